@@ -22,8 +22,10 @@ along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
 from conrad.compat import *
 
 import numpy as np
+import scipy.sparse as sp
 
 from conrad.defs import vec, is_vector, sparse_or_dense
+from conrad.abstract.matrix import csx_slice_compressed
 
 # TODO: Change module to maps?
 # TODO: Change this to DiscreteMap?
@@ -66,12 +68,51 @@ class DiscreteMapping(object):
 		self.__forwardmap = vec(map_vector).astype(int)
 		self.__n_frame0 = len(self.__forwardmap)
 		self.__n_frame1 = self.__forwardmap.max() + 1
+		self.__matrix = None
 
 	@property
 	def vec(self):
 		""" Vector representation of forward mapping. """
 		return self.__forwardmap
 
+	@property
+	def matrix(self):
+		r"""
+		Sparse matrix representation of forward mapping.
+
+		Matrix ``C`` in :math:`\{0, 1\}^{K \times M}`, for ``M`` =
+		:attr:`DiscreteMapping.n_frame0` and ``K`` =
+		:attr:`DiscreteMapping.n_frame1`, with :math:`C_{ki} = 1` if
+		and only if entry ``i`` of the first set maps to entry ``k`` of
+		the second. Built on first access, in CSR format with
+		:obj:`numpy.float32` entries (so that products preserve the
+		precision of their other operand), and cached.
+		"""
+		if self.__matrix is None:
+			pointers = np.zeros(self.n_frame1 + 1, dtype=int)
+			np.cumsum(
+					np.bincount(self.vec, minlength=self.n_frame1),
+					out=pointers[1:])
+			self.__matrix = sp.csr_matrix((
+					np.ones(self.n_frame0, dtype=np.float32),
+					np.argsort(self.vec, kind='stable'), pointers),
+					shape=(self.n_frame1, self.n_frame0))
+		return self.__matrix
+
+	@staticmethod
+	def _output_dtype(in_):
+		if np.issubdtype(in_.dtype, np.floating):
+			return in_.dtype
+		return np.float64
+
+	@staticmethod
+	def _check_inplace_output(out_):
+		if not isinstance(out_, np.ndarray):
+			raise TypeError(
+					'output of in-place mapping must be of type {}; use '
+					'allocating version of method for sparse matrices'
+					''.format(np.ndarray))
+
 	def __getitem__(self, index):
 		return self.vec[index]
 
@@ -96,13 +137,16 @@ class DiscreteMapping(object):
 			# end for
 
 		If arrays are matrices, mapping operates on rows. If arrays are
-		vectors, mapping operates on entries.
+		vectors, mapping operates on entries. Vectors are aggregated
+		with :func:`numpy.bincount`, matrices by multiplication with
+		:attr:`DiscreteMapping.matrix`.
 
 		Arguments:
 			in_: Input array with :attr:`DiscreteMapping.n_frame0` rows
-				and ``k`` >= ``1`` columns.
-			out_: Output array with :attr:`DiscreteMapping.n_frame1`
-				rows and ``k`` >= 1 columns. Modified in-place.
+				and ``k`` >= ``1`` columns; may be sparse.
+			out_: Dense output array with
+				:attr:`DiscreteMapping.n_frame1` rows and ``k`` >= 1
+				columns. Modified in-place.
 			clear_output (:obj:`bool`, optional): If ``True``, set
 				output array to ``0`` before adding input values.
 
@@ -111,7 +155,7 @@ class DiscreteMapping(object):
 
 		Raises:
 			TypeError: If input and output arrays are not (jointly)
-				vectors or matrices.
+				vectors or matrices, or if output array is sparse.
 			ValueError: If input and output array dimensions are not
 				compatible with each other or consistent with the
 				dimensions of the mapping.
@@ -121,6 +165,7 @@ class DiscreteMapping(object):
 		if not (vector_processing or matrix_processing):
 			raise TypeError('arguments "in_" and "out_" be numpy or '
 							'scipy vectors or matrices')
+		self._check_inplace_output(out_)
 
 		dim_in1 = in_.shape[0]
 		dim_out1 = out_.shape[0]
@@ -145,12 +190,12 @@ class DiscreteMapping(object):
 			out_ *= 0
 
 		if vector_processing:
-			for idx_0, idx_1 in enumerate(self.vec):
-				out_[idx_1] += in_[idx_0]
+			out_ += np.bincount(
+					self.vec, weights=in_, minlength=self.n_frame1)
+		elif isinstance(in_, np.ndarray):
+			out_ += self.matrix.dot(in_)
 		else:
-			for idx_0, idx_1 in enumerate(self.vec):
-				out_[idx_1, :] += in_[idx_0, :]
-		# TODO: use efficient slicing when input is sparse. warn when output sparse??
+			out_ += self.matrix.dot(in_).toarray()
 
 		return out_
 
@@ -161,24 +206,29 @@ class DiscreteMapping(object):
 		If input array is a matrix, mapping operates on rows. If array
 		is a vector, mapping operates on entries.
 
-		A new empty vector or matrix
-
 		Arguments:
 			in_: Input array with :attr:`DiscreteMapping.n_frame0` rows
 				and ``k`` >= ``1`` columns.
 
 		Returns:
-			:class:`numpy.ndarray`: Array with
-			:attr:`DiscreteMapping.n_frame1` rows and ``k`` columns.
-			Input entries are mapped one-to-one or one-to-many *into*
-			output.
+			Array with :attr:`DiscreteMapping.n_frame1` rows and ``k``
+			columns: a :class:`numpy.ndarray`, or a sparse matrix in
+			the format of ``in_`` if ``in_`` is sparse. Input entries
+			are mapped one-to-one or one-to-many *into* output.
 		"""
+		if sparse_or_dense(in_) and not isinstance(in_, np.ndarray):
+			if in_.shape[0] != self.n_frame0:
+				raise ValueError(
+						'argument "in_" must have {} rows'
+						''.format(self.n_frame0))
+			return self.matrix.dot(in_).asformat(in_.format)
+
 		if is_vector(in_):
-			out_ = np.zeros(self.__n_frame1)
+			out_ = np.zeros(self.__n_frame1, dtype=self._output_dtype(in_))
 		elif sparse_or_dense(in_):
 			dim1 = self.__n_frame1
 			dim2 = in_.shape[1]
-			out_ = np.zeros((dim1, dim2))
+			out_ = np.zeros((dim1, dim2), dtype=self._output_dtype(in_))
 
 		return self.frame0_to_1_inplace(in_, out_)
 
@@ -194,13 +244,15 @@ class DiscreteMapping(object):
 			# end for
 
 		If arrays are matrices, mapping operates on rows. If arrays are
-		vectors, mapping operates on entries.
+		vectors, mapping operates on entries. Rows are gathered by
+		indexing with :attr:`DiscreteMapping.vec`.
 
 		Arguments:
 			in_: Input array with :attr:`DiscreteMapping.n_frame1` rows
-				and ``k`` >= ``1`` columns.
-			out_: Output array with :attr:``DiscreteMapping.n_frame0``
-				rows and ``k`` >= ``1`` columns. Modified in-place.
+				and ``k`` >= ``1`` columns; may be sparse.
+			out_: Dense output array with
+				:attr:``DiscreteMapping.n_frame0`` rows and ``k`` >=
+				``1`` columns. Modified in-place.
 			clear_output (:obj:`bool`, optional): If ``True``, set
 				output array to ``0`` before adding input values.
 
@@ -209,7 +261,7 @@ class DiscreteMapping(object):
 
 		Raises:
 			TypeError: If input and output arrays are not (jointly)
-				vectors or matrices.
+				vectors or matrices, or if output array is sparse.
 			ValueError: If input and output array dimensions are not
 				compatible with each other or consistent with the
 				dimensions of the mapping.
@@ -220,6 +272,7 @@ class DiscreteMapping(object):
 		if not (vector_processing or matrix_processing):
 			raise TypeError('arguments "in_" and "out_" be numpy or '
 							'scipy vectors or matrices')
+		self._check_inplace_output(out_)
 
 		dim_in1 = in_.shape[0]
 		dim_out1 = out_.shape[0]
@@ -243,16 +296,17 @@ class DiscreteMapping(object):
 		if clear_output:
 			out_ *= 0
 
-		if vector_processing:
-			for idx_0, idx_1 in enumerate(self.vec):
-				out_[idx_0] += in_[idx_1]
-
-		if matrix_processing:
-			for idx_0, idx_1 in enumerate(self.vec):
-				out_[idx_0, :] += in_[idx_1, :]
+		if isinstance(in_, np.ndarray):
+			out_ += in_[self.vec]
+		else:
+			out_ += self.__gather_rows(in_).toarray()
 
 		return out_
 
+	def __gather_rows(self, in_):
+		return csx_slice_compressed(
+				in_.tocsr(), self.vec).asformat(in_.format)
+
 	def frame1_to_0(self, in_):
 		"""
 		Allocating version of :meth`DiscreteMapping.frame1_to_0`.
@@ -265,17 +319,25 @@ class DiscreteMapping(object):
 				and ``k`` >= ``1`` columns.
 
 		Returns:
-			:class:`numpy.ndarray`: Array with
-			:attr:`DiscreteMapping.n_frame0` rows and same number of
-			columns as input. Input entries are mapped one-to-one or
-			many-to-one *into* output.
+			Array with :attr:`DiscreteMapping.n_frame0` rows and same
+			number of columns as input: a :class:`numpy.ndarray`, or a
+			sparse matrix in the format of ``in_`` if ``in_`` is
+			sparse. Input entries are mapped one-to-one or many-to-one
+			*into* output.
 		"""
+		if sparse_or_dense(in_) and not isinstance(in_, np.ndarray):
+			if in_.shape[0] != self.n_frame1:
+				raise ValueError(
+						'argument "in_" must have {} rows'
+						''.format(self.n_frame1))
+			return self.__gather_rows(in_)
+
 		if is_vector(in_):
-			out_ = np.zeros(self.__n_frame0)
+			out_ = np.zeros(self.__n_frame0, dtype=self._output_dtype(in_))
 		elif sparse_or_dense(in_):
 			dim1 = self.__n_frame0
 			dim2 = in_.shape[1]
-			out_ = np.zeros((dim1, dim2))
+			out_ = np.zeros((dim1, dim2), dtype=self._output_dtype(in_))
 
 		return self.frame1_to_0_inplace(in_, out_)
 
@@ -296,9 +358,8 @@ class ClusterMapping(DiscreteMapping):
 				first set to the v[i]'th cluster in the second set.
 		"""
 		DiscreteMapping.__init__(self, clustering_vector)
-		self.__cluster_weights = np.zeros(self.n_clusters)
-		for cluster_index in self.vec:
-			self.__cluster_weights[cluster_index] += 1.
+		self.__cluster_weights = np.bincount(
+				self.vec, minlength=self.n_clusters).astype(float)
 		self.__empty_clusters = np.sum(self.__cluster_weights == 0) > 0
 
 	@property
@@ -316,6 +377,23 @@ class ClusterMapping(DiscreteMapping):
 		""" Number of elements mapped to each cluster. """
 		return self.__cluster_weights
 
+	@staticmethod
+	def __scale_rows(data, factors):
+		"""
+		Scale rows (entries) of matrix (vector) ``data`` in-place.
+
+		Sparse matrices are scaled through their arrays of nonzero
+		values, which leaves their structure unchanged.
+		"""
+		if isinstance(data, sp.csr_matrix):
+			data.data *= np.repeat(factors, np.diff(data.indptr))
+		elif isinstance(data, sp.csc_matrix):
+			data.data *= factors[data.indices]
+		elif data.shape[0] == data.size:
+			data *= factors.reshape(data.shape)
+		else:
+			data *= factors.reshape(-1, 1)
+
 	def __rescale_len_points(self, data):
 		"""
 		Scale input array's entries by corresponding cluster's weight.
@@ -339,14 +417,8 @@ class ClusterMapping(DiscreteMapping):
 		Returns:
 			None
 		"""
-		vector = data.shape[0] == data.size
-		for idx_point, idx_cluster in enumerate(self.vec):
-			w = self.cluster_weights[idx_cluster]
-			if w > 0:
-				if vector:
-					data[idx_point] *= 1. / w
-				else:
-					data[idx_point, :] *= 1. / w
+		# (every point's cluster is nonempty)
+		self.__scale_rows(data, 1. / self.cluster_weights[self.vec])
 
 	def __rescale_len_clusters(self, data):
 		"""
@@ -372,13 +444,8 @@ class ClusterMapping(DiscreteMapping):
 		Returns:
 			None
 		"""
-		vector = data.shape[0] == data.size
-		for idx_cluster, w in enumerate(self.cluster_weights):
-			if w > 0:
-				if vector:
-					data[idx_cluster] *= 1. / w
-				else:
-					data[idx_cluster, :] *= 1. / w
+		w = self.cluster_weights
+		self.__scale_rows(data, 1. / np.where(w > 0, w, 1.))
 
 	def downsample_inplace(self, in_, out_, rescale_output=True,
 						 clear_output=False):
@@ -512,20 +579,7 @@ class ClusterMapping(DiscreteMapping):
 		if not self.__empty_clusters:
 			return self
 
-		vec = np.zeros(self.vec.size, dtype=int)
-		vec += self.vec
-		idx_order = vec.argsort()
-
-		cluster_new = 0
-		cluster_old = vec[idx_order[0]]
-
-		for idx in idx_order:
-			if vec[idx] != cluster_old:
-				cluster_new += 1
-				cluster_old = vec[idx]
-
-			vec[idx] = cluster_new
-
+		_, vec = np.unique(self.vec, return_inverse=True)
 		return ClusterMapping(vec)
 
 class PermutationMapping(DiscreteMapping):
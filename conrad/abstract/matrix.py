@@ -1,5 +1,6 @@
 from conrad.compat import *
 
+from collections import OrderedDict
 import numpy as np
 import scipy.sparse as sp
 
@@ -9,17 +10,22 @@ def csx_slice_compressed(matrix, indices):
 	"""
 	Slice the rows (CSR) or columns (CSC) of a CS[X] sparse matrix
 
+	The slice is formed by index arithmetic on the matrix's compressed
+	storage: the source position of each nonzero in the submatrix is
+	the start of its row (column) in ``matrix``, plus its offset within
+	that row (column).
+
 	Arguments:
 		matrix (:class:`scipy.sparse.csr_matrix` or
 			:class:`scipy.sparse.csc_matrix`): Matrix to be sliced into
-		indices (:obj:`list`): Indices of compressed dimension to
-			include in submatrix
+		indices (:obj:`list` or :class:`numpy.ndarray`): Indices of
+			compressed dimension to include in submatrix
 
 	Returns:
 		(:class:`scipy.sparse.csr_matrix` or
 		:class:`scipy.sparse.csc_matrix`): Submatrix
 	"""
-	indices = list(indices)
+	indices = np.asarray(indices, dtype=int).ravel()
 
 	if isinstance(matrix, sp.csr_matrix):
 		m = len(indices)
@@ -28,21 +34,20 @@ def csx_slice_compressed(matrix, indices):
 		m = matrix.shape[0]
 		n = len(indices)
 
-	val_full = matrix.data
-	ind_full = matrix.indices
 	ptr_full = matrix.indptr
+	starts = ptr_full[indices]
+	lengths = ptr_full[indices + 1] - starts
 
-	ptr_sub = np.hstack((0, np.diff(ptr_full)[indices].cumsum()))
-	nnz_sub = ptr_sub[-1]
+	ptr_sub = np.zeros(len(indices) + 1, dtype=ptr_full.dtype)
+	np.cumsum(lengths, out=ptr_sub[1:])
+	nnz_sub = int(ptr_sub[-1])
 
-	val_sub = np.zeros(nnz_sub, dtype=val_full.dtype)
-	ind_sub = np.zeros(nnz_sub, dtype=ind_full.dtype)
+	# position in full arrays = row start + offset within row
+	source = np.arange(nnz_sub, dtype=np.intp)
+	source += np.repeat(starts - ptr_sub[:-1], lengths)
 
-	for idx_sub, idx_full in enumerate(indices):
-		ptr_0s, ptr_1s = ptr_sub[idx_sub], ptr_sub[idx_sub + 1]
-		ptr_0f, ptr_1f = ptr_full[idx_full], ptr_full[idx_full + 1]
-		val_sub[ptr_0s:ptr_1s] = val_full[ptr_0f:ptr_1f]
-		ind_sub[ptr_0s:ptr_1s] = ind_full[ptr_0f:ptr_1f]
+	val_sub = matrix.data[source]
+	ind_sub = matrix.indices[source]
 
 	return type(matrix)((val_sub, ind_sub, ptr_sub), shape=(m, n))
 
@@ -50,76 +55,387 @@ def csx_slice_uncompressed(matrix, indices):
 	"""
 	Slice the columns (CSR) or rows (CSC) of a CS[X] sparse matrix
 
+	Nonzeros are selected by a single pass over the matrix's index
+	array, using a lookup table of included positions along the
+	uncompressed dimension; the pointer array of the submatrix is
+	recovered by locating the original pointers among the selected
+	entries.
+
 	Arguments:
 		matrix (:class:`scipy.sparse.csr_matrix` or
 			:class:`scipy.sparse.csc_matrix`): Matrix to be sliced into
-		indices (:obj:`list`): Indices of uncompressed dimension to
-			include in submatrix
+		indices (:obj:`list` or :class:`numpy.ndarray`): Indices of
+			uncompressed dimension to include in submatrix
 
 	Returns:
 		(:class:`scipy.sparse.csr_matrix` or
-		:class:`scipy.sparse.csc_matrix`): Submatrix
+		:class:`scipy.sparse.csc_matrix`): Submatrix. Entries along the
+		sliced dimension are arranged in ascending order of ``indices``.
 
 	"""
-	indices = list(indices)
+	indices = np.sort(np.asarray(indices, dtype=int).ravel())
 
 	if isinstance(matrix, sp.csr_matrix):
 		m = matrix.shape[0]
 		n = len(indices)
+		dim = matrix.shape[1]
 	else:
 		m = len(indices)
 		n = matrix.shape[1]
+		dim = matrix.shape[0]
 
-	val_full = matrix.data
 	ind_full = matrix.indices
 	ptr_full = matrix.indptr
 
-	ptr_sub = np.zeros_like(ptr_full)
-	included = np.zeros(matrix.nnz, dtype=bool)
-	indices.sort()
-	perm_inverse = {}
-	for i0, i1 in enumerate(indices):
-		perm_inverse[i1] = i0
-
-	for k in xrange(len(ptr_full) - 1):
-		ptr0, ptr1 = ptr_full[k], ptr_full[k + 1]
-		ind_slice = ind_full[ptr0:ptr1]
-		index_iter = iter(indices)
-		i_target = next(index_iter)
-		for j in np.argsort(ind_slice):
-			i_sorted = ind_slice[j]
-			while i_sorted > i_target and i_target < indices[-1]:
-				i_target = next(index_iter)
-			if i_sorted < i_target:
-				continue
-			elif i_sorted == i_target:
-				ptr_sub[k + 1] += 1
-				included[ptr0 + j] = True
-
-	ptr_sub[1:] = ptr_sub[1:].cumsum()
-	nnz_sub = ptr_sub[-1]
-	val_sub = np.zeros(nnz_sub, dtype=val_full.dtype)
-	ind_sub = np.zeros(nnz_sub, dtype=ind_full.dtype)
-
-	head = 0
-	for ptr, include in enumerate(included):
-		if include:
-			ind_sub[head] = perm_inverse[ind_full[ptr]]
-			val_sub[head] = val_full[ptr]
-			head += 1
+	included = np.zeros(dim, dtype=bool)
+	included[indices] = True
+	perm_inverse = np.zeros(dim, dtype=ind_full.dtype)
+	perm_inverse[indices] = np.arange(len(indices), dtype=ind_full.dtype)
+
+	selected = np.flatnonzero(included[ind_full])
+	ptr_sub = np.searchsorted(selected, ptr_full).astype(ptr_full.dtype)
+
+	val_sub = matrix.data[selected]
+	ind_sub = perm_inverse[ind_full[selected]]
 
 	return type(matrix)((val_sub, ind_sub, ptr_sub), shape=(m, n))
 
+QUANTIZED_CODE_TYPES = {8: np.uint8, 16: np.uint16}
+
+class QuantizedMatrix(object):
+	r"""
+	Sparse matrix with entries quantized column by column.
+
+	Each entry :math:`a_{ij}` is stored as an unsigned integer code
+	:math:`c_{ij}` of 8 or 16 bits, with :math:`a_{ij} \approx s_j
+	c_{ij}` for the column scale :math:`s_j = \max_i a_{ij} /
+	(2^\mbox{bits} - 1)`; each entry is thus recovered to within
+	:math:`s_j / 2`. Optionally, entries smaller than a fixed fraction
+	of their column's maximum are dropped. Codes are held in CSR or CSC
+	layout.
+
+	Products with vectors are formed from the codes directly, by
+	scaling the vector instead of decompressing the matrix. Slices are
+	decompressed on request.
+
+	Entries must be nonnegative, as for dose matrices.
+	"""
+	def __init__(self, matrix, shape=None, layout_CSR=True, bits=16,
+				 threshold=0., dtype=None):
+		"""
+		Initialize :class:`QuantizedMatrix`.
+
+		Arguments:
+			matrix: Dense or sparse matrix to quantize, or tuple
+				``(codes, indices, pointers, scales)`` of arrays
+				holding a quantized matrix in compressed layout.
+			shape (:obj:`tuple`, optional): Matrix dimensions; required
+				when ``matrix`` is a tuple of arrays.
+			layout_CSR (:obj:`bool`, optional): Store codes in CSR
+				rather than CSC layout. Ignored for sparse input,
+				which retains its layout.
+			bits (:obj:`int`, optional): Width of codes, 8 or 16.
+				Ignored for a tuple of arrays, whose codes determine
+				their width.
+			threshold (:obj:`float`, optional): Drop entries smaller
+				than ``threshold`` times the largest entry of their
+				column.
+			dtype (optional): Floating point type of decompressed
+				entries and of matrix-vector products. Defaults to the
+				type of ``matrix``, or :obj:`numpy.float32` for a tuple
+				of arrays.
+
+		Raises:
+			TypeError: If ``matrix`` is not a tuple of arrays or a
+				matrix type recognized by :mod:`conrad`, or if codes
+				have an unsupported type.
+			ValueError: If ``shape`` missing for a tuple of arrays, if
+				``bits`` or ``threshold`` out of range, or if
+				``matrix`` has negative entries.
+		"""
+		if isinstance(matrix, tuple):
+			if shape is None:
+				raise ValueError(
+						'argument `shape` required when matrix provided '
+						'as a tuple of arrays')
+			codes, indices, pointers, scales = matrix
+			codes = np.asarray(codes)
+			if codes.dtype.type not in QUANTIZED_CODE_TYPES.values():
+				raise TypeError(
+						'quantized codes must be one of the following '
+						'types: {}'.format(QUANTIZED_CODE_TYPES.values()))
+			constructor = sp.csr_matrix if layout_CSR else sp.csc_matrix
+			self.__codes = constructor(
+					(codes, indices, pointers), shape=tuple(shape))
+			self.__scales = np.asarray(scales)
+			self.__dtype = np.dtype(np.float32 if dtype is None else dtype)
+			return
+
+		if not sparse_or_dense(matrix):
+			raise TypeError(
+					'matrix to quantize must be one of the following '
+					'types: {}'.format(CONRAD_MATRIX_TYPES))
+		if bits not in QUANTIZED_CODE_TYPES:
+			raise ValueError(
+					'argument `bits` must be one of {}'
+					''.format(sorted(QUANTIZED_CODE_TYPES.keys())))
+		threshold = float(threshold)
+		if not 0 <= threshold < 1:
+			raise ValueError('argument `threshold` must be in [0, 1)')
+
+		if dtype is None:
+			dtype = matrix.dtype if np.issubdtype(
+					matrix.dtype, np.floating) else np.float64
+		self.__dtype = np.dtype(dtype)
+
+		if isinstance(matrix, np.ndarray):
+			matrix = sp.csr_matrix(matrix) if layout_CSR else \
+					 sp.csc_matrix(matrix)
+		else:
+			matrix = matrix.copy()
+			matrix.sum_duplicates()
+		if matrix.nnz > 0 and matrix.data.min() < 0:
+			raise ValueError(
+					'matrix to quantize must have nonnegative entries')
+
+		column_max = np.zeros(matrix.shape[1])
+		columns = self.__entry_columns(matrix)
+		np.maximum.at(column_max, columns, matrix.data)
+		levels = 2**bits - 1
+		self.__scales = column_max / levels
+
+		# (column scales are positive wherever entries are nonzero)
+		with np.errstate(divide='ignore', invalid='ignore'):
+			codes = np.rint(matrix.data / self.__scales[columns])
+		keep = codes > 0
+		if threshold > 0:
+			keep &= matrix.data >= threshold * column_max[columns]
+		counts = np.zeros(matrix.nnz + 1, dtype=matrix.indptr.dtype)
+		np.cumsum(keep, out=counts[1:])
+
+		self.__codes = type(matrix)((
+				codes[keep].astype(QUANTIZED_CODE_TYPES[bits]),
+				matrix.indices[keep], counts[matrix.indptr]),
+				shape=matrix.shape)
+
+	@staticmethod
+	def __entry_columns(matrix):
+		if isinstance(matrix, sp.csr_matrix):
+			return matrix.indices
+		return np.repeat(
+				np.arange(matrix.shape[1]), np.diff(matrix.indptr))
+
+	@property
+	def shape(self):
+		""" Matrix dimensions. """
+		return self.__codes.shape
+
+	@property
+	def nnz(self):
+		""" Number of stored entries. """
+		return self.__codes.nnz
+
+	@property
+	def bits(self):
+		""" Width of integer codes. """
+		return 8 * self.__codes.data.dtype.itemsize
+
+	@property
+	def dtype(self):
+		""" Floating point type of decompressed entries. """
+		return self.__dtype
+
+	@property
+	def layout_CSR(self):
+		""" ``True`` if codes held in CSR layout, else CSC. """
+		return isinstance(self.__codes, sp.csr_matrix)
+
+	@property
+	def codes(self):
+		""" Integer code of each stored entry. """
+		return self.__codes.data
+
+	@property
+	def indices(self):
+		""" Column (CSR) or row (CSC) index of each stored entry. """
+		return self.__codes.indices
+
+	@property
+	def pointers(self):
+		""" Offset of each row (CSR) or column (CSC) in stored entries. """
+		return self.__codes.indptr
+
+	@property
+	def scales(self):
+		""" Scale of each column's codes. """
+		return self.__scales
+
+	@property
+	def nbytes(self):
+		""" Bytes held by codes, indices, pointers and scales. """
+		return sum(a.nbytes for a in (
+				self.codes, self.indices, self.pointers, self.scales))
+
+	def astype(self, dtype):
+		"""
+		Copy of matrix that decompresses to ``dtype``.
+
+		Arrays of codes, indices, pointers and scales are shared.
+
+		Arguments:
+			dtype: Floating point type of decompressed entries.
+
+		Returns:
+			:class:`QuantizedMatrix`
+		"""
+		return QuantizedMatrix(
+				(self.codes, self.indices, self.pointers, self.scales),
+				shape=self.shape, layout_CSR=self.layout_CSR, dtype=dtype)
+
+	def __decompress(self, codes, scales):
+		data = codes.data * scales[self.__entry_columns(codes)]
+		return type(codes)(
+				(data.astype(self.dtype), codes.indices, codes.indptr),
+				shape=codes.shape)
+
+	def decompress(self):
+		"""
+		Decompress matrix.
+
+		Returns:
+			:class:`scipy.sparse.csr_matrix` or
+			:class:`scipy.sparse.csc_matrix`: Matrix with entries of
+			type :attr:`QuantizedMatrix.dtype`, in the layout of the
+			codes.
+		"""
+		return self.__decompress(self.__codes, self.__scales)
+
+	def row_slice(self, indices):
+		"""
+		Decompress rows of matrix.
+
+		Arguments:
+			indices: Indices of rows to include in submatrix.
+
+		Returns:
+			Decompressed submatrix, in the layout of the codes.
+		"""
+		if self.layout_CSR:
+			codes = csx_slice_compressed(self.__codes, indices)
+		else:
+			codes = csx_slice_uncompressed(self.__codes, indices)
+		return self.__decompress(codes, self.__scales)
+
+	def column_slice(self, indices):
+		"""
+		Decompress columns of matrix.
+
+		Arguments:
+			indices: Indices of columns to include in submatrix.
+
+		Returns:
+			Decompressed submatrix, in the layout of the codes. As for
+			:func:`csx_slice_uncompressed`, columns of a CSR
+			submatrix are arranged in ascending order of ``indices``.
+		"""
+		indices = np.asarray(indices, dtype=int).ravel()
+		if self.layout_CSR:
+			codes = csx_slice_uncompressed(self.__codes, indices)
+			indices = np.sort(indices)
+		else:
+			codes = csx_slice_compressed(self.__codes, indices)
+		return self.__decompress(codes, self.__scales[indices])
+
+	def dot(self, x):
+		r"""
+		Multiply matrix by vector (or matrix) ``x``.
+
+		The product is formed from the integer codes, as
+		:math:`C(\mathbf{diag}(s)x)`, without decompressing the matrix.
+
+		Arguments:
+			x: Vector of length :attr:`QuantizedMatrix.shape` [1], or
+				matrix with as many rows.
+
+		Returns:
+			:class:`numpy.ndarray`: Product, of type
+			:attr:`QuantizedMatrix.dtype`.
+
+		Raises:
+			ValueError: If dimensions of ``x`` incompatible.
+		"""
+		x = np.asarray(x)
+		if x.shape[0] != self.shape[1]:
+			raise ValueError(
+					'argument `x` must have {} rows'.format(self.shape[1]))
+		scales = self.__scales.reshape((-1,) + (1,) * (x.ndim - 1))
+		return np.asarray(self.__codes.dot(
+				(scales * x).astype(self.dtype, copy=False)))
+
+	def dot_transpose(self, y):
+		"""
+		Multiply transpose of matrix by vector (or matrix) ``y``.
+
+		Arguments:
+			y: Vector of length :attr:`QuantizedMatrix.shape` [0], or
+				matrix with as many rows.
+
+		Returns:
+			:class:`numpy.ndarray`: Product, of type
+			:attr:`QuantizedMatrix.dtype`.
+
+		Raises:
+			ValueError: If dimensions of ``y`` incompatible.
+		"""
+		y = np.asarray(y)
+		if y.shape[0] != self.shape[0]:
+			raise ValueError(
+					'argument `y` must have {} rows'.format(self.shape[0]))
+		scales = self.__scales.reshape((-1,) + (1,) * (y.ndim - 1))
+		product = self.__codes.T.dot(y.astype(self.dtype, copy=False))
+		return (scales * np.asarray(product)).astype(self.dtype, copy=False)
+
 class SliceCachingMatrix(object):
-	def __init__(self, data):
+	"""
+	Matrix that caches submatrices sliced by row and/or column labels.
+
+	Slices supplied as primary data (i.e., by dictionary input) are
+	held for the lifetime of the object. Slices derived from the
+	primary data are cached in least-recently-used order; when a
+	:attr:`SliceCachingMatrix.cache_budget` is set, the least recently
+	used derived slices that are not pinned are evicted whenever the
+	derived slices together occupy more than the budgeted number of
+	bytes.
+	"""
+
+	def __init__(self, data, cache_budget=None):
+		"""
+		Initialize :class:`SliceCachingMatrix`.
+
+		Arguments:
+			data: Contiguous matrix, or dictionary of labeled
+				submatrices.
+			cache_budget (:obj:`int`, optional): Maximum number of
+				bytes held by derived (i.e., non-primary) slices.
+				Unbounded if ``None``.
+		"""
 		self.__dim1 = None
 		self.__dim2 = None
 		self.__data = None
 		self.__row_slices = {}
 		self.__column_slices = {}
 		self.__double_slices = {}
+		self.__cache_order = OrderedDict()
+		self.__primary = set()
+		self.__pinned = set()
+		self.__cache_budget = None
+		self.__cache_bytes = 0
+		self.__cache_hits = 0
+		self.__cache_misses = 0
+		self.__cache_evictions = 0
 
 		self.data = data
+		self.cache_budget = cache_budget
 
 	def __contains__(self, comparator):
 		if not isinstance(comparator, (int, tuple)):
@@ -219,20 +535,200 @@ class SliceCachingMatrix(object):
 
 			self.__shape_check((rows, columns))
 			self.__dim1, self.__dim2 = rows, columns
-			if labeled_by == 'columns':
-				self.__column_slices.update(data)
-			else:
-				self.__row_slices.update(data)
+			kind = 'column' if labeled_by == 'columns' else 'row'
+			for label in data:
+				if (kind, label) in self.__cache_order:
+					self.__cache_bytes -= self.__cache_order.pop(
+							(kind, label))
+					self.__pinned.discard((kind, label))
+				self.__primary.add((kind, label))
+			self.__slices(kind).update(data)
 		else:
-			if not sparse_or_dense(data):
+			if not (sparse_or_dense(data) or
+					isinstance(data, QuantizedMatrix)):
 				raise TypeError(
 						'when data provided as a singleton matrix, '
 						'it must be formatted as one of the following '
-						'matrix types {}'.format(CONRAD_MATRIX_TYPES))
+						'matrix types {}'.format(
+								CONRAD_MATRIX_TYPES + (QuantizedMatrix,)))
 			self.__shape_check(data.shape)
 			self.__dim1, self.__dim2 = data.shape
 			self.__data = data
 
+	@staticmethod
+	def __nbytes(matrix):
+		if isinstance(matrix, np.ndarray):
+			return matrix.nbytes
+		return matrix.data.nbytes + matrix.indices.nbytes + \
+				matrix.indptr.nbytes
+
+	def __slices(self, kind):
+		if kind == 'row':
+			return self.__row_slices
+		elif kind == 'column':
+			return self.__column_slices
+		elif kind == 'both':
+			return self.__double_slices
+		else:
+			raise ValueError(
+					'slice kind must be one of `row`, `column` or '
+					'`both`')
+
+	def __cache_hit(self, kind, label):
+		self.__cache_hits += 1
+		key = (kind, label)
+		if key in self.__cache_order:
+			# mark as most recently used
+			self.__cache_order[key] = self.__cache_order.pop(key)
+		return self.__slices(kind)[label]
+
+	def __cache_insert(self, kind, label, submatrix):
+		self.__cache_misses += 1
+		key = (kind, label)
+		nbytes = self.__nbytes(submatrix)
+		self.__slices(kind)[label] = submatrix
+		self.__cache_order[key] = nbytes
+		self.__cache_bytes += nbytes
+		self.__enforce_budget()
+		return submatrix
+
+	def __evict_entry(self, key):
+		kind, label = key
+		self.__slices(kind).pop(label)
+		self.__cache_bytes -= self.__cache_order.pop(key)
+		self.__pinned.discard(key)
+		self.__cache_evictions += 1
+
+	def __enforce_budget(self):
+		if self.__cache_budget is None:
+			return
+		for key in list(self.__cache_order.keys()):
+			if self.__cache_bytes <= self.__cache_budget:
+				break
+			if key not in self.__pinned:
+				self.__evict_entry(key)
+
+	@property
+	def cache_budget(self):
+		"""
+		Maximum number of bytes held by derived slices.
+
+		Primary slices and pinned slices are never evicted to meet the
+		budget; pinned slices count towards it. Lowering the budget
+		evicts slices immediately. Unbounded if ``None``.
+
+		Raises:
+			ValueError: If budget is negative.
+		"""
+		return self.__cache_budget
+
+	@cache_budget.setter
+	def cache_budget(self, cache_budget):
+		if cache_budget is not None:
+			cache_budget = int(cache_budget)
+			if cache_budget < 0:
+				raise ValueError('cache budget must be nonnegative')
+		self.__cache_budget = cache_budget
+		self.__enforce_budget()
+
+	@property
+	def cache_stats(self):
+		"""
+		Dictionary of slice cache statistics.
+
+		Entries are: ``hits`` and ``misses`` (lookups served from and
+		added to the cache), ``evictions``, ``entries`` (number of
+		derived slices held), ``pinned``, ``bytes`` (held by derived
+		slices), ``primary_bytes`` (held by primary slices), and
+		``budget``.
+		"""
+		return {
+				'hits': self.__cache_hits,
+				'misses': self.__cache_misses,
+				'evictions': self.__cache_evictions,
+				'entries': len(self.__cache_order),
+				'pinned': len(self.__pinned),
+				'bytes': self.__cache_bytes,
+				'primary_bytes': sum(
+						self.__nbytes(self.__slices(kind)[label]) for
+						kind, label in self.__primary),
+				'budget': self.__cache_budget,
+		}
+
+	def __cached_key(self, label, kind):
+		key = (kind, label)
+		if label not in self.__slices(kind):
+			raise KeyError(
+					'no {} slice with label {} cached'.format(kind, label))
+		return key
+
+	def pin(self, label, kind='row'):
+		"""
+		Exempt a cached slice from eviction.
+
+		Arguments:
+			label: Label of slice; a (row label, column label) tuple
+				if ``kind`` is ``both``.
+			kind (:obj:`str`, optional): One of ``row``, ``column`` or
+				``both``.
+
+		Returns:
+			None
+
+		Raises:
+			KeyError: If no slice cached under ``label``.
+		"""
+		key = self.__cached_key(label, kind)
+		if key not in self.__primary:
+			self.__pinned.add(key)
+
+	def unpin(self, label, kind='row'):
+		"""
+		Make a pinned slice eligible for eviction again.
+
+		Arguments:
+			label: Label of slice.
+			kind (:obj:`str`, optional): One of ``row``, ``column`` or
+				``both``.
+
+		Returns:
+			None
+		"""
+		self.__pinned.discard((kind, label))
+		self.__enforce_budget()
+
+	def evict(self, label=None, kind='row'):
+		"""
+		Remove derived slice(s) from cache.
+
+		Arguments:
+			label (optional): Label of slice to evict, which is removed
+				even if pinned. If ``None``, evict all derived slices
+				that are not pinned.
+			kind (:obj:`str`, optional): One of ``row``, ``column`` or
+				``both``; ignored if ``label`` is ``None``.
+
+		Returns:
+			None
+
+		Raises:
+			KeyError: If no slice cached under ``label``.
+			ValueError: If ``label`` refers to a slice supplied as
+				primary data.
+		"""
+		if label is None:
+			for key in list(self.__cache_order.keys()):
+				if key not in self.__pinned:
+					self.__evict_entry(key)
+			return
+
+		key = self.__cached_key(label, kind)
+		if key in self.__primary:
+			raise ValueError(
+					'{} slice with label {} supplied as primary data, '
+					'cannot be evicted'.format(kind, label))
+		self.__evict_entry(key)
+
 	@staticmethod
 	def __row_slice_generic(data, indices):
 		if indices is None:
@@ -242,6 +738,8 @@ class SliceCachingMatrix(object):
 
 		if isinstance(data, np.ndarray):
 			return data[indices, :]
+		elif isinstance(data, QuantizedMatrix):
+			return data.row_slice(indices)
 		elif isinstance(data, sp.csr_matrix):
 			return csx_slice_compressed(data, indices)
 		else:
@@ -249,7 +747,7 @@ class SliceCachingMatrix(object):
 
 	def row_slice(self, label, indices):
 		if label in self.__row_slices:
-			return self.__row_slices[label]
+			return self.__cache_hit('row', label)
 		if self.data is None:
 			raise AttributeError(
 					'unified matrix for all rows not set/built, '
@@ -260,9 +758,8 @@ class SliceCachingMatrix(object):
 		else:
 			if callable(indices):
 				indices = indices(label)
-			self.__row_slices[label] = self.__row_slice_generic(
-					self.data, indices)
-			return self.__row_slices[label]
+			return self.__cache_insert('row', label, self.__row_slice_generic(
+					self.data, indices))
 
 	def row_assemble(self, labels):
 		raise NotImplementedError
@@ -275,6 +772,8 @@ class SliceCachingMatrix(object):
 					'an uncached slice')
 		if isinstance(data, np.ndarray):
 			return data[:, indices]
+		elif isinstance(data, QuantizedMatrix):
+			return data.column_slice(indices)
 		elif isinstance(data, sp.csr_matrix):
 			return csx_slice_uncompressed(data, indices)
 		else:
@@ -282,7 +781,7 @@ class SliceCachingMatrix(object):
 
 	def column_slice(self, label, indices):
 		if label in self.__column_slices:
-			return self.__column_slices[label]
+			return self.__cache_hit('column', label)
 		if self.data is None:
 			raise AttributeError(
 					'unified matrix for all columns not set/built, '
@@ -293,9 +792,9 @@ class SliceCachingMatrix(object):
 		else:
 			if callable(indices):
 				indices = indices(label)
-			self.__column_slices[label] = self.__column_slice_generic(
-					self.data, indices)
-			return self.__column_slices[label]
+			return self.__cache_insert(
+					'column', label, self.__column_slice_generic(
+							self.data, indices))
 
 	def column_assemble(self, labels):
 		raise NotImplementedError
@@ -314,21 +813,24 @@ class SliceCachingMatrix(object):
 			key = (row_label, column_label)
 			if key in self.__double_slices:
 				# return precomputed (row, column)labeled submatrix, if cached
-				return self.__double_slices[key]
+				return self.__cache_hit('both', key)
 			elif row_label in self.__row_slices:
 				# use precomputed row-labeled submatrix, if cached
 				if callable(column_indices):
 					column_indices = column_indices(column_label)
-				self.__double_slices[key] = self.__column_slice_generic(
-						self.__row_slices[row_label], column_indices)
+				submatrix = self.__column_slice_generic(
+						self.__cache_hit('row', row_label), column_indices)
 			elif column_label in self.__column_slices:
 				# use precomputed column-labeled submatrix, if cached
 				if callable(row_indices):
 					row_indices = row_indices(row_label)
-				self.__double_slices[key] = self.__row_slice_generic(
-						self.__column_slices[column_label], row_indices)
+				submatrix = self.__row_slice_generic(
+						self.__cache_hit('column', column_label), row_indices)
 			else:
-				if isinstance(self.data, (np.ndarray, sp.csr_matrix)):
+				row_major = isinstance(self.data, (np.ndarray, sp.csr_matrix))
+				if isinstance(self.data, QuantizedMatrix):
+					row_major = self.data.layout_CSR
+				if row_major:
 					slice1 = self.row_slice
 					label = row_label
 					indices1 = row_indices
@@ -341,9 +843,8 @@ class SliceCachingMatrix(object):
 					slice2 = self.__row_slice_generic
 					indices2 = row_indices
 
-				self.__double_slices[key] = slice2(
-						slice1(label, indices1), indices2)
-			return self.__double_slices[key]
+				submatrix = slice2(slice1(label, indices1), indices2)
+			return self.__cache_insert('both', key, submatrix)
 
 	@property
 	def __cached_slices(self):
@@ -21,13 +21,21 @@ Define :class:`Case`, the top level interface for treatment planning.
 """
 from conrad.compat import *
 
+import time
+import asyncio
 import warnings
+import functools
+import itertools
+import threading
+import multiprocessing
 import numpy as np
+from concurrent.futures import CancelledError
 
 from conrad.physics import Physics
 from conrad.medicine import Anatomy, Prescription
 from conrad.optimization.problem import PlanningProblem
-from conrad.optimization.history import RunRecord, PlanningHistory
+from conrad.optimization.history import RunOutput, RunRecord, \
+										PlanningHistory
 
 class Case(object):
 	"""
@@ -336,7 +344,7 @@ class Case(object):
 
 		for structure in self.anatomy:
 			A = self.physics.dose_matrix_by_label(structure.label)
-			if A.shape[0] == 1:
+			if A.shape[0] == 1 and structure.size != 1:
 				structure.A_mean = A
 			else:
 				structure.A_full = A
@@ -349,6 +357,36 @@ class Case(object):
 				structure.voxel_weights = vw
 		self.physics.mark_data_as_loaded()
 
+	def change_dose_frame(self, frame_name):
+		"""
+		Switch dose frame of :attr:`Case.physics` used for planning.
+
+		Dose matrices and voxel weights of the new frame are loaded to
+		each structure in :attr:`Case.anatomy`. Structures are resized
+		if the frames discretize their voxels differently, e.g., if the
+		new frame is voxel-clustered.
+
+		Arguments:
+			frame_name (:obj:`str`): Name of a dose frame attached to
+				:attr:`Case.physics`.
+
+		Returns:
+			None
+
+		Raises:
+			KeyError: If no frame named ``frame_name`` attached.
+		"""
+		if frame_name == self.physics.frame.name and self.physics.data_loaded:
+			return
+		self.physics.change_dose_frame(frame_name)
+		if not self.physics.plannable:
+			return
+		for structure in self.anatomy:
+			voxels = self.physics.dose_matrix_by_label(structure.label).shape[0]
+			if structure.size not in (None, voxels):
+				structure.resize(voxels)
+		self.load_physics_to_anatomy(overwrite=True)
+
 	def gather_physics_from_anatomy(self):
 		"""
 		Gather dose matrices from structures.
@@ -439,11 +477,18 @@ class Case(object):
 			problem feasibility and a
 			:class:`~conrad.optimization.history.RunRecord` with data
 			from the setup, execution and output of the planning run.
+			The wall-clock and CPU time spent in each phase of the run
+			are recorded in
+			:attr:`~conrad.optimization.history.RunRecord.timing`.
 
 		Raises:
 			ValueError: If case not plannable due to missing information.
 		"""
-		if not self.plannable:
+		# (loads dose matrices from physics to anatomy, if needed)
+		wall, cpu = time.perf_counter(), time.process_time()
+		plannable = self.plannable
+		wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+		if not plannable:
 			raise ValueError('case not plannable in current state.\n'
 							 'minimum requirements:\n'
 							 '---------------------\n'
@@ -452,7 +497,6 @@ class Case(object):
 							 '-"case.anatomy" contains at least one '
 							 'structure marked as target')
 
-
 		# two pass planning for DVH constraints: OFF by default
 		use_2pass = options.pop('dvh_exact', use_2pass)
 		# dose constraint slack: ON by default
@@ -469,6 +513,7 @@ class Case(object):
 				use_slack=use_slack,
 				gamma=gamma,
 				tau=tau)
+		run.output.add_timing('load', wall, cpu)
 
 		# solve problem
 		feas = self.problem.solve(self.anatomy.list, run.output,
@@ -479,15 +524,377 @@ class Case(object):
 		if run.feasible:
 			## causes data.items() no attribute error in filter_data when calling plot(run.plotting_data) because nested dict is produced
 			## run.plotting_data[0] = self.plotting_data(x=run.x)
-			run.plotting_data = self.plotting_data(x=run.x)
+			with run.output.timed('dose'):
+				self.calculate_doses(run.x)
+			with run.output.timed('plotting'):
+				run.plotting_data = self.plotting_data()
 			if use_2pass:
-				run.plotting_data['exact'] = self.plotting_data(x=run.x_exact)
+				with run.output.timed('dose_exact'):
+					self.calculate_doses(run.x_exact)
+				with run.output.timed('plotting_exact'):
+					run.plotting_data['exact'] = self.plotting_data()
 		else:
 			warnings.warn('Problem infeasible as formulated')
 
 		status = (feas == int(1 + int(use_2pass)))
 		return status, run
 
+	async def plan_async(self, timeout=None, progress=None, executor=None,
+						 **options):
+		"""
+		Coroutine version of :meth:`Case.plan`, run in an executor.
+
+		Planning runs in ``executor`` so that the event loop stays
+		responsive. Cancelling the awaiting task, or exceeding
+		``timeout``, stops planning at its next progress report: at
+		the start of each build or solve phase, and after each solver
+		iteration if the solver reports iterates (see option
+		``callback`` of
+		:meth:`~conrad.optimization.problem.PlanningProblem.solve`).
+		The coroutine waits for planning to stop before propagating
+		the cancellation or timeout, so that the case is never planned
+		concurrently.
+
+		Arguments:
+			timeout (:obj:`float`, optional): Time limit, in seconds.
+			progress (optional): Callable invoked in the event loop
+				with each progress report, a dictionary with entry
+				``'phase'`` and, during solver iterations, the
+				iteration count and residuals.
+			executor (:class:`concurrent.futures.Executor`, optional):
+				Executor in which to plan; the event loop's default
+				executor (a thread pool) is used if not provided.
+			**options: Keyword arguments to :meth:`Case.plan`.
+
+		Returns:
+			:obj:`tuple`: Same as :meth:`Case.plan`.
+
+		Raises:
+			asyncio.TimeoutError: If planning exceeds ``timeout``.
+		"""
+		loop = asyncio.get_running_loop()
+		stop = threading.Event()
+
+		def checkpoint(info):
+			if stop.is_set():
+				raise CancelledError('planning cancelled')
+			if progress is not None:
+				loop.call_soon_threadsafe(progress, info)
+
+		future = loop.run_in_executor(
+				executor, functools.partial(
+						self.plan, callback=checkpoint, **options))
+		try:
+			return await asyncio.wait_for(asyncio.shield(future), timeout)
+		except (asyncio.CancelledError, asyncio.TimeoutError):
+			stop.set()
+			try:
+				await future
+			except (CancelledError, asyncio.CancelledError):
+				pass
+			raise
+
+	@staticmethod
+	def __expand_parameter_grid(parameter_grid):
+		"""
+		Convert parameter grid to a list of objective settings.
+
+		Arguments:
+			parameter_grid: Either a list of dictionaries, each mapping
+				structure labels (or names) to a dictionary of
+				objective parameters, or a single such dictionary with
+				a list of values for each parameter, expanded to the
+				Cartesian product of all values. In the expansion, the
+				last parameter varies fastest, so that consecutive
+				settings differ in as few parameters as possible.
+
+		Returns:
+			:obj:`list` of :obj:`dict`: Objective settings, each keyed
+			by structure label, then by parameter name.
+
+		Raises:
+			TypeError: If ``parameter_grid`` is neither a
+				:obj:`dict` nor a :obj:`list`.
+		"""
+		if isinstance(parameter_grid, dict):
+			keys = []
+			values = []
+			for label in parameter_grid:
+				for parameter, grid in parameter_grid[label].items():
+					if isinstance(grid, (str, int, float)):
+						grid = [grid]
+					keys.append((label, parameter))
+					values.append(list(grid))
+			settings = []
+			for combination in itertools.product(*values):
+				setting = {}
+				for (label, parameter), value in zip(keys, combination):
+					setting.setdefault(label, {})[parameter] = value
+				settings.append(setting)
+			return settings
+		elif isinstance(parameter_grid, (list, tuple)):
+			return list(parameter_grid)
+		else:
+			raise TypeError(
+					'argument `parameter_grid` must be a {} or {}'
+					''.format(dict, list))
+
+	def __plan_sequence(self, settings, warm_start, options):
+		"""
+		Plan once for each objective setting, in order.
+
+		Objective parameters changed during the sequence are restored
+		afterwards.
+
+		Arguments:
+			settings (:obj:`list` of :obj:`dict`): Objective settings,
+				as produced by :meth:`Case.__expand_parameter_grid`.
+			warm_start (:obj:`bool`): If ``True``, warm start each
+				plan from the previous feasible plan.
+			options (:obj:`dict`): Keyword arguments to
+				:meth:`Case.plan`.
+
+		Returns:
+			:obj:`list` of
+			:class:`~conrad.optimization.history.RunRecord`: Record of
+			each plan, in order of ``settings``.
+		"""
+		original = {}
+		for setting in settings:
+			for label, parameters in setting.items():
+				objective = self.anatomy[label].objective
+				for parameter in parameters:
+					original.setdefault(label, {}).setdefault(
+							parameter, getattr(objective, parameter + '_raw'))
+
+		runs = []
+		previous = None
+		try:
+			for setting in settings:
+				for label, parameters in setting.items():
+					self.change_objective(label, **parameters)
+				run_options = dict(options)
+				if warm_start and previous is not None:
+					run_options['warm_start'] = previous
+				_, run = self.plan(**run_options)
+				runs.append(run)
+				if run.feasible:
+					previous = run
+		finally:
+			for label, parameters in original.items():
+				self.change_objective(label, **parameters)
+		return runs
+
+	def plan_sweep(self, parameter_grid, history=None, warm_start=True,
+				   processes=None, loader=None, **options):
+		"""
+		Plan once for each of a family of objective settings.
+
+		All plans share the dose matrices and dose constraints of the
+		case, and differ only in objective parameters (e.g., weights
+		and doses), so consecutive plans reuse the solver's setup: the
+		:mod:`cvxpy` solver is run with option ``parametrize`` (unless
+		set otherwise) so that its canonicalization is reused, and
+		the POGS solvers keep their matrix equilibration and
+		factorization. With the POGS solvers, each plan is warm
+		started from the previous feasible plan; :mod:`cvxpy` solvers
+		cannot use the previous plan as an initial guess.
+
+		Arguments:
+			parameter_grid: Objective settings, either as a list of
+				dictionaries mapping structure labels (or names) to
+				objective parameters, e.g.,
+				``[{'oar': {'weight': 1}}, {'oar': {'weight': 2}}]``,
+				or as a dictionary of parameter value lists, e.g.,
+				``{'oar': {'weight': [1, 2]}}``, expanded to the
+				Cartesian product of the lists.
+			history (:class:`~conrad.optimization.history.PlanningHistory`, optional):
+				If provided, each plan is appended to ``history``.
+			warm_start (:obj:`bool`, optional): If ``True``, warm start
+				each plan from the previous feasible plan.
+			processes (:obj:`int`, optional): If greater than one,
+				split the settings into this many contiguous chunks and
+				plan each chunk in a separate process, on a copy of
+				the case; plans within a chunk are warm started as
+				above. In this mode the case's structure doses are not
+				updated.
+			loader (optional): Picklable callable that returns the
+				case as stored, e.g., a
+				:class:`~conrad.io.io.CaseLoader` from
+				:meth:`~conrad.io.io.CaseIO.case_loader`. If provided,
+				worker processes receive the loader, together with
+				the active frame name and each structure's objective
+				and constraints, instead of a copy of the case and its
+				dose matrices; each worker loads the case (e.g.,
+				memory-mapping its dose matrices) and applies these
+				settings before planning.
+			**options: Keyword arguments to :meth:`Case.plan`.
+
+		Returns:
+			:obj:`list` of
+			:class:`~conrad.optimization.history.RunRecord`: Record of
+			each plan, in order of the settings. The case's objectives
+			are restored to their values before the sweep.
+
+		Raises:
+			TypeError: If ``history`` is provided and not a
+				:class:`~conrad.optimization.history.PlanningHistory`.
+		"""
+		if history is not None and not isinstance(history, PlanningHistory):
+			raise TypeError(
+					'argument `history` must be of type {}'
+					''.format(PlanningHistory))
+
+		settings = self.__expand_parameter_grid(parameter_grid)
+		options.setdefault('parametrize', True)
+		processes = min(int(processes or 1), len(settings))
+
+		if processes > 1:
+			if loader is None:
+				source = self
+			else:
+				source = (loader, self.physics.frame.name, {
+						s.label: (s.objective, s.constraints)
+						for s in self.anatomy.list})
+			bounds = np.linspace(0, len(settings), processes + 1).astype(int)
+			tasks = [
+					(source, settings[start:stop], warm_start, options)
+					for start, stop in zip(bounds[:-1], bounds[1:])]
+			pool = multiprocessing.Pool(processes)
+			try:
+				chunks = pool.map(_plan_sweep_chunk, tasks)
+			finally:
+				pool.close()
+				pool.join()
+			runs = [run for chunk in chunks for run in chunk]
+		else:
+			runs = self.__plan_sequence(settings, warm_start, options)
+
+		if history is not None:
+			for run in runs:
+				history += run
+		return runs
+
+	def __upsample_guess(self, run, coarse_frame, fine_frame):
+		"""
+		Map optimal variables of ``run`` to a finer dose frame.
+
+		Beam intensities are upsampled through the beam map of the
+		frame mapping from ``fine_frame`` to ``coarse_frame``, if any.
+		Voxel dual variables are kept only if the frames share voxels.
+
+		Returns:
+			:class:`~conrad.optimization.history.RunOutput`: Output
+			with initial guesses for planning in ``fine_frame``.
+		"""
+		mapping = self.physics.retrieve_frame_mapping(fine_frame, coarse_frame)
+		guess = RunOutput()
+		x = run.output.optimal_variables['x']
+		if mapping.beam_map is not None:
+			x = mapping.beam_map.upsample(x)
+		guess.optimal_variables['x'] = x
+		if mapping.voxel_map is None:
+			guess.optimal_variables['nu'] = run.output.optimal_variables.get(
+					'nu', None)
+		return guess
+
+	def plan_multiresolution(self, frames, refine_maxiter=None, **options):
+		"""
+		Plan on coarse dose frames, then on the current frame.
+
+		Each level is planned as in :meth:`Case.plan`, from the
+		coarsest frame of ``frames`` to the active frame of
+		:attr:`Case.physics`, e.g., voxel- or beam-clustered frames
+		built with :mod:`conrad.optimization.voxel_clustering` or
+		:mod:`conrad.optimization.beam_clustering`, followed by the full
+		frame. The optimal beam intensities of each feasible level are
+		upsampled to the next level and warm start its solve, if the
+		solver accepts initial guesses (the POGS solvers do, the
+		:mod:`cvxpy` solvers do not). Frames
+		must be related by frame mappings from each level to the
+		previous one, as retrieved by
+		:meth:`~conrad.physics.Physics.retrieve_frame_mapping`; beam
+		intensities are upsampled through the mapping's beam map, or
+		passed unchanged if the mapping has none.
+
+		Arguments:
+			frames: Name, or list of names, of frames of
+				:attr:`Case.physics` to plan before the active frame,
+				coarsest first.
+			refine_maxiter (:obj:`int`, optional): If provided, limit
+				on solver iterations (solver option ``maxiter``) for
+				the active frame, i.e., fixed-budget refinement of the
+				upsampled plan. A refinement stopped by the limit is
+				reported as not feasible, but its beam intensities are
+				still available from the returned run.
+			**options: Keyword arguments to :meth:`Case.plan`, used at
+				every level. Option ``warm_start`` applies to the
+				coarsest level only.
+
+		Returns:
+			:obj:`tuple`: Same as :meth:`Case.plan`, for the active
+			frame. The
+			:attr:`~conrad.optimization.history.RunRecord.timing` of the
+			returned run has entries ``'level0'``, ``'level1'``, ...,
+			with the total time spent on each level (including loading
+			the level's dose matrices and upsampling), the active
+			frame last; its
+			:attr:`~conrad.optimization.history.RunRecord.info` has
+			entry ``'levels'``, listing the frame, dimensions,
+			feasibility, solve time, solver iterations and timing of
+			each level. The active
+			frame is restored when planning ends.
+
+		Raises:
+			ValueError: If a frame mapping between consecutive levels
+				is missing.
+		"""
+		if isinstance(frames, str):
+			frames = [frames]
+		full_frame = self.physics.frame.name
+		levels = list(frames) + [full_frame]
+		for coarse, fine in zip(levels[:-1], levels[1:]):
+			self.physics.retrieve_frame_mapping(fine, coarse)
+
+		summary = []
+		timing = {}
+		previous = None
+		try:
+			for index, frame in enumerate(levels):
+				wall, cpu = time.perf_counter(), time.process_time()
+				run_options = dict(options)
+				if index > 0:
+					run_options.pop('warm_start', None)
+					if previous is not None:
+						run_options['warm_start'] = self.__upsample_guess(
+								previous, levels[index - 1], frame)
+				if frame == full_frame and refine_maxiter is not None:
+					run_options['maxiter'] = int(refine_maxiter)
+
+				self.change_dose_frame(frame)
+				feasible, run = self.plan(**run_options)
+				previous = run if run.feasible else None
+
+				timing['level{}'.format(index)] = {
+						'wall': time.perf_counter() - wall,
+						'cpu': time.process_time() - cpu}
+				summary.append({
+						'frame': frame,
+						'voxels': self.physics.voxels,
+						'beams': self.physics.beams,
+						'feasible': run.feasible,
+						'solvetime': run.solvetime,
+						'iters': run.info.get('iters', None),
+						'timing': run.timing,
+				})
+		finally:
+			self.change_dose_frame(full_frame)
+
+		for level, entry in timing.items():
+			run.output.add_timing(level, entry['wall'], entry['cpu'])
+		run.output.solver_info['levels'] = summary
+		return feasible, run
+
 	def plotting_data(self, x=None, constraints_only=False, maxlength=None):
 		"""
 		Dictionary of :mod:`matplotlib`-compatible plotting data.
@@ -516,4 +923,19 @@ class Case(object):
 		else:
 			if x is not None:
 				self.calculate_doses(x)
-			return self.anatomy.plotting_data(maxlength=maxlength)
\ No newline at end of file
+			return self.anatomy.plotting_data(maxlength=maxlength)
+
+def _plan_sweep_chunk(task):
+	""" Plan a chunk of a sweep; target of worker processes. """
+	source, settings, warm_start, options = task
+	if isinstance(source, Case):
+		case = source
+	else:
+		loader, frame_name, structures = source
+		case = loader()
+		if case.physics.frame.name != frame_name:
+			case.change_dose_frame(frame_name)
+		for label, (objective, constraints) in structures.items():
+			case.anatomy[label].objective = objective
+			case.anatomy[label].constraints = constraints
+	return case._Case__plan_sequence(settings, warm_start, options)
@@ -19,7 +19,8 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
 """
-from conrad.io.io import CaseIO
+from conrad.io.io import CaseIO, CaseLoader
+from conrad.io.batch import CaseBatchRecord, plan_cases
 
 def parsearg(list_, prefix, type_, default):
 	for arg in map(str, list_):
@@ -91,14 +91,14 @@ class ConradDBAccessor(object):
 
 		return self.record_entry(directory, name, unwritten_val, overwrite)
 
-	def load_entry(self, entry):
+	def load_entry(self, entry, mmap=False):
 		if entry is None:
 			return None
 		entry = self.DB.get(entry)
 		if isinstance(entry, DataFragmentEntry):
-			entry = self.FS.read_data(entry)
+			entry = self.FS.read_data(entry, mmap=mmap)
 		if isinstance(entry, dict):
 			for k in entry:
 				if isinstance(entry[k], str) and self.DB.has_key(entry[k]):
-					entry[k] = self.load_entry(entry[k])
+					entry[k] = self.load_entry(entry[k], mmap=mmap)
 		return entry
\ No newline at end of file
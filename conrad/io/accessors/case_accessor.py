@@ -25,7 +25,8 @@ import os
 import yaml
 
 from conrad.case import Case
-from conrad.io.schema import CaseEntry, HistoryEntry, CONRAD_DB_ENTRY_PREFIXES
+from conrad.io.schema import CaseEntry, HistoryEntry, SolutionEntry, \
+							  CONRAD_DB_ENTRY_PREFIXES
 from conrad.io.accessors.base_accessor import ConradDBAccessor
 from conrad.io.accessors.anatomy_accessor import AnatomyAccessor
 from conrad.io.accessors.physics_accessor import PhysicsAccessor
@@ -113,7 +114,7 @@ class CaseAccessor(ConradDBAccessor):
 
 		return self.DB.set(case_ID, case_entry, overwrite=True)
 
-	def load_case(self, case_entry, frame='default'):
+	def load_case(self, case_entry, frame='default', mmap=False, lazy=True):
 		case_entry = self.DB.get(case_entry)
 		validate_case_entry(case_entry)
 		if not case_entry.complete:
@@ -122,17 +123,19 @@ class CaseAccessor(ConradDBAccessor):
 		return Case(
 			anatomy=self.anatomy_accessor.load_anatomy(case_entry.anatomy),
 			physics=self.physics_accessor.load_physics(
-					case_entry.physics, frame_name=frame),
+					case_entry.physics, frame_name=frame, mmap=mmap,
+					lazy=lazy),
 			prescription=case_entry.prescription,
 		)
 
-	def load_frame(self, case_entry, frame_name):
+	def load_frame(self, case_entry, frame_name, mmap=False):
 		case_entry = self.DB.get(case_entry)
 		validate_case_entry(case_entry)
 		physics_entry = self.DB.get(case_entry.physics)
 		frame = self.physics_accessor.frame_accessor.select_frame_entry(
 				physics_entry.frames, frame_name)
-		return self.physics_accessor.frame_accessor.load_frame(frame)
+		return self.physics_accessor.frame_accessor.load_frame(
+				frame, mmap=mmap)
 
 	def load_frame_mapping(self, case_entry, source_frame, target_frame):
 		case_entry = self.DB.get(case_entry)
@@ -183,6 +186,32 @@ class CaseAccessor(ConradDBAccessor):
 		case_entry.history.add_solutions(solution_ID)
 		return solution_ID
 
+	def add_solution_entry(self, case_entry, solution_entry):
+		"""
+		Attach solution saved elsewhere to history of case.
+
+		Used to merge solutions written by another :class:`CaseIO`
+		(e.g., in a worker process) against the same filesystem.
+
+		Arguments:
+			case_entry: :class:`CaseEntry` or database pointer.
+			solution_entry: :class:`SolutionEntry`, or dictionary
+				representation of one, with data fragments expanded
+				rather than given as database pointers.
+
+		Returns:
+			:obj:`str`: Database pointer to solution.
+		"""
+		case_entry = self.DB.get(case_entry)
+		validate_case_entry(case_entry)
+		self.__load_history(case_entry)
+
+		if isinstance(solution_entry, dict):
+			solution_entry = SolutionEntry(**solution_entry)
+		solution_ID = self.DB.set_next(solution_entry.flatten(self.DB))
+		case_entry.history.add_solutions(solution_ID)
+		return solution_ID
+
 	def load_solution(self, history_entry, frame_name, solution_name):
 		history_entry = self.DB.get(history_entry)
 		self.history_accessor.load_history(history_entry)
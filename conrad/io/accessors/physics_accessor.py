@@ -1,6 +1,6 @@
 """
-Define :class:`DoseFrameAccessor`, :class:`FrameMappingAccessor` and
-:class:`PhysicsAccessor`.
+Define :class:`DoseFrameLoader`, :class:`DoseFrameAccessor`,
+:class:`FrameMappingAccessor` and :class:`PhysicsAccessor`.
 """
 """
 Copyright 2016 Baris Ungun, Anqi Fu
@@ -24,12 +24,79 @@ from conrad.compat import *
 
 from conrad.abstract.mapping import string_to_map_constructor
 from conrad.physics.physics import Physics, DoseFrame, DoseFrameMapping
+from conrad.physics.physics import LazyDoseFrame
 from conrad.physics.physics import DEFAULT_FRAME0_NAME
 from conrad.case import Case
 from conrad.io.schema import DoseFrameEntry, DoseFrameMappingEntry
 from conrad.io.schema import PhysicsEntry
 from conrad.io.accessors.base_accessor import ConradDBAccessor
 
+class DoseFrameLoader(object):
+	"""
+	Callable that loads :class:`DoseFrame` data from a database entry.
+
+	Used as the loader of a :class:`LazyDoseFrame`. The loader is
+	picklable, so that lazily loaded frames (and the
+	:class:`~conrad.physics.Physics` and :class:`~conrad.Case` objects
+	holding them) can be sent to other processes: the filesystem
+	interface is pickled by type, and a new instance is constructed
+	when the loader is unpickled.
+	"""
+
+	def __init__(self, database, filesystem, frame_entry, mmap=False):
+		"""
+		Initialize :class:`DoseFrameLoader`.
+
+		Arguments:
+			database: Database containing ``frame_entry`` and the data
+				fragments it points to.
+			filesystem: Filesystem interface used to read data.
+			frame_entry (:class:`DoseFrameEntry`): Entry of frame.
+			mmap (:obj:`bool`, optional): If ``True``, memory-map the
+				frame's dose matrix from disk instead of reading it
+				into memory.
+		"""
+		self.__accessor = ConradDBAccessor(
+				database=database, filesystem=filesystem)
+		self.__frame_entry = frame_entry
+		self.__mmap = bool(mmap)
+
+	def __getstate__(self):
+		return {
+				'database': self.__accessor.DB,
+				'filesystem_type': type(self.__accessor.FS),
+				'frame_entry': self.__frame_entry,
+				'mmap': self.__mmap,
+		}
+
+	def __setstate__(self, state):
+		self.__init__(
+				state['database'], state['filesystem_type'](),
+				state['frame_entry'], mmap=state['mmap'])
+
+	def __call__(self, frame):
+		"""
+		Assign data of frame entry to ``frame``.
+
+		Arguments:
+			frame (:class:`DoseFrame`): Frame to populate.
+
+		Returns:
+			None
+		"""
+		entry = self.__frame_entry
+		load = self.__accessor.load_entry
+		if entry.dose_matrix is not None:
+			frame.dose_matrix = load(entry.dose_matrix, mmap=self.__mmap)
+		if entry.voxel_labels is not None:
+			frame.voxel_labels = load(entry.voxel_labels)
+		if entry.voxel_weights is not None:
+			frame.voxel_weights = load(entry.voxel_weights)
+		if entry.beam_labels is not None:
+			frame.beam_labels = load(entry.beam_labels)
+		if entry.beam_weights is not None:
+			frame.beam_weights = load(entry.beam_weights)
+
 class DoseFrameAccessor(ConradDBAccessor):
 	def __init__(self, database=None, filesystem=None):
 		ConradDBAccessor.__init__(
@@ -75,7 +142,23 @@ class DoseFrameAccessor(ConradDBAccessor):
 
 		))
 
-	def load_frame(self, frame_entry):
+	def load_frame(self, frame_entry, mmap=False, lazy=False):
+		"""
+		Load :class:`DoseFrame` from database entry.
+
+		Arguments:
+			frame_entry: :class:`DoseFrameEntry`, or database pointer
+				to one.
+			mmap (:obj:`bool`, optional): If ``True``, memory-map the
+				frame's dose matrix from disk instead of reading it
+				into memory.
+			lazy (:obj:`bool`, optional): If ``True``, return a
+				:class:`LazyDoseFrame` that reads the frame's dose
+				matrix, labels and weights on first access.
+
+		Returns:
+			:class:`DoseFrame`: Loaded frame.
+		"""
 		frame_entry = self.DB.get(frame_entry)
 		if not isinstance(frame_entry, DoseFrameEntry):
 			raise ValueError(
@@ -85,21 +168,16 @@ class DoseFrameAccessor(ConradDBAccessor):
 		if not frame_entry.complete:
 			raise ValueError('dose frame incomplete')
 
+		loader = DoseFrameLoader(self.DB, self.FS, frame_entry, mmap=mmap)
+		if lazy:
+			return LazyDoseFrame(
+					loader, voxels=frame_entry.n_voxels,
+					beams=frame_entry.n_beams, frame_name=frame_entry.name)
+
 		frame = DoseFrame(
 				voxels=frame_entry.n_voxels, beams=frame_entry.n_beams,
 				frame_name=frame_entry.name)
-
-		if frame_entry.dose_matrix is not None:
-			frame.dose_matrix = self.load_entry(frame_entry.dose_matrix)
-		if frame_entry.voxel_labels is not None:
-			frame.voxel_labels = self.load_entry(frame_entry.voxel_labels)
-		if frame_entry.voxel_weights is not None:
-			frame.voxel_weights = self.load_entry(frame_entry.voxel_weights)
-		if frame_entry.beam_labels is not None:
-			frame.beam_labels = self.load_entry(frame_entry.beam_labels)
-		if frame_entry.beam_weights is not None:
-			frame.beam_weights = self.load_entry(frame_entry.beam_weights)
-
+		loader(frame)
 		return frame
 
 	def select_frame_entry(self, frame_list, frame_name='default'):
@@ -241,7 +319,27 @@ class PhysicsAccessor(ConradDBAccessor):
 				voxel_grid=grid, frames=frames, frame_mappings=mappings
 		))
 
-	def load_physics(self, physics_entry, frame_name='default'):
+	def load_physics(self, physics_entry, frame_name='default', mmap=False,
+					 lazy=True):
+		"""
+		Load :class:`Physics` from database entry.
+
+		Arguments:
+			physics_entry: :class:`PhysicsEntry`, or database pointer
+				to one.
+			frame_name (:obj:`str`, optional): Name of frame to make
+				active. Defaults to first frame in alphabetical order.
+			mmap (:obj:`bool`, optional): If ``True``, memory-map dose
+				matrices from disk instead of reading them into memory.
+			lazy (:obj:`bool`, optional): If ``True``, attach every
+				frame in ``physics_entry`` to the loaded
+				:class:`Physics` as a :class:`LazyDoseFrame`, so that
+				only frame metadata is read up front. Otherwise, load
+				only the requested frame, in full.
+
+		Returns:
+			:class:`Physics`: Loaded physics.
+		"""
 		physics_entry = self.DB.get(physics_entry)
 		if not isinstance(physics_entry, PhysicsEntry):
 			raise ValueError(
@@ -265,12 +363,28 @@ class PhysicsAccessor(ConradDBAccessor):
 		if frame_name == 'default':
 			frame_name = frame_names[0]
 
-		return Physics( dose_grid=grid, dose_frame=self.load_frame(frame_name))
+		if not lazy:
+			return Physics(
+					dose_grid=grid,
+					dose_frame=self.load_frame(frame_name, mmap=mmap))
+
+		active_entry = self.frame_accessor.select_frame_entry(
+				self.__frame_cache, frame_name)
+		frames = [
+				self.frame_accessor.load_frame(f, mmap=mmap, lazy=True)
+				for f in self.__frame_cache]
+		active = frames[self.__frame_cache.index(active_entry)]
+
+		physics = Physics(dose_grid=grid, dose_frame=active)
+		for frame in frames:
+			if frame is not active:
+				physics.add_dose_frame(frame.name, dose_frame=frame)
+		return physics
 
-	def load_frame(self, frame_name='default'):
+	def load_frame(self, frame_name='default', mmap=False):
 		return self.frame_accessor.load_frame(
 				self.frame_accessor.select_frame_entry(
-						self.__frame_cache, frame_name))
+						self.__frame_cache, frame_name), mmap=mmap)
 
 	def load_frame_mapping(self, source_frame='default',
 						   target_frame='default'):
@@ -21,8 +21,8 @@ along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
 """
 from conrad.compat import *
 
-from conrad.optimization.solver_optkit import SolverOptkit, \
-											  PROJECTOR_POGS_DENSE_DIRECT
+from conrad.defs import CONRAD_MATRIX_TYPES
+from conrad.optimization.solver_base import PROJECTOR_POGS_DENSE_DIRECT
 from conrad.io.schema import SolverCacheEntry
 from conrad.io.accessors.base_accessor import ConradDBAccessor
 
@@ -31,33 +31,18 @@ class SolverCacheAccessor(ConradDBAccessor):
 		ConradDBAccessor.__init__(
 				self, database=database, filesystem=filesystem)
 
-	def __save_pogs_solver_cache(self, solver, cache_name, frame_name,
-								 directory, overwrite=False):
-		solver_cache_raw = solver.cache
-		solver_cache_entry = SolverCacheEntry(
-				name=cache_name, frame=frame_name, solver='POGS')
-
-		self.FS.check_dir(directory)
-		subdir = self.FS.join_mkdir(
-				directory, 'solver_caches', 'pogs_solver_caches', frame_name)
-
-		# save equilibration
-		solver_cache_entry.matrix = self.pop_and_record(
-				solver_cache_raw, 'matrix', subdir, overwrite=overwrite)
-		solver_cache_entry.left_preconditioner = self.pop_and_record(
-				solver_cache_raw, 'left_preconditioner', subdir,
-				overwrite=overwrite)
-		solver_cache_entry.right_preconditioner = self.pop_and_record(
-				solver_cache_raw, 'right_preconditioner', subdir,
-				overwrite=overwrite)
-
-		# save projector
-		solver_cache_entry.projector_matrix = self.pop_and_record(
-				solver_cache_raw, 'projector_matrix', subdir,
-				alternate_keys=[['projector', 'matrix']], overwrite=overwrite)
-		solver_cache_entry.projector_type = solver_cache_raw.pop(
-				'projector_type', solver_cache_raw.pop('projector').pop('type'))
-		return self.DB.set_next(solver_cache_entry)
+	@staticmethod
+	def __flatten_solver_cache(solver_cache, prefix=''):
+		# e.g., solver_cache['projector']['matrix'] -> 'projector_matrix'
+		flat = {}
+		for key, value in solver_cache.items():
+			key = prefix + str(key)
+			if isinstance(value, dict):
+				flat.update(SolverCacheAccessor.__flatten_solver_cache(
+						value, key + '_'))
+			else:
+				flat[key] = value
+		return flat
 
 	def __load_pogs_solver_cache(self, solver_cache_entry):
 		solver_cache_entry = self.DB.get(solver_cache_entry)
@@ -78,27 +63,65 @@ class SolverCacheAccessor(ConradDBAccessor):
 			# e.g., projector_type == 'indirect'
 			L = None
 		return {
+				'solver': solver_cache_entry.solver,
 				'left_preconditioner': d,
 				'matrix': A,
 				'right_preconditioner': e,
 				'projector_matrix': L,
 		}
 
-	# TODO: add solver name field?
 	def save_solver_cache(self, solver, cache_name, frame_name, directory,
-							   overwrite=False):
+						  overwrite=False):
+		"""
+		Save cache of any solver that exports one.
+
+		The solver's cache type and problem fingerprint are recorded
+		on the database entry; arrays and sparse matrices in the
+		flattened cache are saved as a data dictionary. Other entries,
+		except for a projector type, are not saved.
+
+		Raises:
+			TypeError: If ``solver`` does not export a cache, e.g.,
+				before a problem has been built.
+		"""
 		self.FS.check_dir(directory)
 
-		if isinstance(solver, SolverOptkit):
-			return self.__save_pogs_solver_cache(
-				solver, cache_name, frame_name, directory, overwrite)
-		else:
+		solver_cache_raw = getattr(solver, 'cache', None)
+		if not isinstance(solver_cache_raw, dict):
 			raise TypeError(
-					'solver caching only implemented for solvers of '
-					'type {}'.format(SolverOptkit))
+					'no cache available for solver of type {}'
+					''.format(type(solver)))
+		solver_cache_raw = self.__flatten_solver_cache(solver_cache_raw)
+
+		solver_cache_entry = SolverCacheEntry(
+				name=cache_name, frame=frame_name,
+				solver=solver_cache_raw.pop('solver', None),
+				fingerprint=solver_cache_raw.pop('fingerprint', None),
+				projector_type=solver_cache_raw.pop('projector_type', None))
+		data = {
+				k: v for k, v in solver_cache_raw.items()
+				if isinstance(v, CONRAD_MATRIX_TYPES)}
+
+		solver_name = str(solver_cache_entry.solver).lower()
+		subdir = self.FS.join_mkdir(
+				directory, 'solver_caches',
+				'{}_solver_caches'.format(solver_name), frame_name)
+		solver_cache_entry.data = self.record_entry(
+				subdir, cache_name, data, overwrite=overwrite)
+		return self.DB.set_next(solver_cache_entry)
 
-	# TODO: add cache name
 	def load_solver_cache(self, solver_cache_entry):
+		"""
+		Load solver cache saved by :meth:`save_solver_cache`.
+
+		Returns flattened solver cache, including entries ``'solver'``
+		and ``'fingerprint'``, to be passed as option ``solver_cache``
+		to the ``build`` method of a solver with the same cache type.
+
+		Raises:
+			ValueError: If entry is not a complete
+				:class:`SolverCacheEntry`.
+		"""
 		solver_cache_entry = self.DB.get(solver_cache_entry)
 		if not isinstance(solver_cache_entry, SolverCacheEntry):
 			raise ValueError(
@@ -108,12 +131,16 @@ class SolverCacheAccessor(ConradDBAccessor):
 		if not solver_cache_entry.complete:
 			raise ValueError('solver_cache incomplete')
 
-		if solver_cache_entry.solver == 'POGS':
+		if solver_cache_entry.data is None:
+			# entries saved before generic caches were supported
 			return self.__load_pogs_solver_cache(solver_cache_entry)
-		else:
-			raise ValueError(
-					'solver caching only implemented for solvers of '
-					'type {}'.format(SolverOptkit))
+
+		solver_cache = self.load_entry(solver_cache_entry.data)
+		solver_cache['solver'] = solver_cache_entry.solver
+		solver_cache['fingerprint'] = solver_cache_entry.fingerprint
+		if solver_cache_entry.projector_type is not None:
+			solver_cache['projector_type'] = solver_cache_entry.projector_type
+		return solver_cache
 
 	# TODO: add cache name
 	def select_solver_cache_entry(self, solver_cache_list, cache_name,
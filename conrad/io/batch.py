@@ -0,0 +1,263 @@
+"""
+Define :func:`plan_cases` for planning many :class:`~conrad.Case`
+objects from a :class:`CaseIO` database in a pool of processes, and
+console entry point :func:`main`.
+"""
+"""
+Copyright 2016--2017 Baris Ungun, Anqi Fu
+
+This file is part of CONRAD.
+
+CONRAD is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+CONRAD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from conrad.compat import *
+
+import argparse
+import multiprocessing
+import sys
+import time
+import traceback
+from contextlib import contextmanager
+
+from conrad.io.io import CaseIO
+
+# state of worker process, set by _initialize_worker
+_WORKER = {}
+
+class CaseBatchRecord(object):
+	"""
+	Outcome of loading, planning and saving one case in a batch.
+
+	Attributes:
+		case_name (:obj:`str`): Name of case in database.
+		feasible (:obj:`bool`): ``True`` if planning succeeded and
+			found a feasible plan; ``None`` if planning not reached.
+		solution_ID (:obj:`str`): Database pointer to saved solution,
+			or ``None`` if no solution saved.
+		timing (:obj:`dict`): Wall clock and CPU time in seconds, by
+			phase (``'load'``, ``'plan'``, ``'save'``) and in
+			``'total'``.
+		error (:obj:`str`): Traceback of exception raised while
+			processing the case, or ``None``.
+	"""
+	def __init__(self, case_name):
+		self.case_name = str(case_name)
+		self.feasible = None
+		self.solution_ID = None
+		self.solution_entry = None
+		self.timing = {}
+		self.error = None
+
+	@property
+	def succeeded(self):
+		""" ``True`` if a solution was saved for case. """
+		return self.error is None and self.solution_entry is not None
+
+	@contextmanager
+	def timed(self, phase):
+		"""
+		Context manager recording time spent in enclosed block.
+
+		Arguments:
+			phase (:obj:`str`): Name of processing phase.
+		"""
+		wall, cpu = time.perf_counter(), time.process_time()
+		try:
+			yield
+		finally:
+			self.timing[phase] = {
+					'wall': time.perf_counter() - wall,
+					'cpu': time.process_time() - cpu,
+			}
+
+def _initialize_worker(DB_constructor, DB_dict, FS_constructor):
+	""" Build database copy of worker process, once per process. """
+	_WORKER['DB'] = DB_constructor(dictionary=DB_dict)
+	_WORKER['FS_constructor'] = FS_constructor
+
+def _plan_case(task):
+	""" Load, plan and save one case; target of worker processes. """
+	case_name, directory, solution_name, mmap, options = task
+	record = CaseBatchRecord(case_name)
+	try:
+		with record.timed('total'):
+			# fresh CaseIO per case, so that no case is saved back to
+			# the database on switching the active case
+			caseio = CaseIO(FS_constructor=_WORKER['FS_constructor'])
+			caseio.DB = _WORKER['DB']
+
+			with record.timed('load'):
+				case = caseio.load_case(case_name, mmap=mmap)
+			with record.timed('plan'):
+				record.feasible, run = case.plan(**options)
+			if record.feasible:
+				with record.timed('save'):
+					solution_ID = caseio.save_solution(
+							solution_name,
+							caseio.FS.join_mkdir(directory, case_name),
+							x=run.x)
+					record.solution_entry = caseio.DB.get(
+							solution_ID).arborize(caseio.DB).nested_dictionary
+	except Exception:
+		record.error = traceback.format_exc()
+	return record
+
+def plan_cases(caseio, case_names, directory, solution_name='batch',
+			   processes=None, mmap=True, **options):
+	"""
+	Load, plan and save each of a list of cases.
+
+	Cases are distributed over a pool of worker processes. Each worker
+	reads a copy of the database of ``caseio`` once, then for each of
+	its cases loads the case, with dose matrices memory-mapped so that
+	the operating system shares their pages between workers, plans it
+	and writes the solution to a subdirectory of ``directory`` named
+	for the case, via :meth:`CaseIO.save_solution`. Solutions are then
+	added to the database of ``caseio``. An exception raised while
+	processing a case is recorded and does not affect other cases.
+
+	Arguments:
+		caseio (:class:`CaseIO`): Input/output manager whose database
+			contains the cases. Its filesystem type is used by each
+			worker, and so must be readable across processes.
+		case_names: Names of cases to plan.
+		directory (:obj:`str`): Directory in which to save solutions.
+		solution_name (:obj:`str`, optional): Name under which to save
+			each solution.
+		processes (:obj:`int`, optional): If greater than one, size of
+			the process pool; otherwise cases are planned in the
+			calling process (against a copy of the database, as
+			above).
+		mmap (:obj:`bool`, optional): If ``True``, memory-map dose
+			matrices when loading cases.
+		**options: Keyword arguments to :meth:`~conrad.Case.plan`.
+
+	Returns:
+		:obj:`list` of :class:`CaseBatchRecord`: Outcome of each case,
+		in order of ``case_names``.
+
+	Raises:
+		TypeError: If ``caseio`` is not a :class:`CaseIO`.
+	"""
+	if not isinstance(caseio, CaseIO):
+		raise TypeError(
+				'argument `caseio` must be of type {}'.format(CaseIO))
+
+	case_names = list(case_names)
+	caseio.FS.check_dir(directory)
+	initargs = (
+			type(caseio.DB), caseio.DB.dump_to_dictionary(),
+			type(caseio.FS))
+	tasks = [
+			(name, directory, solution_name, mmap, options)
+			for name in case_names]
+	processes = min(int(processes or 1), len(tasks))
+
+	if processes > 1:
+		pool = multiprocessing.Pool(
+				processes, initializer=_initialize_worker, initargs=initargs)
+		try:
+			records = pool.map(_plan_case, tasks, chunksize=1)
+		finally:
+			pool.close()
+			pool.join()
+	else:
+		_initialize_worker(*initargs)
+		try:
+			records = [_plan_case(task) for task in tasks]
+		finally:
+			_WORKER.clear()
+
+	for record in records:
+		if record.succeeded:
+			record.solution_ID = caseio.accessor.add_solution_entry(
+					caseio.select_case_entry(record.case_name),
+					record.solution_entry)
+	return records
+
+def main(argv=None):
+	"""
+	Console entry point: plan cases of a database YAML file in batch.
+
+	Arguments:
+		argv (:obj:`list`, optional): Command line arguments; defaults
+			to ``sys.argv[1:]``.
+
+	Returns:
+		:obj:`int`: Exit status; nonzero if any case failed.
+	"""
+	parser = argparse.ArgumentParser(
+			description='Plan CONRAD cases from a database in parallel.')
+	parser.add_argument(
+			'database', help='YAML file containing CONRAD database')
+	parser.add_argument(
+			'directory', help='directory in which to save solutions')
+	parser.add_argument(
+			'cases', nargs='*',
+			help='names of cases to plan (default: all cases)')
+	parser.add_argument(
+			'-p', '--processes', type=int, default=None,
+			help='size of process pool (default: number of CPUs)')
+	parser.add_argument(
+			'-n', '--solution-name', default='batch',
+			help='name under which to save each solution')
+	destination = parser.add_mutually_exclusive_group(required=True)
+	destination.add_argument(
+			'-o', '--output',
+			help='YAML file to which to write updated database')
+	destination.add_argument(
+			'--in-place', action='store_true',
+			help='overwrite input database with updated database')
+	parser.add_argument(
+			'--solver', help='solver passed to Case.plan()')
+	parser.add_argument(
+			'--backend', choices=('cvxpy', 'pogs', 'numpy'),
+			help='optimization backend passed to Case.plan() '
+				 '(default: fastest available)')
+	args = parser.parse_args(argv)
+
+	caseio = CaseIO(DB_yaml=args.database)
+	case_names = args.cases or sorted(caseio.available_cases)
+	processes = args.processes or multiprocessing.cpu_count()
+	options = {'verbose': 0}
+	if args.solver is not None:
+		options['solver'] = args.solver
+	if args.backend is not None:
+		options['backend'] = args.backend
+
+	records = plan_cases(
+			caseio, case_names, args.directory,
+			solution_name=args.solution_name, processes=processes,
+			**options)
+
+	n_failed = 0
+	for record in records:
+		if record.error is not None:
+			n_failed += 1
+			status = 'FAILED'
+		else:
+			status = 'feasible' if record.feasible else 'infeasible'
+		print('{}: {} ({:.2f} s)'.format(
+				record.case_name, status,
+				record.timing.get('total', {}).get('wall', 0.)))
+		if record.error is not None:
+			print(record.error, file=sys.stderr)
+
+	caseio.DB.dump_to_yaml(
+			args.database if args.in_place else args.output,
+			overwrite_file=True)
+	return int(n_failed > 0)
+
+if __name__ == '__main__':
+	sys.exit(main())
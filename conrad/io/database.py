@@ -191,6 +191,8 @@ class LocalPythonDatabase(ConradDatabaseBase):
 						DenseMatrixEntry]: self.__data_fragments,
 				CONRAD_DB_ENTRY_TYPES[
 						SparseMatrixEntry]: self.__data_fragments,
+				CONRAD_DB_ENTRY_TYPES[
+						QuantizedMatrixEntry]: self.__data_fragments,
 				CONRAD_DB_ENTRY_TYPES[
 						DataDictionaryEntry]: self.__data_fragments,
 				CONRAD_DB_ENTRY_TYPES[DoseFrameEntry]: self.__frames,
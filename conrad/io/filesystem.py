@@ -29,6 +29,7 @@ import numpy as np
 import scipy.sparse as sp
 
 from conrad.defs import sparse_or_dense, CONRAD_MATRIX_TYPES
+from conrad.abstract.matrix import QuantizedMatrix
 from conrad.io.schema import *
 
 @add_metaclass(abc.ABCMeta)
@@ -44,9 +45,16 @@ class ConradFilesystemBase(object):
 				VectorEntry : self.to_vector,
 				DenseMatrixEntry : self.to_dense_matrix,
 				SparseMatrixEntry : self.to_sparse_matrix,
+				QuantizedMatrixEntry : self.to_quantized_matrix,
 				UnsafeFileEntry : self.to_unsafe_data,
 		}
 
+		# entry types whose data can be memory-mapped
+		self.__MMAP_TYPES = (
+				DataDictionaryEntry, VectorEntry, DenseMatrixEntry,
+				SparseMatrixEntry, QuantizedMatrixEntry,
+		)
+
 		self.__DUMP = {
 				int : lambda directory, name, value, overwrite: value,
 				float : lambda directory, name, value, overwrite: value,
@@ -56,6 +64,7 @@ class ConradFilesystemBase(object):
 				np.ndarray : self.write_ndarray,
 				sp.csr_matrix : self.write_sparse_matrix,
 				sp.csc_matrix : self.write_sparse_matrix,
+				QuantizedMatrix : self.write_quantized_matrix,
 		}
 
 	@abc.abstractmethod
@@ -67,7 +76,7 @@ class ConradFilesystemBase(object):
 		raise NotImplementedError
 
 	@abc.abstractmethod
-	def read(self, file, key):
+	def read(self, file, key, mmap=False):
 		raise NotImplementedError
 
 	@abc.abstractmethod
@@ -78,13 +87,38 @@ class ConradFilesystemBase(object):
 	def write(self, file, data, overwrite=False):
 		raise NotImplementedError
 
-	def read_data(self, data_fragment_entry):
+	def __read(self, file, key, mmap=False):
+		# only request mapping explicitly, for compatibility with
+		# filesystem implementations that do not support it
+		if mmap:
+			return self.read(file, key, mmap=True)
+		return self.read(file, key)
+
+	def read_data(self, data_fragment_entry, mmap=False):
+		"""
+		Read data described by database entry.
+
+		Arguments:
+			data_fragment_entry: Database entry for data.
+			mmap (:obj:`bool`, optional): If ``True``, memory-map
+				vector and matrix data from files that support it
+				instead of reading them into memory.
+
+		Returns:
+			Data read from filesystem.
+
+		Raises:
+			TypeError: If no read method available for entry type.
+		"""
 		data_fragment_entry = cdb_util.route_data_fragment(data_fragment_entry)
-		if type(data_fragment_entry) not in self.__DIGEST:
+		entry_type = type(data_fragment_entry)
+		if entry_type not in self.__DIGEST:
 			raise TypeError(
 					'no read method for data of type {}'
-					''.format(type(data_fragment_entry)))
-		return self.__DIGEST[type(data_fragment_entry)](data_fragment_entry)
+					''.format(entry_type))
+		if mmap and entry_type in self.__MMAP_TYPES:
+			return self.__DIGEST[entry_type](data_fragment_entry, mmap=True)
+		return self.__DIGEST[entry_type](data_fragment_entry)
 
 	def write_data(self, directory, name, data, overwrite=False):
 		if type(data) not in self.__DUMP:
@@ -120,7 +154,7 @@ class ConradFilesystemBase(object):
 				return self.to_vector(ve)
 		return typed_data
 
-	def to_data_dictionary(self, data_dictionary_entry):
+	def to_data_dictionary(self, data_dictionary_entry, mmap=False):
 		if isinstance(data_dictionary_entry, dict):
 			data_dictionary_entry = DataDictionaryEntry(**data_dictionary_entry)
 		if not isinstance(data_dictionary_entry, DataDictionaryEntry):
@@ -133,11 +167,11 @@ class ConradFilesystemBase(object):
 					'input:\n{}'
 					''.format(data_dictionary_entry.nested_dictionary))
 		return {
-				k: self.read_data(data_dictionary_entry.entries[k]) for k in
-				data_dictionary_entry.entries
+				k: self.read_data(data_dictionary_entry.entries[k], mmap)
+				for k in data_dictionary_entry.entries
 		}
 
-	def to_vector(self, vector_entry):
+	def to_vector(self, vector_entry, mmap=False):
 		if isinstance(vector_entry, dict):
 			vector_entry = VectorEntry(**vector_entry)
 		if not isinstance(vector_entry, VectorEntry):
@@ -148,9 +182,10 @@ class ConradFilesystemBase(object):
 			raise ValueError(
 					'data incomplete, could not form vector\n\ninput:\n'
 					'{}'.format(vector_entry.nested_dictionary))
-		return self.read(vector_entry.data_file, vector_entry.data_key)
+		return np.asarray(self.__read(
+				vector_entry.data_file, vector_entry.data_key, mmap))
 
-	def to_dense_matrix(self, dense_matrix_entry):
+	def to_dense_matrix(self, dense_matrix_entry, mmap=False):
 		if isinstance(dense_matrix_entry, dict):
 			dense_matrix_entry = DenseMatrixEntry(**dense_matrix_entry)
 
@@ -164,12 +199,16 @@ class ConradFilesystemBase(object):
 					'data incomplete, could not form dense matrix\n\n'
 					'input:\n{}'
 					''.format(dense_matrix_entry.nested_dictionary))
-		data = self.read(
-				dense_matrix_entry.data_file, dense_matrix_entry.data_key)
+		data = self.__read(
+				dense_matrix_entry.data_file, dense_matrix_entry.data_key,
+				mmap)
 		order = 'C' if dense_matrix_entry.layout_rowmajor else 'F'
+		if mmap:
+			# keep mapping unless layout must be changed
+			return np.asarray(data, order=order)
 		return np.array(data, order=order)
 
-	def to_sparse_matrix(self, sparse_matrix_entry):
+	def to_sparse_matrix(self, sparse_matrix_entry, mmap=False):
 		sm_entry = sparse_matrix_entry
 		if isinstance(sm_entry, dict):
 			sm_entry = SparseMatrixEntry(**sm_entry)
@@ -183,20 +222,55 @@ class ConradFilesystemBase(object):
 					'input:\n{}'.format(sm_entry.nested_dictionary))
 		constructor = sp.csr_matrix if sm_entry.layout_CSR else \
 					  sp.csc_matrix
-		values = self.read(sm_entry.data_values_file, sm_entry.data_values_key)
-		indices = self.read(
-				sm_entry.data_indices_file, sm_entry.data_indices_key)
-		pointers = self.read(
-				sm_entry.data_pointers_file, sm_entry.data_pointers_key)
+		values = self.__read(
+				sm_entry.data_values_file, sm_entry.data_values_key, mmap)
+		indices = self.__read(
+				sm_entry.data_indices_file, sm_entry.data_indices_key, mmap)
+		pointers = self.__read(
+				sm_entry.data_pointers_file, sm_entry.data_pointers_key, mmap)
 		if sm_entry.layout_fortran_indexing:
-			indices -=1
-			pointers -=1
+			# (out-of-place, since mapped arrays are read-only)
+			indices = indices - 1
+			pointers = pointers - 1
 
 		return constructor((values, indices, pointers), shape=sm_entry.shape)
 
+	def to_quantized_matrix(self, quantized_matrix_entry, mmap=False):
+		qm_entry = quantized_matrix_entry
+		if isinstance(qm_entry, dict):
+			qm_entry = QuantizedMatrixEntry(**qm_entry)
+		if not isinstance(qm_entry, QuantizedMatrixEntry):
+			raise TypeError(
+					'input should be of type (or parsable as) {}'
+					''.format(QuantizedMatrixEntry))
+		if not qm_entry.complete:
+			raise ValueError(
+					'data incomplete, could not form quantized matrix\n\n'
+					'input:\n{}'.format(qm_entry.nested_dictionary))
+		codes = self.__read(
+				qm_entry.data_values_file, qm_entry.data_values_key, mmap)
+		indices = self.__read(
+				qm_entry.data_indices_file, qm_entry.data_indices_key, mmap)
+		pointers = self.__read(
+				qm_entry.data_pointers_file, qm_entry.data_pointers_key, mmap)
+		scales = self.__read(
+				qm_entry.data_scales_file, qm_entry.data_scales_key, mmap)
+		if 8 * codes.dtype.itemsize != qm_entry.bits:
+			raise ValueError(
+					'quantized matrix codes stored as {}, expected {}-bit '
+					'codes'.format(codes.dtype, qm_entry.bits))
+		if qm_entry.layout_fortran_indexing:
+			indices = indices - 1
+			pointers = pointers - 1
+
+		return QuantizedMatrix(
+				(codes, indices, pointers, scales), shape=qm_entry.shape,
+				layout_CSR=qm_entry.layout_CSR, dtype=qm_entry.dtype)
+
 	def write_data_dictionary(self, directory, name, dictionary,
 							  overwrite=False):
-		saveable_type = lambda o: isinstance(o, CONRAD_MATRIX_TYPES)
+		saveable_type = lambda o: isinstance(
+				o, CONRAD_MATRIX_TYPES + (QuantizedMatrix,))
 		if any(map(saveable_type, dictionary.values())):
 			dd = DataDictionaryEntry()
 			dd.entries = {k: self.write_data(
@@ -265,11 +339,39 @@ class ConradFilesystemBase(object):
 				},
 		})
 
+	def write_quantized_matrix(self, directory, name, matrix,
+							   overwrite=False):
+		if not isinstance(matrix, QuantizedMatrix):
+			raise TypeError(
+					'quantized matrix to be written must be of type {}'
+					''.format(QuantizedMatrix))
+		write = lambda suffix, array: self.write(
+				os.path.join(directory, name + suffix), array, overwrite)
+		return QuantizedMatrixEntry(**{
+				CONRAD_DB_TYPETAG: CONRAD_DB_TYPESTRING[QuantizedMatrixEntry],
+				'layout_CSR': matrix.layout_CSR,
+				'layout_fortran_indexing': False,
+				'shape': matrix.shape,
+				'quantization': {
+						'bits': matrix.bits,
+						'dtype': matrix.dtype,
+				},
+				'data': {
+						'pointers': write('_pointers', matrix.pointers),
+						'indices': write('_indices', matrix.indices),
+						'values': write('_codes', matrix.codes),
+						'scales': write('_scales', matrix.scales),
+				},
+		})
+
 	def write_matrix(self, directory, name, matrix, overwrite=False):
+		if isinstance(matrix, QuantizedMatrix):
+			return self.write_quantized_matrix(
+					directory, name, matrix, overwrite)
 		if not sparse_or_dense(matrix):
 			raise TypeError(
 					'matrix to save must be one of {}'
-					''.format(CONRAD_MATRIX_TYPES))
+					''.format(CONRAD_MATRIX_TYPES + (QuantizedMatrix,)))
 		if isinstance(matrix, np.ndarray):
 			return self.write_dense_matrix(directory, name, matrix, overwrite)
 		else:
@@ -290,18 +392,39 @@ class LocalFilesystem(ConradFilesystemBase):
 					os.mkdir(d)
 		return d
 
-	def read(self, file, key=None):
+	def read(self, file, key=None, mmap=False):
+		"""
+		Read array from file.
+
+		Arguments:
+			file (:obj:`str`): Path to `.npy`, `.npz` or `.txt` file.
+			key (:obj:`str`, optional): Key of array in `.npz` file.
+			mmap (:obj:`bool`, optional): If ``True``, map array in
+				`.npy` file read-only into memory, so that only the
+				pages touched by subsequent operations are read from
+				disk (and can be shared by processes via the page
+				cache). Ignored for `.npz` and `.txt` files, which
+				cannot be mapped.
+
+		Returns:
+			:class:`numpy.ndarray`: Array read from file.
+
+		Raises:
+			OSError: If file does not exist.
+			ValueError: If file extension not recognized, or no key
+				provided for `.npz` file.
+		"""
 		file = str(file)
 		if not os.path.exists(file):
 			raise OSError('file {} does not exist'.format(file))
 		if file.endswith('.npy'):
-			return np.load(file)
+			return np.load(file, mmap_mode='r' if mmap else None)
 		elif file.endswith('.npz'):
 			if key is None:
 				raise ValueError('no key provided for `.npz` file')
-			return np.load(filename)[key]
+			return np.load(file)[key]
 		elif file.endswith('.txt'):
-			return np.loadtxt(filename)
+			return np.loadtxt(file)
 		else:
 			raise ValueError('file extension must be one of {}'.format(
 							('.npz', '.npy', '.txt')))
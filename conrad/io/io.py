@@ -1,6 +1,7 @@
 """
 Define :class:`ConradIO` for managing saving and loading of
-:class:`Case` objects.
+:class:`Case` objects, and :class:`CaseLoader` for loading them in
+other processes.
 """
 """
 Copyright 2016 Baris Ungun, Anqi Fu
@@ -141,7 +142,27 @@ class CaseIO(object):
 				'no case found for case name=`{}`, case_ID=`{}`'
 				''.format(case_name, case_ID))
 
-	def load_case(self, case_name, case_ID=None, case_entry=None):
+	def load_case(self, case_name, case_ID=None, case_entry=None,
+				  mmap=False, lazy=True):
+		"""
+		Load case from database and make it the active case.
+
+		Arguments:
+			case_name (:obj:`str`): Name of case.
+			case_ID (:obj:`str`, optional): Database key of case, used
+				if ``case_name`` not found.
+			case_entry (:class:`CaseEntry`, optional): Case entry,
+				used instead of lookup by name or key if provided.
+			mmap (:obj:`bool`, optional): If ``True``, memory-map the
+				dose matrix of the loaded frame from disk instead of
+				reading it into memory.
+			lazy (:obj:`bool`, optional): If ``True``, attach all of
+				the case's dose frames, deferring reads of each frame's
+				data until first access.
+
+		Returns:
+			:class:`Case`: Active case.
+		"""
 		self.close_active_case()
 
 		if isinstance(case_entry, CaseEntry):
@@ -154,7 +175,8 @@ class CaseIO(object):
 		else:
 			self.__active_case_ID = None
 		self.__active_case_entry = ce
-		self.__active_case_object = self.accessor.load_case(ce)
+		self.__active_case_object = self.accessor.load_case(
+				ce, mmap=mmap, lazy=lazy)
 		return self.active_case
 
 	def save_new_case(self, case, case_name, directory=None):
@@ -201,6 +223,30 @@ class CaseIO(object):
 			self.active_meta.name = name
 			self.__cases[name] = self.__cases.pop(old_name)
 
+	def case_loader(self, case_name=None, mmap=True):
+		"""
+		Build picklable loader of a case in this database.
+
+		Arguments:
+			case_name (:obj:`str`, optional): Name of case; defaults
+				to the name of the active case.
+			mmap (:obj:`bool`, optional): If ``True``, the loader
+				memory-maps the dose matrix of the loaded frame.
+
+		Returns:
+			:class:`CaseLoader`: Loader of case.
+
+		Raises:
+			ValueError: If no case name provided and no case active,
+				or if case not found.
+		"""
+		if case_name is None:
+			if self.active_meta is None:
+				raise ValueError('no active case')
+			case_name = self.active_meta.name
+		self.select_case_entry(case_name)
+		return CaseLoader(self, case_name, mmap=mmap)
+
 	def close_active_case(self):
 		if self.active_case is not None:
 			self.save_active_case(self.__active_case_directory)
@@ -209,7 +255,7 @@ class CaseIO(object):
 		self.__active_case_entry = None
 		self.__active_case_directory = None
 
-	def load_frame(self, frame_name):
+	def load_frame(self, frame_name, mmap=False):
 		if self.active_meta is None or self.active_case is None:
 			raise ValueError('no active case')
 
@@ -219,7 +265,8 @@ class CaseIO(object):
 		if frame_name not in self.active_case.physics.available_frames:
 			case.physics.add_dose_frame(
 					frame_name,
-					dose_frame=self.accessor.load_frame(entry, frame_name))
+					dose_frame=self.accessor.load_frame(
+							entry, frame_name, mmap=mmap))
 		case.physics.change_dose_frame(frame_name)
 
 	def load_frame_mapping(self, source_frame, target_frame):
@@ -275,7 +322,7 @@ class CaseIO(object):
 		if frame_name is None:
 			frame_name = self.active_frame_name
 
-		self.accessor.save_solution(
+		return self.accessor.save_solution(
 				self.active_meta, frame_name, solution_name, directory,
 				**solution_data)
 
@@ -306,3 +353,50 @@ class CaseIO(object):
 	def YAML_to_case(self, yaml_file):
 		self.close_active_case()
 		return self.accessor.load_case_yaml(yaml_file)
+
+class CaseLoader(object):
+	"""
+	Picklable callable that loads a case from a database.
+
+	The loader holds a copy of the database (as a dictionary) and the
+	types of the database and filesystem interfaces, rather than a
+	:class:`Case`, so that it can be sent to worker processes cheaply:
+	each call builds a new :class:`CaseIO` and loads the case, reading
+	(or memory-mapping) its dose matrices from disk. Changes to the
+	database after the loader is built are not seen by the loader.
+	"""
+
+	def __init__(self, caseio, case_name, mmap=True):
+		"""
+		Initialize :class:`CaseLoader`.
+
+		Arguments:
+			caseio (:class:`CaseIO`): Interface to database containing
+				case.
+			case_name (:obj:`str`): Name of case.
+			mmap (:obj:`bool`, optional): If ``True``, memory-map the
+				dose matrix of the loaded frame.
+		"""
+		self.__DB_constructor = type(caseio.DB)
+		self.__DB_dict = caseio.DB.dump_to_dictionary()
+		self.__FS_constructor = type(caseio.FS)
+		self.__case_name = str(case_name)
+		self.__mmap = bool(mmap)
+
+	@property
+	def case_name(self):
+		""" Name of case loaded. """
+		return self.__case_name
+
+	def __call__(self):
+		"""
+		Load case.
+
+		Returns:
+			:class:`Case`: Case loaded from copy of database.
+		"""
+		caseio = CaseIO(
+				DB_constructor=self.__DB_constructor,
+				DB_dict=self.__DB_dict,
+				FS_constructor=self.__FS_constructor)
+		return caseio.load_case(self.__case_name, mmap=self.__mmap)
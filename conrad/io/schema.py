@@ -1317,6 +1317,101 @@ class SparseMatrixEntry(DataFragmentEntry):
 				'data_values_key': self.data_values_key
 		}
 
+class QuantizedMatrixEntry(SparseMatrixEntry):
+	def __init__(self, **entry_dictionary):
+		self.__bits = None
+		self.__dtype = None
+		self.__data_scales_file = None
+		self.__data_scales_key = None
+		SparseMatrixEntry.__init__(self, **entry_dictionary)
+		self._DataFragmentEntry__type = 'quantized_matrix'
+
+	@property
+	def complete(self):
+		complete = SparseMatrixEntry.complete.fget(self)
+		complete &= self.bits in (8, 16)
+		complete &= isinstance(self.dtype, str)
+		complete &= self._DataFragmentEntry__check_npyz_file_key(
+				self.data_scales_file, self.data_scales_key)
+		return complete
+
+	@property
+	def bits(self):
+		return self.__bits
+
+	@bits.setter
+	def bits(self, bits):
+		if bits is not None:
+			self.__bits = int(bits)
+
+	@property
+	def dtype(self):
+		return self.__dtype
+
+	@dtype.setter
+	def dtype(self, dtype):
+		if dtype is not None:
+			self.__dtype = np.dtype(dtype).name
+
+	@property
+	def data_scales_file(self):
+		return self.__data_scales_file
+
+	@data_scales_file.setter
+	def data_scales_file(self, data_scales_file):
+		if data_scales_file is not None:
+			self.__data_scales_file = str(data_scales_file)
+
+	@property
+	def data_scales_key(self):
+		return self.__data_scales_key
+
+	@data_scales_key.setter
+	def data_scales_key(self, data_scales_key):
+		if data_scales_key is not None:
+			self.__data_scales_key = str(data_scales_key)
+
+	def ingest_dictionary(self, **quantizedmat_dictionary):
+		self.bits = cdb_util.try_keys(
+				quantizedmat_dictionary, 'quantization_bits',
+				['quantization', 'bits'])
+		self.dtype = cdb_util.try_keys(
+				quantizedmat_dictionary, 'quantization_dtype',
+				['quantization', 'dtype'])
+		self.data_scales_file = cdb_util.try_keys(
+				quantizedmat_dictionary, 'data_scales_file',
+				['data', 'scales', 'file'])
+		self.data_scales_key = cdb_util.try_keys(
+				quantizedmat_dictionary, 'data_scales_key',
+				['data', 'scales', 'key'])
+		SparseMatrixEntry.ingest_dictionary(self, **quantizedmat_dictionary)
+
+	@property
+	def nested_dictionary(self):
+		dictionary = SparseMatrixEntry.nested_dictionary.fget(self)
+		dictionary[CONRAD_DB_TYPETAG] = CONRAD_DB_TYPESTRING[type(self)]
+		dictionary['quantization'] = {
+				'bits': self.bits,
+				'dtype': self.dtype,
+		}
+		dictionary['data']['scales'] = {
+				'file': self.data_scales_file,
+				'key': self.data_scales_key,
+		}
+		return dictionary
+
+	@property
+	def flat_dictionary(self):
+		dictionary = SparseMatrixEntry.flat_dictionary.fget(self)
+		dictionary.update({
+				CONRAD_DB_TYPETAG: CONRAD_DB_TYPESTRING[type(self)],
+				'quantization_bits': self.bits,
+				'quantization_dtype': self.dtype,
+				'data_scales_file': self.data_scales_file,
+				'data_scales_key': self.data_scales_key,
+		})
+		return dictionary
+
 class HistoryEntry(ConradDatabaseEntry):
 	def __init__(self, **entry_dictionary):
 		ConradDatabaseEntry.__init__(self)
@@ -1552,6 +1647,8 @@ class SolverCacheEntry(ConradDatabaseEntry):
 		self.__name = None
 		self.__frame = None
 		self.__solver = None
+		self.__fingerprint = None
+		self.__data = None
 		self.__left_preconditioner = None
 		self.__matrix = None
 		self.__right_preconditioner = None
@@ -1564,6 +1661,9 @@ class SolverCacheEntry(ConradDatabaseEntry):
 		complete = isinstance(self.name, str)
 		complete &= isinstance(self.frame, str)
 		complete &= isinstance(self.solver, str)
+		if self.data is not None:
+			return complete & cdb_util.isinstance_or_db_pointer(
+					self.data, DataFragmentEntry)
 		complete &= cdb_util.isinstance_or_db_pointer(
 				self.left_preconditioner, DataFragmentEntry)
 		complete &= cdb_util.isinstance_or_db_pointer(
@@ -1603,6 +1703,25 @@ class SolverCacheEntry(ConradDatabaseEntry):
 		if isinstance(solver_name, str):
 			self.__solver = solver_name
 
+	@property
+	def fingerprint(self):
+		return self.__fingerprint
+
+	@fingerprint.setter
+	def fingerprint(self, fingerprint):
+		if isinstance(fingerprint, str):
+			self.__fingerprint = fingerprint
+
+	@property
+	def data(self):
+		return self.__data
+
+	@data.setter
+	def data(self, data_entry):
+		data_entry = cdb_util.route_data_fragment(data_entry)
+		if cdb_util.isinstance_or_db_pointer(data_entry, DataFragmentEntry):
+			self.__data = data_entry
+
 	@property
 	def left_preconditioner(self):
 		return self.__left_preconditioner
@@ -1663,6 +1782,8 @@ class SolverCacheEntry(ConradDatabaseEntry):
 				solver_cache_dictionary, 'name', 'cache_name')
 		self.frame = solver_cache_dictionary.pop('frame', None)
 		self.solver = solver_cache_dictionary.pop('solver', None)
+		self.fingerprint = solver_cache_dictionary.pop('fingerprint', None)
+		self.data = solver_cache_dictionary.pop('data', None)
 		self.left_preconditioner = solver_cache_dictionary.pop(
 				'left_preconditioner', None)
 		self.matrix = solver_cache_dictionary.pop('matrix', None)
@@ -1677,6 +1798,8 @@ class SolverCacheEntry(ConradDatabaseEntry):
 
 	def flatten(self, conrad_db):
 		cdb_util.validate_db(conrad_db)
+		if isinstance(self.data, ConradDatabaseEntry):
+			self.data = conrad_db.set_next(self.data.flatten(conrad_db))
 		if isinstance(self.left_preconditioner, ConradDatabaseEntry):
 			self.left_preconditioner = conrad_db.set_next(
 					self.left_preconditioner.flatten(conrad_db))
@@ -1692,6 +1815,8 @@ class SolverCacheEntry(ConradDatabaseEntry):
 
 	def arborize(self, conrad_db):
 		cdb_util.validate_db(conrad_db)
+		if self.data is not None:
+			self.data = conrad_db.get(self.data).arborize(conrad_db)
 		if self.left_preconditioner is not None:
 			self.left_preconditioner = conrad_db.get(
 					self.left_preconditioner).arborize(conrad_db)
@@ -1712,6 +1837,8 @@ class SolverCacheEntry(ConradDatabaseEntry):
 				'name': self.name,
 				'frame': self.frame,
 				'solver': self.solver,
+				'fingerprint': self.fingerprint,
+				'data': cdb_util.expand_if_db_entry(self.data),
 				'left_preconditioner': cdb_util.expand_if_db_entry(
 						self.left_preconditioner),
 				'matrix': cdb_util.expand_if_db_entry(self.matrix),
@@ -1725,7 +1852,7 @@ class SolverCacheEntry(ConradDatabaseEntry):
 
 	@property
 	def flat_dictionary(self):
-		checklist = [self.left_preconditioner, self.matrix,
+		checklist = [self.data, self.left_preconditioner, self.matrix,
 					 self.right_preconditioner, self.projector_matrix]
 		if not cdb_util.check_flat(checklist, DataFragmentEntry):
 			raise ValueError(
@@ -1738,6 +1865,8 @@ class SolverCacheEntry(ConradDatabaseEntry):
 				'name': self.name,
 				'frame': self.frame,
 				'solver': self.solver,
+				'fingerprint': self.fingerprint,
+				'data': self.data,
 				'left_preconditioner': self.left_preconditioner,
 				'matrix': self.matrix,
 				'right_preconditioner': self.right_preconditioner,
@@ -1965,6 +2094,7 @@ CONRAD_DB_ENTRY_PREFIXES = {
 		VectorEntry: 'data_fragment.',
 		DenseMatrixEntry: 'data_fragment.',
 		SparseMatrixEntry: 'data_fragment.',
+		QuantizedMatrixEntry: 'data_fragment.',
 		PhysicsEntry: 'physics.',
 		AnatomyEntry: 'anatomy.',
 		StructureEntry: 'structure.',
@@ -1988,6 +2118,7 @@ CONRAD_DB_TYPESTRING = {
 		VectorEntry: 'data_fragment: vector',
 		DenseMatrixEntry: 'data_fragment: dense matrix',
 		SparseMatrixEntry: 'data_fragment: sparse matrix',
+		QuantizedMatrixEntry: 'data_fragment: quantized matrix',
 		DoseFrameEntry: 'frame',
 		DoseFrameMappingEntry: 'frame_mapping',
 		PhysicsEntry: 'physics',
@@ -2004,6 +2135,7 @@ CONRAD_DB_TYPESTRING_TO_CONSTRUCTOR = {
 		'data_fragment: vector': VectorEntry,
 		'data_fragment: dense matrix': DenseMatrixEntry,
 		'data_fragment: sparse matrix': SparseMatrixEntry,
+		'data_fragment: quantized matrix': QuantizedMatrixEntry,
 		'frame': DoseFrameEntry,
 		'frame_mapping': DoseFrameMappingEntry,
 		'physics': PhysicsEntry,
@@ -493,7 +493,7 @@ class PercentileConstraint(Constraint):
 				'symbol' : self.symbol
 				}
 
-	def get_maxmargin_fulfillers(self, y, had_slack=False):
+	def get_maxmargin_fulfillers(self, y, had_slack=False, ordered=True):
 		r"""
 		Get indices to values of ``y`` deepest in feasible set.
 
@@ -526,6 +526,11 @@ class PercentileConstraint(Constraint):
 			had_slack (:obj:`bool`, optional): Define margin relative to
 				slack-modulated dose value instead of the base dose
 				value of this :class:`PercentileConstraint`.
+			ordered (:obj:`bool`, optional): If ``True``, sort the
+				margins and return indices in order of margin. If
+				``False``, select the indices with a linear-time
+				partition of the margins, and return them in ascending
+				order.
 
 		Returns:
 			:class:`numpy.ndarray`: Vector of indices that yield the
@@ -539,7 +544,18 @@ class PercentileConstraint(Constraint):
 		start = 0 if self.upper else -n_returned
 		end = n_returned if self.upper else None
 		dose = self.dose_achieved.value if had_slack else self.dose.value
-		return (vec(y) - dose).argsort()[start:end]
+		margin = vec(y) - dose
+		if ordered:
+			return margin.argsort()[start:end]
+
+		if n_returned == 0:
+			return np.zeros(0, dtype=int)
+		if n_returned >= margin.size:
+			return np.arange(margin.size)
+		kth = n_returned - 1 if self.upper else margin.size - n_returned
+		selected = np.zeros(margin.size, dtype=bool)
+		selected[np.argpartition(margin, kth)[start:end]] = True
+		return np.flatnonzero(selected)
 
 class MeanConstraint(Constraint):
 	"""
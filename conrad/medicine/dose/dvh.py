@@ -46,13 +46,27 @@ class DVH(object):
 	two sorted, length-matched, vectors of dose and percentile values,
 	respectively.
 
+	By default, the DVH curve is formed from exact dose values, which
+	requires the dose data to be sorted on each assignment. If a dose
+	bin width is specified, the curve is instead read off a histogram
+	of the doses with fixed bins. The histogram is updated
+	incrementally: on each assignment, only voxels whose dose moved to
+	a different bin are re-counted, so that repeated updates after
+	small plan changes take linear time, at the cost of resolving
+	doses on the DVH curve to within one bin width. If the doses span
+	more than :attr:`DVH.MAX_BINS` bins, the curve is formed from exact
+	dose values for that assignment instead.
+
 	Attributes:
 		MAX_LENGTH (:obj:`int`): Default maximum length constant to use
 			when constructing and possibly sampling DVH cures.
+		MAX_BINS (:obj:`int`): Maximum number of bins in dose
+			histogram.
 	"""
 	MAX_LENGTH = 1000
+	MAX_BINS = 2**20
 
-	def __init__(self, n_voxels, maxlength=MAX_LENGTH):
+	def __init__(self, n_voxels, maxlength=MAX_LENGTH, bin_width=None):
 		"""
 		Initialize :class:`DVH`.
 
@@ -65,12 +79,24 @@ class DVH(object):
 			maxlength (:obj:`int`, optional): Maximum series length,
 				above which data will be sampled to maintain a suitably
 				short representation of the DVH.
+			bin_width (:obj:`float`, optional): If provided, form DVH
+				curve from a histogram of doses with bins of this
+				width, instead of from sorted dose values.
 
 		Raises:
-			ValueError: If ``n_voxels`` is not an :obj:`int` >= `1`.
+			ValueError: If ``n_voxels`` is not an :obj:`int` >= `1`, or
+				``bin_width`` is not positive.
 		"""
 		if n_voxels is None or n_voxels is np.nan or n_voxels < 1:
 			raise ValueError('argument "n_voxels" must be an integer > 0')
+		if bin_width is not None and not bin_width > 0:
+			raise ValueError('argument "bin_width" must be > 0')
+
+		self.__bin_width = None if bin_width is None else float(bin_width)
+		self.__bins = None
+		self.__bin_counts = None
+		self.__dose_extrema = (0., 0.)
+		self.__sorted_cache = None
 
 		self.__dose_buffer = np.zeros(int(n_voxels))
 		self.__stride = 1 * (n_voxels < maxlength) + int(n_voxels / maxlength)
@@ -81,6 +107,10 @@ class DVH(object):
 		self.__percentiles[1:] = np.linspace(100, 0, length - 1)
 		self.__DATA_ENTERED = False
 
+	@property
+	def bin_width(self):
+		""" Width of dose bins, or ``None`` if DVH curve is exact. """
+		return self.__bin_width
 
 	@property
 	def populated(self):
@@ -95,12 +125,15 @@ class DVH(object):
 		The data provided to the setter are sorted to form the abscissa
 		values for the DVH curve. If the length of the input exceeds the
 		maximum data series length (as determined when the object was
-		initialized), the input data is sampled.
+		initialized), the input data is sampled. If
+		:attr:`DVH.bin_width` is set, the abscissa values are instead
+		interpolated from the binned dose histogram.
 
 		Raises:
 			ValueError: If size of input data does not match size of
 			structure associated with :class:`DVH` as specified to
-			object initializer.
+			object initializer, or if :attr:`DVH.bin_width` is set and
+			the input data are not finite.
 		"""
 		return self.__doses[1:]
 
@@ -109,19 +142,84 @@ class DVH(object):
 		if len(y) != self.__dose_buffer.size:
 			raise ValueError('dimension mismatch: length of argument "y" '
 							 'must be {}'.format(self.__dose_buffer.size))
+		if self.__bin_width is not None and not np.all(np.isfinite(y)):
+			raise ValueError('argument "y" must be finite to bin doses')
 
 		# populate dose buffer from y
 		self.__dose_buffer[:] = y[:]
+		self.__sorted_cache = None
 
-		# maintain sorted buffer
-		self.__dose_buffer.sort()
+		if self.__bin_width is None:
+			# maintain sorted buffer
+			self.__dose_buffer.sort()
 
-		# sample doses from buffer
-		self.__doses[1:] = self.__dose_buffer[::self.__stride]
+			# sample doses from buffer
+			self.__doses[1:] = self.__dose_buffer[::self.__stride]
+		elif self.__update_histogram():
+			self.__doses[1:] = self.__doses_from_histogram()
+		else:
+			self.__doses[1:] = self.__sorted_doses[::self.__stride]
 
 		# flag DVH curve as populated
 		self.__DATA_ENTERED = True
 
+	def __update_histogram(self):
+		"""
+		Update dose histogram from (unsorted) dose buffer.
+
+		Only voxels that changed bins since the last update are
+		re-counted.
+
+		Returns:
+			:obj:`bool`: ``False`` if doses span more than
+			:attr:`DVH.MAX_BINS` bins, in which case the histogram is
+			discarded, and rebuilt on the next update.
+		"""
+		buffer = self.__dose_buffer
+		self.__dose_extrema = (buffer.min(), buffer.max())
+		if self.__dose_extrema[1] / self.__bin_width >= self.MAX_BINS:
+			self.__bins = None
+			self.__bin_counts = None
+			return False
+
+		# bin index = floor(dose / width), negative doses in first bin
+		# (truncation of nonnegative values to int32 is fastest)
+		bins = np.maximum(buffer * (1. / self.__bin_width), 0.)
+		bins = bins.astype(np.int32)
+
+		if self.__bins is None:
+			self.__bin_counts = np.bincount(bins)
+		else:
+			changed = np.flatnonzero(bins != self.__bins)
+			if changed.size > 0:
+				removed = np.bincount(self.__bins[changed])
+				added = np.bincount(bins[changed])
+				if added.size > self.__bin_counts.size:
+					self.__bin_counts = np.hstack((
+							self.__bin_counts, np.zeros(
+									added.size - self.__bin_counts.size,
+									dtype=self.__bin_counts.dtype)))
+				self.__bin_counts[:removed.size] -= removed
+				self.__bin_counts[:added.size] += added
+		self.__bins = bins
+		return True
+
+	def __doses_from_histogram(self):
+		"""
+		Interpolate sampled doses of DVH curve from dose histogram.
+
+		Doses at the sampled ranks of the sorted dose vector are
+		interpolated linearly within the bin containing each rank, and
+		clipped to the range of the dose data.
+		"""
+		ranks = np.arange(0, self.__dose_buffer.size, self.__stride)
+		cumulative = np.cumsum(self.__bin_counts)
+		bins = np.searchsorted(cumulative, ranks, side='right')
+		counts = self.__bin_counts[bins]
+		offsets = ranks - (cumulative[bins] - counts) + 0.5
+		doses = (bins + offsets / counts) * self.__bin_width
+		return np.clip(doses, *self.__dose_extrema)
+
 	@staticmethod
 	def __interpolate_percentile(p1, p2, p_des):
 		r"""
@@ -160,6 +258,39 @@ class DVH(object):
 			# alpha = (p_des - p2) / (p1 - p2)
 			return float(p_des - p2) / float(p1 - p2)
 
+	@property
+	def __sorted_doses(self):
+		"""
+		Full dose data, in ascending order.
+
+		In binned mode, the dose buffer is unsorted, and a sorted copy
+		is kept until the dose data change.
+		"""
+		if self.__bin_width is None:
+			return self.__dose_buffer
+		if self.__sorted_cache is None:
+			self.__sorted_cache = np.sort(self.__dose_buffer)
+		return self.__sorted_cache
+
+	def percentiles_at_doses(self, doses):
+		"""
+		Vectorized version of :meth:`DVH.percentile_at_dose`.
+
+		Percentiles are found by binary search on the full, sorted dose
+		data.
+
+		Arguments:
+			doses: Vector-like input of queried doses, assumed to have
+				same units as DVH data.
+
+		Returns:
+			:class:`numpy.ndarray`: Percentile value corresponding to
+			each queried dose.
+		"""
+		doses = np.asarray(doses, dtype=float)
+		counts = np.searchsorted(self.__sorted_doses, doses, side='left')
+		return 100. * counts / float(self.__dose_buffer.size)
+
 	def percentile_at_dose(self, dose):
 		"""
 		Read off DVH curve to get precentile value at ``dose``.
@@ -179,22 +310,42 @@ class DVH(object):
 
 		if self.__doses is None: return np.nan
 
-		return 100. * (
-				sum(self.__dose_buffer < dose) /
-				float(self.__dose_buffer.size))
+		return float(self.percentiles_at_doses([dose])[0])
+
+	def doses_at_percentiles(self, percentiles):
+		"""
+		Vectorized version of :meth:`DVH.dose_at_percentile`.
+
+		The dose at percentile ``p`` is found by linear interpolation
+		between the two voxel doses nearest to rank (100 - ``p``)% of
+		the full, sorted dose data, so that percentiles 100 and 0 yield
+		the minimum and maximum dose, respectively. If
+		:attr:`DVH.bin_width` is set, the sampled DVH curve is
+		interpolated instead.
+
+		Arguments:
+			percentiles: Vector-like input of queried percentiles.
+
+		Returns:
+			:class:`numpy.ndarray`: Dose value corresponding to each
+			queried percentile.
+		"""
+		percentiles = np.asarray(percentiles, dtype=float)
+		size = self.__dose_buffer.size
+		ranks = 0.01 * (100. - percentiles) * (size - 1)
+		if self.__bin_width is None:
+			return np.interp(ranks, np.arange(size), self.__dose_buffer)
+		else:
+			sample_ranks = np.hstack((
+					np.arange(0, size, self.__stride), size - 1))
+			sample_doses = np.hstack((self.__doses[1:], self.max_dose))
+			return np.interp(ranks, sample_ranks, sample_doses)
 
 	def dose_at_percentile(self, percentile):
 		"""
 		Read off DVH curve to get dose value at ``percentile``.
 
-		Since the :class:`DVH` object maintains the DVH curve of
-		(dose, percentile) pairs as two sorted vectors, to approximate
-		the dose d at percentile ``percentile``, we retrieve the
-		index i that yields the nearest percentile value. The
-		corresponding i'th dose is returned. When the nearest percentile
-		is not within 0.5%, the two nearest neighbor percentiles and
-		two nearest neighbor dose values are used to approximate the
-		dose at the queried percentile by linear interpolation.
+		See :meth:`DVH.doses_at_percentiles`.
 
 		Arguments:
 			percentile (:obj:`int`, :obj:`float` or :class:`Percent`):
@@ -211,61 +362,22 @@ class DVH(object):
 
 		if self.__doses is None: return np.nan
 
-		if percentile == 100:
-			return self.min_dose
-		if percentile == 0:
-			return self.max_dose
-
-		# bisection retrieval of index @ percentile
-		# ----------------------------------------
-		u = len(self.__percentiles) - 1
-		l = 1
-		i = int(l + (u - l) / 2)
-
-		# set tolerance based on bucket width
-		tol = (self.__percentiles[-2] - self.__percentiles[-1]) / 2
-
-		# get to within 0.5 of a percentile if possible
-		abstol = 0.5
-
-		while (u - l > 5):
-			# percentile sorted descending
-			if self.__percentiles[i] > percentile:
-				l = i
-			else:
-				u = i
-			i = int(l + (u - l) / 2)
-
-		# break to iterative search
-		# -------------------------
-		idx = None
-		for i in xrange(l, u):
-			if abs(self.__percentiles[i] - percentile) < tol:
-				idx = i
-				break
-
-		# retrieve dose from index, interpolate if needed
-		# -----------------------------------------------
-		if idx is None: idx = u
-		if abs(self.__percentiles[idx] - percentile) <= abstol:
-			# return dose if available percentile bucket is close enough
-			return self.__doses[idx]
-		else:
-			# interpolate dose by interpolating percentiles if not close enough
-			alpha = self.__interpolate_percentile(self.__percentiles[i],
-				self.__percentiles[i + 1], percentile)
-			return alpha * self.__doses[i] + (1 - alpha) * self.__doses[i + 1]
+		return float(self.doses_at_percentiles([percentile])[0])
 
 	@property
 	def min_dose(self):
 		""" Smallest dose value in DVH curve. """
 		if self.__doses is None: return np.nan
+		if self.__bin_width is not None:
+			return self.__dose_extrema[0]
 		return self.__dose_buffer[0]
 
 	@property
 	def max_dose(self):
 		""" Largest dose value in DVH curve. """
 		if self.__doses is None: return np.nan
+		if self.__bin_width is not None:
+			return self.__dose_extrema[1]
 		return self.__dose_buffer[-1]
 
 	@property
@@ -289,6 +401,8 @@ class DVH(object):
 		if maxlength is None:
 			return self
 
-		dvh = DVH(self.__dose_buffer.size, maxlength=int(maxlength))
+		dvh = DVH(
+				self.__dose_buffer.size, maxlength=int(maxlength),
+				bin_width=self.__bin_width)
 		dvh.data = self.__dose_buffer
 		return dvh
\ No newline at end of file
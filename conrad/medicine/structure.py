@@ -35,7 +35,7 @@ import operator
 
 from conrad.defs import CONRAD_DEBUG_PRINT, positive_real_valued, \
 						sparse_or_dense, vec
-from conrad.physics.units import cm3, Gy, DeliveredDose
+from conrad.physics.units import cm3, Gy, DeliveredDose, Percent
 from conrad.medicine.dose import Constraint, MeanConstraint, ConstraintList, \
 								 PercentileConstraint, DVH, RELOPS
 from conrad.optimization.objectives import TreatmentObjective, \
@@ -96,7 +96,9 @@ class Structure(object):
 				to receive a non-zero dose level during treatment.
 			size (:obj:`int`, optional): Number of voxels (volume
 				elements) in structure.
-			**options: Arbitrary keyword arguments.
+			**options: Arbitrary keyword arguments. Option
+				``dvh_bin_width`` is passed to the structure's
+				:class:`DVH` as ``bin_width``.
 
 		Raises:
 			TypeError: If ``label`` is not an :obj:`int` or :obj:`str`.
@@ -119,6 +121,7 @@ class Structure(object):
 		self.__y = None
 		self.__y_mean = np.nan
 		self.dvh = None
+		self.__dvh_bin_width = options.pop('dvh_bin_width', None)
 		self.constraints = ConstraintList()
 
 		objective = options.pop('objective', None)
@@ -182,7 +185,7 @@ class Structure(object):
 			raise ValueError('argument "size" must be a positive int')
 		else:
 			self.__size = int(size)
-			self.dvh = DVH(self.size)
+			self.dvh = DVH(self.size, bin_width=self.__dvh_bin_width)
 
 			# default to uniformly weighted voxels
 			self.voxel_weights = np.ones(self.size)
@@ -220,6 +223,26 @@ class Structure(object):
 		self.__A_full = None
 		self.__A_mean = None
 
+	def resize(self, size):
+		"""
+		Change number of voxels in structure.
+
+		Used to represent the structure in a dose frame with a different
+		voxel discretization, e.g., with clustered voxels. Dose
+		matrices and doses are reset, and voxel weights are reset to
+		the ``1`` vector.
+
+		Arguments:
+			size (:obj:`int`): New structure size.
+
+		Returns:
+			None
+		"""
+		self.reset_matrices()
+		self.__y = None
+		self.__y_mean = np.nan
+		self.size = size
+
 	@property
 	def collapsable(self):
 		""" ``True`` if optimization can be performed with mean dose only. """
@@ -325,10 +348,13 @@ class Structure(object):
 								np.ndarray, sp.csc_matrix,
 								sp.csr_matrix))
 			else:
+				# match weights to matrix precision, so that a single
+				# precision matrix is not upcast
+				weights = self.__as_matrix_dtype(self.voxel_weights)
 				if isinstance(self.A_full, np.ndarray):
-					self.__A_mean = np.dot(self.voxel_weights, self.A_full)
+					self.__A_mean = np.dot(weights, self.A_full)
 				else:
-					self.__A_mean = vec(self.voxel_weights * self.A_full)
+					self.__A_mean = vec(weights * self.A_full)
 				self.__A_mean /= float(self.weighted_size)
 
 	@property
@@ -525,6 +551,18 @@ class Structure(object):
 		self.__y_mean = np.dot(self.voxel_weights, y) / self.weighted_size
 		self.dvh.data = self.__y
 
+	def __as_matrix_dtype(self, vector):
+		"""
+		Cast vector to floating point type of :attr:`Structure.A_full`.
+
+		Keeps products with a single precision dose matrix in single
+		precision, rather than upcasting (i.e., copying) the matrix.
+		"""
+		dtype = getattr(self.A_full, 'dtype', None)
+		if dtype is None or not np.issubdtype(dtype, np.floating):
+			return vector
+		return np.asarray(vector, dtype=dtype)
+
 	def calc_y(self, x):
 		"""
 		Calculate voxel doses as:
@@ -539,7 +577,8 @@ class Structure(object):
 
 		# calculate dose from input vector x:
 		# 	y = Ax
-		x = vec(x)
+		# (in precision of dose matrix)
+		x = self.__as_matrix_dtype(vec(x))
 		if isinstance(self.A, (sp.csr_matrix, sp.csc_matrix)):
 			self.__y = np.squeeze(self.A * x)
 		elif isinstance(self.A, np.ndarray):
@@ -599,6 +638,11 @@ class Structure(object):
 			ValueError: If :attr:`Structure.dvh` not initialized or not
 				populated with dose data.
 		"""
+		self.__check_evaluable(constraint)
+		return self.__audit(
+				constraint, self.__doses_achieved([constraint])[0])
+
+	def __check_evaluable(self, constraint):
 		if not isinstance(constraint, Constraint):
 			raise TypeError('argument "constraint" must be of type '
 				'conrad.dose.Constraint')
@@ -616,29 +660,68 @@ class Structure(object):
 							 '(assign dose by setting field "{}.y")'
 							 ''.format(Structure))
 
-		relop = operator.le if constraint.relop == RELOPS.LEQ else operator.ge
+	def __doses_achieved(self, constraints):
+		"""
+		Doses achieved at the thresholds of each of ``constraints``.
 
-		if isinstance(constraint.threshold, str):
-			if constraint.threshold == 'mean':
-				dose_achieved = self.mean_dose
+		Doses at all percentile thresholds are read off the structure's
+		DVH in a single query.
+
+		Raises:
+			ValueError: If any of ``constraints`` has a threshold other
+				than a percentile, ``'mean'``, ``'min'`` or ``'max'``.
+		"""
+		percentiles = [
+				c.threshold.value if isinstance(c.threshold, Percent) else
+				c.threshold for c in constraints
+				if not isinstance(c.threshold, str)]
+		if len(percentiles) > 0:
+			percentile_doses = iter(
+					self.dvh.doses_at_percentiles(percentiles))
+
+		doses = []
+		for constraint in constraints:
+			if not isinstance(constraint.threshold, str):
+				doses.append(next(percentile_doses))
+			elif constraint.threshold == 'mean':
+				doses.append(self.mean_dose)
 			elif constraint.threshold == 'min':
-				dose_achieved = self.min_dose
+				doses.append(self.min_dose)
 			elif constraint.threshold == 'max':
-				dose_achieved = self.max_dose
-		else:
-			dose_achieved = self.dvh.dose_at_percentile(
-				constraint.threshold)
+				doses.append(self.max_dose)
+			else:
+				raise ValueError('constraint threshold {} not '
+								 'recognized'.format(constraint.threshold))
+		return doses
 
+	@staticmethod
+	def __audit(constraint, dose_achieved):
+		relop = operator.le if constraint.relop == RELOPS.LEQ else operator.ge
 		status = relop(float(dose_achieved), float(constraint.dose))
 		dose = float(dose_achieved) / float(constraint.dose) * constraint.dose
 		return (status, dose)
 
 	def satisfies_all(self, constraint_list):
-		return all(listmap(
-				lambda status_dose_tuple: status_dose_tuple[0],
-				listmap(
-						self.satisfies,
-						ConstraintList(constraint_list).list)))
+		"""
+		Test whether structure's voxel doses satisfy all constraints.
+
+		Doses achieved at all percentile thresholds are retrieved from
+		the structure's DVH in a single query.
+
+		Arguments:
+			constraint_list: :class:`ConstraintList`, or collection of
+				:class:`Constraint` objects.
+
+		Returns:
+			:obj:`bool`: ``True`` if structure's voxel doses conform to
+			every constraint.
+		"""
+		constraints = ConstraintList(constraint_list).list
+		for constraint in constraints:
+			self.__check_evaluable(constraint)
+		return all(
+				self.__audit(constraint, dose)[0] for constraint, dose in
+				zip(constraints, self.__doses_achieved(constraints)))
 
 	def plotting_data(self, constraints_only=False, maxlength=None):
 		"""
@@ -720,8 +803,9 @@ class Structure(object):
 		s['mean'] = self.mean_dose
 		s['min'] = self.min_dose
 		s['max'] = self.max_dose
-		for p in percentiles:
-			s['D' + str(p)] = self.dvh.dose_at_percentile(p) * self.dose_unit
+		doses = self.dvh.doses_at_percentiles(percentiles)
+		for p, dose in zip(percentiles, doses):
+			s['D' + str(p)] = float(dose) * self.dose_unit
 		return s
 
 	@property
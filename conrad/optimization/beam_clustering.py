@@ -1,4 +1,14 @@
 """
+Define :class:`BeamClustering` for building beam-clustered dose frames.
+
+Attributes:
+	COMPRESSION_DEFAULT (:obj:`float`): Default ratio of beams to beam
+		clusters in each group of beams.
+	SPATIAL_WEIGHT_DEFAULT (:obj:`float`): Default weight of beamlet
+		positions, relative to dose influence, when clustering beamlets
+		of a fluence map.
+"""
+"""
 Copyright 2016 Baris Ungun, Anqi Fu
 
 This file is part of CONRAD.
@@ -16,3 +26,365 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
 """
+from conrad.compat import *
+
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.csgraph as csgraph
+
+from conrad.abstract.mapping import ClusterMapping
+from conrad.abstract.matrix import QuantizedMatrix
+from conrad.physics.beams import BeamSet, FluenceMap
+from conrad.physics.physics import DoseFrame, DoseFrameMapping, Physics
+from conrad.optimization.voxel_clustering import SKETCH_DIMENSION_DEFAULT, \
+	BATCH_SIZE_DEFAULT, MAX_ITER_DEFAULT, sketch_rows, kmeans_minibatch
+
+COMPRESSION_DEFAULT = 10.
+SPATIAL_WEIGHT_DEFAULT = 1.
+
+def grid_positions(grid):
+	"""
+	Position of each unit of a regular grid, in traversal order.
+
+	Arguments:
+		grid (:class:`~conrad.physics.grid.AbstractGrid`): Grid.
+
+	Returns:
+		:class:`numpy.ndarray`: Matrix with one row per grid unit and
+		one column of (integer) coordinates per grid dimension, in the
+		order of the grid's dimensions.
+	"""
+	size = int(np.prod(grid.shape))
+	index = np.arange(size)
+	return np.vstack([
+			(index // grid.strides[dim]) % grid.shape[i]
+			for i, dim in enumerate(grid.dims)]).T
+
+def grid_adjacency(grid):
+	"""
+	Adjacency of units of a regular grid.
+
+	Arguments:
+		grid (:class:`~conrad.physics.grid.AbstractGrid`): Grid.
+
+	Returns:
+		:class:`scipy.sparse.csr_matrix`: Symmetric boolean matrix, with
+		one row and column per grid unit, with nonzero entries for each
+		pair of units adjacent along one grid dimension.
+	"""
+	positions = grid_positions(grid)
+	size = positions.shape[0]
+	sources, targets = [], []
+	for i, dim in enumerate(grid.dims):
+		interior = np.flatnonzero(positions[:, i] < grid.shape[i] - 1)
+		sources.append(interior)
+		targets.append(interior + grid.strides[dim])
+	sources, targets = np.hstack(sources), np.hstack(targets)
+	adjacency = sp.csr_matrix(
+			(np.ones(sources.size, dtype=bool), (sources, targets)),
+			shape=(size, size))
+	return (adjacency + adjacency.T).tocsr()
+
+def split_disconnected(assignments, adjacency):
+	"""
+	Split clusters into connected components.
+
+	Arguments:
+		assignments: Vector assigning each point to a cluster.
+		adjacency: Sparse adjacency matrix of points.
+
+	Returns:
+		:class:`numpy.ndarray`: Vector assigning each point to a
+		cluster, numbered contiguously from zero, such that each
+		cluster is a subset of an input cluster that is connected in
+		the graph of ``adjacency``.
+	"""
+	adjacency = sp.coo_matrix(adjacency)
+	same = assignments[adjacency.row] == assignments[adjacency.col]
+	graph = sp.csr_matrix(
+			(np.ones(same.sum(), dtype=bool),
+			 (adjacency.row[same], adjacency.col[same])),
+			shape=adjacency.shape)
+	_, components = csgraph.connected_components(graph, directed=False)
+	return ClusterMapping(components).contiguous.vec
+
+class BeamClustering(object):
+	"""
+	Group beams with similar dose influence into clusters.
+
+	Beams are clustered within groups, so that no cluster mixes beams
+	from different groups. Groups are the beams of a
+	:class:`~conrad.physics.beams.BeamSet`, if one is provided (e.g.,
+	one group of beamlets per fluence map), or else the beam labels of
+	the frame. To compare beams cheaply, each dose matrix column is
+	sketched by a fixed set of random projections, and the sketches
+	are clustered with
+	:func:`~conrad.optimization.voxel_clustering.kmeans_minibatch`.
+
+	Beamlets of a :class:`~conrad.physics.beams.FluenceMap` are
+	clustered into contiguous patches of bixels: their positions on the
+	bixel grid are appended to their sketches, weighted by
+	:attr:`BeamClustering.spatial_weight`, and clusters that are not
+	connected on the grid are split into connected components.
+
+	The resulting beam-clustered :class:`~conrad.physics.DoseFrame` has
+	one column per cluster, equal to the sum of its beams' columns, so
+	that the dose delivered by the clustered beams at some intensities
+	equals the dose delivered by the full frame's beams when each beam
+	takes the intensity of its cluster. Its beam weights are the
+	cluster sizes, and its voxels are those of the full frame. A
+	:class:`~conrad.abstract.mapping.ClusterMapping` from full frame
+	beams to clusters relates the frames: upsampling (without
+	rescaling) maps cluster intensities to full frame intensities.
+
+	Attributes:
+		compression (:obj:`float`): Default ratio of beams to clusters
+			in each group.
+		sketch_dimension (:obj:`int`): Number of random projections
+			of each dose matrix column.
+		spatial_weight (:obj:`float`): Weight of beamlet positions,
+			relative to the root mean square norm of the beamlets'
+			sketches, per extent of the fluence map.
+		batch_size (:obj:`int`): Number of points sampled per
+			:math:`k`-means iteration.
+		max_iter (:obj:`int`): Number of :math:`k`-means iterations.
+	"""
+	def __init__(self, compression=COMPRESSION_DEFAULT,
+				 sketch_dimension=SKETCH_DIMENSION_DEFAULT,
+				 spatial_weight=SPATIAL_WEIGHT_DEFAULT,
+				 batch_size=BATCH_SIZE_DEFAULT, max_iter=MAX_ITER_DEFAULT,
+				 seed=None):
+		"""
+		Initialize :class:`BeamClustering`.
+
+		Arguments:
+			compression (:obj:`float`, optional): Default ratio of
+				beams to clusters in each group.
+			sketch_dimension (:obj:`int`, optional): Number of random
+				projections of each dose matrix column.
+			spatial_weight (:obj:`float`, optional): Weight of beamlet
+				positions when clustering beamlets of a fluence map.
+			batch_size (:obj:`int`, optional): Number of points sampled
+				per :math:`k`-means iteration.
+			max_iter (:obj:`int`, optional): Number of :math:`k`-means
+				iterations.
+			seed (:obj:`int`, optional): Seed of random number
+				generator, for reproducible clusterings.
+
+		Raises:
+			ValueError: If ``compression`` is less than one, or
+				``spatial_weight`` is negative.
+		"""
+		if compression < 1:
+			raise ValueError('argument `compression` must be >= 1')
+		if spatial_weight < 0:
+			raise ValueError('argument `spatial_weight` must be nonnegative')
+		self.compression = float(compression)
+		self.sketch_dimension = int(sketch_dimension)
+		self.spatial_weight = float(spatial_weight)
+		self.batch_size = int(batch_size)
+		self.max_iter = int(max_iter)
+		self.__random_state = np.random.RandomState(seed)
+
+	def cluster_columns(self, matrix, n_clusters, grid=None):
+		"""
+		Cluster columns of ``matrix``.
+
+		Arguments:
+			matrix: Dense or sparse matrix.
+			n_clusters (:obj:`int`): Number of clusters formed by
+				:math:`k`-means. If ``grid`` is provided, splitting
+				disconnected clusters may yield more clusters.
+			grid (:class:`~conrad.physics.beams.BixelGrid`, optional):
+				Grid on which columns of ``matrix`` are arranged, in
+				traversal order.
+
+		Returns:
+			:class:`~conrad.abstract.mapping.ClusterMapping`: Map from
+			columns of ``matrix`` to clusters.
+
+		Raises:
+			ValueError: If ``grid`` size does not match number of
+				columns of ``matrix``.
+		"""
+		points = sketch_rows(
+				matrix.T, self.sketch_dimension, self.__random_state)
+		if grid is not None:
+			if np.prod(grid.shape) != points.shape[0]:
+				raise ValueError(
+						'argument `grid` must have one unit per column '
+						'of argument `matrix`')
+			if self.spatial_weight > 0:
+				scale = np.sqrt(np.mean(np.sum(points**2, axis=1)))
+				scale = self.spatial_weight * (scale if scale > 0 else 1.)
+				points = np.hstack((points, scale * grid_positions(
+						grid) / float(max(grid.shape))))
+
+		assignments = kmeans_minibatch(
+				points, n_clusters, batch_size=self.batch_size,
+				max_iter=self.max_iter, random_state=self.__random_state)
+		if grid is not None:
+			assignments = split_disconnected(
+					assignments, grid_adjacency(grid))
+		return ClusterMapping(assignments)
+
+	@staticmethod
+	def beam_groups(frame, beams=None):
+		"""
+		Partition beams of ``frame`` into groups clustered separately.
+
+		Arguments:
+			frame (:class:`~conrad.physics.DoseFrame`): Frame.
+			beams (:class:`~conrad.physics.beams.BeamSet`, optional):
+				Beams of ``frame``, in order of the frame's beams.
+
+		Returns:
+			:obj:`list`: Tuple for each group, with label of group,
+			vector of indices of group's beams, and
+			:class:`~conrad.physics.beams.BixelGrid` of the beams if
+			the group is a :class:`~conrad.physics.beams.FluenceMap`,
+			or else ``None``.
+
+		Raises:
+			ValueError: If ``beams`` does not match beams of ``frame``.
+		"""
+		if beams is not None:
+			beams = beams if isinstance(beams, BeamSet) else BeamSet(beams)
+			if beams.count != frame.beams:
+				raise ValueError(
+						'argument `beams` must have as many beams ({}) as '
+						'argument `frame` ({})'.format(
+								beams.count, frame.beams))
+			groups = []
+			offset = 0
+			for label, beam in enumerate(beams.beams):
+				grid = beam.bixel_grid if isinstance(beam, FluenceMap) else None
+				groups.append(
+						(label, np.arange(offset, offset + beam.count), grid))
+				offset += beam.count
+			return groups
+		if frame.beam_labels is not None:
+			return [
+					(label, indices, None) for label, indices in sorted(
+							DoseFrame.label_index(frame.beam_labels).items())]
+		return [(0, np.arange(frame.beams), None)]
+
+	def cluster_frame(self, frame, beams=None, frame_name=None,
+					  clusters=None):
+		"""
+		Build beam-clustered copy of ``frame``.
+
+		Arguments:
+			frame (:class:`~conrad.physics.DoseFrame`): Frame with a
+				contiguous dose matrix.
+			beams (:class:`~conrad.physics.beams.BeamSet`, optional):
+				Beams of ``frame``; see :meth:`BeamClustering.beam_groups`.
+			frame_name (:obj:`str`, optional): Name of clustered frame;
+				by default, name of ``frame`` with suffix
+				``'_beam_clusters'``.
+			clusters (:obj:`dict`, optional): Number of clusters for
+				groups of beams, keyed by group label. Groups not
+				included are compressed by
+				:attr:`BeamClustering.compression`.
+
+		Returns:
+			:obj:`tuple`: Clustered
+			:class:`~conrad.physics.DoseFrame`, and
+			:class:`~conrad.abstract.mapping.ClusterMapping` from beams
+			of ``frame`` to beams of clustered frame. Beam labels of
+			the clustered frame are the labels of the groups.
+
+		Raises:
+			TypeError: If ``frame`` is not a
+				:class:`~conrad.physics.DoseFrame`.
+			ValueError: If ``frame`` lacks a contiguous dose matrix.
+		"""
+		if not isinstance(frame, DoseFrame):
+			raise TypeError(
+					'argument `frame` must be of type {}'.format(DoseFrame))
+		if frame.dose_matrix is None or frame.dose_matrix.data is None:
+			raise ValueError(
+					'argument `frame` must have a contiguous dose matrix '
+					'to cluster beams')
+		A = frame.dose_matrix.data
+		if isinstance(A, QuantizedMatrix):
+			A = A.decompress()
+
+		cluster_vector = np.zeros(frame.beams, dtype=int)
+		labels = []
+		offset = 0
+		for label, indices, grid in self.beam_groups(frame, beams):
+			if clusters is not None and label in clusters:
+				n_clusters = int(clusters[label])
+				if n_clusters < 1:
+					raise ValueError(
+							'number of clusters requested for label {} '
+							'must be positive'.format(label))
+			else:
+				n_clusters = int(np.ceil(indices.size / self.compression))
+			mapping = self.cluster_columns(A[:, indices], n_clusters, grid)
+			cluster_vector[indices] = offset + mapping.vec
+			offset += mapping.n_clusters
+			labels.append(label * np.ones(mapping.n_clusters, dtype=int))
+		beam_map = ClusterMapping(cluster_vector)
+
+		# column of each cluster is sum of columns of its beams
+		dose_matrix = beam_map.downsample(A.T, rescale_output=False).T
+		if isinstance(dose_matrix, np.ndarray):
+			dose_matrix = np.ascontiguousarray(dose_matrix)
+
+		if frame_name is None:
+			frame_name = frame.name + '_beam_clusters'
+		clustered = DoseFrame(
+				data=dose_matrix, beam_labels=np.hstack(labels),
+				beam_weights=beam_map.cluster_weights.astype(int),
+				frame_name=frame_name)
+		if frame.voxel_labels is not None:
+			clustered.voxel_labels = frame.voxel_labels
+		if frame.voxel_weights is not None and frame.voxel_weights.data is not None:
+			clustered.voxel_weights = frame.voxel_weights.data
+		return clustered, beam_map
+
+	def cluster_physics(self, physics, beams=None, frame_name=None,
+						clusters=None, source_frame=None):
+		"""
+		Add beam-clustered frame and frame mapping to ``physics``.
+
+		The clustered frame is built from a frame of ``physics`` as in
+		:meth:`BeamClustering.cluster_frame`, and added to ``physics``
+		with a :class:`~conrad.physics.DoseFrameMapping` whose source is
+		the full frame and whose target is the clustered frame. The
+		active frame of ``physics`` is unchanged.
+
+		Arguments:
+			physics (:class:`~conrad.physics.Physics`): Physics to
+				which to add clustered frame.
+			beams (:class:`~conrad.physics.beams.BeamSet`, optional):
+				Beams of full frame.
+			frame_name (:obj:`str`, optional): Name of clustered frame.
+			clusters (:obj:`dict`, optional): Number of clusters for
+				groups of beams, keyed by group label.
+			source_frame (:obj:`str`, optional): Name of frame to
+				cluster; by default, the active frame of ``physics``.
+
+		Returns:
+			:class:`~conrad.physics.DoseFrame`: Clustered frame.
+
+		Raises:
+			TypeError: If ``physics`` is not a
+				:class:`~conrad.physics.Physics`.
+		"""
+		if not isinstance(physics, Physics):
+			raise TypeError(
+					'argument `physics` must be of type {}'.format(Physics))
+		if source_frame is None:
+			frame = physics.frame
+		else:
+			frame = physics.retrieve_frame(source_frame)
+
+		clustered, beam_map = self.cluster_frame(
+				frame, beams=beams, frame_name=frame_name, clusters=clusters)
+		physics.add_dose_frame(clustered.name, dose_frame=clustered)
+		physics.add_frame_mapping(DoseFrameMapping(
+				frame.name, clustered.name, beam_map=beam_map))
+		return clustered
@@ -22,8 +22,11 @@ along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
 """
 from conrad.compat import *
 
+import time
 import numpy as np
 
+from contextlib import contextmanager
+
 class RunProfile(object):
 	"""
 	Record of solver input associated with a treatment planning run.
@@ -142,9 +145,17 @@ class RunOutput(object):
 			a minimum, has entries solver
 			run time (first pass/restricted constraints, and second
 			pass/exact constraints).
+		timing (:obj:`dict`): Dictionary of wall-clock and CPU times,
+			in seconds, spent in each phase of the planning run, e.g.,
+			``'load'``, ``'build'``, ``'canonicalization'``,
+			``'solver'``, ``'dose'`` and ``'plotting'``. Phases of the
+			second pass of the two-pass method have the suffix
+			``'_exact'``. Each entry is a dictionary with keys
+			``'wall'`` and ``'cpu'``.
 		"""
 	def __init__(self):
 		""" Intialize empty `RunOutput`. """
+		self.timing = {}
 
 		self.optimal_variables = {'x': None, 'x_exact': None}
 		self.optimal_dvh_slopes = {}
@@ -172,6 +183,38 @@ class RunOutput(object):
 		""" Run time for second-pass solve (exact dose constraints). """
 		return self.solver_info['time_exact']
 
+	def add_timing(self, phase, wall, cpu):
+		"""
+		Add wall-clock and CPU time to entry for ``phase`` in timing.
+
+		Arguments:
+			phase (:obj:`str`): Name of planning phase.
+			wall (:obj:`float`): Wall-clock time, in seconds.
+			cpu (:obj:`float`): CPU time, in seconds.
+
+		Returns:
+			None
+		"""
+		entry = self.timing.setdefault(phase, {'wall': 0., 'cpu': 0.})
+		entry['wall'] += float(wall)
+		entry['cpu'] += float(cpu)
+
+	@contextmanager
+	def timed(self, phase):
+		"""
+		Context manager recording time spent in enclosed block.
+
+		Arguments:
+			phase (:obj:`str`): Name of planning phase.
+		"""
+		wall, cpu = time.perf_counter(), time.process_time()
+		try:
+			yield
+		finally:
+			self.add_timing(
+					phase, time.perf_counter() - wall,
+					time.process_time() - cpu)
+
 
 class RunRecord(object):
 	"""
@@ -274,6 +317,11 @@ class RunRecord(object):
 		""" Run time for second-pass solve (exact dose constraints). """
 		return self.output.solvetime
 
+	@property
+	def timing(self):
+		""" Wall-clock and CPU time of each phase of planning run. """
+		return self.output.timing
+
 class PlanningHistory(object):
 	"""
 	Class for tracking treatment plans generated by a :class:`~conrad.Case`.
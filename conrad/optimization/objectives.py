@@ -8,6 +8,7 @@ import cvxpy
 from conrad.defs import vec, module_installed
 from conrad.physics.units import Gy, DeliveredDose
 from conrad.physics.string import dose_from_string
+from conrad.optimization.proximal import SeparableObjective
 
 WEIGHT_PWL_UNDER_DEFAULT = 1.
 WEIGHT_PWL_OVER_DEFAULT = 0.05
@@ -19,6 +20,32 @@ OPTKIT_INSTALLED = module_installed('optkit')
 if OPTKIT_INSTALLED:
 	import optkit as ok
 
+def pogs_objective(size, numpy=False, **function_parameters):
+	"""
+	Build POGS function vector with requested backend.
+
+	Arguments:
+		size (:obj:`int`): Length of function vector.
+		numpy (:obj:`bool`, optional): If ``True``, build a
+			:class:`~conrad.optimization.proximal.SeparableObjective`;
+			otherwise, build an :class:`optkit.PogsObjective`.
+		**function_parameters: Keyword arguments ``h``, ``a``, ``b``,
+			``c``, ``d``, ``e`` describing the function vector.
+
+	Returns:
+		Function vector.
+
+	Raises:
+		NotImplementedError: If :mod:`optkit` backend requested but
+			:mod:`optkit` is not installed.
+	"""
+	if numpy:
+		return SeparableObjective(size, **function_parameters)
+	elif OPTKIT_INSTALLED:
+		return ok.api.PogsObjective(size, **function_parameters)
+	else:
+		raise NotImplementedError
+
 @add_metaclass(abc.ABCMeta)
 class TreatmentObjective(object):
 	def __init__(self, **dose_and_weight_params):
@@ -35,6 +62,11 @@ class TreatmentObjective(object):
 			self.__add_aliases(attr, *aliases)
 
 	def __getattr__(self, name):
+		# special methods (e.g., __setstate__, looked up when copying or
+		# pickling an objective) are never weights or doses
+		if name.startswith('__') and name.endswith('__'):
+			raise AttributeError(
+					'{} has no attribute {}'.format(type(self), name))
 		if not name.startswith('_'):
 			raw = name.endswith('_raw')
 			name = name.replace('_raw', '')
@@ -148,6 +180,35 @@ class TreatmentObjective(object):
 	def primal_expr_Ax(self, A, x_var, voxel_weights=None):
 		raise NotImplementedError
 
+	@abc.abstractmethod
+	def primal_expr_parametrized(self, y_var, voxel_weights=None):
+		"""
+		Build objective with weights and doses as :mod:`cvxpy` parameters.
+
+		The expression is built to comply with :mod:`cvxpy`'s
+		disciplined parametrized programming (DPP) rules, so that a
+		problem containing it is canonicalized once and re-solved
+		after updating only the parameter values.
+
+		Arguments:
+			y_var: :mod:`cvxpy` expression for the structure dose.
+			voxel_weights (optional): Vector of voxel weights.
+
+		Returns:
+			:obj:`tuple`: Objective expression and :obj:`dict` of
+			:class:`cvxpy.Parameter` objects, keyed by the same names as
+			:attr:`TreatmentObjective.parametrized_values`.
+		"""
+		raise NotImplementedError
+
+	@abc.abstractproperty
+	def parametrized_values(self):
+		"""
+		Current values of the parameters used in
+		:meth:`TreatmentObjective.primal_expr_parametrized`.
+		"""
+		raise NotImplementedError
+
 	@abc.abstractmethod
 	def dual_expr(self, y_dual_var, voxel_weights=None):
 		raise NotImplementedError
@@ -157,7 +218,7 @@ class TreatmentObjective(object):
 		raise NotImplementedError
 
 	@abc.abstractmethod
-	def primal_expr_pogs(self, size, voxel_weights=None):
+	def primal_expr_pogs(self, size, voxel_weights=None, numpy=False):
 		raise NotImplementedError
 
 	@abc.abstractmethod
@@ -245,6 +306,18 @@ class NontargetObjectiveLinear(TreatmentObjective):
 			return self.weight * cvxpy.sum(
 					cvxpy.multiply(voxel_weights, (x_var.T @ A.T).T))
 
+	def primal_expr_parametrized(self, y_var, voxel_weights=None):
+		weight = cvxpy.Parameter(nonneg=True)
+		if voxel_weights is None:
+			expr = weight * cvxpy.sum(y_var)
+		else:
+			expr = weight * cvxpy.sum(cvxpy.multiply(voxel_weights, y_var))
+		return expr, {'weight': weight}
+
+	@property
+	def parametrized_values(self):
+		return {'weight': self.weight}
+
 	def dual_expr(self, nu_var, voxel_weights=None):
 		""" Return ``0``"""
 		return 0
@@ -256,13 +329,11 @@ class NontargetObjectiveLinear(TreatmentObjective):
 		weight_vec = 1. if voxel_weights is None else voxel_weights
 		return nu_var == self.weight * weight_vec
 
-	def primal_expr_pogs(self, size, voxel_weights=None):
-		if OPTKIT_INSTALLED:
-			weight_vec = 1. if voxel_weights is None else voxel_weights
-			return ok.api.PogsObjective(
-					size, h='Zero', c=0, d=weight_vec * self.weight)
-		else:
-			raise NotImplementedError
+	def primal_expr_pogs(self, size, voxel_weights=None, numpy=False):
+		weight_vec = 1. if voxel_weights is None else voxel_weights
+		return pogs_objective(
+				size, numpy=numpy, h='Zero', c=0,
+				d=weight_vec * self.weight)
 
 	def dual_expr_pogs(self, size, voxel_weights=None):
 		if OPTKIT_INSTALLED:
@@ -325,6 +396,19 @@ class NontargetObjectiveSquare(TreatmentObjective):
 			return self.weight * 0.5 * cvxpy.sum(
 					cvxpy.multiply(voxel_weights, (x_var.T @ A.T).T**2))
 
+	def primal_expr_parametrized(self, y_var, voxel_weights=None):
+		weight = cvxpy.Parameter(nonneg=True)
+		if voxel_weights is None:
+			expr = weight * 0.5 * cvxpy.sum(y_var**2)
+		else:
+			expr = weight * 0.5 * cvxpy.sum(
+					cvxpy.multiply(voxel_weights, y_var**2))
+		return expr, {'weight': weight}
+
+	@property
+	def parametrized_values(self):
+		return {'weight': self.weight}
+
 	def dual_expr(self, nu_var, voxel_weights=None):
 		""" Return ``0``"""
 		#return 0
@@ -338,14 +422,12 @@ class NontargetObjectiveSquare(TreatmentObjective):
 		#return nu_var == self.weight * weight_vec
 		raise NotImplementedError
 
-	def primal_expr_pogs(self, size, voxel_weights=None):
-		if OPTKIT_INSTALLED:
-			#weight_vec = 1. if voxel_weights is None else voxel_weights
-			#return ok.api.PogsObjective(
-			#size, h='Zero', c=0, d=weight_vec * self.weight)
-			raise NotImplementedError
-		else:
+	def primal_expr_pogs(self, size, voxel_weights=None, numpy=False):
+		if not numpy:
 			raise NotImplementedError
+		weights = 1. if voxel_weights is None else vec(voxel_weights)
+		return pogs_objective(
+				size, numpy=numpy, h='Square', c=weights * self.weight)
 
 	def dual_expr_pogs(self, size, voxel_weights=None):
 		if OPTKIT_INSTALLED:
@@ -446,6 +528,42 @@ class TargetObjectivePWL(TreatmentObjective):
 		return self.weight_abs * cvxpy.norm(residuals, 1) + \
 			self.weight_linear * cvxpy.sum(residuals)
 
+	def primal_expr_parametrized(self, y_var, voxel_weights=None):
+		r"""
+		Return :math:`\|b\omega \circ y - bd\omega\|_1 + c\omega^Ty -
+		cd\omega^T1`, with products :math:`bd, cd` as parameters.
+		"""
+		weight_abs = cvxpy.Parameter(nonneg=True)
+		weight_abs_dose = cvxpy.Parameter()
+		weight_linear = cvxpy.Parameter()
+		weight_linear_dose = cvxpy.Parameter()
+		residuals = weight_abs * y_var - weight_abs_dose
+		if voxel_weights is None:
+			size = y_var.size
+			linear = cvxpy.sum(y_var)
+		else:
+			size = float(np.sum(voxel_weights))
+			residuals = cvxpy.multiply(voxel_weights, residuals)
+			linear = cvxpy.sum(cvxpy.multiply(voxel_weights, y_var))
+		expr = cvxpy.norm(residuals, 1) + weight_linear * linear - \
+			size * weight_linear_dose
+		return expr, {
+				'weight_abs': weight_abs,
+				'weight_abs_dose': weight_abs_dose,
+				'weight_linear': weight_linear,
+				'weight_linear_dose': weight_linear_dose,
+		}
+
+	@property
+	def parametrized_values(self):
+		dose = float(self.target_dose)
+		return {
+				'weight_abs': self.weight_abs,
+				'weight_abs_dose': self.weight_abs * dose,
+				'weight_linear': self.weight_linear,
+				'weight_linear_dose': self.weight_linear * dose,
+		}
+
 	def dual_expr(self, nu_var, voxel_weights=None):
 		if voxel_weights is None:
 			return -float(self.target_dose) * cvxpy.sum(nu_var)
@@ -468,15 +586,12 @@ class TargetObjectivePWL(TreatmentObjective):
 				nu_var >= voxel_weights * lower_bound
 		]
 
-	def primal_expr_pogs(self, size, voxel_weights=None):
-		if OPTKIT_INSTALLED:
-			weights = 1. if voxel_weights is None else vec(voxel_weights)
-			return ok.api.PogsObjective(
-					size, h='Abs', b=float(self.target_dose),
-					c=weights * self.weight_abs,
-					d=weights * self.weight_linear)
-		else:
-			raise NotImplementedError
+	def primal_expr_pogs(self, size, voxel_weights=None, numpy=False):
+		weights = 1. if voxel_weights is None else vec(voxel_weights)
+		return pogs_objective(
+				size, numpy=numpy, h='Abs', b=float(self.target_dose),
+				c=weights * self.weight_abs,
+				d=weights * self.weight_linear)
 
 	def dual_expr_pogs(self, size, voxel_weights=None):
 		if OPTKIT_INSTALLED:
@@ -552,6 +667,31 @@ class TargetObjectiveSquare(TreatmentObjective):
 		else:
 			return self.weight * 0.5 * cvxpy.sum(residuals**2)
 
+	def primal_expr_parametrized(self, y_var, voxel_weights=None):
+		r"""
+		Return :math:`\frac{1}{2}\sum \omega \circ (\sqrt{w}y -
+		\sqrt{w}d)^2`, with :math:`\sqrt{w}d` as a parameter.
+		"""
+		root_weight = cvxpy.Parameter(nonneg=True)
+		root_weight_dose = cvxpy.Parameter()
+		residuals = root_weight * y_var - root_weight_dose
+		if voxel_weights is None:
+			expr = 0.5 * cvxpy.sum(residuals**2)
+		else:
+			expr = 0.5 * cvxpy.sum(cvxpy.multiply(voxel_weights, residuals**2))
+		return expr, {
+				'root_weight': root_weight,
+				'root_weight_dose': root_weight_dose,
+		}
+
+	@property
+	def parametrized_values(self):
+		root_weight = np.sqrt(self.weight)
+		return {
+				'root_weight': root_weight,
+				'root_weight_dose': root_weight * float(self.target_dose),
+		}
+
 	def dual_expr(self, nu_var, voxel_weights=None):
 		#if voxel_weights is None:
 		#	return -float(self.target_dose) * cvxpy.sum(nu_var)
@@ -576,16 +716,13 @@ class TargetObjectiveSquare(TreatmentObjective):
 		#]
 		raise NotImplementedError
 
-	def primal_expr_pogs(self, size, voxel_weights=None):
-		if OPTKIT_INSTALLED:
-			#weights = 1. if voxel_weights is None else vec(voxel_weights)
-			#return ok.api.PogsObjective(
-			#		size, h='Abs', b=float(self.target_dose),
-			#		c=weights * self.weight_abs,
-			#		d=weights * self.weight_linear)
-			raise NotImplementedError
-		else:
+	def primal_expr_pogs(self, size, voxel_weights=None, numpy=False):
+		if not numpy:
 			raise NotImplementedError
+		weights = 1. if voxel_weights is None else vec(voxel_weights)
+		return pogs_objective(
+				size, numpy=numpy, h='Square', b=float(self.target_dose),
+				c=weights * self.weight)
 
 	def dual_expr_pogs(self, size, voxel_weights=None):
 		if OPTKIT_INSTALLED:
@@ -646,6 +783,24 @@ class ObjectiveHinge(TreatmentObjective):
 			residuals = cvxpy.multiply(voxel_weights, residuals)
 		return self.weight * cvxpy.sum(residuals)
 
+	def primal_expr_parametrized(self, y_var, voxel_weights=None):
+		weight = cvxpy.Parameter(nonneg=True)
+		weight_dose = cvxpy.Parameter()
+		residuals = cvxpy.pos(weight * y_var - weight_dose)
+		if voxel_weights is not None:
+			residuals = cvxpy.multiply(voxel_weights, residuals)
+		return cvxpy.sum(residuals), {
+				'weight': weight,
+				'weight_dose': weight_dose,
+		}
+
+	@property
+	def parametrized_values(self):
+		return {
+				'weight': self.weight,
+				'weight_dose': self.weight * float(self.deadzone_dose),
+		}
+
 	def dual_expr(self, nu_var, voxel_weights=None):
 		if voxel_weights is None:
 			return -float(self.deadzone_dose) * cvxpy.sum(nu_var)
@@ -663,15 +818,12 @@ class ObjectiveHinge(TreatmentObjective):
 			voxel_weights = vec(voxel_weights)
 		return [nu_var <= voxel_weights * self.weight, nu_var >= 0]
 
-	def primal_expr_pogs(self, size, voxel_weights=None):
-		if OPTKIT_INSTALLED:
-			weights = 1. if voxel_weights is None else vec(voxel_weights)
-			return ok.api.PogsObjective(
-					size, h='Abs', b=float(self.deadzone_dose),
-					c=weights * self.weight / 2.,
-					d=weights * self.weight / 2.)
-		else:
-			raise NotImplementedError
+	def primal_expr_pogs(self, size, voxel_weights=None, numpy=False):
+		weights = 1. if voxel_weights is None else vec(voxel_weights)
+		return pogs_objective(
+				size, numpy=numpy, h='Abs', b=float(self.deadzone_dose),
+				c=weights * self.weight / 2.,
+				d=weights * self.weight / 2.)
 
 	def dual_expr_pogs(self, size, voxel_weights=None):
 		if OPTKIT_INSTALLED:
@@ -0,0 +1,339 @@
+"""
+Define :class:`ParetoExplorer` for approximating treatment plan
+trade-off surfaces.
+
+Attributes:
+	WEIGHT_FLOOR_DEFAULT (:obj:`float`): Default lower bound on the
+		relative weight of each criterion, so that anchor plans are
+		Pareto optimal rather than weakly Pareto optimal.
+	TOLERANCE_DEFAULT (:obj:`float`): Default tolerance, relative to
+		the range of each criterion over the anchor plans, on the gap
+		between the explored surface and the true trade-off surface.
+	MAX_PLANS_DEFAULT (:obj:`int`): Default limit on the number of
+		plans computed by :meth:`ParetoExplorer.explore`.
+"""
+"""
+Copyright 2016--2017 Baris Ungun, Anqi Fu
+
+This file is part of CONRAD.
+
+CONRAD is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+CONRAD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from conrad.compat import *
+
+import heapq
+import itertools
+import numpy as np
+
+from conrad.optimization.preprocessing import ObjectiveMethods
+from conrad.optimization.history import PlanningHistory
+
+WEIGHT_FLOOR_DEFAULT = 1e-3
+TOLERANCE_DEFAULT = 1e-2
+MAX_PLANS_DEFAULT = 15
+
+class ParetoExplorer(object):
+	"""
+	Adaptive approximation of the trade-off between structure objectives.
+
+	Each structure selected for exploration contributes one criterion:
+	the value of its objective, at its original weights. Plans are
+	computed by weighted-sum scalarization, i.e., by scaling the
+	weights of each selected structure's objective by a multiplier and
+	planning the :class:`~conrad.Case` as usual (dose constraints and
+	the objectives of other structures are retained).
+
+	The explorer follows the sandwich method: after planning an
+	anchor for each criterion, it repeatedly takes the largest facet
+	of the current inner approximation of the trade-off surface (the
+	convex hull of plans computed so far), plans with criterion weights
+	normal to that facet, and splits the facet at the new plan unless
+	the plan lies within tolerance of the facet. Criteria are compared
+	after normalization by their ranges over the anchor plans. Each
+	plan is warm started from the previously computed plan nearest in
+	weight space when the POGS solvers are used, and plans are cached
+	by their weights.
+
+	Attributes:
+		case (:class:`~conrad.Case`): Case to plan.
+		labels (:obj:`list`): Labels of structures whose objectives are
+			the criteria.
+		runs (:obj:`list` of :class:`~conrad.optimization.history.RunRecord`):
+			Record of each plan computed, in order.
+		weight_floor (:obj:`float`): Lower bound on relative weight of
+			each criterion.
+	"""
+	def __init__(self, case, labels, weight_floor=WEIGHT_FLOOR_DEFAULT,
+				 **plan_options):
+		"""
+		Initialize explorer.
+
+		Arguments:
+			case (:class:`~conrad.Case`): Case to plan.
+			labels: Labels (or names) of two or more structures in
+				``case``, whose objectives are the criteria.
+			weight_floor (:obj:`float`, optional): Lower bound on
+				relative weight of each criterion.
+			**plan_options: Keyword arguments to
+				:meth:`~conrad.Case.plan`. Option ``parametrize`` is
+				set by default, so that the :mod:`cvxpy` solver reuses
+				its canonicalization between plans.
+
+		Raises:
+			ValueError: If fewer than two structures are provided.
+		"""
+		labels = list(labels)
+		if len(labels) < 2:
+			raise ValueError(
+					'at least two structures are required to explore '
+					'trade-offs; provided: {}'.format(labels))
+		self.case = case
+		self.labels = [case.anatomy[label].label for label in labels]
+		self.weight_floor = float(weight_floor)
+		self.runs = []
+		self.__options = dict(plan_options)
+		self.__options.setdefault('parametrize', True)
+		self.__base_weights = {}
+		for label in self.labels:
+			parameters = case.anatomy[label].objective.parameters
+			self.__base_weights[label] = {
+					k: v for k, v in parameters.items() if 'weight' in k}
+		self.__weights = []
+		self.__values = []
+		self.__cache = {}
+		self.__anchors = None
+		self.__facets = []
+		self.__accepted = []
+		self.__counter = itertools.count()
+
+	@property
+	def n_criteria(self):
+		""" Number of criteria explored. """
+		return len(self.labels)
+
+	@property
+	def weights(self):
+		"""
+		Criterion weights of each plan.
+
+		Array with one row per plan in :attr:`ParetoExplorer.runs` and
+		one column per criterion; rows sum to one.
+		"""
+		return np.array(self.__weights).reshape(-1, self.n_criteria)
+
+	@property
+	def objective_values(self):
+		"""
+		Criterion values of each plan.
+
+		Array with one row per plan in :attr:`ParetoExplorer.runs` and
+		one column per criterion; rows of infeasible plans are ``nan``.
+		"""
+		return np.array(self.__values).reshape(-1, self.n_criteria)
+
+	@property
+	def table(self):
+		"""
+		Compact summary of explored plans.
+
+		Dictionary with entries ``'labels'`` (structure label of each
+		criterion), ``'weights'`` and ``'objective_values'`` (as in
+		:attr:`ParetoExplorer.weights` and
+		:attr:`ParetoExplorer.objective_values`), ``'feasible'`` (one
+		entry per plan) and ``'facets'``, an array of plan indices
+		with one row per facet of the explored surface, suitable for
+		interpolating between plans.
+		"""
+		facets = self.__accepted + [f[-1] for f in self.__facets]
+		return {
+				'labels': list(self.labels),
+				'weights': self.weights,
+				'objective_values': self.objective_values,
+				'feasible': [run.feasible for run in self.runs],
+				'facets': np.array(
+						facets, dtype=int).reshape(-1, self.n_criteria),
+		}
+
+	def __evaluate(self, run):
+		if not run.feasible:
+			return [np.nan] * self.n_criteria
+		return [float(ObjectiveMethods.eval(self.case.anatomy[label], x=run.x))
+				for label in self.labels]
+
+	def __warm_start(self, weights):
+		feasible = [i for i, run in enumerate(self.runs) if run.feasible]
+		if len(feasible) == 0:
+			return None
+		distances = [np.linalg.norm(self.__weights[i] - weights)
+					 for i in feasible]
+		return self.runs[feasible[int(np.argmin(distances))]]
+
+	def plan(self, weights):
+		"""
+		Plan with given criterion weights, or retrieve cached plan.
+
+		Arguments:
+			weights: Nonnegative weight of each criterion. Normalized to
+				sum to one, with each entry at least
+				:attr:`ParetoExplorer.weight_floor`.
+
+		Returns:
+			:obj:`int`: Index of plan in :attr:`ParetoExplorer.runs`.
+
+		Raises:
+			ValueError: If ``weights`` has wrong size or a negative
+				entry.
+		"""
+		weights = np.array(weights, dtype=float).reshape(-1)
+		if weights.size != self.n_criteria or np.any(weights < 0):
+			raise ValueError(
+					'argument `weights` must be a nonnegative vector of '
+					'length {}'.format(self.n_criteria))
+		weights = np.maximum(weights / weights.sum(), self.weight_floor)
+		weights /= weights.sum()
+
+		key = tuple(np.round(weights, 8))
+		if key in self.__cache:
+			return self.__cache[key]
+
+		options = dict(self.__options)
+		warm_start = self.__warm_start(weights)
+		if warm_start is not None:
+			options['warm_start'] = warm_start
+
+		# scale structure weights so that equal criterion weights
+		# reproduce the case's own objectives
+		try:
+			for label, w in zip(self.labels, weights):
+				self.case.change_objective(label, **{
+						k: self.n_criteria * w * v
+						for k, v in self.__base_weights[label].items()})
+			_, run = self.case.plan(**options)
+		finally:
+			for label in self.labels:
+				self.case.change_objective(
+						label, **self.__base_weights[label])
+
+		self.runs.append(run)
+		self.__weights.append(weights)
+		self.__values.append(self.__evaluate(run))
+		self.__cache[key] = len(self.runs) - 1
+		return self.__cache[key]
+
+	def __normalized(self, indices):
+		values = self.objective_values
+		anchors = values[self.__anchors]
+		ideal = np.nanmin(anchors, axis=0)
+		spread = np.nanmax(anchors, axis=0) - ideal
+		spread[~(spread > 0)] = 1.
+		return (values[list(indices)] - ideal) / spread, spread
+
+	def __facet_normal(self, facet):
+		"""
+		Normal of facet in normalized criterion space.
+
+		Returns:
+			:obj:`tuple`: Normal, with entries summing to one, and
+			value of the normal's inner product with the facet's
+			vertices; ``(None, None)`` if the facet is degenerate
+			(e.g., two anchors coincide), or if the normal has
+			negative entries, i.e., the facet does not face the ideal
+			point.
+		"""
+		points, _ = self.__normalized(facet)
+		_, sigma, vt = np.linalg.svd(points[1:] - points[0])
+		if sigma[-1] < 1e-6:
+			return None, None
+		normal = vt[-1]
+		if normal.sum() < 0:
+			normal = -normal
+		if np.any(normal < -1e-9) or not normal.sum() > 0:
+			return None, None
+		normal = np.maximum(normal, 0) / normal.sum()
+		return normal, float(np.dot(normal, points[0]))
+
+	def __push_facet(self, facet):
+		points, _ = self.__normalized(facet)
+		if np.any(np.isnan(points)):
+			return
+		size = max([np.linalg.norm(p - q) for p, q in
+					itertools.combinations(points, 2)])
+		heapq.heappush(
+				self.__facets, (-size, next(self.__counter), tuple(facet)))
+
+	def explore(self, max_plans=MAX_PLANS_DEFAULT,
+				tolerance=TOLERANCE_DEFAULT, history=None):
+		"""
+		Approximate the trade-off surface between criteria.
+
+		Plans an anchor for each criterion, then refines facets of the
+		explored surface until each lies within ``tolerance`` of the
+		trade-off surface, or ``max_plans`` plans have been computed.
+		Calling again with a larger budget resumes the refinement.
+
+		Arguments:
+			max_plans (:obj:`int`, optional): Maximum number of plans
+				in :attr:`ParetoExplorer.runs` on return.
+			tolerance (:obj:`float`, optional): Tolerance on the gap
+				between a facet and the trade-off surface, relative to
+				the range of the criteria over the anchor plans.
+			history (:class:`~conrad.optimization.history.PlanningHistory`, optional):
+				If provided, each new plan is appended to ``history``.
+
+		Returns:
+			:obj:`dict`: Summary of explored plans, as in
+			:attr:`ParetoExplorer.table`.
+
+		Raises:
+			TypeError: If ``history`` is provided and not a
+				:class:`~conrad.optimization.history.PlanningHistory`.
+		"""
+		if history is not None and not isinstance(history, PlanningHistory):
+			raise TypeError(
+					'argument `history` must be of type {}'
+					''.format(PlanningHistory))
+		n_start = len(self.runs)
+
+		if self.__anchors is None:
+			self.__anchors = [
+					self.plan(np.eye(self.n_criteria)[i])
+					for i in xrange(self.n_criteria)]
+			self.__push_facet(self.__anchors)
+
+		while len(self.__facets) > 0 and len(self.runs) < max_plans:
+			facet = heapq.heappop(self.__facets)[-1]
+			normal, level = self.__facet_normal(facet)
+			if normal is None:
+				# no supporting direction: plan at mean weights of the
+				# vertices, split facet if a distinct plan results
+				index = self.plan(self.weights[list(facet)].mean(axis=0))
+				points, _ = self.__normalized(list(facet) + [index])
+				gap = np.min(np.linalg.norm(points[:-1] - points[-1], axis=1))
+			else:
+				_, spread = self.__normalized(facet)
+				index = self.plan(normal / spread)
+				point, _ = self.__normalized([index])
+				gap = level - float(np.dot(normal, point[0]))
+			if index in facet or np.isnan(gap) or gap <= tolerance:
+				self.__accepted.append(facet)
+				continue
+			for i in xrange(self.n_criteria):
+				subfacet = list(facet)
+				subfacet[i] = index
+				self.__push_facet(subfacet)
+
+		if history is not None:
+			for run in self.runs[n_start:]:
+				history += run
+		return self.table
@@ -97,6 +97,21 @@ class ObjectiveMethods(object):
 		else:
 			return structure.objective.expr_Ax(matrix, variable, weights)
 
+	@staticmethod
+	def primal_expr_parametrized(structure, variable):
+		ObjectiveMethods.normalize(structure)
+		if structure.collapsable:
+			return structure.objective.primal_expr_parametrized(
+					structure.A_mean @ variable)
+		else:
+			return structure.objective.primal_expr_parametrized(
+					structure.A @ variable, structure.voxel_weights)
+
+	@staticmethod
+	def parametrized_values(structure):
+		ObjectiveMethods.normalize(structure)
+		return structure.objective.parametrized_values
+
 	@staticmethod
 	def dual_expr(structure, nu_var):
 		ObjectiveMethods.normalize(structure)
@@ -107,10 +122,13 @@ class ObjectiveMethods(object):
 		return structure.objective.dual_expr(nu_var, weights)
 
 	@staticmethod
-	def primal_expr_pogs(structure):
+	def primal_expr_pogs(structure, numpy=False):
 		ObjectiveMethods.normalize(structure)
 		weights = ObjectiveMethods.get_weights(structure)
 		size = 1 if structure.collapsable else structure.size
+		if numpy:
+			return structure.objective.primal_expr_pogs(
+					size, weights, numpy=True)
 		return structure.objective.primal_expr_pogs(size, weights)
 
 	@staticmethod
@@ -1,6 +1,14 @@
 """
 Define :class:`PlanningProblem`, interface between :class:`~conrad.Case`
 and solvers.
+
+Attributes:
+	SCREENING_FRACTION_DEFAULT (:obj:`float`): Default fraction of
+		voxels of each eligible structure kept in the first solve with
+		active-set voxel screening.
+	SCREENING_TOL_DEFAULT (:obj:`float`): Relative tolerance on dose
+		levels used to detect screened-out voxels that violate a
+		screened dose constraint or objective term.
 """
 """
 Copyright 2016 Baris Ungun, Anqi Fu
@@ -23,11 +31,19 @@ along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
 from conrad.compat import *
 
 import os
+import numpy as np
 
-from conrad.medicine.dose import PercentileConstraint
+from conrad.defs import vec
+from conrad.medicine.dose import MaxConstraint, PercentileConstraint
+from conrad.optimization.objectives import ObjectiveHinge
 from conrad.optimization.solver_cvxpy import SolverCVXPY
 from conrad.optimization.solver_optkit import SolverOptkit
-from conrad.optimization.history import RunOutput
+from conrad.optimization.solver_numpy import SolverNumpy
+from conrad.optimization.history import RunOutput, RunRecord, \
+										PlanningHistory
+
+SCREENING_FRACTION_DEFAULT = 0.1
+SCREENING_TOL_DEFAULT = 1e-6
 
 class PlanningProblem(object):
 	"""
@@ -43,6 +59,9 @@ class PlanningProblem(object):
 			:mod:`cvxpy`-baed solver, if available.
 		solver_pogs (:class:`SolverOptkit` or :class:`NoneType`): POGS
 			solver, if available.
+		solver_numpy (:class:`SolverNumpy`): :mod:`numpy`-based
+			implementation of POGS, used for plans without dose
+			constraints when :mod:`optkit` is unavailable.
 	"""
 
 	def __init__(self):
@@ -54,6 +73,7 @@ class PlanningProblem(object):
 		"""
 		self.solver_cvxpy = SolverCVXPY()
 		self.solver_pogs = SolverOptkit()
+		self.solver_numpy = SolverNumpy()
 		self.__solver = None
 
 	@property
@@ -112,6 +132,95 @@ class PlanningProblem(object):
 		if not exact:
 			self.__update_constraints(structure)
 
+	@staticmethod
+	def __warm_start_guess(warm_start, n_beams):
+		"""
+		Extract optimal variables of previous planning run.
+
+		Arguments:
+			warm_start: Source of initial guess. One of
+				:class:`PlanningHistory` (most recent run is used),
+				:class:`RunRecord` or :class:`RunOutput`; any other
+				value yields no initial guesses.
+			n_beams (:obj:`int`): Number of beams in current problem;
+				guesses of a different size are discarded.
+
+		Returns:
+			:obj:`tuple`: Beam intensities and voxel dual variables of
+			run, or ``None`` in place of either if unavailable.
+		"""
+		if isinstance(warm_start, PlanningHistory):
+			if len(warm_start.runs) == 0:
+				return None, None
+			warm_start = warm_start.runs[-1]
+		if isinstance(warm_start, RunRecord):
+			warm_start = warm_start.output
+		if not isinstance(warm_start, RunOutput):
+			return None, None
+
+		x = warm_start.optimal_variables.get('x', None)
+		if x is None or len(x) != n_beams:
+			return None, None
+		return x, warm_start.optimal_variables.get('nu', None)
+
+	def __warm_start_options(self, warm_start, n_beams):
+		"""
+		Extract initial guesses from previous planning run.
+
+		Arguments:
+			warm_start: Source of initial guess, as accepted by
+				:meth:`PlanningProblem.__warm_start_guess`.
+			n_beams (:obj:`int`): Number of beams in current problem;
+				guesses of a different size are discarded.
+
+		Initial guesses are only used by the POGS solvers; the
+		:mod:`cvxpy` backends cannot be started from a given point, so
+		for :mod:`cvxpy` only option ``warm_start`` is set, which lets
+		solvers that keep state between runs of the same problem
+		(e.g., SCS) resume from their previous iterates.
+
+		Returns:
+			:obj:`dict`: Keyword arguments with initial guesses for
+			the beam intensities (``x0``) and dual variables
+			(``nu0``), to be passed to
+			:meth:`PlanningProblem.solver.solve`.
+		"""
+		guesses = {}
+		if self.solver == self.solver_cvxpy:
+			guesses['warm_start'] = True
+			return guesses
+
+		x, nu = self.__warm_start_guess(warm_start, n_beams)
+		if x is not None:
+			guesses['x0'] = x
+		if nu is not None:
+			guesses['nu0'] = nu
+		return guesses
+
+	@staticmethod
+	def __report_progress(callback, phase):
+		""" Report start of planning phase to ``callback``, if any. """
+		if callback is not None:
+			callback({'phase': phase})
+
+	def __progress_options(self, callback, phase):
+		"""
+		Report start of solve phase and wrap callback for solver.
+
+		Arguments:
+			callback: Progress callback, or ``None``.
+			phase (:obj:`str`): Name of solve phase.
+
+		Returns:
+			:obj:`dict`: Keyword argument ``callback`` for
+			:meth:`PlanningProblem.solver.solve`, if active solver
+			reports iterates; empty otherwise.
+		"""
+		self.__report_progress(callback, phase)
+		if callback is None or self.solver != self.solver_numpy:
+			return {}
+		return {'callback': lambda info: callback(dict(info, phase=phase))}
+
 	def __gather_solver_info(self, run_output, exact=False):
 		"""
 		Transfer solver metadata to a :class:RunOutput` instance.
@@ -138,6 +247,26 @@ class PlanningProblem(object):
 		run_output.solver_info['objective' + keymod] = self.solver.objective_value
 		run_output.solver_info['iters' + keymod] = self.solver.solveiters
 
+	def __gather_solver_timing(self, run_output, exact=False):
+		"""
+		Transfer solver phase timing to a :class:`RunOutput` instance.
+
+		Arguments:
+			run_output (:class:`RunOutput`): Container for solver data.
+				Data stored as entries in :attr:`RunOutput.timing`.
+			exact (:obj:`bool`, optional): If ``True``, append '_exact'
+				to keys of dictionary entries.
+
+		Returns:
+			None
+		"""
+		keymod = '_exact' if exact else ''
+		timing = self.solver.timing
+		for phase in timing:
+			run_output.add_timing(
+					phase + keymod, timing[phase]['wall'],
+					timing[phase]['cpu'])
+
 	def __gather_solver_vars(self, run_output, exact=False):
 		"""
 		Transfer solver variables to a :class:`RunOutput` instance.
@@ -162,7 +291,7 @@ class PlanningProblem(object):
 		keymod = '_exact' if exact else ''
 		run_output.optimal_variables['x' + keymod] = self.solver.x
 		run_output.optimal_variables['mu' + keymod] = self.solver.x_dual
-		if self.solver == self.solver_pogs:
+		if self.solver in (self.solver_pogs, self.solver_numpy):
 			run_output.optimal_variables['nu' + keymod] = self.solver.y_dual
 		else:
 			run_output.optimal_variables['nu' + keymod] = None
@@ -226,31 +355,61 @@ class PlanningProblem(object):
 				run_output.optimal_slacks[cid] = self.solver.get_slack_value(
 						cid)
 
-	def __set_solver_fastest_available(self, structures):
+	def __set_solver_fastest_available(self, structures, backend=None):
 		"""
 		Set active solver to fastest solver than can handle problem.
 
 		If ``structures`` includes any dose constraints, only
 		:mod:`cvxpy`-based solvers can be used. If no dose constraints
 		are present, and the module :mod:`optkit` is installed, the POGS
-		solver is the fastest option.
+		solver is the fastest option; otherwise, the :mod:`numpy`
+		implementation of POGS is used.
 
 		Arguments:
 			structures: Iterable collection of
 				:class:`~conrad.medicine.Structure` objects, passed to
 				:meth:`SolverOptkit.can_solve`.
+			backend (:obj:`str`, optional): If provided, use this
+				solver instead: one of ``'cvxpy'``, ``'pogs'`` (for
+				:mod:`optkit`) or ``'numpy'``.
 
 		Returns:
 			None
 
 		Raises:
 			ValueError: If neither a CVXPY solver nor an OPTKIT/POGS
-				solver is available.
+				solver is available, or if ``backend`` is not
+				recognized, not available, or cannot solve problems
+				with the dose constraints in ``structures``.
 		"""
+		if backend is not None:
+			solvers = {
+					'cvxpy': self.solver_cvxpy,
+					'pogs': self.solver_pogs,
+					'numpy': self.solver_numpy,
+			}
+			if backend not in solvers:
+				raise ValueError(
+						'argument "backend" must be one of {}; provided: '
+						'{}'.format(sorted(solvers), backend))
+			solver = solvers[backend]
+			if solver is None:
+				raise ValueError('backend {} not available'.format(backend))
+			if solver is not self.solver_cvxpy and \
+					not solver.can_solve(structures):
+				raise ValueError(
+						'backend {} cannot solve problems with dose '
+						'constraints'.format(backend))
+			self.__solver = solver
+			return
+
 		if self.solver_pogs is not None:
 			if self.solver_pogs.can_solve(structures):
 				self.__solver = self.solver_pogs
 				return
+		if self.solver_numpy.can_solve(structures):
+			self.__solver = self.solver_numpy
+			return
 		if self.solver_cvxpy is not None:
 			self.__solver = self.solver_cvxpy
 			return
@@ -277,6 +436,210 @@ class PlanningProblem(object):
 						s.constraints[key], PercentileConstraint)
 		return percentile_constraints_included
 
+	@staticmethod
+	def __screenable(structure):
+		"""
+		Test whether voxels of ``structure`` can be screened.
+
+		Voxels of a non-target structure can be screened out of its
+		maximum dose constraints, convex restrictions of upper
+		percentile constraints and hinge objective, since voxels with
+		doses below the constraints' (or hinge's) dose levels do not
+		contribute to these terms.
+
+		Arguments:
+			structure (:class:`~conrad.medicine.Structure`): Structure
+				to test.
+
+		Returns:
+			:obj:`bool`: ``True`` if ``structure`` is a non-target
+			with at least one term eligible for screening.
+		"""
+		if structure.is_target or structure.A is None:
+			return False
+		if isinstance(structure.objective, ObjectiveHinge):
+			return True
+		for cid in structure.constraints:
+			c = structure.constraints[cid]
+			if isinstance(c, MaxConstraint):
+				return True
+			if isinstance(c, PercentileConstraint) and c.upper:
+				return True
+		return False
+
+	def __screening_subsets(self, structures, fraction, x0=None):
+		"""
+		Select initial voxel subsets for active-set screening.
+
+		For each structure eligible for screening, keep the voxels
+		with the highest doses under a heuristic plan, given by the
+		initial guess ``x0`` if provided, or uniform beam intensities
+		otherwise.
+
+		Arguments:
+			structures: Iterable collection of
+				:class:`~conrad.medicine.Structure` objects.
+			fraction (:obj:`float`): Fraction of voxels to keep in
+				each eligible structure.
+			x0 (optional): Initial guess of beam intensities.
+
+		Returns:
+			:obj:`dict`: Sorted row indices of voxels kept, keyed by
+			structure label. Structures for which all voxels would be
+			kept are omitted.
+		"""
+		subsets = {}
+		for s in structures:
+			if not self.__screenable(s):
+				continue
+			size, n_beams = s.A.shape
+			count = int(np.ceil(fraction * size))
+			if count >= size:
+				continue
+			x = np.ones(n_beams) if x0 is None else vec(x0)
+			y = vec(s.A @ x)
+			subsets[s.label] = np.sort(np.argpartition(-y, count - 1)[:count])
+		return subsets
+
+	def __screening_threshold(self, structure, exact=False):
+		"""
+		Lowest dose at which a voxel of ``structure`` enters the problem.
+
+		Arguments:
+			structure (:class:`~conrad.medicine.Structure`): Structure
+				eligible for screening.
+			exact (:obj:`bool`, optional): If ``True``, percentile
+				constraints are built as exact constraints (on all
+				voxels) rather than convex restrictions, and are
+				ignored.
+
+		Returns:
+			:obj:`float`: Minimum over the structure's screened terms
+			of the dose above which a voxel contributes to the term,
+			at the current solution; ``None`` if the structure has no
+			screened terms.
+		"""
+		thresholds = []
+		if isinstance(structure.objective, ObjectiveHinge):
+			thresholds.append(float(structure.objective.deadzone_dose))
+		for cid in structure.constraints:
+			c = structure.constraints[cid]
+			if isinstance(c, MaxConstraint):
+				thresholds.append(c.dose.value)
+			elif isinstance(c, PercentileConstraint) and c.upper and \
+					not exact:
+				# voxel enters restriction if dose > dose + slack - beta
+				beta = self.solver.dvh_vars[cid].value
+				slack = self.solver.get_slack_value(cid)
+				thresholds.append(
+						c.dose.value + float(slack or 0) - float(beta or 0))
+		return min(thresholds) if thresholds else None
+
+	def __extend_screening_subsets(self, structures, subsets, exact=False):
+		"""
+		Add screened-out voxels violating screened terms to ``subsets``.
+
+		A screened-out voxel is added if its dose under the current
+		solution, calculated with one matrix-vector product per
+		structure, exceeds the voxel's
+		:meth:`PlanningProblem.__screening_threshold`, up to relative
+		tolerance :data:`SCREENING_TOL_DEFAULT`.
+
+		Arguments:
+			structures: Iterable collection of
+				:class:`~conrad.medicine.Structure` objects.
+			subsets (:obj:`dict`): Voxel subsets, as produced by
+				:meth:`PlanningProblem.__screening_subsets`, extended
+				in place.
+			exact (:obj:`bool`, optional): If ``True``, current
+				solution is from the second pass of the two-pass
+				method.
+
+		Returns:
+			:obj:`bool`: ``True`` if any voxels were added.
+		"""
+		added = False
+		x = self.solver.x
+		for s in structures:
+			rows = subsets.get(s.label, None)
+			if rows is None:
+				continue
+			threshold = self.__screening_threshold(s, exact)
+			if threshold is None:
+				continue
+			y = vec(s.A @ x)
+			screened = np.ones(y.size, dtype=bool)
+			screened[rows] = False
+			violators = np.flatnonzero(screened & (
+					y > threshold + SCREENING_TOL_DEFAULT * abs(threshold)))
+			if violators.size > 0:
+				subsets[s.label] = np.union1d(rows, violators)
+				added = True
+		return added
+
+	def __solve_screened(self, structures, run_output, subsets,
+						 build_options, solve_options, exact=False,
+						 callback=None):
+		"""
+		Solve built problem, re-solving until no screened voxel violated.
+
+		With voxel subsets, the problem solved is a relaxation of the
+		problem over all voxels. If no screened-out voxel violates a
+		screened term at its solution, that solution is optimal for
+		the full problem; otherwise, the violating voxels are added to
+		``subsets``, and the problem is rebuilt and solved again. The
+		loop ends since each round adds at least one voxel.
+
+		Solver metadata and timing (including the total solve time of
+		all rounds) are transferred to ``run_output``; with voxel
+		subsets, entry ``'screening'`` (or ``'screening_exact'``) of
+		:attr:`RunOutput.solver_info` records the number of rounds and
+		the number of voxels kept, by structure label.
+
+		Arguments:
+			structures: Iterable collection of
+				:class:`~conrad.medicine.Structure` objects.
+			run_output (:class:`RunOutput`): Container for solver data.
+			subsets (:obj:`dict`): Voxel subsets, shared with
+				:attr:`SolverCVXPY.voxel_subsets`; empty if no
+				screening performed.
+			build_options (:obj:`dict`): Keyword arguments to
+				:meth:`PlanningProblem.solver.build`, for rebuilds.
+			solve_options (:obj:`dict`): Keyword arguments to
+				:meth:`PlanningProblem.solver.solve`.
+			exact (:obj:`bool`, optional): If ``True``, solving
+				second pass of the two-pass method.
+			callback (optional): Progress callback.
+
+		Returns:
+			:obj:`bool`: ``True`` if last solve feasible.
+		"""
+		keymod = '_exact' if exact else ''
+		feasible = self.solver.solve(**solve_options)
+		rounds, solvetime = 1, 0.
+		while feasible and subsets and self.__extend_screening_subsets(
+				structures, subsets, exact=exact):
+			self.__gather_solver_timing(run_output, exact=exact)
+			solvetime += self.solver.solvetime
+			self.__report_progress(callback, 'build' + keymod)
+			with run_output.timed('build' + keymod):
+				self.solver.build(structures, exact=exact, **build_options)
+			self.__report_progress(callback, 'solve' + keymod)
+			feasible = self.solver.solve(**solve_options)
+			rounds += 1
+
+		self.__gather_solver_info(run_output, exact=exact)
+		self.__gather_solver_timing(run_output, exact=exact)
+		run_output.solver_info['time' + keymod] += solvetime
+		if subsets:
+			run_output.solver_info['screening' + keymod] = {
+					'rounds': rounds,
+					'voxels': {
+							label: rows.size
+							for label, rows in subsets.items()},
+			}
+		return feasible
+
 	def solve(self, structures, run_output, slack=True,
 			  exact_constraints=False, **options):
 		"""
@@ -300,7 +663,55 @@ class PlanningProblem(object):
 				on the second pass.
 			**options: Abitrary keyword arguments, passed through to
 				:meth:`PlanningProblem.solver.init_problem` and
-				:meth:`PlanningProblem.solver.build`.
+				:meth:`PlanningProblem.solver.build`. Option
+				``warm_start`` may be a :class:`PlanningHistory`,
+				:class:`RunRecord` or :class:`RunOutput`, from which
+				the optimal variables of the (most recent) previous
+				run are used to warm start the solver, or ``True`` to
+				request a warm start without initial guesses.
+				Initial guesses are used by the POGS solvers only;
+				:mod:`cvxpy` solvers are at most resumed from their
+				own previous iterates (SCS). The second pass of the
+				two-pass method, which builds a new :mod:`cvxpy`
+				problem, is not warm started.
+				Option ``solver_cache`` is passed only to the first
+				build; the solver ignores it unless its fingerprint
+				matches the problem built from ``structures``. Solver
+				caches are supported by the POGS solvers only: the
+				:mod:`cvxpy` solver neither exports nor reads one, so
+				its canonicalized problem data are not persisted (with
+				option ``parametrize``, they are reused in memory
+				between builds).
+				Option ``callback`` is a callable invoked with a
+				dictionary reporting progress: once at the start of
+				each phase (``'build'``, ``'solve'``, and for the
+				second pass ``'build_exact'`` and ``'solve_exact'``)
+				with the phase name as entry ``'phase'``, and, if
+				the active solver reports iterates (currently
+				:class:`~conrad.optimization.solver_numpy.SolverNumpy`),
+				after each solver iteration with the iteration count
+				and residuals as additional entries. An exception
+				raised by ``callback`` aborts planning.
+				Option ``backend`` selects the solver: ``'cvxpy'``,
+				``'pogs'`` (:mod:`optkit`) or ``'numpy'``; by default,
+				the fastest solver that can handle the problem is
+				used, except that option ``solver`` (the name of a
+				:mod:`cvxpy` backend, e.g., ``'ECOS'``) selects
+				:mod:`cvxpy`.
+				Option ``screen_voxels`` enables active-set voxel
+				screening when the problem is solved with :mod:`cvxpy`
+				(i.e., has dose constraints): if ``True``, or a
+				fraction in :math:`(0, 1]`, non-target structures with
+				maximum or upper percentile dose constraints, or a
+				hinge objective, enter these terms with only that
+				fraction (default :data:`SCREENING_FRACTION_DEFAULT`)
+				of their voxels, those with the highest doses under
+				the beam intensities of the run given by option
+				``warm_start``, if any, or under uniform intensities.
+				Screened-out voxels violating a
+				term at the solution are added, and the problem is
+				solved again, until none remain, so that the solution
+				is that of the problem over all voxels.
 
 		Returns:
 			:obj:`int`: Number of feasible solver runs performed: ``0``
@@ -308,7 +719,9 @@ class PlanningProblem(object):
 			``2`` if two-pass method requested and both passes feasible.
 
 		Raises:
-			ValueError: If no solvers avaialable.
+			ValueError: If no solvers avaialable, if option
+				``backend`` cannot be used, or if option
+				``screen_voxels`` is not a fraction in :math:`(0, 1]`.
 		"""
 		if self.solver_cvxpy is None and self.solver_pogs is None:
 			raise ValueError(
@@ -329,12 +742,45 @@ class PlanningProblem(object):
 		use_slack = options.pop('dvh_slack', slack)
 		use_2pass = options.pop('dvh_exact', exact_constraints)
 		use_2pass &= self.__verify_2pass_applicable(structures)
-		self.__set_solver_fastest_available(structures)
+		warm_start = options.pop('warm_start', None)
+		solver_cache = options.pop('solver_cache', None)
+		callback = options.pop('callback', None)
+		screen_voxels = options.pop('screen_voxels', False)
+		if screen_voxels is True:
+			screen_voxels = SCREENING_FRACTION_DEFAULT
+		elif screen_voxels and not 0 < screen_voxels <= 1:
+			raise ValueError(
+					'option "screen_voxels" must be a bool or a fraction '
+					'in (0, 1]; provided: {}'.format(screen_voxels))
+		backend = options.pop('backend', None)
+		if backend is None and 'solver' in options:
+			backend = 'cvxpy'
+		use_warm_start = warm_start is not None and warm_start is not False
+		self.__set_solver_fastest_available(structures, backend)
 		self.solver.init_problem(n_beams, use_slack=use_slack,
 								 use_2pass=use_2pass, **options)
 
+		if use_warm_start:
+			warm_options = self.__warm_start_options(warm_start, n_beams)
+		else:
+			warm_options = {}
+
+		# select voxels for active-set screening
+		subsets = {}
+		if screen_voxels and self.solver == self.solver_cvxpy:
+			x_guess = None
+			if use_warm_start:
+				x_guess, _ = self.__warm_start_guess(warm_start, n_beams)
+			subsets = self.__screening_subsets(
+					structures, float(screen_voxels), x_guess)
+		if self.solver_cvxpy is not None:
+			self.solver_cvxpy.voxel_subsets = subsets
+
 		# build problem
-		construction_report = self.solver.build(structures, **options)
+		self.__report_progress(callback, 'build')
+		with run_output.timed('build'):
+			construction_report = self.solver.build(
+					structures, solver_cache=solver_cache, **options)
 
 		if PRINT_PROBLEM_CONSTRUCTION:
 			print('\nPROBLEM CONSTRUCTION:')
@@ -342,33 +788,39 @@ class PlanningProblem(object):
 				print(cr)
 
 		# solve
-		run_output.feasible = self.solver.solve(**options)
+		warm_options.update(self.__progress_options(callback, 'solve'))
+		run_output.feasible = self.__solve_screened(
+				structures, run_output, subsets, options,
+				dict(options, **warm_options), callback=callback)
 
 		# relay output to run_output object
-		self.__gather_solver_info(run_output)
 		self.__gather_solver_vars(run_output)
 		self.__gather_dvh_slopes(run_output, structures)
 		self.__gather_constraint_slacks(run_output, structures)
-		run_output.solver_info['time'] = self.solver.solvetime
 
 		if not run_output.feasible:
 			return 0
 
 		# relay output to structures
-		for s in structures:
-			self.__update_structure(s)
+		with run_output.timed('dose'):
+			for s in structures:
+				self.__update_structure(s)
 
 		# second pass, if applicable
 		if use_2pass and run_output.feasible:
-			self.solver.build(structures, exact=True)
-			self.solver.solve(**options)
-
-			self.__gather_solver_info(run_output, exact=True)
+			self.__report_progress(callback, 'build_exact')
+			with run_output.timed('build_exact'):
+				self.solver.build(structures, exact=True)
+			self.__solve_screened(
+					structures, run_output, subsets, {},
+					dict(options, **self.__progress_options(
+							callback, 'solve_exact')),
+					exact=True, callback=callback)
 			self.__gather_solver_vars(run_output, exact=True)
-			run_output.solver_info['time_exact'] = self.solver.solvetime
 
-			for s in structures:
-				self.__update_structure(s, exact=True)
+			with run_output.timed('dose_exact'):
+				for s in structures:
+					self.__update_structure(s, exact=True)
 
 			return 2
 		else:
@@ -0,0 +1,203 @@
+"""
+Define fully-separable convex functions and their proximal operators.
+
+:class:`SeparableObjective` is a pure :mod:`numpy` counterpart of the
+function vectors used by POGS (see :class:`optkit.PogsObjective`). It
+represents the sum, over entries :math:`i`, of
+
+.. math::
+
+	f_i(x_i) = c_i h_i(a_i x_i - b_i) + d_i x_i + (e_i / 2) x_i^2,
+
+with each :math:`h_i` drawn from the scalar functions listed in
+``FUNCTION_CODES``.
+
+Attributes:
+	FUNCTION_CODES (:obj:`dict`): Map from the POGS names of the
+		supported scalar functions to the integer codes stored in
+		:attr:`SeparableObjective.h`.
+"""
+"""
+Copyright 2016--2017 Baris Ungun, Anqi Fu
+
+This file is part of CONRAD.
+
+CONRAD is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+CONRAD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from conrad.compat import *
+
+import numpy as np
+
+FUNCTION_CODES = {
+	'Zero': 0,
+	'Abs': 1,
+	'Square': 2,
+	'IndGe0': 3,
+}
+
+class SeparableObjective(object):
+	r"""
+	Fully-separable function :math:`f: \mathbf{R}^n \rightarrow
+	\mathbf{R}` in POGS' function vector form.
+
+	Attributes:
+		h (:class:`numpy.ndarray`): Integer codes (see
+			``FUNCTION_CODES``) of the scalar function applied to each
+			entry.
+		a (:class:`numpy.ndarray`): Nonzero input scalings.
+		b (:class:`numpy.ndarray`): Input offsets.
+		c (:class:`numpy.ndarray`): Nonnegative output scalings.
+		d (:class:`numpy.ndarray`): Linear terms.
+		e (:class:`numpy.ndarray`): Nonnegative quadratic terms.
+	"""
+	def __init__(self, size, h='Zero', a=1., b=0., c=1., d=0., e=0.):
+		"""
+		Initialize function vector with entries set to same function.
+
+		Arguments:
+			size (:obj:`int`): Length of function vector.
+			h (:obj:`str`, optional): Name of the scalar function, must
+				be a key of ``FUNCTION_CODES``.
+			a: Scalar or length-``size`` vector.
+			b: Scalar or length-``size`` vector.
+			c: Scalar or length-``size`` vector.
+			d: Scalar or length-``size`` vector.
+			e: Scalar or length-``size`` vector.
+
+		Raises:
+			KeyError: If ``h`` is not a supported function name.
+			ValueError: If any entry of ``a`` is zero, or if any entry
+				of ``c`` or ``e`` is negative.
+		"""
+		if h not in FUNCTION_CODES:
+			raise KeyError(
+					'function `{}` not supported; options are: {}'
+					''.format(h, list(FUNCTION_CODES.keys())))
+		size = int(size)
+		self.h = np.full(size, FUNCTION_CODES[h], dtype=int)
+		self.a = np.zeros(size)
+		self.b = np.zeros(size)
+		self.c = np.zeros(size)
+		self.d = np.zeros(size)
+		self.e = np.zeros(size)
+		self.a[:] = a
+		self.b[:] = b
+		self.c[:] = c
+		self.d[:] = d
+		self.e[:] = e
+		if np.any(self.a == 0):
+			raise ValueError('input scaling `a` must be nonzero')
+		if np.any(self.c < 0) or np.any(self.e < 0):
+			raise ValueError('scalings `c` and `e` must be nonnegative')
+
+	@property
+	def size(self):
+		""" Length of function vector. """
+		return self.h.size
+
+	def copy_from(self, other, start=0):
+		"""
+		Overwrite a block of entries with those of another vector.
+
+		Arguments:
+			other (:class:`SeparableObjective`): Source function vector.
+			start (:obj:`int`, optional): Offset at which to copy
+				``other`` into this function vector.
+
+		Returns:
+			None
+
+		Raises:
+			ValueError: If ``other`` does not fit at offset ``start``.
+		"""
+		stop = start + other.size
+		if start < 0 or stop > self.size:
+			raise ValueError(
+					'cannot copy function vector of length {} to offset '
+					'{} of function vector of length {}'
+					''.format(other.size, start, self.size))
+		for attr in ('h', 'a', 'b', 'c', 'd', 'e'):
+			getattr(self, attr)[start:stop] = getattr(other, attr)
+
+	def scaled(self, scaling):
+		r"""
+		Function vector composed with a diagonal scaling.
+
+		Arguments:
+			scaling: Positive scalar or vector :math:`s`.
+
+		Returns:
+			:class:`SeparableObjective`: Function vector :math:`g` with
+			:math:`g(z) = f(\mathbf{diag}(s) z)`.
+		"""
+		g = SeparableObjective(self.size)
+		g.h[:] = self.h
+		g.a[:] = self.a * scaling
+		g.b[:] = self.b
+		g.c[:] = self.c
+		g.d[:] = self.d * scaling
+		g.e[:] = self.e * scaling**2
+		return g
+
+	def eval(self, x):
+		"""
+		Evaluate function vector.
+
+		Arguments:
+			x: Length-``size`` vector.
+
+		Returns:
+			:obj:`float`: Sum of entrywise function values; ``inf`` if
+			an indicator function is violated.
+		"""
+		x = np.asarray(x, dtype=float).reshape(-1)
+		z = self.a * x - self.b
+		hz = np.zeros(self.size)
+		mask = self.h == FUNCTION_CODES['Abs']
+		hz[mask] = np.abs(z[mask])
+		mask = self.h == FUNCTION_CODES['Square']
+		hz[mask] = 0.5 * z[mask]**2
+		if np.any(z[self.h == FUNCTION_CODES['IndGe0']] < 0):
+			return np.inf
+		return float(np.dot(self.c, hz) + np.dot(self.d, x) +
+					 0.5 * np.dot(self.e, x**2))
+
+	def prox(self, v, rho):
+		r"""
+		Evaluate proximal operator of function vector.
+
+		Arguments:
+			v: Length-``size`` vector.
+			rho (:obj:`float`): Positive proximal parameter.
+
+		Returns:
+			:class:`numpy.ndarray`: Minimizer over :math:`x` of
+			:math:`f(x) + (\rho / 2) \|x - v\|_2^2`.
+		"""
+		z = self.a * (rho * v - self.d) / (self.e + rho) - self.b
+		curvature = self.c * self.a**2
+		active = curvature > 0
+		rho_h = (self.e + rho) / np.where(active, curvature, 1.)
+
+		mask = active & (self.h == FUNCTION_CODES['Abs'])
+		if mask.any():
+			z[mask] = np.sign(z[mask]) * np.maximum(
+					np.abs(z[mask]) - 1. / rho_h[mask], 0)
+		mask = active & (self.h == FUNCTION_CODES['Square'])
+		if mask.any():
+			z[mask] *= rho_h[mask] / (1. + rho_h[mask])
+		mask = self.h == FUNCTION_CODES['IndGe0']
+		if mask.any():
+			z[mask] = np.maximum(z[mask], 0)
+		return (z + self.b) / self.a
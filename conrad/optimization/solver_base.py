@@ -43,7 +43,9 @@ along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
 """
 from conrad.compat import *
 
+import hashlib
 import numpy as np
+import scipy.sparse as sp
 import abc
 
 GAMMA_DEFAULT = 1e-2
@@ -100,6 +102,7 @@ class Solver(object):
 		self.feasible = False
 		self.__global_weight_scaling = 1.
 		self.__global_dose_scaling = 1.
+		self.__fingerprint = None
 
 	@property
 	def gamma(self):
@@ -128,6 +131,43 @@ class Solver(object):
 	def global_dose_scaling(self):
 		return self.__global_dose_scaling
 
+	@property
+	def timing(self):
+		"""
+		Wall-clock and CPU time of phases of most recent solve.
+
+		Dictionary keyed by phase name, with entries ``'wall'`` and
+		``'cpu'``. Empty unless populated by a solver implementation.
+		"""
+		return {}
+
+	@property
+	def cache_type(self):
+		"""
+		Name of solver cache layout, or ``None`` if caching unsupported.
+
+		Solvers that report the same cache type can exchange caches.
+		"""
+		return None
+
+	@property
+	def cache(self):
+		"""
+		Prototype for exporting solver cache.
+
+		Implementations return a dictionary with entries ``'solver'``
+		(the solver's :attr:`Solver.cache_type`) and ``'fingerprint'``
+		(the :attr:`Solver.fingerprint` of the problem the cache was
+		built for), plus any arrays, sparse matrices or nested
+		dictionaries thereof needed to skip problem setup.
+		"""
+		return None
+
+	@property
+	def fingerprint(self):
+		""" Fingerprint of problem layout at most recent build. """
+		return self.__fingerprint
+
 	def gamma_prioritized(self, priority):
 		"""
 		Calculate penalty scaling for slack variable.
@@ -244,6 +284,102 @@ class Solver(object):
 							  structure.label, matrix_info, reason)))
 		return report
 
+	@staticmethod
+	def layout_fingerprint(structures):
+		"""
+		Hash the dose matrix layout of ``structures``.
+
+		The fingerprint covers the order, labels and number of
+		optimization rows of each structure, and the contents of the
+		dose data entering the optimization: each structure's mean dose
+		vector and, unless the structure is collapsable, its full dose
+		matrix (shape, type, and for sparse matrices the index
+		arrays). Any change to the dose data changes the fingerprint,
+		and so invalidates cached equilibrations and factorizations.
+
+		Arguments:
+			structures: Iterable collection of
+				:class:`~conrad.medicine.Structure` objects.
+
+		Returns:
+			:obj:`str`: Hexadecimal digest.
+		"""
+		digest = hashlib.sha1()
+		for s in structures:
+			rows = 1 if s.collapsable else s.size
+			A_mean = np.zeros(0) if s.A_mean is None else \
+					 np.ascontiguousarray(s.A_mean, dtype=float)
+			digest.update(str(
+					(s.label, s.collapsable, rows, A_mean.size)).encode())
+			digest.update(A_mean.tobytes())
+			if not s.collapsable:
+				Solver.__update_matrix_digest(digest, s.A)
+		return digest.hexdigest()
+
+	@staticmethod
+	def __update_matrix_digest(digest, A):
+		""" Add shape, type and entries of matrix ``A`` to ``digest``. """
+		if A is None:
+			digest.update(b'None')
+		elif sp.issparse(A):
+			if not isinstance(A, (sp.csr_matrix, sp.csc_matrix)):
+				A = A.tocsr()
+			digest.update(str(
+					(A.format, A.shape, A.dtype.str, A.nnz)).encode())
+			for array in (A.indptr, A.indices, A.data):
+				digest.update(np.ascontiguousarray(array).tobytes())
+		else:
+			A = np.ascontiguousarray(A)
+			digest.update(str(('dense', A.shape, A.dtype.str)).encode())
+			digest.update(A.tobytes())
+
+	def cache_fingerprint(self, structures, **options):
+		"""
+		Fingerprint of the problem built from ``structures``.
+
+		Solvers whose cached data depend on more than the dose matrix
+		layout (e.g., on the form of the objective and constraints)
+		extend :meth:`Solver.layout_fingerprint` here.
+
+		Arguments:
+			structures: Iterable collection of
+				:class:`~conrad.medicine.Structure` objects.
+			**options: Build options.
+
+		Returns:
+			:obj:`str`: Hexadecimal digest.
+		"""
+		return self.layout_fingerprint(structures)
+
+	def __record_fingerprint(self, structures, **options):
+		self.__fingerprint = self.cache_fingerprint(structures, **options)
+		return self.__fingerprint
+
+	def __valid_cache(self, solver_cache):
+		"""
+		Test whether ``solver_cache`` applies to the current problem.
+
+		Arguments:
+			solver_cache: Candidate cache, as produced by
+				:attr:`Solver.cache`.
+
+		Returns:
+			:obj:`bool`: ``False`` if ``solver_cache`` is not a
+			dictionary, was produced by a solver with a different cache
+			type, or was built for a problem with a different
+			fingerprint. Caches without these entries (e.g., saved
+			before fingerprints were recorded) are accepted.
+		"""
+		if not isinstance(solver_cache, dict):
+			return False
+		solver = solver_cache.get('solver', None)
+		if solver is not None and solver != self.cache_type:
+			return False
+		fingerprint = solver_cache.get('fingerprint', None)
+		if fingerprint is not None and fingerprint != self.fingerprint:
+			return False
+		return True
+
 	def __set_scaling(self, structures):
 		weight_scaling = 1.
 		dose_scaling = 1.
@@ -36,11 +36,15 @@ from conrad.compat import *
 
 import time
 import numpy as np
+import scipy.sparse as sp
 
 from conrad.defs import vec as conrad_vec, module_installed, println
+from conrad.abstract.matrix import csx_slice_compressed, \
+								   csx_slice_uncompressed
 from conrad.medicine.dose import Constraint, MeanConstraint, MinConstraint, \
 								 MaxConstraint, PercentileConstraint
 from conrad.medicine.anatomy import Anatomy
+from conrad.optimization.objectives import ObjectiveHinge
 from conrad.optimization.preprocessing import ObjectiveMethods
 from conrad.optimization.solver_base import *
 
@@ -75,6 +79,19 @@ if module_installed('cvxpy'):
 				The dual variables' values are stored here after each
 				optimization run for access by clients of the
 				:class:`SolverCVXPY` object.
+			parametrize (:obj:`bool`): If ``True``, objective weights,
+				target doses, constraint doses and slack penalties
+				are built as :class:`cvxpy.Parameter` objects. The
+				problem is then only rebuilt when the structure of
+				the planning problem changes; otherwise, calls to
+				:meth:`SolverCVXPY.build` update parameter values.
+			voxel_subsets (:obj:`dict`): Dictionary, keyed by structure
+				label, of row indices of each structure's dose matrix
+				used to build its maximum dose constraints, convex
+				restrictions of upper percentile constraints and hinge
+				objective; terms of structures not in the dictionary
+				use all rows. Problems built with voxel subsets are
+				not parametrized.
 		"""
 
 		def __init__(self, n_beams=None, **options):
@@ -95,6 +112,14 @@ if module_installed('cvxpy'):
 			self.__constraint_indices = {}
 			self.constraint_dual_vars = {}
 			self.__solvetime = np.nan
+			self.__timing = {}
+			self.parametrize = False
+			self.__parametrized = False
+			self.__objective_parameters = {}
+			self.__constraint_parameters = {}
+			self.__tau_parameter = None
+			self.__parametrized_cache = None
+			self.voxel_subsets = {}
 
 			if isinstance(n_beams, int):
 				self.init_problem(n_beams, **options)
@@ -118,12 +143,21 @@ if module_installed('cvxpy'):
 					percentile-type dose constraints as exact
 					constraints instead of convex restrictions thereof,
 					assuming other requirements are met.
-				**options: Arbitrary keyword arguments.
+				**options: Arbitrary keyword arguments. Option
+					``parametrize`` sets
+					:attr:`SolverCVXPY.parametrize`; in that mode, the
+					beam intensity variable and any parametrized
+					problem built for ``n_beams`` beams are retained.
 
 			Returns:
 				None
 			"""
-			self.__x = cvxpy.Variable(n_beams)
+			parametrize = bool(options.pop('parametrize', False))
+			if not (parametrize and self.parametrize and
+					self.n_beams == n_beams):
+				self.__x = cvxpy.Variable(n_beams)
+				self.__parametrized_cache = None
+			self.parametrize = parametrize
 			self.clear()
 
 			self.use_slack = use_slack
@@ -134,7 +168,9 @@ if module_installed('cvxpy'):
 		@property
 		def n_beams(self):
 			""" Number of candidate beams in treatment plan. """
-			return self.__x.size[0]
+			if len(self.__x.shape) == 0:
+				return 0
+			return self.__x.shape[0]
 
 		def clear(self):
 			r"""
@@ -153,9 +189,57 @@ if module_installed('cvxpy'):
 			self.dvh_vars = {}
 			self.slack_vars = {}
 			self.constraint_dual_vars = {}
+			self.__constraint_indices = {}
+			self.__parametrized = False
+
+		@staticmethod
+		def __percentile_voxel_limit(A, constr):
+			"""
+			Maximum number of voxels allowed to violate ``constr``.
+			"""
+			sign = 1 if constr.upper else -1
+			fraction = float(sign < 0) + sign * constr.percentile.fraction
+			return fraction * A.shape[0]
 
 		@staticmethod
-		def __percentile_constraint_restricted(A, x, constr, beta, slack=None):
+		def __select_rows(A, rows):
+			""" Select ``rows`` of ``A`` without densifying sparse matrices. """
+			if isinstance(A, sp.csr_matrix):
+				return csx_slice_compressed(A, rows)
+			elif isinstance(A, sp.csc_matrix):
+				return csx_slice_uncompressed(A, rows)
+			else:
+				return A[rows, :]
+
+		def __screened_matrix(self, structure):
+			"""
+			Rows of structure dose matrix in :attr:`SolverCVXPY.voxel_subsets`.
+			"""
+			rows = self.voxel_subsets.get(structure.label, None)
+			if rows is None:
+				return structure.A
+			return self.__select_rows(structure.A, rows)
+
+		def __screened_objective(self, structure):
+			"""
+			Hinge objective of ``structure`` on rows in voxel subset.
+
+			The objective is normalized by the full (weighted) size of
+			``structure``, so that it matches the objective built from
+			all rows wherever screened-out voxels are below the hinge.
+			"""
+			ObjectiveMethods.normalize(structure)
+			rows = self.voxel_subsets[structure.label]
+			weights = structure.voxel_weights
+			if weights is not None:
+				weights = conrad_vec(weights)[rows]
+			return structure.objective.expr_Ax(
+					self.__screened_matrix(structure), self.__x, weights)
+
+		@staticmethod
+		def __percentile_constraint_restricted(A, x, constr, beta,
+											   slack=None, dose=None,
+											   voxel_limit=None):
 			r"""
 			Form convex restriction to DVH constraint.
 
@@ -180,6 +264,11 @@ if module_installed('cvxpy'):
 				constr (:class:`PercentileConstraint`): Dose constraint.
 				slack (:obj:`bool`, optional): If ``True``, include
 					slack variable in constraint formulation.
+				dose (optional): Constraint dose level; taken from
+					``constr`` if not provided.
+				voxel_limit (optional): Voxel limit :math:`\phi`;
+					calculated from ``constr`` and ``A`` if not
+					provided.
 
 			Returns:
 				:class:`cvxpy.Constraint`: :mod:`cvxpy` representation
@@ -195,13 +284,16 @@ if module_installed('cvxpy'):
 								''.format(PercentileConstraint, type(constr)))
 
 			sign = 1 if constr.upper else -1
-			fraction = float(sign < 0) + sign * constr.percentile.fraction
-			p = fraction * A.shape[0]
-			dose = constr.dose.value
+			if voxel_limit is None:
+				voxel_limit = SolverCVXPY.__percentile_voxel_limit(
+						A, constr)
+			if dose is None:
+				dose = constr.dose.value
 			if slack is None:
 				slack = 0.
 			return cvxpy.sum(cvxpy.pos(
-					beta + sign * (A@x - (dose + sign * slack)) )) <= beta * p
+					beta + sign * (A@x - (dose + sign * slack)) )) <= \
+					beta * voxel_limit
 
 		@staticmethod
 		def __percentile_constraint_exact(A, x, y, constr, had_slack=False):
@@ -231,14 +323,48 @@ if module_installed('cvxpy'):
 
 			sign = 1 if constr.upper else -1
 			dose = constr.dose_achieved if had_slack else constr.dose
-			idx_exact = constr.get_maxmargin_fulfillers(y, had_slack)
-			A_exact = np.copy(A[idx_exact, :])
+			idx_exact = constr.get_maxmargin_fulfillers(
+					y, had_slack, ordered=False)
+
+			A_exact = SolverCVXPY.__select_rows(A, idx_exact)
 			return sign * (A_exact @ x - dose.value) <= 0
 
 		def __add_constraints(self, structure, exact=False):
 			"""
 			Add constraints from ``structure`` to problem.
 
+			Gather constraints and slack penalties from ``structure``
+			with :meth:`SolverCVXPY.__gather_constraints`, and extend
+			:attr:`SolverCVXPY.problem` with them in a single step.
+
+			Arguments:
+				structure (:class:`~conrad.medicine.Structure`):
+					Structure from which to read dose matrix and dose
+					constraints.
+				exact (:obj:`bool`, optional): If ``True``, build
+					exact versions of percentile-type dose constraints.
+
+			Returns:
+				None
+			"""
+			if self.problem is None:
+				objective = cvxpy.Minimize(0)
+				constraints = []
+			else:
+				objective = self.problem.objective
+				constraints = list(self.problem.constraints)
+			objective_terms = []
+			self.__gather_constraints(
+					structure, objective_terms, constraints, exact=exact)
+			if objective_terms:
+				objective += cvxpy.Minimize(sum(objective_terms))
+			self.problem = cvxpy.Problem(objective, constraints)
+
+		def __gather_constraints(self, structure, objective_terms, constraints,
+								 exact=False):
+			"""
+			Collect constraints from ``structure`` for problem assembly.
+
 			Constraints built with slack variables if
 			:attr:`SolverCVXPY.use_slack` is ``True`` at call time. When
 			slacks are used, each slack variable is registered in the
@@ -247,7 +373,8 @@ if module_installed('cvxpy'):
 			of optimal values.
 
 			A nonnegativity constraint on each slack variable is
-			added to :attr:`SolverCVXPY.problem.constraints`.
+			appended to ``constraints``, and the penalty on each slack
+			variable is appended to ``objective_terms``.
 
 			When ``structure`` includes percentile-type dose constraints,
 			and a convex restriction (i.e., a hinge loss approximation)
@@ -257,13 +384,22 @@ if module_installed('cvxpy'):
 			corresponding constraint's ID as a key for later retrival of
 			optimal values.
 
-			A nonnegativity constraint on each slope variable is added
-			to :attr:`SolverCVXPY.problem.constraints`.
+			A nonnegativity constraint on each slope variable is
+			appended to ``constraints``.
+
+			The position of each dose constraint in ``constraints`` is
+			recorded for retrieval of dual values, so ``constraints``
+			should hold every constraint preceding those from
+			``structure`` in the problem to be assembled.
 
 			Arguments:
 				structure (:class:`~conrad.medicine.Structure`):
 					Structure from which to read dose matrix and dose
 					constraints.
+				objective_terms (:obj:`list`): List of objective terms
+					to extend.
+				constraints (:obj:`list`): List of constraints to
+					extend.
 				exact (:obj:`bool`, optional): If ``True`` *and*
 					:attr:`SolverCVXPY.use_2pass` is ``True`` *and*
 					``structure`` has a calculated dose vector, treat
@@ -279,7 +415,7 @@ if module_installed('cvxpy'):
 			"""
 			# extract dvh constraint from structure,
 			# make slack variable (if self.use_slack), add
-			# slack to self.objective and slack >= 0 to constraints
+			# slack to objective terms and slack >= 0 to constraints
 			if exact:
 				if not self.use_2pass or structure.y is None:
 					raise ValueError('exact constraints requested, but '
@@ -290,45 +426,48 @@ if module_installed('cvxpy'):
 									 '(structure dose: {})\n'
 									 ''.format(self.use_2pass, structure.y))
 
-			if self.problem is not None:
-				self.objective = self.problem.objective
-				self.constraints = self.problem.constraints
-			else:
-				self.objective = cvxpy.Minimize(0)
-				self.constraints = []
-			
 			for cid in structure.constraints:
 				c = structure.constraints[cid]
 				cslack = not exact and self.use_slack and c.priority > 0
+				if self.__parametrized:
+					params = self.__constraint_parameters[cid] = {}
+					dose = params['dose'] = cvxpy.Parameter()
+				else:
+					dose = c.dose.value
+
 				if cslack:
-					gamma = self.gamma_prioritized(c.priority)
+					if self.__parametrized:
+						gamma = params['gamma'] = cvxpy.Parameter(
+								nonneg=True)
+					else:
+						gamma = self.gamma_prioritized(c.priority)
 					slack = cvxpy.Variable()
 					self.slack_vars[cid] = slack
-					self.objective += cvxpy.Minimize(gamma * slack)
-					self.constraints += [slack >= 0]
+					objective_terms.append(gamma * slack)
+					constraints += [slack >= 0]
 					if not c.upper:
-						self.constraints += [slack <= c.dose.value]
+						constraints += [slack <= dose]
 				else:
 					slack = 0.
 					self.slack_vars[cid] = None
 
 				if isinstance(c, MeanConstraint):
 					if c.upper:
-						self.constraints += [
+						constraints += [
 								structure.A_mean @ self.__x - slack <=
-								c.dose.value]
+								dose]
 					else:
-						self.constraints += [
+						constraints += [
 								structure.A_mean @ self.__x + slack >=
-								c.dose.value]
+								dose]
 
 				elif isinstance(c, MinConstraint):
-					self.constraints += \
-						[structure.A @ self.__x >= c.dose.value]
+					constraints += \
+						[structure.A @ self.__x >= dose]
 
 				elif isinstance(c, MaxConstraint):
-					self.constraints += \
-						[structure.A @ self.__x <= c.dose.value]
+					constraints += \
+						[self.__screened_matrix(structure) @ self.__x <= dose]
 
 				elif isinstance(c, PercentileConstraint):
 					if exact:
@@ -338,24 +477,32 @@ if module_installed('cvxpy'):
 								had_slack=self.use_slack)
 
 						# add it to problem
-						self.constraints += [ dvh_constr ]
+						constraints += [ dvh_constr ]
 
 					else:
 						# beta = 1 / slope for DVH constraint approximation
 						beta = cvxpy.Variable()
 						self.dvh_vars[cid] = beta
-						self.constraints += [ beta >= 0 ]
+						constraints += [ beta >= 0 ]
+
+						if self.__parametrized:
+							voxel_limit = params['voxel_limit'] = \
+								cvxpy.Parameter(nonneg=True)
+						else:
+							voxel_limit = self.__percentile_voxel_limit(
+									structure.A, c)
 
 						# build convex restriction to constraint
+						A = structure.A if not c.upper else \
+							self.__screened_matrix(structure)
 						dvh_constr = self.__percentile_constraint_restricted(
-							structure.A, self.__x, c, beta, slack)
+							A, self.__x, c, beta, slack,
+							dose=dose, voxel_limit=voxel_limit)
 
 						# add it to problem
-						self.constraints += [ dvh_constr ]
-				
-				self.problem = cvxpy.Problem(self.objective, self.constraints)
-				self.__constraint_indices[cid] = None
-				self.__constraint_indices[cid] = len(self.problem.constraints) - 1
+						constraints += [ dvh_constr ]
+
+				self.__constraint_indices[cid] = len(constraints) - 1
 
 		def get_slack_value(self, constr_id):
 			"""
@@ -444,6 +591,18 @@ if module_installed('cvxpy'):
 			""" Solver run time. """
 			return self.__solvetime
 
+		@property
+		def timing(self):
+			"""
+			Wall-clock and CPU time of phases of most recent solve.
+
+			Dictionary, keyed by phase (``'canonicalization'``, i.e.,
+			conversion of the :mod:`cvxpy` problem to solver data, and
+			``'solver'``, i.e., the backend run), of dictionaries with
+			entries ``'wall'`` and ``'cpu'``, in seconds.
+			"""
+			return self.__timing
+
 		@property
 		def status(self):
 			""" Solver status. """
@@ -467,7 +626,149 @@ if module_installed('cvxpy'):
 				return structure.objective.expr(
 						structure.A @ self.x, structure.voxel_weights)
 
-		def build(self, structures, exact=False, **options):
+		def __structure_signature(self, structures, tau):
+			"""
+			Summarize the features of ``structures`` that determine
+			the form (as opposed to the data) of the planning problem.
+			"""
+			signature = [self.n_beams, self.use_slack, bool(tau)]
+			references = []
+			for s in structures:
+				references += [s.A, s.A_mean, s.voxel_weights]
+				signature.append((
+						s.label, type(s.objective), s.collapsable,
+						id(s.A), id(s.A_mean), id(s.voxel_weights)))
+				for cid in s.constraints:
+					c = s.constraints[cid]
+					signature.append(
+							(cid, type(c), c.upper, c.priority > 0))
+			return tuple(signature), references
+
+		def __build_parametrized(self, structures, tau=None):
+			"""
+			Build parametrized problem, or update cached problem.
+
+			If the signature of ``structures`` matches that of the
+			cached problem, restore the cached problem and its
+			variables; otherwise, build a new problem with
+			:class:`cvxpy.Parameter` objects for all weights and dose
+			levels and cache it. In either case, set the parameter
+			values from the current data in ``structures``.
+
+			Arguments:
+				structures: Iterable collection of :class:`Structure`
+					objects.
+				tau (:obj:`float`, optional): Weight of :math:`\ell_1`
+					penalty on beam intensities.
+
+			Returns:
+				None
+			"""
+			signature, references = self.__structure_signature(
+					structures, tau)
+			cache = self.__parametrized_cache
+			if cache is not None and cache['signature'] == signature:
+				self.problem = cache['problem']
+				self.slack_vars = cache['slack_vars']
+				self.dvh_vars = cache['dvh_vars']
+				self.__constraint_indices = cache['constraint_indices']
+				self.__parametrized = True
+			else:
+				self.clear()
+				self.__parametrized = True
+				self.__objective_parameters = {}
+				self.__constraint_parameters = {}
+				if tau:
+					self.__tau_parameter = cvxpy.Parameter(nonneg=True)
+					self.__assemble(structures, [
+							self.__tau_parameter * cvxpy.norm(self.__x, 1)])
+				else:
+					self.__tau_parameter = None
+					self.__assemble(structures)
+				self.__parametrized_cache = {
+						'signature': signature,
+						'references': references,
+						'problem': self.problem,
+						'slack_vars': self.slack_vars,
+						'dvh_vars': self.dvh_vars,
+						'constraint_indices': self.__constraint_indices,
+				}
+
+			self.__update_parameters(structures, tau)
+
+		def __update_parameters(self, structures, tau=None):
+			"""
+			Set parameter values of parametrized problem.
+
+			Arguments:
+				structures: Iterable collection of :class:`Structure`
+					objects, matching the structures used to build
+					the parametrized problem.
+				tau (:obj:`float`, optional): Weight of :math:`\ell_1`
+					penalty on beam intensities.
+
+			Returns:
+				None
+			"""
+			if self.__tau_parameter is not None:
+				self.__tau_parameter.value = float(tau)
+			for s in structures:
+				params = self.__objective_parameters[s.label]
+				values = ObjectiveMethods.parametrized_values(s)
+				for key in params:
+					params[key].value = values[key]
+				for cid in s.constraints:
+					c = s.constraints[cid]
+					params = self.__constraint_parameters[cid]
+					params['dose'].value = c.dose.value
+					if 'gamma' in params:
+						params['gamma'].value = self.gamma_prioritized(
+								c.priority)
+					if 'voxel_limit' in params:
+						params['voxel_limit'].value = \
+							self.__percentile_voxel_limit(s.A, c)
+
+		def __assemble(self, structures, objective_terms=None, exact=False):
+			"""
+			Assemble problem from ``structures`` in a single step.
+
+			Objective terms and constraints from all structures are
+			collected in lists, and :attr:`SolverCVXPY.problem` is
+			formed from them once, so that assembly time grows linearly
+			with the number of dose constraints.
+
+			Arguments:
+				structures: Iterable collection of :class:`Structure`
+					objects.
+				objective_terms (:obj:`list`, optional): Objective terms
+					to include in addition to those built from
+					``structures``.
+				exact (:obj:`bool`, optional): If ``True``, build
+					exact versions of percentile-type dose constraints.
+
+			Returns:
+				None
+			"""
+			objective_terms = list(objective_terms or [])
+			constraints = list(self.problem.constraints)
+			for s in structures:
+				if self.__parametrized:
+					expr, params = ObjectiveMethods.primal_expr_parametrized(
+							s, self.__x)
+					self.__objective_parameters[s.label] = params
+				elif s.label in self.voxel_subsets and isinstance(
+						s.objective, ObjectiveHinge):
+					expr = self.__screened_objective(s)
+				else:
+					expr = ObjectiveMethods.expr(s, self.__x)
+				objective_terms.append(expr)
+				self.__gather_constraints(
+						s, objective_terms, constraints, exact=exact)
+			self.problem = cvxpy.Problem(
+					cvxpy.Minimize(sum(objective_terms)), constraints)
+
+		def build(self, structures, exact=False, solver_cache=None,
+				  **options):
 			"""
 			Update :mod:`cvxpy` optimization based on structure data.
 
@@ -481,29 +782,50 @@ if module_installed('cvxpy'):
 			(When constraints include slack variables, a penalty on each
 			slack variable is added to the objective.)
 
+			If :attr:`SolverCVXPY.parametrize` is ``True``, ``exact``
+			is ``False`` and :attr:`SolverCVXPY.voxel_subsets` is
+			empty, the problem is built with
+			:class:`cvxpy.Parameter` objects in place of weights and
+			doses. The parametrized problem is cached, and subsequent
+			calls with structurally equivalent ``structures`` (same
+			structures, dose matrices, objective types and constraint
+			types) only update the parameter values, so that
+			:mod:`cvxpy` can reuse its canonicalization of the
+			problem. The parametrized problem is kept in memory only:
+			:mod:`cvxpy` problems are not exported as a solver cache
+			(:attr:`Solver.cache` is ``None``), since restoring one
+			would require unpickling or :mod:`cvxpy` internals.
+
 			Arguments:
 				structures: Iterable collection of :class:`Structure`
 					objects.
+				exact (:obj:`bool`, optional): If ``True``, build
+					exact versions of percentile-type dose constraints.
+				solver_cache (:obj:`dict`, optional): Ignored.
+				**options: Arbitrary keyword arguments. Option ``tau``
+					sets the weight of an :math:`\ell_1` penalty on the
+					beam intensities.
 
 			Returns:
 				:obj:`str`: String documenting how data in
 				``structures`` were parsed to form an optimization
 				problem.
 			"""
-			self.clear()
 			if isinstance(structures, Anatomy):
 				structures = structures.list
+			if self.parametrize and not exact and not self.voxel_subsets:
+				self.__build_parametrized(structures, options.get('tau'))
+				return self._Solver__construction_report(structures)
+
+			self.clear()
 			# A, dose, weight_abs, weight_lin = \
 					# self._Solver__gather_matrix_and_coefficients(structures)
 
-			if 'tau' in options:
-				self.problem = cvxpy.Problem(cvxpy.Minimize(options['tau']*cvxpy.norm(self.__x, 1)), self.problem.constraints)
+			if options.get('tau', None):
+				self.__assemble(structures, [
+						options['tau'] * cvxpy.norm(self.__x, 1)], exact=exact)
 			else:
-				self.problem = cvxpy.Problem(cvxpy.Minimize(0), self.problem.constraints)
-			for s in structures:
-				objective = cvxpy.Minimize(ObjectiveMethods.expr(s, self.__x))
-				self.problem = cvxpy.Problem(self.problem.objective + objective, self.problem.constraints)
-				self.__add_constraints(s, exact=exact)
+				self.__assemble(structures, exact=exact)
 
 			# self.problem.objective = cvxpy.Minimize(
 			# 		weight_abs.T * cvxpy.abs(A * self.__x - dose) +
@@ -518,6 +840,14 @@ if module_installed('cvxpy'):
 			"""
 			Execute optimization of a previously built planning problem.
 
+			If option ``warm_start`` is ``True``, :mod:`cvxpy` is asked
+			to warm start the backend: solvers that keep state between
+			runs of the same problem (SCS) resume from their previous
+			primal and dual iterates, while ECOS ignores the request.
+			The backends cannot be started from a given point, so
+			initial guesses ``x0`` and ``nu0``, as accepted by the POGS
+			solvers, are ignored.
+
 			Arguments:
 				**options: Keyword arguments specifying solver options,
 					passed to :meth:`cvxpy.Problem.solve`.
@@ -540,14 +870,12 @@ if module_installed('cvxpy'):
 			maxiter = int(options.pop('maxiter', MAXITER_DEFAULT))
 			use_gpu = bool(options.pop('gpu', GPU_DEFAULT))
 			use_indirect = bool(options.pop('use_indirect', INDIRECT_DEFAULT))
+			warm_start = bool(options.pop('warm_start', False))
+			options.pop('x0', None)
+			options.pop('nu0', None)
 
-			# solve
-			PRINT('running solver...')
-			start = time.process_time()
 			if solver == cvxpy.ECOS:
-				ret = self.problem.solve(
-						solver=cvxpy.ECOS,
-						verbose=VERBOSE,
+				solver_options = dict(
 						max_iters=maxiter,
 						reltol=reltol,
 						reltol_inacc=reltol,
@@ -555,24 +883,41 @@ if module_installed('cvxpy'):
 						feastol_inacc=reltol)
 			elif solver == cvxpy.SCS:
 				if use_gpu:
-					ret = self.problem.solve(
-							solver=cvxpy.SCS,
-							verbose=VERBOSE,
+					solver_options = dict(
 							max_iters=maxiter,
 							eps=reltol,
 							gpu=use_gpu,
 							use_indirect=True)
 				else:
-					ret = self.problem.solve(
-							solver=cvxpy.SCS,
-							verbose=VERBOSE,
+					solver_options = dict(
 							max_iters=maxiter,
 							eps=reltol,
 							use_indirect=use_indirect)
 			else:
 				raise ValueError('invalid solver specified: {}\n'
 								 'no optimization performed'.format(solver))
-			self.__solvetime = time.process_time() - start
+
+			# canonicalize
+			PRINT('canonicalizing problem...')
+			wall, cpu = time.perf_counter(), time.process_time()
+			data, chain, inverse_data = self.problem.get_problem_data(solver)
+			self.__timing['canonicalization'] = {
+					'wall': time.perf_counter() - wall,
+					'cpu': time.process_time() - cpu}
+
+			# solve
+			PRINT('running solver...')
+			wall, cpu = time.perf_counter(), time.process_time()
+			solution = chain.solve_via_data(
+					self.problem, data, warm_start=warm_start,
+					verbose=VERBOSE, solver_opts=solver_options)
+			self.problem.unpack_results(solution, chain, inverse_data)
+			self.__timing['solver'] = {
+					'wall': time.perf_counter() - wall,
+					'cpu': time.process_time() - cpu}
+			self.__solvetime = self.__timing['canonicalization']['cpu'] + \
+				self.__timing['solver']['cpu']
+			ret = self.problem.value
 
 
 			PRINT("status: {}".format(self.problem.status))
@@ -0,0 +1,750 @@
+r"""
+Define first-order solver implemented with :mod:`numpy` and :mod:`scipy`.
+
+:class:`SolverNumpy` runs the graph-form ADMM method of POGS,
+
+.. math::
+
+	\mbox{minimize}\; f(y) + g(x) \quad \mbox{subject to}\; y = Ax,
+
+directly on the structure dose matrices, with no compiled dependencies
+beyond :mod:`numpy` and :mod:`scipy`. The equilibrated dose matrix and
+the Cholesky factorization used to project onto the graph
+:math:`\{(x, y) : y = Ax\}` are cached between solves, so that changes
+to objective weights only require new iterations.
+
+For information on POGS, see:
+https://foges.github.io/pogs/
+
+Attributes:
+	ALPHA_DEFAULT (:obj:`float`): Default over-relaxation parameter.
+	RHO_DEFAULT (:obj:`float`): Fallback initial ADMM penalty, used
+		when no penalty can be estimated from the objective.
+	EQUILIBRATION_PASSES (:obj:`int`): Number of row/column balancing
+		passes used to equilibrate the dose matrix.
+"""
+"""
+Copyright 2016--2017 Baris Ungun, Anqi Fu
+
+This file is part of CONRAD.
+
+CONRAD is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+CONRAD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from conrad.compat import *
+
+import time
+import numpy as np
+import scipy.sparse as sp
+import scipy.linalg as la
+
+from conrad.defs import println, CONRAD_DEBUG_PRINT
+from conrad.medicine.anatomy import Anatomy
+from conrad.optimization.proximal import SeparableObjective
+from conrad.optimization.preprocessing import ObjectiveMethods
+from conrad.optimization.solver_base import *
+
+ALPHA_DEFAULT = 1.7
+RHO_DEFAULT = 1.
+EQUILIBRATION_PASSES = 10
+
+class SolverNumpy(Solver):
+	r"""
+	Pure :mod:`numpy` implementation of the POGS method.
+
+	:class:`SolverNumpy` builds the same fully-separable problem as
+	:class:`~conrad.optimization.solver_optkit.SolverOptkit`, using the
+	function vector descriptions of each structure's objective (see
+	:meth:`~conrad.optimization.preprocessing.ObjectiveMethods.primal_expr_pogs`),
+	and solves it with graph-form ADMM.
+
+	:class:`SolverNumpy` does not support planning problems with dose
+	constraints.
+
+	Attributes:
+		objective_voxels (:class:`SeparableObjective`): Description of
+			the fully-separable objective function :math:`f:
+			\mathbf{R}^\mbox{voxels}\rightarrow\mathbf{R}` applied to
+			the vector of voxel doses.
+		objective_beams (:class:`SeparableObjective`): Description of
+			the fully-separable objective function :math:`g:
+			\mathbf{R}^\mbox{beams}\rightarrow\mathbf{R}` applied to
+			the vector of beam intensities.
+	"""
+	def __init__(self):
+		"""
+		Initialize empty :class:`SolverNumpy` as a :class:`Solver`.
+
+		Arguments:
+			None
+		"""
+		Solver.__init__(self)
+		self.objective_voxels = None
+		self.objective_beams = None
+		self.__A_dict = {}
+		self.__A_equil = None
+		self.__d = None
+		self.__e = None
+		self.__L = None
+		self.__n_beams = None
+		self.__state = None
+		self.__rho = RHO_DEFAULT
+		self.__output = None
+		self.__info = None
+		self.__timing = {}
+
+	def init_problem(self, n_beams=None, **options):
+		"""
+		Initialize problem---no-op for :class:`SolverNumpy`.
+
+		Method defined to match public methods of
+		:class:`~conrad.optimization.solver_cvxpy.SolverCVXPY`.
+
+		Arguments:
+			n_beams (:obj:`int`, optional): Number of beams in plan.
+			**options: Arbitrary keyword arguments.
+		"""
+		if n_beams is not None:
+			self.__n_beams = int(n_beams)
+
+	@property
+	def n_beams(self):
+		""" Number of candidate beams in solver's problem. """
+		return self.__n_beams
+
+	@staticmethod
+	def can_solve(structures):
+		"""
+		Test if :class:`Structure` objects compatible with solver.
+
+		Arguments:
+			structures: An iterable collection of :class:`Structure`
+				objects.
+
+		Returns:
+			:obj:`bool`: ``True`` if none of the structures have
+			dose constraints and all structure objectives have a
+			function vector description.
+		"""
+		for s in structures:
+			if s.constraints.size > 0:
+				return False
+			try:
+				ObjectiveMethods.primal_expr_pogs(s, numpy=True)
+			except NotImplementedError:
+				return False
+		return True
+
+	def clear(self):
+		"""
+		Discard cached matrix, factorization and solver state.
+
+		Arguments:
+			None
+
+		Returns:
+			None
+		"""
+		self.__A_dict = {}
+		self.__A_equil = None
+		self.__d = None
+		self.__e = None
+		self.__L = None
+		self.__state = None
+		self.__output = None
+		self.__info = None
+
+	def get_slack_value(self, constr_id):
+		"""
+		Get slack variable for queried constraint. Not implemented.
+
+		Arguments:
+			constr_id (:obj:`str`): ID tag for queried constraint.
+
+		Returns:
+			float: NaN, as :attr:`numpy.np.nan`.
+		"""
+		return np.nan
+
+	def get_dual_value(self, constr_id):
+		"""
+		Get dual variable for queried constraint. Not implemented.
+
+		Arguments:
+			constr_id (:obj:`str`): ID tag for queried constraint.
+
+		Returns:
+			float: NaN, as :attr:`numpy.np.nan`.
+		"""
+		return np.nan
+
+	def get_dvh_slope(self, constr_id):
+		"""
+		Get slope for queried constraint. Not implemented.
+
+		Arguments:
+			constr_id (:obj:`str`): ID tag for queried constraint.
+
+		Returns:
+			float: NaN, as :attr:`numpy.np.nan`.
+		"""
+		return np.nan
+
+	def __assert_solved(self, property_name):
+		"""
+		Assert :meth:`SolverNumpy.solve` has been called.
+
+		Arguments:
+			property_name (:obj:`str`): Name of property to
+				retrieve, display in exception message if raised.
+
+		Returns:
+			None
+
+		Raises:
+			ValueError: If no solver output is available.
+		"""
+		if self.__output is None:
+			raise ValueError(
+					'no solver output; cannot retrieve property '
+					'SolverNumpy.{}.\n Call SolverNumpy.build() and '
+					'SolverNumpy.solve() at least once'
+					''.format(property_name))
+
+	@property
+	def x(self):
+		r"""
+		Vector variable of beam intensities, :math:`x`.
+		"""
+		self.__assert_solved('x')
+		return self.__output['x']
+
+	@property
+	def x_dual(self):
+		r"""
+		Dual variable corresponding to constraint :math:`x \ge 0`.
+		"""
+		self.__assert_solved('x_dual')
+		return self.__output['mu']
+
+	@property
+	def y_dual(self):
+		r"""
+		Dual variable corresponding to constraint :math:`Ax = y`.
+		"""
+		self.__assert_solved('y_dual')
+		return self.__output['nu']
+
+	@property
+	def solvetime(self):
+		""" Solver run time. """
+		self.__assert_solved('solvetime')
+		return self.__info['time']
+
+	@property
+	def timing(self):
+		"""
+		Wall-clock and CPU time of phases of most recent solve.
+
+		Dictionary, keyed by phase (``'setup'``, i.e., equilibration
+		and factorization of the dose matrix, if performed by the most
+		recent build, and ``'solver'``, i.e., the ADMM iterations), of
+		dictionaries with entries ``'wall'`` and ``'cpu'``, in seconds.
+		"""
+		return self.__timing
+
+	@property
+	def status(self):
+		""" Solver status. """
+		self.__assert_solved('status')
+		return self.__info['status']
+
+	@property
+	def objective_value(self):
+		""" Objective value at end of solve. """
+		self.__assert_solved('objective_value')
+		return self.__info['objective']
+
+	@property
+	def solveiters(self):
+		""" Number of solver iterations performed. """
+		self.__assert_solved('solveiters')
+		return self.__info['iters']
+
+	@property
+	def cache_type(self):
+		""" Solver cache layout, shared with POGS. """
+		return 'POGS'
+
+	@property
+	def cache(self):
+		"""
+		Equilibrated matrix, preconditioners and projector factorization.
+
+		Dictionary in the same layout as
+		:attr:`~conrad.optimization.solver_optkit.SolverOptkit.cache`,
+		or ``None`` if no matrix has been built.
+		"""
+		if self.__A_equil is None:
+			return None
+		return {
+				'solver': self.cache_type,
+				'fingerprint': self.fingerprint,
+				'matrix': self.__A_equil,
+				'left_preconditioner': self.__d,
+				'right_preconditioner': self.__e,
+				'projector': {
+						'type': PROJECTOR_POGS_DENSE_DIRECT,
+						'matrix': self.__L,
+				},
+		}
+
+	def __check_for_updates(self, structures):
+		A_dict_curr = {s.label: None for s in structures}
+		for s in structures:
+			if s.collapsable:
+				A_dict_curr[s.label] = s.A_mean
+			else:
+				A_dict_curr[s.label] = s.A_full
+
+		updated = True
+		if len(self.__A_dict) > 0 and set(self.__A_dict) == set(A_dict_curr):
+			updated = any([
+					self.__A_dict[label] is not A_dict_curr[label]
+					for label in A_dict_curr])
+		self.__A_dict = A_dict_curr
+		return updated
+
+	def __build_matrix(self, structures):
+		"""
+		Gather dose matrix from ``structures``.
+
+		Stack each structure's dose matrix, or its ``1 x N`` mean dose
+		vector if the structure is collapsable. The stacked matrix is
+		sparse (CSR) if any of the structure dose matrices are sparse,
+		and dense otherwise.
+
+		Arguments:
+			structures: Iterable collection of
+				:class:`~conrad.medicine.Structure` objects.
+
+		Returns:
+			Dose matrix.
+		"""
+		self._Solver__check_dimensions(structures)
+		blocks = []
+		for s in structures:
+			if s.collapsable:
+				blocks.append(np.reshape(s.A_mean, (1, -1)))
+			else:
+				blocks.append(s.A_full)
+		# double precision, as required by equilibration and projector
+		# factorization, regardless of precision of structure matrices
+		if any(sp.issparse(block) for block in blocks):
+			A = sp.vstack(blocks, format='csr', dtype=float)
+		else:
+			A = np.vstack(blocks).astype(float)
+		CONRAD_DEBUG_PRINT('BUILT MATRIX SIZE: {}'.format(A.shape))
+		return A
+
+	@staticmethod
+	def __equilibrate(A):
+		r"""
+		Balance row and column norms of dose matrix.
+
+		Arguments:
+			A: Dense or sparse dose matrix.
+
+		Returns:
+			:obj:`tuple`: Equilibrated matrix :math:`\tilde A =
+			\mathbf{diag}(d) A \mathbf{diag}(e)` and vectors
+			:math:`d`, :math:`e`.
+		"""
+		m, n = A.shape
+		A2 = A.multiply(A) if sp.issparse(A) else A**2
+		d = np.ones(m)
+		e = np.ones(n)
+		for _ in range(EQUILIBRATION_PASSES):
+			rows = np.sqrt(d**2 * (A2 @ e**2))
+			d /= np.sqrt(np.where(rows > 0, rows, 1.))
+			cols = np.sqrt(e**2 * (A2.T @ d**2))
+			e /= np.sqrt(np.where(cols > 0, cols, 1.))
+
+		# scale so that typical singular value of equilibrated matrix ~1
+		frobenius = np.sqrt(np.dot(d**2, A2 @ e**2))
+		if frobenius > 0:
+			scaling = np.sqrt(frobenius / np.sqrt(min(m, n)))
+			d /= scaling
+			e /= scaling
+
+		if sp.issparse(A):
+			A_equil = sp.diags(d) @ A @ sp.diags(e)
+			A_equil = A_equil.tocsr()
+		else:
+			A_equil = d[:, None] * A * e[None, :]
+		return A_equil, d, e
+
+	@staticmethod
+	def __factor(A_equil):
+		r"""
+		Cholesky factorization of projection onto graph of
+		:math:`\tilde A`.
+
+		Arguments:
+			A_equil: Equilibrated dose matrix.
+
+		Returns:
+			:class:`numpy.ndarray`: Lower triangular factor of
+			:math:`I + \tilde A^T \tilde A` if :math:`\tilde A` is tall,
+			or of :math:`I + \tilde A \tilde A^T` if it is wide.
+		"""
+		m, n = A_equil.shape
+		if m >= n:
+			gramian = A_equil.T @ A_equil
+		else:
+			gramian = A_equil @ A_equil.T
+		if sp.issparse(gramian):
+			gramian = gramian.toarray()
+		gramian = np.asarray(gramian)
+		gramian[np.diag_indices_from(gramian)] += 1.
+		return la.cholesky(gramian, lower=True)
+
+	def __project(self, x, y):
+		r"""
+		Project :math:`(x, y)` onto graph of equilibrated matrix.
+
+		Arguments:
+			x: Vector in beam space.
+			y: Vector in voxel space.
+
+		Returns:
+			:obj:`tuple`: Vectors :math:`(x', y')` closest to
+			:math:`(x, y)` with :math:`y' = \tilde Ax'`.
+		"""
+		A = self.__A_equil
+		m, n = A.shape
+		if m >= n:
+			x_proj = la.cho_solve((self.__L, True), x + A.T @ y)
+		else:
+			x_proj = x + A.T @ la.cho_solve((self.__L, True), y - A @ x)
+		return x_proj, A @ x_proj
+
+	def __load_cache(self, solver_cache, shape):
+		"""
+		Adopt equilibration and factorization from solver cache.
+
+		Arguments:
+			solver_cache (:obj:`dict`): Cache, as produced by
+				:attr:`SolverNumpy.cache` or
+				:attr:`~conrad.optimization.solver_optkit.SolverOptkit.cache`.
+			shape (:obj:`tuple`): Expected dimensions of the
+				equilibrated matrix.
+
+		Returns:
+			:obj:`bool`: ``True`` if cache matches the current problem
+			fingerprint and provided an equilibrated matrix and
+			preconditioners (and, if any, a factorization) of the
+			expected sizes; otherwise, nothing is adopted.
+		"""
+		if not self._Solver__valid_cache(solver_cache):
+			return False
+		A_equil = solver_cache.get('matrix', solver_cache.get('A_equil'))
+		d = solver_cache.get(
+				'left_preconditioner', solver_cache.get('d'))
+		e = solver_cache.get(
+				'right_preconditioner', solver_cache.get('e'))
+		projector = solver_cache.get('projector', {})
+		L = solver_cache.get(
+				'projector_matrix',
+				solver_cache.get('LLT', projector.get('matrix')))
+		if A_equil is None or d is None or e is None:
+			return False
+		if getattr(A_equil, 'shape', None) != shape:
+			return False
+		m, n = shape
+		d = np.asarray(d, dtype=float).reshape(-1)
+		e = np.asarray(e, dtype=float).reshape(-1)
+		if d.size != m or e.size != n:
+			return False
+		if L is not None:
+			L = np.asarray(L)
+			if L.shape != (min(m, n), min(m, n)):
+				return False
+		self.__A_equil = A_equil
+		self.__d = d
+		self.__e = e
+		self.__L = L
+		return True
+
+	def __build_voxel_objective(self, structures):
+		rows = sum([s.size if not s.collapsable else 1 for s in structures])
+		self.objective_voxels = SeparableObjective(rows)
+		self.__update_voxel_objective(structures)
+
+	def __update_voxel_objective(self, structures):
+		self._Solver__set_scaling(structures)
+		ptr = 0
+		for s in structures:
+			obj_sub = ObjectiveMethods.primal_expr_pogs(s, numpy=True)
+			self.objective_voxels.copy_from(obj_sub, ptr)
+			ptr += 1 if s.collapsable else s.size
+
+	def __build_beam_objective(self, structures):
+		cols = self._Solver__check_dimensions(structures)
+		self.objective_beams = SeparableObjective(cols, h='IndGe0')
+
+	def build(self, structures, solver_cache=None, **options):
+		"""
+		Build optimization problem from structure data.
+
+		Extract dose matrix, target doses, and objective weights from
+		structures, and update :attr:`SolverNumpy.objective_voxels`
+		and :attr:`SolverNumpy.objective_beams`. The dose matrix is
+		only equilibrated and factorized if the matrix gathered from
+		the structures has changed since the last build; otherwise, the
+		next solve resumes from the iterates of the previous solve.
+
+		Arguments:
+			structures: Iterable collection of :class:`Structure`
+				objects.
+			solver_cache (:obj:`dict`, optional): If provided, solver
+				will try to skip equilibration and factorization based
+				on provided data. Ignored if its fingerprint does not
+				match the problem built from ``structures``.
+			**options: Keyword arguments.
+
+		Returns:
+			:obj:`str`: String documenting how data in ``structures``
+			were parsed to form an optimization problem.
+
+		Raises:
+			ValueError: If :meth:`SolverNumpy.can_solve` returns
+				``False`` for ``structures``.
+		"""
+		if isinstance(structures, Anatomy):
+			structures = structures.list
+
+		if not self.can_solve(structures):
+			raise ValueError(
+					'SolverNumpy does not support dose constraints or '
+					'objectives without a function vector description')
+
+		self.__timing = {}
+		self._Solver__record_fingerprint(structures)
+		if self.__check_for_updates(structures) or self.__A_equil is None:
+			wall, cpu = time.perf_counter(), time.process_time()
+			A = self.__build_matrix(structures)
+			if not self.__load_cache(solver_cache, A.shape):
+				self.__A_equil, self.__d, self.__e = self.__equilibrate(A)
+				self.__L = None
+			if self.__L is None:
+				self.__L = self.__factor(self.__A_equil)
+			self.__state = None
+			self.__timing['setup'] = {
+					'wall': time.perf_counter() - wall,
+					'cpu': time.process_time() - cpu}
+
+		n_voxels, n_beams = self.__A_equil.shape
+		if self.objective_voxels is None or \
+				self.objective_voxels.size != n_voxels:
+			self.__build_voxel_objective(structures)
+		else:
+			self.__update_voxel_objective(structures)
+		if self.objective_beams is None or \
+				self.objective_beams.size != n_beams:
+			self.__build_beam_objective(structures)
+
+		return self._Solver__construction_report(structures)
+
+	@staticmethod
+	def __estimate_rho(f):
+		"""
+		Estimate ADMM penalty from scaled voxel objective.
+
+		Balance the magnitude of the objective's (sub)gradients, which
+		sets the scale of the dual variables, against the magnitude of
+		the doses at which the objective's kinks are located, which
+		sets the scale of the primal variables.
+
+		Arguments:
+			f (:class:`SeparableObjective`): Voxel objective, in
+				equilibrated, dose-scaled variables.
+
+		Returns:
+			:obj:`float`: Initial ADMM penalty.
+		"""
+		dual_scale = np.linalg.norm(f.c * np.abs(f.a) + np.abs(f.d))
+		primal_scale = np.linalg.norm(f.b / f.a)
+		if dual_scale > 0 and primal_scale > 0:
+			return float(dual_scale / primal_scale)
+		return RHO_DEFAULT
+
+	def __initial_state(self, x0=None, nu0=None):
+		"""
+		Initialize ADMM iterates in equilibrated, dose-scaled variables.
+
+		Arguments:
+			x0 (optional): Initial guess of beam intensities.
+			nu0 (optional): Initial guess of dual variable for
+				constraint :math:`y = Ax`.
+
+		Returns:
+			:obj:`dict`: Primal iterates ``x``, ``y`` and scaled dual
+			iterates ``xt``, ``yt``, resumed from the previous solve
+			where no guess is provided.
+
+		Raises:
+			ValueError: If ``x0`` or ``nu0`` is incorrectly sized.
+		"""
+		m, n = self.__A_equil.shape
+		scaling = self.global_dose_scaling
+		if self.__state is None:
+			state = {
+					'x': np.zeros(n), 'y': np.zeros(m),
+					'xt': np.zeros(n), 'yt': np.zeros(m)}
+		else:
+			state = self.__state
+		if x0 is not None:
+			x0 = np.asarray(x0, dtype=float).reshape(-1)
+			if x0.size != n:
+				raise ValueError(
+						'initial guess "x0" must have {} entries; '
+						'provided: {}'.format(n, x0.size))
+			state['x'] = x0 / (scaling * self.__e)
+			state['y'] = self.__A_equil @ state['x']
+		if nu0 is not None:
+			nu0 = np.asarray(nu0, dtype=float).reshape(-1)
+			if nu0.size != m:
+				raise ValueError(
+						'initial guess "nu0" must have {} entries; '
+						'provided: {}'.format(m, nu0.size))
+			state['yt'] = -nu0 * scaling / (self.__rho * self.__d)
+		return state
+
+	def solve(self, **options):
+		"""
+		Execute optimization of a previously built planning problem.
+
+		Arguments:
+			**options: Keyword arguments specifying solver options:
+				``abstol``, ``reltol``, ``maxiter`` (or ``maxiters``),
+				``verbose``, ``rho``, ``alpha``, initial guesses
+				``x0`` and ``nu0``, and ``callback``, a callable
+				invoked after each iteration with a dictionary of the
+				iteration count and the primal and dual residuals and
+				tolerances; an exception raised by ``callback``
+				aborts the solve. Other options are ignored.
+
+		Returns:
+			:obj:`bool`: ``True`` if solver converged.
+
+		Raises:
+			ValueError: If :meth:`SolverNumpy.build` has not been
+				called.
+		"""
+		if self.__A_equil is None or self.objective_voxels is None:
+			raise ValueError(
+					'no problem built; cannot perform treatment plan '
+					'optimization.\n Call SolverNumpy.build() at least '
+					'once to build a problem')
+
+		VERBOSE = bool(options.pop('verbose', VERBOSE_DEFAULT))
+		PRINT = println if VERBOSE else lambda msg : None
+		abstol = float(options.pop('abstol', ABSTOL_DEFAULT))
+		reltol = float(options.pop('reltol', RELTOL_DEFAULT))
+		maxiter = int(options.pop(
+				'maxiters', options.pop('maxiter', MAXITER_DEFAULT)))
+		alpha = float(options.pop('alpha', ALPHA_DEFAULT))
+		callback = options.pop('callback', None)
+
+		wall, cpu = time.perf_counter(), time.process_time()
+		A = self.__A_equil
+		m, n = A.shape
+		scaling = self.global_dose_scaling
+		f = self.objective_voxels.scaled(scaling / self.__d)
+		g = self.objective_beams.scaled(scaling * self.__e)
+		if self.__state is None:
+			self.__rho = self.__estimate_rho(f)
+		elif 'rho' in options:
+			# keep unscaled dual iterates fixed under change of penalty
+			self.__state['xt'] *= self.__rho / float(options['rho'])
+			self.__state['yt'] *= self.__rho / float(options['rho'])
+		rho = self.__rho = float(options.pop('rho', self.__rho))
+		state = self.__initial_state(
+				options.pop('x0', None), options.pop('nu0', None))
+		x, y, xt, yt = state['x'], state['y'], state['xt'], state['yt']
+		x12, y12 = x, y
+		sqrt_dim = np.sqrt(m + n)
+		converged = False
+		k = 0
+		PRINT('running solver...')
+
+		for k in xrange(1, maxiter + 1):
+			x12 = g.prox(x - xt, rho)
+			y12 = f.prox(y - yt, rho)
+			x12r = alpha * x12 + (1 - alpha) * x
+			y12r = alpha * y12 + (1 - alpha) * y
+			x_prev, y_prev = x, y
+			x, y = self.__project(x12r + xt, y12r + yt)
+			xt += x12r - x
+			yt += y12r - y
+
+			res_primal = np.sqrt(np.sum((x12 - x)**2) + np.sum((y12 - y)**2))
+			res_dual = rho * np.sqrt(
+					np.sum((x - x_prev)**2) + np.sum((y - y_prev)**2))
+			eps_primal = sqrt_dim * abstol + reltol * max(
+					np.sqrt(np.sum(x12**2) + np.sum(y12**2)),
+					np.sqrt(np.sum(x**2) + np.sum(y**2)))
+			eps_dual = sqrt_dim * abstol + reltol * rho * np.sqrt(
+					np.sum(xt**2) + np.sum(yt**2))
+			if k % 100 == 0:
+				PRINT('iter {}: primal residual {:.3e}, dual residual '
+					  '{:.3e}, rho {:.3e}'.format(
+					  k, res_primal, res_dual, rho))
+			if callback is not None:
+				callback({
+						'iteration': k,
+						'primal_residual': res_primal,
+						'dual_residual': res_dual,
+						'primal_tolerance': eps_primal,
+						'dual_tolerance': eps_dual,
+				})
+			if res_primal < eps_primal and res_dual < eps_dual:
+				converged = True
+				break
+
+		self.__rho = rho
+		self.__state = {'x': x, 'y': y, 'xt': xt, 'yt': yt}
+
+		x_out = scaling * self.__e * x12
+		y_out = scaling * (A @ x12) / self.__d
+		self.__output = {
+				'x': x_out,
+				'y': y_out,
+				'mu': rho * xt / (scaling * self.__e),
+				'nu': -rho * yt * self.__d / scaling,
+		}
+		self.__timing['solver'] = {
+				'wall': time.perf_counter() - wall,
+				'cpu': time.process_time() - cpu}
+		self.__info = {
+				'status': 'optimal' if converged else 'optimal_inaccurate',
+				'objective': self.objective_voxels.eval(y_out) +
+							 self.objective_beams.eval(x_out),
+				'iters': k,
+				'time': self.__timing['solver']['cpu'],
+		}
+
+		PRINT('status: {}'.format(self.__info['status']))
+		PRINT('optimal value: {}'.format(self.__info['objective']))
+		return converged
@@ -333,7 +333,7 @@ if module_installed('optkit'):
 							'LLT': None,
 					}
 			}
-			if isinstance(solver_cache, dict):
+			if self._Solver__valid_cache(solver_cache):
 				cache_options['solver_cache']['A_equil'] = solver_cache.pop(
 						'A_equil', solver_cache.pop('matrix', None))
 				cache_options['solver_cache']['d'] = solver_cache.pop(
@@ -386,7 +386,12 @@ if module_installed('optkit'):
 			"""
 			cols = self._Solver__check_dimensions(structures)
 			rows = sum([s.size if not s.collapsable else 1 for s in structures])
-			A = np.zeros((rows, cols))
+			# allocate in precision of structure matrices, e.g., single
+			# precision if all dose matrices are single precision
+			dtype = np.result_type(*[
+					s.A_mean.dtype if s.collapsable else s.A_full.dtype
+					for s in structures])
+			A = np.zeros((rows, cols), dtype=dtype)
 			CONRAD_DEBUG_PRINT('BUILT MATRIX SIZE: {}'.format(A.size))
 
 			ptr = 0
@@ -448,7 +453,9 @@ if module_installed('optkit'):
 					objects.
 				solver_cache (:obj:`dict`, optional): If provided,
 					solver will try to skip equilibration and
-					factorization based on provided data.
+					factorization based on provided data. Ignored if
+					its fingerprint does not match the problem built
+					from ``structures``.
 				**options: Keyword arguments.
 
 			Returns:
@@ -473,6 +480,7 @@ if module_installed('optkit'):
 					options.pop(
 							'double', not ok.api.backend.precision_is_32bit))
 
+			self._Solver__record_fingerprint(structures)
 			matrix_updated = self.__check_for_updates(structures)
 			if self.__A_current is None or matrix_updated:
 				A = self.__A_current = self.__build_matrix(structures)
@@ -556,8 +564,19 @@ if module_installed('optkit'):
 				self.pogs_solver.output.y *= self.global_dose_scaling
 			return self.pogs_solver.info.converged
 
+		@property
+		def cache_type(self):
+			""" Solver cache layout. """
+			return 'POGS'
+
 		@property
 		def cache(self):
+			"""
+			Equilibrated matrix, preconditioners and projector.
+
+			Dictionary with solver type and problem fingerprint, or
+			``None`` if no POGS solver has been built.
+			"""
 			if self.pogs_solver is None:
 				return None
 
@@ -568,6 +587,8 @@ if module_installed('optkit'):
 				projector_type = 'indirect'
 
 			return {
+					'solver': self.cache_type,
+					'fingerprint': self.fingerprint,
 					'matrix': cache.pop('A_equil'),
 					'left_preconditioner': cache.pop('d'),
 					'right_preconditioner': cache.pop('e'),
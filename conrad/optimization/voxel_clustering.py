@@ -1,4 +1,22 @@
 """
+Define :class:`VoxelClustering` for building voxel-clustered dose
+frames, and routines :func:`sketch_rows` and :func:`kmeans_minibatch`
+for clustering rows of dose matrices.
+
+Attributes:
+	COMPRESSION_DEFAULT (:obj:`float`): Default ratio of voxels to
+		voxel clusters in each structure.
+	SKETCH_DIMENSION_DEFAULT (:obj:`int`): Default number of random
+		projections of each dose matrix row compared during clustering.
+	BATCH_SIZE_DEFAULT (:obj:`int`): Default number of points sampled
+		per iteration of :func:`kmeans_minibatch`.
+	MAX_ITER_DEFAULT (:obj:`int`): Default number of iterations of
+		:func:`kmeans_minibatch`.
+	FLAT_CLUSTERS_MAX (:obj:`int`): Largest number of clusters formed
+		by :func:`kmeans_minibatch` without first partitioning the
+		points into groups.
+"""
+"""
 Copyright 2016 Baris Ungun, Anqi Fu
 
 This file is part of CONRAD.
@@ -16,3 +34,370 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
 """
+from conrad.compat import *
+
+import numpy as np
+import scipy.sparse as sp
+
+from conrad.abstract.mapping import ClusterMapping
+from conrad.physics.physics import DoseFrame, DoseFrameMapping, Physics
+
+COMPRESSION_DEFAULT = 10.
+SKETCH_DIMENSION_DEFAULT = 32
+BATCH_SIZE_DEFAULT = 1024
+MAX_ITER_DEFAULT = 100
+FLAT_CLUSTERS_MAX = 256
+
+# bound on number of point-to-center distances formed at once
+_ASSIGNMENT_BLOCK = 2**22
+# bound on number of times each point is sampled, on average
+_EPOCHS_MAX = 10
+
+def _nearest_centers(points, centers):
+	"""
+	Index of nearest center to each point, in Euclidean distance.
+
+	Distances are formed in blocks of points, to bound the memory
+	used when both the number of points and of centers are large.
+	"""
+	center_norms = np.sum(centers**2, axis=1)
+	assignments = np.zeros(points.shape[0], dtype=int)
+	block = max(1, _ASSIGNMENT_BLOCK // max(1, centers.shape[0]))
+	for start in xrange(0, points.shape[0], block):
+		distances = center_norms - 2 * points[start:start + block].dot(
+				centers.T)
+		assignments[start:start + block] = np.argmin(distances, axis=1)
+	return assignments
+
+def sketch_rows(matrix, dimension, random_state=None):
+	"""
+	Project rows of ``matrix`` onto random Gaussian directions.
+
+	Projections approximately preserve distances between rows, so that
+	rows can be compared at a cost that does not grow with the number
+	of columns.
+
+	Arguments:
+		matrix: Dense or sparse matrix.
+		dimension (:obj:`int`): Number of projections. Matrices with
+			no more columns are returned densified but otherwise
+			unchanged.
+		random_state (:class:`numpy.random.RandomState`, optional):
+			Source of randomness; if not provided, :mod:`numpy.random`
+			is used.
+
+	Returns:
+		:class:`numpy.ndarray`: Dense matrix with one row per row of
+		``matrix``.
+	"""
+	rng = np.random if random_state is None else random_state
+	if matrix.shape[1] <= dimension:
+		return matrix.toarray() if sp.issparse(matrix) else np.asarray(matrix)
+	projection = rng.standard_normal(
+			(matrix.shape[1], dimension)) / np.sqrt(dimension)
+	dtype = matrix.dtype if matrix.dtype.kind == 'f' else float
+	return np.asarray(matrix.dot(projection.astype(dtype)))
+
+def kmeans_minibatch(points, n_clusters, batch_size=BATCH_SIZE_DEFAULT,
+					 max_iter=MAX_ITER_DEFAULT, random_state=None):
+	"""
+	Cluster points with mini-batch :math:`k`-means.
+
+	Centers are initialized at distinct points drawn at random. Each
+	iteration assigns a random batch of points to their nearest
+	centers, and moves each center towards the mean of its assigned
+	points with a step size that decays with the number of points
+	the center has been assigned so far. All points are then
+	assigned to their nearest center.
+
+	Since each assignment compares every point with every center, if
+	more than :data:`FLAT_CLUSTERS_MAX` clusters are requested, the
+	points are first partitioned into about ``sqrt(n_clusters)``
+	groups, and each group is clustered separately with a share of
+	the clusters proportional to its size.
+
+	Arguments:
+		points: Dense matrix, with one row per point.
+		n_clusters (:obj:`int`): Maximum number of clusters.
+		batch_size (:obj:`int`, optional): Number of points sampled
+			per iteration.
+		max_iter (:obj:`int`, optional): Maximum number of iterations;
+			fewer are taken if the batches would otherwise sample each
+			point more than ten times on average.
+		random_state (:class:`numpy.random.RandomState`, optional):
+			Source of randomness; if not provided, :mod:`numpy.random`
+			is used.
+
+	Returns:
+		:class:`numpy.ndarray`: Vector assigning each point to a
+		cluster, with clusters numbered contiguously from zero. Fewer
+		than ``n_clusters`` clusters result if some centers attract no
+		points.
+
+	Raises:
+		ValueError: If ``n_clusters`` is not positive.
+	"""
+	rng = np.random if random_state is None else random_state
+	points = np.asarray(points)
+	m = points.shape[0]
+	n_clusters = int(n_clusters)
+	if n_clusters < 1:
+		raise ValueError('argument `n_clusters` must be positive')
+	if n_clusters >= m:
+		return np.arange(m, dtype=int)
+	if n_clusters > FLAT_CLUSTERS_MAX:
+		return _kmeans_grouped(
+				points, n_clusters, batch_size, max_iter, random_state)
+
+	dtype = points.dtype if points.dtype.kind == 'f' else float
+	centers = points[rng.choice(m, n_clusters, replace=False)].astype(dtype)
+	counts = np.zeros(n_clusters)
+	batch_size = min(int(batch_size), m)
+	max_iter = min(int(max_iter), int(np.ceil(_EPOCHS_MAX * m / batch_size)))
+
+	for _ in xrange(max_iter):
+		batch = points[rng.choice(m, batch_size, replace=False)]
+		assigned = _nearest_centers(batch, centers)
+		batch_counts = np.bincount(assigned, minlength=n_clusters)
+		updated = batch_counts > 0
+		sums = sp.csr_matrix(
+				(np.ones(batch_size, dtype=dtype),
+				 (assigned, np.arange(batch_size))),
+				shape=(n_clusters, batch_size)).dot(batch)
+		counts += batch_counts
+		# c <- c + (sum - n_batch * c) / n_total, i.e., the per-center
+		# learning rate 1 / n_total of the sequential update
+		centers[updated] += (
+				sums[updated] - batch_counts[updated, None] *
+				centers[updated]) / counts[updated, None]
+
+	return ClusterMapping(_nearest_centers(points, centers)).contiguous.vec
+
+def _kmeans_grouped(points, n_clusters, batch_size, max_iter, random_state):
+	""" Cluster groups of points formed by a coarse clustering. """
+	groups = kmeans_minibatch(
+			points, int(np.ceil(np.sqrt(n_clusters))), batch_size=batch_size,
+			max_iter=max_iter, random_state=random_state)
+	group_sizes = np.bincount(groups)
+	shares = np.maximum(1, np.round(
+			n_clusters * group_sizes / float(points.shape[0]))).astype(int)
+
+	assignments = np.zeros(points.shape[0], dtype=int)
+	offset = 0
+	for group, indices in DoseFrame.label_index(groups).items():
+		labels = kmeans_minibatch(
+				points[indices], shares[group], batch_size=batch_size,
+				max_iter=max_iter, random_state=random_state)
+		assignments[indices] = offset + labels
+		offset += labels.max() + 1
+	return assignments
+
+class VoxelClustering(object):
+	"""
+	Group voxels with similar dose-influence rows into clusters.
+
+	Voxels of each structure are clustered separately, so that every
+	cluster is labeled with a single structure. To compare voxels
+	cheaply, each dose matrix row is sketched by a fixed set of random
+	projections, and the sketches are clustered with
+	:func:`kmeans_minibatch`.
+
+	The resulting voxel-clustered :class:`~conrad.physics.DoseFrame`
+	has one row per cluster, equal to the mean of its voxels' rows, and
+	voxel weights equal to the cluster sizes, so that objectives
+	evaluated in the clustered frame approximate their values in the
+	full frame. Its beams are those of the full frame. A
+	:class:`~conrad.abstract.mapping.ClusterMapping` from full frame
+	voxels to clusters relates the frames, e.g., to upsample doses.
+
+	Attributes:
+		compression (:obj:`float`): Default ratio of voxels to
+			clusters in each structure.
+		sketch_dimension (:obj:`int`): Number of random projections
+			of each dose matrix row.
+		batch_size (:obj:`int`): Number of points sampled per
+			:math:`k`-means iteration.
+		max_iter (:obj:`int`): Number of :math:`k`-means iterations.
+	"""
+	def __init__(self, compression=COMPRESSION_DEFAULT,
+				 sketch_dimension=SKETCH_DIMENSION_DEFAULT,
+				 batch_size=BATCH_SIZE_DEFAULT, max_iter=MAX_ITER_DEFAULT,
+				 seed=None):
+		"""
+		Initialize :class:`VoxelClustering`.
+
+		Arguments:
+			compression (:obj:`float`, optional): Default ratio of
+				voxels to clusters in each structure.
+			sketch_dimension (:obj:`int`, optional): Number of random
+				projections of each dose matrix row.
+			batch_size (:obj:`int`, optional): Number of points sampled
+				per :math:`k`-means iteration.
+			max_iter (:obj:`int`, optional): Number of :math:`k`-means
+				iterations.
+			seed (:obj:`int`, optional): Seed of random number
+				generator, for reproducible clusterings.
+
+		Raises:
+			ValueError: If ``compression`` is less than one.
+		"""
+		if compression < 1:
+			raise ValueError('argument `compression` must be >= 1')
+		self.compression = float(compression)
+		self.sketch_dimension = int(sketch_dimension)
+		self.batch_size = int(batch_size)
+		self.max_iter = int(max_iter)
+		self.__random_state = np.random.RandomState(seed)
+
+	def sketch(self, matrix):
+		"""
+		Project rows of ``matrix`` onto random Gaussian directions.
+
+		Matrices with no more columns than
+		:attr:`VoxelClustering.sketch_dimension` are returned densified
+		but otherwise unchanged.
+
+		Arguments:
+			matrix: Dense or sparse matrix.
+
+		Returns:
+			:class:`numpy.ndarray`: Dense matrix with one row per row
+			of ``matrix``.
+		"""
+		return sketch_rows(
+				matrix, self.sketch_dimension, self.__random_state)
+
+	def cluster_rows(self, matrix, n_clusters):
+		"""
+		Cluster rows of ``matrix``.
+
+		Arguments:
+			matrix: Dense or sparse matrix.
+			n_clusters (:obj:`int`): Maximum number of clusters.
+
+		Returns:
+			:class:`~conrad.abstract.mapping.ClusterMapping`: Map from
+			rows of ``matrix`` to clusters.
+		"""
+		return ClusterMapping(kmeans_minibatch(
+				self.sketch(matrix), n_clusters, batch_size=self.batch_size,
+				max_iter=self.max_iter, random_state=self.__random_state))
+
+	def __n_clusters(self, label, size, clusters):
+		if clusters is not None and label in clusters:
+			n_clusters = int(clusters[label])
+			if n_clusters < 1:
+				raise ValueError(
+						'number of clusters requested for label {} must '
+						'be positive'.format(label))
+			return n_clusters
+		return int(np.ceil(size / self.compression))
+
+	def cluster_frame(self, frame, frame_name=None, clusters=None):
+		"""
+		Build voxel-clustered copy of ``frame``.
+
+		Arguments:
+			frame (:class:`~conrad.physics.DoseFrame`): Frame with
+				dose matrix and voxel labels.
+			frame_name (:obj:`str`, optional): Name of clustered frame;
+				by default, name of ``frame`` with suffix
+				``'_voxel_clusters'``.
+			clusters (:obj:`dict`, optional): Number of clusters for
+				structures, keyed by label. Structures not included
+				are compressed by :attr:`VoxelClustering.compression`.
+
+		Returns:
+			:obj:`tuple`: Clustered
+			:class:`~conrad.physics.DoseFrame`, and
+			:class:`~conrad.abstract.mapping.ClusterMapping` from voxels
+			of ``frame`` to voxels of clustered frame.
+
+		Raises:
+			TypeError: If ``frame`` is not a
+				:class:`~conrad.physics.DoseFrame`.
+			ValueError: If ``frame`` lacks a dose matrix or voxel
+				labels.
+		"""
+		if not isinstance(frame, DoseFrame):
+			raise TypeError(
+					'argument `frame` must be of type {}'.format(DoseFrame))
+		if frame.dose_matrix is None or frame.voxel_labels is None:
+			raise ValueError(
+					'argument `frame` must have a dose matrix and voxel '
+					'labels to cluster voxels')
+
+		cluster_vector = np.zeros(frame.voxels, dtype=int)
+		labels, blocks, weights = [], [], []
+		offset = 0
+		for label, indices in sorted(
+				DoseFrame.label_index(frame.voxel_labels).items()):
+			submatrix = frame.submatrix(label)
+			mapping = self.cluster_rows(
+					submatrix, self.__n_clusters(label, indices.size, clusters))
+			cluster_vector[indices] = offset + mapping.vec
+			offset += mapping.n_clusters
+			labels.append(label * np.ones(mapping.n_clusters, dtype=int))
+			blocks.append(mapping.downsample(submatrix))
+			weights.append(mapping.cluster_weights)
+
+		if all(sp.issparse(block) for block in blocks):
+			dose_matrix = sp.vstack(blocks, format='csr')
+		else:
+			dose_matrix = np.vstack([
+					block.toarray() if sp.issparse(block) else block
+					for block in blocks])
+
+		if frame_name is None:
+			frame_name = frame.name + '_voxel_clusters'
+		clustered = DoseFrame(
+				data=dose_matrix, voxel_labels=np.hstack(labels),
+				voxel_weights=np.hstack(weights).astype(int),
+				frame_name=frame_name)
+		if frame.beam_labels is not None:
+			clustered.beam_labels = frame.beam_labels
+		if frame.beam_weights is not None and frame.beam_weights.data is not None:
+			clustered.beam_weights = frame.beam_weights.data
+		return clustered, ClusterMapping(cluster_vector)
+
+	def cluster_physics(self, physics, frame_name=None, clusters=None,
+						source_frame=None):
+		"""
+		Add voxel-clustered frame and frame mapping to ``physics``.
+
+		The clustered frame is built from a frame of ``physics`` as in
+		:meth:`VoxelClustering.cluster_frame`, and added to
+		``physics`` with a :class:`~conrad.physics.DoseFrameMapping`
+		whose source is the full frame and whose target is the
+		clustered frame. The active frame of ``physics`` is unchanged.
+
+		Arguments:
+			physics (:class:`~conrad.physics.Physics`): Physics to
+				which to add clustered frame.
+			frame_name (:obj:`str`, optional): Name of clustered frame.
+			clusters (:obj:`dict`, optional): Number of clusters for
+				structures, keyed by label.
+			source_frame (:obj:`str`, optional): Name of frame to
+				cluster; by default, the active frame of ``physics``.
+
+		Returns:
+			:class:`~conrad.physics.DoseFrame`: Clustered frame.
+
+		Raises:
+			TypeError: If ``physics`` is not a
+				:class:`~conrad.physics.Physics`.
+		"""
+		if not isinstance(physics, Physics):
+			raise TypeError(
+					'argument `physics` must be of type {}'.format(Physics))
+		if source_frame is None:
+			frame = physics.frame
+		else:
+			frame = physics.retrieve_frame(source_frame)
+
+		clustered, voxel_map = self.cluster_frame(
+				frame, frame_name=frame_name, clusters=clusters)
+		physics.add_dose_frame(clustered.name, dose_frame=clustered)
+		physics.add_frame_mapping(DoseFrameMapping(
+				frame.name, clustered.name, voxel_map=voxel_map))
+		return clustered
@@ -260,6 +260,11 @@ class FluenceMap(AbstractBeam):
 		""" Number of beamlets in fluence map. """
 		return self.__bixel_grid.bixels
 
+	@property
+	def bixel_grid(self):
+		""" :class:`BixelGrid` on which beamlets are arranged. """
+		return self.__bixel_grid
+
 	# TODO: methods for converting to aperture
 
 class BeamSet(AbstractBeam):
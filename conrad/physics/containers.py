@@ -20,9 +20,9 @@ from conrad.compat import *
 
 import numpy as np
 
-from conrad.defs import vec
+from conrad.defs import vec, sparse_or_dense
 from conrad.abstract.vector import SliceCachingVector
-from conrad.abstract.matrix import SliceCachingMatrix
+from conrad.abstract.matrix import SliceCachingMatrix, QuantizedMatrix
 
 class WeightVector(SliceCachingVector):
 	def __init__(self, data):
@@ -43,8 +43,23 @@ class WeightVector(SliceCachingVector):
 		return self.data is not None and np.sum(self.data == 1) == self.size
 
 class DoseMatrix(SliceCachingMatrix):
-	def __init__(self, data):
-		SliceCachingMatrix.__init__(self, data)
+	def __init__(self, data, cache_budget=None, dtype=None):
+		"""
+		Initialize :class:`DoseMatrix`.
+
+		Arguments:
+			data: Contiguous dose matrix, which may be a
+				:class:`~conrad.abstract.matrix.QuantizedMatrix`, or
+				dictionary of labeled submatrices.
+			cache_budget (:obj:`int`, optional): Maximum number of
+				bytes held by derived slices.
+			dtype (optional): Floating point type of dose matrix, e.g.,
+				:obj:`numpy.float32` for single precision. If provided,
+				matrices assigned as data are cast to this type;
+				otherwise their type is retained.
+		"""
+		self.__dtype = None if dtype is None else np.dtype(dtype)
+		SliceCachingMatrix.__init__(self, data, cache_budget=cache_budget)
 
 	def __contains__(self, comparator):
 		if isinstance(comparator, tuple):
@@ -53,6 +68,19 @@ class DoseMatrix(SliceCachingMatrix):
 					isinstance(item, str) else item for item in comparator)
 		return SliceCachingMatrix.__contains__(self, comparator)
 
+	@staticmethod
+	def __slice_kind(kind):
+		return kind.replace('voxel', 'row').replace('beam', 'column')
+
+	def pin(self, label, kind='voxel'):
+		return SliceCachingMatrix.pin(self, label, self.__slice_kind(kind))
+
+	def unpin(self, label, kind='voxel'):
+		return SliceCachingMatrix.unpin(self, label, self.__slice_kind(kind))
+
+	def evict(self, label=None, kind='voxel'):
+		return SliceCachingMatrix.evict(self, label, self.__slice_kind(kind))
+
 	@property
 	def voxel_dim(self):
 		return self.row_dim
@@ -61,11 +89,34 @@ class DoseMatrix(SliceCachingMatrix):
 	def beam_dim(self):
 		return self.column_dim
 
+	@property
+	def dtype(self):
+		""" Data type of dose matrix, or ``None`` if no data set. """
+		if self.__dtype is not None:
+			return self.__dtype
+		if self.data is not None:
+			return self.data.dtype
+		for kind in ('row', 'column'):
+			for submatrix in self._SliceCachingMatrix__slices(kind).values():
+				return submatrix.dtype
+		return None
+
+	def __cast(self, matrix):
+		castable = sparse_or_dense(matrix) or isinstance(
+				matrix, QuantizedMatrix)
+		if self.__dtype is None or not castable:
+			return matrix
+		if matrix.dtype == self.__dtype:
+			return matrix
+		return matrix.astype(self.__dtype)
+
 	def _preprocess_data(self, data):
-		if isinstance(data, dict) and 'labeled_by' in data:
-			data['labeled_by'] = data['labeled_by'].replace(
-					'voxels', 'rows').replace('beams', 'columns')
-		return data
+		if isinstance(data, dict):
+			if 'labeled_by' in data:
+				data['labeled_by'] = data['labeled_by'].replace(
+						'voxels', 'rows').replace('beams', 'columns')
+			return {k: self.__cast(v) for k, v in data.items()}
+		return self.__cast(data)
 
 	def voxel_slice(self, label, indices):
 		return self.row_slice(label, indices)
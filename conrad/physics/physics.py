@@ -71,7 +71,7 @@ class DoseFrame(object):
 
 	def __init__(self, voxels=None, beams=None, data=None, voxel_labels=None,
 				 beam_labels=None, voxel_weights=None, beam_weights=None,
-				 frame_name=None):
+				 frame_name=None, dtype=None):
 		"""
 		Initialize :class:`DoseFrame`.
 
@@ -89,6 +89,11 @@ class DoseFrame(object):
 			beam_weights (optional): Vector of weights, e.g., number of
 				beams in each cluster if working in a beam-clustered
 				frame.
+			frame_name (:obj:`str`, optional): Name of frame.
+			dtype (optional): Floating point type of dose matrix. If
+				provided, e.g., as :obj:`numpy.float32`, dose matrices
+				assigned to the frame are cast to this type; otherwise,
+				the type of the assigned matrix is retained.
 
 		Raises:
 			ValueError: If dimensions implied by arguments are
@@ -96,9 +101,12 @@ class DoseFrame(object):
 		"""
 		self.__voxels = np.nan
 		self.__beams = np.nan
+		self.__dtype = None if dtype is None else np.dtype(dtype)
 		self.__dose_matrix = None
 		self.__voxel_labels = None
 		self.__beam_labels = None
+		self.__voxel_label_index = None
+		self.__beam_label_index = None
 		self.__voxel_weights = None
 		self.__beam_weights = None
 		self.__name = 'unnamed_frame'
@@ -182,7 +190,7 @@ class DoseFrame(object):
 
 	@dose_matrix.setter
 	def dose_matrix(self, data):
-		mat = DoseMatrix(data)
+		mat = DoseMatrix(data, dtype=self.__dtype)
 
 		if self.voxels not in (None, np.nan):
 			if mat.voxel_dim != self.voxels:
@@ -256,7 +264,7 @@ class DoseFrame(object):
 
 		Setter will also use dimension of input vector to set voxel
 		dimensions (:attr:`DoseFrame.voxels`) if not already assigned at
-		call time.
+		call time, and invalidate the frame's index of voxels by label.
 
 		Raises:
 			ValueError: If provided vector dimensions inconsistent with
@@ -273,6 +281,7 @@ class DoseFrame(object):
 							 'number of voxels in frame ({})'
 							 ''.format(len(voxel_labels), self.voxels))
 		self.__voxel_labels = vec(voxel_labels).astype(int)
+		self.__voxel_label_index = None
 
 	@property
 	def beam_labels(self):
@@ -281,7 +290,7 @@ class DoseFrame(object):
 
 		Setter will also use dimension of input vector to set beam
 		dimensions (:attr:`DoseFrame.beams`) if not already assigned at
-		call time.
+		call time, and invalidate the frame's index of beams by label.
 
 		Raises:
 			ValueError: If provided vector dimensions inconsistent with
@@ -298,6 +307,7 @@ class DoseFrame(object):
 							 'number of beams in frame ({})'
 							 ''.format(len(beam_labels), self.beams))
 		self.__beam_labels = vec(beam_labels).astype(int)
+		self.__beam_label_index = None
 
 	@property
 	def voxel_weights(self):
@@ -392,25 +402,99 @@ class DoseFrame(object):
 			raise ValueError('`{}.{}` not set, retrieval by label '
 							 'impossible'.format(DoseFrame, vector_name))
 
-		indices = listmap(lambda x: x[0], listfilter(
-				lambda x: x[1] == label, enumerate(label_vector)))
+		indices = np.flatnonzero(vec(label_vector) == label)
 		if len(indices) == 0:
 			raise KeyError('label {} not found in entries of field '
 						   '"{}"'.format(label, vector_name))
 
-		return vec(indices)
+		return indices
+
+	@staticmethod
+	def label_index(label_vector):
+		"""
+		Group indices of vector entries by value.
+
+		Entries are grouped with a stable sort of ``label_vector``,
+		so that the indices in each group are in ascending order.
+
+		Arguments:
+			label_vector: Vector of labels.
+
+		Returns:
+			:obj:`dict`: Dictionary, keyed by the unique values in
+			``label_vector``, of read-only vectors of indices at which
+			the entries of ``label_vector`` take each value; empty if
+			``label_vector`` is empty.
+		"""
+		label_vector = vec(label_vector)
+		if label_vector.size == 0:
+			return {}
+		order = np.argsort(label_vector, kind='mergesort')
+		order.flags.writeable = False
+		sorted_labels = label_vector[order]
+		offsets = np.flatnonzero(np.diff(sorted_labels)) + 1
+		starts = np.hstack(([0], offsets))
+		ends = np.hstack((offsets, [label_vector.size]))
+		return {
+				sorted_labels[start].item(): order[start:end]
+				for start, end in zip(starts, ends)
+		}
+
+	@staticmethod
+	def __lookup_in_index(label_index, label, vector_name):
+		"""
+		Retrieve indices from label index built by
+		:meth:`DoseFrame.label_index`.
+
+		Raises:
+			KeyError: If ``label`` not in ``label_index``.
+		"""
+		if label not in label_index:
+			raise KeyError('label {} not found in entries of field '
+						   '"{}"'.format(label, vector_name))
+		return label_index[label]
 
 	def voxel_lookup_by_label(self, label):
 		"""
 		Get indices of voxels labeled ``label`` in this :class:`DoseFrame`.
+
+		Indices are served from an index of voxels by label, built on
+		the first lookup after :attr:`DoseFrame.voxel_labels` is
+		assigned. The returned vector is shared with the index, and
+		should not be modified.
+
+		Raises:
+			ValueError: If :attr:`DoseFrame.voxel_labels` not set.
+			KeyError: If ``label`` not found in voxel labels.
 		"""
-		return self.indices_by_label(self.voxel_labels, label, 'voxel_labels')
+		if self.voxel_labels is None:
+			raise ValueError('`{}.{}` not set, retrieval by label '
+							 'impossible'.format(DoseFrame, 'voxel_labels'))
+		if self.__voxel_label_index is None:
+			self.__voxel_label_index = self.label_index(self.voxel_labels)
+		return self.__lookup_in_index(
+				self.__voxel_label_index, label, 'voxel_labels')
 
 	def beam_lookup_by_label(self, label):
 		"""
 		Get indices of beam labeled ``label`` in this :class:`DoseFrame`.
+
+		Indices are served from an index of beams by label, built on
+		the first lookup after :attr:`DoseFrame.beam_labels` is
+		assigned. The returned vector is shared with the index, and
+		should not be modified.
+
+		Raises:
+			ValueError: If :attr:`DoseFrame.beam_labels` not set.
+			KeyError: If ``label`` not found in beam labels.
 		"""
-		return self.indices_by_label(self.beam_labels, label, 'beam_labels')
+		if self.beam_labels is None:
+			raise ValueError('`{}.{}` not set, retrieval by label '
+							 'impossible'.format(DoseFrame, 'beam_labels'))
+		if self.__beam_label_index is None:
+			self.__beam_label_index = self.label_index(self.beam_labels)
+		return self.__lookup_in_index(
+				self.__beam_label_index, label, 'beam_labels')
 
 	def submatrix(self, voxel_label=None, beam_label=None):
 		if self.dose_matrix is None:
@@ -426,6 +510,107 @@ class DoseFrame(object):
 		return str('Dose Frame: {} VOXELS by {} BEAMS'.format(
 				self.voxels, self.beams))
 
+class LazyDoseFrame(DoseFrame):
+	"""
+	:class:`DoseFrame` with data loaded on first access.
+
+	Frame dimensions and name are assigned at initialization. The dose
+	matrix, labels and weights are populated by a loader the first time
+	any of them is accessed or assigned, and held by the frame
+	thereafter.
+	"""
+
+	def __init__(self, loader, voxels=None, beams=None, frame_name=None):
+		"""
+		Initialize :class:`LazyDoseFrame`.
+
+		Arguments:
+			loader: Callable that takes the frame as its only argument
+				and assigns the frame's data.
+			voxels (int, optional): Number of voxels in frame.
+			beams (int, optional): Number of beams in frame.
+			frame_name (:obj:`str`, optional): Name of frame.
+		"""
+		self.__loader = None
+		DoseFrame.__init__(
+				self, voxels=voxels, beams=beams, frame_name=frame_name)
+		self.__loader = loader
+
+	@property
+	def loaded(self):
+		""" ``True`` if frame data has been loaded. """
+		return self.__loader is None
+
+	def load(self):
+		"""
+		Load frame data, if not already loaded.
+
+		Returns:
+			None
+		"""
+		if self.__loader is not None:
+			loader, self.__loader = self.__loader, None
+			try:
+				loader(self)
+			except:
+				self.__loader = loader
+				raise
+
+	@property
+	def dose_matrix(self):
+		""" Dose matrix; triggers data load. """
+		self.load()
+		return DoseFrame.dose_matrix.fget(self)
+
+	@dose_matrix.setter
+	def dose_matrix(self, data):
+		self.load()
+		DoseFrame.dose_matrix.fset(self, data)
+
+	@property
+	def voxel_labels(self):
+		""" Vector of voxel labels; triggers data load. """
+		self.load()
+		return DoseFrame.voxel_labels.fget(self)
+
+	@voxel_labels.setter
+	def voxel_labels(self, voxel_labels):
+		self.load()
+		DoseFrame.voxel_labels.fset(self, voxel_labels)
+
+	@property
+	def beam_labels(self):
+		""" Vector of beam labels; triggers data load. """
+		self.load()
+		return DoseFrame.beam_labels.fget(self)
+
+	@beam_labels.setter
+	def beam_labels(self, beam_labels):
+		self.load()
+		DoseFrame.beam_labels.fset(self, beam_labels)
+
+	@property
+	def voxel_weights(self):
+		""" Vector of voxel weights; triggers data load. """
+		self.load()
+		return DoseFrame.voxel_weights.fget(self)
+
+	@voxel_weights.setter
+	def voxel_weights(self, voxel_weights):
+		self.load()
+		DoseFrame.voxel_weights.fset(self, voxel_weights)
+
+	@property
+	def beam_weights(self):
+		""" Vector of beam weights; triggers data load. """
+		self.load()
+		return DoseFrame.beam_weights.fget(self)
+
+	@beam_weights.setter
+	def beam_weights(self, beam_weights):
+		self.load()
+		DoseFrame.beam_weights.fset(self, beam_weights)
+
 class DoseFrameMapping(object):
 	def __init__(self, source_name, target_name, voxel_map=None, beam_map=None):
 		self.__source = str(source_name)
@@ -636,6 +821,17 @@ class Physics(object):
 		self.__dose_frame = self.__frames[key]
 		self.__FRAME_LOAD_FLAG = False
 
+	def retrieve_frame(self, key):
+		"""
+		Get dose frame attached to :class:`Physics`, without activating it.
+
+		Raises:
+			KeyError: If no frame attached with key ``key``.
+		"""
+		if not key in self.__frames:
+			raise KeyError('no dose data frame found for key {}'.format(key))
+		return self.__frames[key]
+
 	@property
 	def available_frames(self):
 		"""
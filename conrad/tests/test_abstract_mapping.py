@@ -22,6 +22,7 @@ along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
 from conrad.compat import *
 
 import numpy as np
+import scipy.sparse as sp
 
 from conrad.abstract.mapping import *
 from conrad.tests.base import *
@@ -156,6 +157,61 @@ class DiscreteMappingTestCase(ConradTestCase):
 		with self.assertRaises(ValueError):
 			dmap.frame1_to_0_inplace(vec_1, np.zeros(2 * dmap.n_frame0))
 
+	def test_discrete_mapping_matrix(self):
+		dmap = DiscreteMapping([2, 0, 2, 1, 4])
+		C = dmap.matrix
+		self.assertIsInstance( C, sp.csr_matrix )
+		self.assertEqual( C.shape, (dmap.n_frame1, dmap.n_frame0) )
+		self.assertIs( dmap.matrix, C )
+		expect = np.zeros((dmap.n_frame1, dmap.n_frame0))
+		expect[dmap.vec, np.arange(dmap.n_frame0)] = 1
+		self.assert_vector_equal( C.toarray(), expect )
+
+	def test_discrete_mapping_sparse(self):
+		dmap = DiscreteMapping([2, 0, 2, 1, 4, 1])
+		n = 7
+		mat_0 = sp.rand(dmap.n_frame0, n, 0.5, format='csr')
+		mat_1 = sp.rand(dmap.n_frame1, n, 0.5, format='csr')
+
+		for fmt in ('csr', 'csc'):
+			in_0 = mat_0.asformat(fmt)
+			in_1 = mat_1.asformat(fmt)
+
+			out_1 = dmap.frame0_to_1(in_0)
+			self.assertEqual( out_1.format, fmt )
+			self.assert_vector_equal(
+					out_1.toarray(), dmap.frame0_to_1(in_0.toarray()) )
+			out_0 = dmap.frame1_to_0(in_1)
+			self.assertEqual( out_0.format, fmt )
+			self.assert_vector_equal(
+					out_0.toarray(), dmap.frame1_to_0(in_1.toarray()) )
+
+			# sparse input, dense output
+			out_1 = np.ones((dmap.n_frame1, n))
+			dmap.frame0_to_1_inplace(in_0, out_1)
+			self.assert_vector_equal(
+					out_1, 1 + dmap.frame0_to_1(in_0.toarray()) )
+			out_0 = np.ones((dmap.n_frame0, n))
+			dmap.frame1_to_0_inplace(in_1, out_0)
+			self.assert_vector_equal(
+					out_0, 1 + dmap.frame1_to_0(in_1.toarray()) )
+
+			with self.assertRaises(TypeError):
+				dmap.frame0_to_1_inplace(in_0, in_1)
+			with self.assertRaises(ValueError):
+				dmap.frame0_to_1(in_1)
+			with self.assertRaises(ValueError):
+				dmap.frame1_to_0(in_0)
+
+		# precision of input retained
+		self.assertEqual( dmap.frame0_to_1(
+				np.random.rand(dmap.n_frame0).astype(np.float32)).dtype,
+				np.float32 )
+		self.assertEqual( dmap.frame1_to_0(
+				mat_1.astype(np.float32)).dtype, np.float32 )
+		self.assertEqual( dmap.frame0_to_1(
+				np.arange(dmap.n_frame0)).dtype, np.float64 )
+
 class ClusterMappingTestCase(ConradTestCase):
 	def test_cluster_mapping_init(self):
 		cmap = ClusterMapping([1, 2, 2, 3, 3, 3])
@@ -274,6 +330,26 @@ class ClusterMappingTestCase(ConradTestCase):
 		ro = cmap.downsample(cmap.upsample(ri))
 		self.assert_vector_equal( ri, ro )
 
+	def test_cluster_mapping_sparse(self):
+		cmap = ClusterMapping([0, 1, 1, 2, 2, 2, 4])
+		n = 5
+		pts = sp.rand(cmap.n_points, n, 0.6, format='csr')
+		clus = sp.rand(cmap.n_clusters, n, 0.6, format='csr')
+
+		for fmt in ('csr', 'csc'):
+			for rescale in (True, False):
+				down = cmap.downsample(pts.asformat(fmt), rescale_output=rescale)
+				self.assertEqual( down.format, fmt )
+				self.assert_vector_equal(
+						down.toarray(), cmap.downsample(
+								pts.toarray(), rescale_output=rescale) )
+
+				up = cmap.upsample(clus.asformat(fmt), rescale_output=rescale)
+				self.assertEqual( up.format, fmt )
+				self.assert_vector_equal(
+						up.toarray(), cmap.upsample(
+								clus.toarray(), rescale_output=rescale) )
+
 	def test_cluster_mapping_to_contiguous(self):
 		cmap = ClusterMapping([0, 1, 1, 2])
 		self.assertIs( cmap.contiguous, cmap )
@@ -51,14 +51,136 @@ class SparseMatrixSlicingTestCase(ConradTestCase):
 		# 10 rows or columns
 		indices = [1, 4, 7, 12, 19, 22, 25, 34, 37, 38]
 
-		# A_csr_sub = csx_slice_uncompressed(A_csr, indices)
-		# A_csr_sub_check = A_csr[:, indices]
-		# self.assertEqual( (A_csr_sub - A_csr_sub_check).nnz, 0 )
+		A_csr_sub = csx_slice_uncompressed(A_csr, indices)
+		A_csr_sub_check = A_csr[:, indices]
+		self.assertEqual( (A_csr_sub - A_csr_sub_check).nnz, 0 )
 
 		A_csc_sub = csx_slice_uncompressed(A_csc, indices)
 		A_csc_sub_check = A_csc[indices, :]
 		self.assertEqual( (A_csc_sub - A_csc_sub_check).nnz, 0 )
 
+	def test_csx_slice_vs_scipy(self):
+		m = 200
+		n = 150
+		A_csr = sp.rand(m, n, 0.1).tocsr()
+		A_csc = A_csr.tocsc()
+
+		rows = np.sort(np.random.choice(m, 37, replace=False))
+		columns = np.sort(np.random.choice(n, 23, replace=False))
+
+		for A in (A_csr, A_csc):
+			sub_rows = csx_slice_compressed(A, rows) if \
+					isinstance(A, sp.csr_matrix) else \
+					csx_slice_uncompressed(A, rows)
+			sub_columns = csx_slice_uncompressed(A, columns) if \
+					isinstance(A, sp.csr_matrix) else \
+					csx_slice_compressed(A, columns)
+			self.assertIsInstance( sub_rows, type(A) )
+			self.assertIsInstance( sub_columns, type(A) )
+			self.assert_vector_equal(
+					sub_rows.toarray(), A[rows, :].toarray() )
+			self.assert_vector_equal(
+					sub_columns.toarray(), A[:, columns].toarray() )
+
+		# empty slices and unsorted compressed indices
+		self.assertEqual( csx_slice_compressed(A_csr, []).shape, (0, n) )
+		self.assertEqual( csx_slice_uncompressed(A_csr, []).nnz, 0 )
+		unsorted = rows[::-1]
+		self.assert_vector_equal(
+				csx_slice_compressed(A_csr, unsorted).toarray(),
+				A_csr[unsorted, :].toarray() )
+
+class QuantizedMatrixTestCase(ConradTestCase):
+	def test_quantized_mat_init(self):
+		m, n = 50, 40
+		A = sp.rand(m, n, 0.3, format='csc')
+		for A_ in (A.toarray(), A.tocsr(), A):
+			Q = QuantizedMatrix(A_)
+			self.assertEqual( Q.shape, (m, n) )
+			self.assertEqual( Q.bits, 16 )
+			self.assertEqual( Q.codes.dtype, np.uint16 )
+			self.assertEqual( Q.dtype, A.dtype )
+			self.assertEqual( Q.layout_CSR, not isinstance(A_, sp.csc_matrix) )
+			self.assertEqual( Q.scales.size, n )
+
+			# entries within half a quantization step
+			A_back = Q.decompress()
+			self.assertIsInstance( A_back, sp.csr_matrix if Q.layout_CSR
+								   else sp.csc_matrix )
+			error = np.abs(A_back.toarray() - A.toarray())
+			self.assertTrue( np.all(error <= 0.5 * Q.scales + 1e-15) )
+
+		Q = QuantizedMatrix(A, bits=8, dtype=np.float32)
+		self.assertEqual( Q.codes.dtype, np.uint8 )
+		self.assertEqual( Q.decompress().dtype, np.float32 )
+		self.assertLess( Q.nbytes, QuantizedMatrix(A).nbytes )
+		Q32 = QuantizedMatrix(A).astype(np.float32)
+		self.assertEqual( Q32.dtype, np.float32 )
+
+		# small entries dropped
+		Q = QuantizedMatrix(A, threshold=0.5)
+		self.assertLess( Q.nnz, A.nnz )
+		column_max = A.max(axis=0).toarray().ravel()
+		A_back = Q.decompress().toarray()
+		self.assertTrue( np.all(
+				A_back[A_back > 0] >= 0.5 * column_max[
+				np.nonzero(A_back > 0)[1]] - Q.scales[
+				np.nonzero(A_back > 0)[1]]) )
+
+		# from arrays
+		Q2 = QuantizedMatrix(
+				(Q.codes, Q.indices, Q.pointers, Q.scales), shape=Q.shape,
+				layout_CSR=Q.layout_CSR)
+		self.assertTrue( np.shares_memory(Q2.codes, Q.codes) )
+		self.assertEqual( Q2.dtype, np.float32 )
+		with self.assertRaises(ValueError):
+			QuantizedMatrix((Q.codes, Q.indices, Q.pointers, Q.scales))
+		with self.assertRaises(TypeError):
+			QuantizedMatrix(
+					(Q.codes.astype(float), Q.indices, Q.pointers, Q.scales),
+					shape=Q.shape)
+
+		with self.assertRaises(TypeError):
+			QuantizedMatrix(np.random.rand(m))
+		with self.assertRaises(ValueError):
+			QuantizedMatrix(A, bits=12)
+		with self.assertRaises(ValueError):
+			QuantizedMatrix(A, threshold=1)
+		with self.assertRaises(ValueError):
+			QuantizedMatrix(-A)
+
+	def test_quantized_mat_products(self):
+		m, n = 200, 50
+		A = sp.rand(m, n, 0.2, format='csr')
+		x = np.random.rand(n)
+		y = np.random.rand(m)
+		for Q in (QuantizedMatrix(A), QuantizedMatrix(A.tocsc()),
+				  QuantizedMatrix(A, dtype=np.float32)):
+			Ax = Q.dot(x)
+			self.assertEqual( Ax.dtype, Q.dtype )
+			self.assert_vector_equal( Ax, A.dot(x), 1e-4, 1e-4 )
+			self.assert_vector_equal(
+					Q.dot(np.vstack((x, x)).T)[:, 1], Ax, 1e-6, 1e-6 )
+			self.assert_vector_equal(
+					Q.dot_transpose(y), A.T.dot(y), 1e-4, 1e-4 )
+
+			with self.assertRaises(ValueError):
+				Q.dot(y)
+			with self.assertRaises(ValueError):
+				Q.dot_transpose(x)
+
+	def test_quantized_mat_slice(self):
+		m, n = 50, 40
+		A = sp.rand(m, n, 0.3, format='csr')
+		rows = [3, 7, 12, 40]
+		columns = [0, 5, 9, 33, 39]
+		for Q in (QuantizedMatrix(A), QuantizedMatrix(A.tocsc())):
+			A_back = Q.decompress().toarray()
+			self.assert_vector_equal(
+					Q.row_slice(rows).toarray(), A_back[rows, :] )
+			self.assert_vector_equal(
+					Q.column_slice(columns).toarray(), A_back[:, columns] )
+
 class SliceCachingMatrixTestCase(ConradTestCase):
 	def test_sc_mat_init_attr(self):
 		m, n = 20, 10
@@ -280,3 +402,75 @@ class SliceCachingMatrixTestCase(ConradTestCase):
 			else:
 				self.assertEqual(
 					(F.slice(row_label=0, column_label=0) - A_sub_vb).nnz, 0 )
+
+	def test_sc_mat_cache_budget(self):
+		m, n = 30, 40
+		A = np.random.rand(m, n)
+		rows = [1, 5, 8, 15, 20, 22]
+		columns = [1, 5, 8, 15]
+		row_bytes = A[rows, :].nbytes
+		column_bytes = A[:, columns].nbytes
+
+		D = SliceCachingMatrix(A)
+		self.assertIsNone( D.cache_budget )
+		D.row_slice(0, rows)
+		D.row_slice(0, rows)
+		D.column_slice(0, columns)
+		stats = D.cache_stats
+		self.assertEqual( stats['hits'], 1 )
+		self.assertEqual( stats['misses'], 2 )
+		self.assertEqual( stats['entries'], 2 )
+		self.assertEqual( stats['bytes'], row_bytes + column_bytes )
+
+		# least recently used slice evicted when budget lowered
+		D.row_slice(0, rows)
+		D.cache_budget = row_bytes
+		self.assertIn( ('row', 0), D )
+		self.assertNotIn( ('column', 0), D )
+		self.assertEqual( D.cache_stats['evictions'], 1 )
+
+		# pinned slices are retained over budget
+		D.pin(0, 'row')
+		D.column_slice(0, columns)
+		self.assertIn( ('row', 0), D )
+		self.assertNotIn( ('column', 0), D )
+		D.unpin(0, 'row')
+		self.assertIn( ('row', 0), D )
+
+		D.evict(0, 'row')
+		self.assertNotIn( ('row', 0), D )
+		self.assertEqual( D.cache_stats['bytes'], 0 )
+		with self.assertRaises(KeyError):
+			D.evict(0, 'row')
+		with self.assertRaises(ValueError):
+			D.cache_budget = -1
+
+		# primary slices are never evicted
+		data = {i: np.random.rand(m, n) for i in xrange(2)}
+		D = SliceCachingMatrix(data, cache_budget=0)
+		self.assertEqual( D.cache_stats['primary_bytes'], 2 * A.nbytes )
+		D.slice(0, 0, column_indices=columns)
+		self.assertIn( ('row', 0), D )
+		self.assertNotIn( ('both', (0, 0)), D )
+		with self.assertRaises(ValueError):
+			D.evict(0, 'row')
+		D.evict()
+		self.assertTrue( all(('row', i) in D for i in xrange(2)) )
+
+	def test_sc_mat_quantized(self):
+		m, n = 30, 40
+		rows = [1, 5, 8, 15, 20, 22]
+		columns = [1, 5, 8, 15, 20, 22, 33, 35, 37]
+		A = sp.rand(m, n, 0.3, format='csr')
+		for Q in (QuantizedMatrix(A), QuantizedMatrix(A.tocsc())):
+			A_back = Q.decompress().toarray()
+			D = SliceCachingMatrix(Q)
+			self.assertIs( D.data, Q )
+			self.assertEqual( D.shape, (m, n) )
+			self.assert_vector_equal(
+					D.row_slice(0, rows).toarray(), A_back[rows, :] )
+			self.assert_vector_equal(
+					D.column_slice(0, columns).toarray(), A_back[:, columns] )
+			self.assert_vector_equal(
+					D.slice(1, 1, rows, columns).toarray(),
+					A_back[rows, :][:, columns] )
@@ -0,0 +1,220 @@
+"""
+Unit tests for :mod:`conrad.optimization.beam_clustering`.
+"""
+"""
+Copyright 2016 Baris Ungun, Anqi Fu
+
+This file is part of CONRAD.
+
+CONRAD is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+CONRAD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from conrad.compat import *
+
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.csgraph as csgraph
+
+from conrad.physics import Gy
+from conrad.physics.beams import Beam, BeamSet, BixelGrid, FluenceMap
+from conrad.physics.physics import DoseFrame, Physics
+from conrad.medicine import Structure
+from conrad.case import Case
+from conrad.optimization.objectives import NontargetObjectiveSquare, \
+										   TargetObjectiveSquare
+from conrad.optimization.beam_clustering import *
+from conrad.tests.base import *
+
+class GridUtilitiesTestCase(ConradTestCase):
+	def test_grid_positions(self):
+		grid = BixelGrid(3, 4)
+		positions = grid_positions(grid)
+		self.assertEqual( positions.shape, (12, 2) )
+		self.assert_vector_equal( positions[:4, 0], [0, 1, 2, 0] )
+		self.assert_vector_equal( positions[:4, 1], [0, 0, 0, 1] )
+
+		grid.set_order('yx')
+		positions = grid_positions(grid)
+		self.assert_vector_equal( positions[:5, 0], [0, 0, 0, 0, 1] )
+		self.assert_vector_equal( positions[:5, 1], [0, 1, 2, 3, 0] )
+
+	def test_grid_adjacency(self):
+		adjacency = grid_adjacency(BixelGrid(3, 4))
+		self.assertEqual( adjacency.shape, (12, 12) )
+		self.assertEqual( (adjacency != adjacency.T).nnz, 0 )
+		# 3 x 4 grid: 2 * 4 horizontal + 3 * 3 vertical edges
+		self.assertEqual( adjacency.nnz, 2 * (2 * 4 + 3 * 3) )
+		self.assertTrue( adjacency[0, 1] and adjacency[0, 3] )
+		self.assertFalse( adjacency[2, 3] )
+
+	def test_split_disconnected(self):
+		# path 0-1-2-3-4, clusters {0, 1, 3} and {2, 4}
+		adjacency = sp.diags([1, 1, 1, 1], 1, shape=(5, 5))
+		adjacency = adjacency + adjacency.T
+		assignments = split_disconnected(
+				np.array([0, 0, 1, 0, 1]), adjacency)
+		self.assertEqual( np.unique(assignments).size, 4 )
+		self.assertEqual( assignments[0], assignments[1] )
+		self.assertNotEqual( assignments[1], assignments[3] )
+
+class BeamClusteringTestCase(ConradTestCase):
+	def setUp(self):
+		self.m = 400
+		self.maps = [FluenceMap(6, 5), FluenceMap(4, 5)]
+		self.beams = BeamSet(self.maps)
+		self.n = self.beams.count
+		self.labels = np.random.randint(0, 2, self.m)
+		self.A = np.random.rand(self.m, self.n)
+		self.A[self.labels == 0] *= 3
+		self.frame = DoseFrame(
+				data=self.A, voxel_labels=self.labels, frame_name='full')
+
+	def assert_clustered_frame(self, frame, clustered, beam_map):
+		self.assertEqual( beam_map.n_points, frame.beams )
+		self.assertEqual( beam_map.n_clusters, clustered.beams )
+		self.assertEqual( clustered.voxels, frame.voxels )
+		self.assert_vector_equal( clustered.voxel_labels, frame.voxel_labels )
+		self.assert_vector_equal(
+				clustered.beam_weights.data, beam_map.cluster_weights )
+
+		# same dose from cluster intensities and upsampled intensities
+		x = np.random.rand(clustered.beams)
+		A = frame.dose_matrix.data
+		A_clustered = clustered.dose_matrix.data
+		self.assert_vector_equal(
+				A_clustered.dot(x), A.dot(beam_map.upsample(x)) )
+
+	def test_beam_clustering_init(self):
+		bc = BeamClustering()
+		self.assertEqual( bc.compression, COMPRESSION_DEFAULT )
+		self.assertEqual( bc.spatial_weight, SPATIAL_WEIGHT_DEFAULT )
+		with self.assertRaises(ValueError):
+			BeamClustering(compression=0.5)
+		with self.assertRaises(ValueError):
+			BeamClustering(spatial_weight=-1)
+
+	def test_cluster_columns(self):
+		bc = BeamClustering(seed=0)
+		cmap = bc.cluster_columns(self.A, 5)
+		self.assertEqual( cmap.n_points, self.n )
+		self.assertLessEqual( cmap.n_clusters, 5 )
+
+		# clusters on bixel grid are connected
+		grid = self.maps[0].bixel_grid
+		cmap = bc.cluster_columns(self.A[:, :30], 5, grid=grid)
+		self.assertEqual( cmap.n_points, 30 )
+		adjacency = grid_adjacency(grid)
+		for cluster in xrange(cmap.n_clusters):
+			members = np.flatnonzero(cmap.vec == cluster)
+			n_components, _ = csgraph.connected_components(
+					adjacency[members, :][:, members], directed=False)
+			self.assertEqual( n_components, 1 )
+
+		with self.assertRaises(ValueError):
+			bc.cluster_columns(self.A, 5, grid=grid)
+
+	def test_beam_groups(self):
+		groups = BeamClustering.beam_groups(self.frame, self.beams)
+		self.assertEqual( [g[0] for g in groups], [0, 1] )
+		self.assert_vector_equal( groups[0][1], np.arange(30) )
+		self.assert_vector_equal( groups[1][1], np.arange(30, 50) )
+		self.assertIs( groups[1][2], self.maps[1].bixel_grid )
+
+		groups = BeamClustering.beam_groups(
+				self.frame, BeamSet([Beam()] * self.n))
+		self.assertEqual( len(groups), self.n )
+		self.assertIsNone( groups[0][2] )
+
+		groups = BeamClustering.beam_groups(self.frame)
+		self.assertEqual( len(groups), 1 )
+		self.assert_vector_equal( groups[0][1], np.arange(self.n) )
+
+		frame = DoseFrame(data=self.A, beam_labels=np.arange(self.n) % 3)
+		groups = BeamClustering.beam_groups(frame)
+		self.assertEqual( [g[0] for g in groups], [0, 1, 2] )
+		self.assert_vector_equal( groups[1][1], np.arange(1, self.n, 3) )
+
+		with self.assertRaises(ValueError):
+			BeamClustering.beam_groups(self.frame, BeamSet(3))
+
+	def test_cluster_frame(self):
+		bc = BeamClustering(compression=5, seed=0)
+		clustered, beam_map = bc.cluster_frame(self.frame)
+		self.assertEqual( clustered.name, 'full_beam_clusters' )
+		self.assertLessEqual( clustered.beams, self.n // 5 )
+		self.assert_clustered_frame(self.frame, clustered, beam_map)
+
+		# clusters do not mix fluence maps
+		clustered, beam_map = bc.cluster_frame(
+				self.frame, beams=self.beams, frame_name='coarse',
+				clusters={1: 2})
+		self.assertEqual( clustered.name, 'coarse' )
+		self.assert_vector_equal(
+				clustered.beam_labels[beam_map.vec],
+				np.hstack((np.zeros(30), np.ones(20))) )
+		self.assertGreaterEqual( clustered.beam_lookup_by_label(1).size, 2 )
+		self.assert_clustered_frame(self.frame, clustered, beam_map)
+
+		# sparse dose matrix yields sparse clustered dose matrix
+		frame = DoseFrame(
+				data=sp.csr_matrix(self.A), voxel_labels=self.labels)
+		clustered, beam_map = bc.cluster_frame(frame, beams=self.beams)
+		self.assertTrue( sp.isspmatrix_csr(clustered.dose_matrix.data) )
+		self.assert_clustered_frame(frame, clustered, beam_map)
+
+		with self.assertRaises(TypeError):
+			bc.cluster_frame(self.A)
+		with self.assertRaises(ValueError):
+			bc.cluster_frame(DoseFrame(voxels=self.m, beams=self.n))
+		with self.assertRaises(ValueError):
+			bc.cluster_frame(self.frame, clusters={0: 0})
+
+	def test_cluster_physics(self):
+		p = Physics(dose_matrix=self.A, voxel_labels=self.labels)
+		frame0 = p.frame.name
+		clustered = BeamClustering(seed=0).cluster_physics(
+				p, beams=self.beams, frame_name='clusters')
+		self.assertEqual( p.frame.name, frame0 )
+		self.assertIn( 'clusters', p.available_frames )
+		self.assertIn( (frame0, 'clusters'), p.available_frame_mappings )
+		beam_map = p.retrieve_frame_mapping(frame0, 'clusters').beam_map
+		self.assert_clustered_frame(p.frame, clustered, beam_map)
+
+		with self.assertRaises(TypeError):
+			BeamClustering().cluster_physics(p.frame)
+
+	def test_plan_clustered_frame(self):
+		case = Case()
+		case.anatomy += Structure(0, 'target', True)
+		case.anatomy += Structure(1, 'oar', False)
+		case.physics.voxel_labels = self.labels
+		case.physics.dose_matrix = self.A
+		case.anatomy['target'].objective = TargetObjectiveSquare(
+				target_dose=1 * Gy, weight=1.)
+		case.anatomy['oar'].objective = NontargetObjectiveSquare(weight=1.)
+		frame0 = case.physics.frame.name
+
+		clustered = BeamClustering(seed=0).cluster_physics(
+				case.physics, beams=self.beams)
+		case.change_dose_frame(clustered.name)
+		feasible, run = case.plan(solver='ECOS', verbose=0)
+		self.assertTrue( feasible )
+		self.assertEqual( run.x.size, clustered.beams )
+
+		beam_map = case.physics.retrieve_frame_mapping(
+				frame0, clustered.name).beam_map
+		x = beam_map.upsample(run.x)
+		y = case.anatomy['target'].y
+		case.change_dose_frame(frame0)
+		case.calculate_doses(x)
+		self.assert_vector_equal( case.anatomy['target'].y, y )
@@ -22,6 +22,7 @@ along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
 from conrad.compat import *
 
 import os
+import asyncio
 import numpy as np
 
 from conrad.physics import Gy
@@ -373,5 +374,123 @@ class CaseTestCase(ConradTestCase):
 				self.assertIsInstance(run, RunRecord )
 				self.assertIsInstance(run.plotting_data, dict )
 				self.assertIn( 0, run.plotting_data )
+				for phase in ('load', 'build', 'canonicalization',
+							  'solver', 'dose', 'plotting'):
+					self.assertIn( phase, run.timing )
 				if exact:
 					self.assertIn( 'exact', run.plotting_data )
+					for phase in ('build', 'solver', 'dose', 'plotting'):
+						self.assertIn( phase + '_exact', run.timing )
+
+	def test_plan_sweep(self):
+		case = Case(self.anatomy, self.physics)
+		weight = case.anatomy['OAR1'].objective.weight_raw
+		history = PlanningHistory()
+
+		# grid expanded to cartesian product
+		runs = case.plan_sweep(
+				{'OAR1': {'weight': [0.5, 1.]}, 'OAR2': {'weight': [1., 2.]}},
+				history=history, verbose=0)
+		self.assertEqual( len(runs), 4 )
+		self.assertEqual( len(history.runs), 4 )
+		for run in runs:
+			self.assertIsInstance( run, RunRecord )
+			self.assertTrue( run.feasible )
+		self.assertEqual(
+				runs[1].profile.objectives[1]['objective']['parameters'],
+				{'weight': 0.5} )
+		self.assertEqual(
+				runs[1].profile.objectives[2]['objective']['parameters'],
+				{'weight': 2.} )
+
+		# objectives restored after sweep
+		self.assert_scalar_equal(
+				case.anatomy['OAR1'].objective.weight_raw, weight )
+
+		# list of settings, solved in worker processes
+		settings = [{'OAR1': {'weight': w}} for w in (0.5, 1., 2.)]
+		runs_parallel = case.plan_sweep(settings, processes=2, verbose=0)
+		self.assertEqual( len(runs_parallel), 3 )
+		self.assertEqual(
+				runs_parallel[2].profile.objectives[1]['objective']\
+				['parameters'], {'weight': 2.} )
+
+		with self.assertRaises(TypeError):
+			case.plan_sweep(settings, history=[], verbose=0)
+		with self.assertRaises(TypeError):
+			case.plan_sweep('OAR1', verbose=0)
+
+	def test_plan_async(self):
+		case = Case(self.anatomy, self.physics)
+		reports = []
+		loop = asyncio.new_event_loop()
+		try:
+			status, run = loop.run_until_complete(case.plan_async(
+					progress=reports.append, verbose=0))
+			self.assertTrue( status )
+			self.assertIsInstance( run, RunRecord )
+			self.assertEqual( reports[0]['phase'], 'build' )
+
+			# timeout stops planning before it completes
+			with self.assertRaises(asyncio.TimeoutError):
+				loop.run_until_complete(case.plan_async(
+						timeout=1e-3, verbose=0, maxiter=10**6,
+						abstol=1e-12, reltol=1e-12))
+
+			# cancellation, without effect on subsequent plans
+			task = loop.create_task(case.plan_async(
+					verbose=0, maxiter=10**6, abstol=1e-12, reltol=1e-12))
+			loop.call_later(1e-2, task.cancel)
+			with self.assertRaises(asyncio.CancelledError):
+				loop.run_until_complete(task)
+			status, run = loop.run_until_complete(
+					case.plan_async(verbose=0))
+			self.assertTrue( status )
+		finally:
+			loop.close()
+
+class CaseMultiresolutionTestCase(ConradTestCase):
+	def setUp(self):
+		m, n = 200, 40
+		labels = np.random.randint(0, 2, m)
+		A = np.random.rand(m, n)
+		A[labels == 0] *= 3
+		self.case = Case()
+		self.case.anatomy += Structure(0, 'target', True)
+		self.case.anatomy += Structure(1, 'oar', False)
+		self.case.physics.voxel_labels = labels
+		self.case.physics.dose_matrix = A
+		self.frame0 = self.case.physics.frame.name
+		self.n = n
+
+	def test_plan_multiresolution(self):
+		from conrad.optimization.beam_clustering import BeamClustering
+		BeamClustering(compression=4, seed=0).cluster_physics(
+				self.case.physics, frame_name='coarse')
+		coarse_beams = self.case.physics.retrieve_frame('coarse').beams
+
+		feasible, run = self.case.plan_multiresolution('coarse', verbose=0)
+		self.assertTrue( feasible )
+		self.assertIsInstance( run, RunRecord )
+		self.assertEqual( run.x.size, self.n )
+		self.assertEqual( self.case.physics.frame.name, self.frame0 )
+		self.assertIn( 'level0', run.timing )
+		self.assertIn( 'level1', run.timing )
+		levels = run.info['levels']
+		self.assertEqual( [l['frame'] for l in levels], ['coarse', self.frame0] )
+		self.assertEqual( [l['beams'] for l in levels], [coarse_beams, self.n] )
+		self.assertTrue( all(l['feasible'] for l in levels) )
+
+		# fixed-budget refinement
+		feasible, run = self.case.plan_multiresolution(
+				['coarse'], refine_maxiter=5, verbose=0)
+		self.assertLessEqual( run.info['levels'][-1]['iters'], 5 )
+		self.assertEqual( run.x.size, self.n )
+
+		# missing frame mapping
+		self.case.physics.add_dose_frame(
+				'other', data=np.random.rand(200, self.n),
+				voxel_labels=self.case.physics.voxel_labels)
+		with self.assertRaises(ValueError):
+			self.case.plan_multiresolution('other', verbose=0)
+		self.assertEqual( self.case.physics.frame.name, self.frame0 )
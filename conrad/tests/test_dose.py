@@ -228,6 +228,15 @@ class PercentileConstraintTestCase(ConradTestCase):
 		# confirm sorted
 		self.assertEqual( sum(np.diff(dose_sub_slack.argsort()) != 1), 0 )
 
+		# unordered selection: same voxels, in ascending index order
+		for had_slack in (False, True):
+			for constr in (pc, D(30) <= 5 * Gy):
+				ordered = constr.get_maxmargin_fulfillers(
+						dose_vec, had_slack=had_slack)
+				unordered = constr.get_maxmargin_fulfillers(
+						dose_vec, had_slack=had_slack, ordered=False)
+				self.assert_vector_equal( unordered, np.sort(ordered) )
+
 class MeanConstraintTestCase(ConradTestCase):
 	def test_mean_constraint(self):
 		mc = MeanConstraint()
@@ -879,6 +888,56 @@ class DVHTestCase(ConradTestCase):
 		self.assertEqual( dvh.min_dose, y.min() )
 		self.assertEqual( dvh.max_dose, y.max() )
 
+	def test_data_binned(self):
+		""" test DVH object property data, binned """
+		m = 3000
+		width = 0.01
+		y = np.random.rand(m)
+		dvh = DVH(m, bin_width=width)
+		self.assertEqual( dvh.bin_width, width )
+		dvh.data = y
+		exact = DVH(m)
+		exact.data = y
+
+		self.assertTrue( dvh.populated )
+		self.assertEqual( dvh.min_dose, y.min() )
+		self.assertEqual( dvh.max_dose, y.max() )
+		self.assertTrue( np.all(np.diff(dvh.data) >= 0) )
+		self.assertLessEqual( np.max(np.abs(dvh.data - exact.data)), width )
+
+		# incremental update matches histogram built from scratch
+		y[:100] += 0.05 * np.random.rand(100)
+		y[-10:] = 2.
+		dvh.data = y
+		counts = np.bincount(np.floor(y / width).astype(int))
+		self.assert_vector_equal(
+				dvh._DVH__bin_counts[:counts.size], counts )
+		self.assertEqual( sum(dvh._DVH__bin_counts[counts.size:]), 0 )
+		self.assertEqual( dvh.max_dose, 2. )
+		exact.data = y
+		self.assertLessEqual( np.max(np.abs(dvh.data - exact.data)), width )
+
+		# doses spanning too many bins: exact curve, then histogram rebuilt
+		y[0] = 2 * dvh.MAX_BINS * width
+		dvh.data = y
+		exact.data = y
+		self.assertIsNone( dvh._DVH__bin_counts )
+		self.assert_vector_equal( dvh.data, exact.data )
+		self.assertEqual( dvh.max_dose, y[0] )
+		y[0] = 0.5
+		dvh.data = y
+		exact.data = y
+		self.assertLessEqual( np.max(np.abs(dvh.data - exact.data)), width )
+
+		# non-finite doses rejected
+		y[0] = np.nan
+		with self.assertRaises(ValueError):
+			dvh.data = y
+
+		self.assertEqual( dvh.resample(100).bin_width, width )
+		with self.assertRaises(ValueError):
+			DVH(m, bin_width=0)
+
 	def test_interpolate_percentile(self):
 		""" test DVH object static method interpolate_percentile """
 		dvh = DVH(100)
@@ -947,6 +1006,47 @@ class DVHTestCase(ConradTestCase):
 		self.assertLessEqual( dose_lower, dose_retrieved)
 		self.assertLessEqual( dose_retrieved, dose_upper)
 
+	def test_vectorized_queries(self):
+		""" test DVH object vectorized percentile/dose queries """
+		m = 3000
+		y = np.random.rand(m)
+		dvh = DVH(m)
+		dvh.data = y
+
+		doses = np.array([-1., 0.1, 0.5, 0.9, 2.])
+		percentiles = dvh.percentiles_at_doses(doses)
+		for dose, percentile in zip(doses, percentiles):
+			self.assertEqual( percentile, 100. * np.sum(y < dose) / m )
+			self.assertEqual( percentile, dvh.percentile_at_dose(dose) )
+
+		percentiles = np.array([0., 2., 25., 60.2, 98., 100.])
+		doses = dvh.doses_at_percentiles(percentiles)
+		self.assert_vector_equal(
+				doses, np.percentile(y, 100 - percentiles) )
+		self.assertEqual( doses[0], y.max() )
+		self.assertEqual( doses[-1], y.min() )
+		for dose, percentile in zip(doses, percentiles):
+			self.assertEqual( dose, dvh.dose_at_percentile(percentile) )
+
+		# binned DVH: within one bin of exact answer
+		width = 0.01
+		dvh = DVH(m, bin_width=width)
+		dvh.data = y
+		self.assertLessEqual( np.max(np.abs(
+				dvh.doses_at_percentiles(percentiles) - doses)), width )
+		self.assertEqual( dvh.dose_at_percentile(0), y.max() )
+		self.assertEqual( dvh.percentile_at_dose(0.5), 100. * np.sum(
+				y < 0.5) / m )
+
+		# binned DVH: sorted doses kept until data change
+		sorted_doses = dvh._DVH__sorted_doses
+		self.assertIs( dvh._DVH__sorted_doses, sorted_doses )
+		y = y + 0.1
+		dvh.data = y
+		self.assertIsNot( dvh._DVH__sorted_doses, sorted_doses )
+		self.assertEqual( dvh.percentile_at_dose(0.5), 100. * np.sum(
+				y < 0.5) / m )
+
 	def test_plotting_data(self):
 		""" test DVH object property plotting_data """
 		m = 2500
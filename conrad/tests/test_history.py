@@ -98,6 +98,22 @@ class RunOutputTestCase(ConradTestCase):
 		self.assertIsInstance( ro.solvetime, float )
 		self.assertIsInstance( ro.solvetime_exact, float )
 
+	def test_run_output_timing(self):
+		ro = RunOutput()
+		self.assertIsInstance( ro.timing, dict )
+		self.assertEqual( len(ro.timing), 0 )
+
+		ro.add_timing('build', 1., 0.5)
+		ro.add_timing('build', 2., 1.5)
+		self.assert_scalar_equal( ro.timing['build']['wall'], 3. )
+		self.assert_scalar_equal( ro.timing['build']['cpu'], 2. )
+
+		with ro.timed('dose'):
+			np.linalg.norm(np.random.rand(1000, 100))
+		self.assertIn( 'dose', ro.timing )
+		self.assertGreater( ro.timing['dose']['wall'], 0 )
+		self.assertGreaterEqual( ro.timing['dose']['cpu'], 0 )
+
 class RunRecordTestCase(ConradTestCase):
 	def test_run_record_init(self):
 		rr = RunRecord()
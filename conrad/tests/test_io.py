@@ -28,7 +28,7 @@ import numpy as np
 from conrad.case import *
 from conrad.io.io import *
 from conrad.medicine import Structure
-from conrad.physics.physics import DoseFrameMapping
+from conrad.physics.physics import DoseFrameMapping, LazyDoseFrame
 from conrad.tests.base import *
 from conrad.tests.test_io_filesystem import FilesystemTestCaching
 
@@ -201,10 +201,20 @@ class CaseIOTestCase(ConradTestCase):
 		case = caseio.load_case('test case')
 		case.physics.add_dose_frame('frame3', voxels=100, beams=20)
 
-		for i in [0, 3]:
+		for i in xrange(4):
 			self.assertIn( 'frame%i' %i, case.physics.available_frames )
+
+		# inactive frames attached lazily, data read on first access
 		for i in [1, 2]:
-			self.assertNotIn( 'frame%i' %i, case.physics.available_frames )
+			frame = case.physics.retrieve_frame('frame%i' %i)
+			self.assertIsInstance( frame, LazyDoseFrame )
+			self.assertFalse( frame.loaded )
+		frame = case.physics.retrieve_frame('frame1')
+		self.assertEqual( frame.shape, (40, 40) )
+		self.assertFalse( frame.loaded )
+		self.assertEqual( frame.dose_matrix.data.shape, (40, 40) )
+		self.assertTrue( frame.loaded )
+		self.assertFalse( case.physics.retrieve_frame('frame2').loaded )
 
 		for i in xrange(4):
 			caseio.load_frame('frame%i' %i)
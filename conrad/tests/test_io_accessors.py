@@ -23,13 +23,18 @@ from conrad.compat import *
 
 import os
 import re
+import pickle
 import numpy as np
 import operator as op
 import scipy.sparse as sp
 
 from conrad.abstract.mapping import DiscreteMapping
 from conrad.medicine import Structure
+from conrad.defs import module_installed
+from conrad.optimization.solver_base import PROJECTOR_POGS_DENSE_DIRECT
 from conrad.optimization.solver_cvxpy import SolverCVXPY
+from conrad.optimization.solver_numpy import SolverNumpy
+from conrad.optimization.solver_optkit import SolverOptkit
 from conrad import Gy
 from conrad.io.accessors.base_accessor import *
 from conrad.io.accessors.anatomy_accessor import *
@@ -214,6 +219,47 @@ class DoseFrameAccessorTestCase(ConradTestCase):
 		self.assert_vector_equal( df.voxel_weights.data, self.vw )
 		self.assert_vector_equal( df.beam_weights.data, self.bw )
 
+	def test_dose_frame_accessor_load_mmap(self):
+		directory = os.path.join(os.getcwd(), 'CONRAD_IO_MMAP_TEST')
+		if not os.path.exists(directory):
+			os.mkdir(directory)
+		dfa = DoseFrameAccessor()
+		ptr = dfa.save_frame(self.frame, directory)
+
+		df = dfa.load_frame(ptr, mmap=True)
+		self.assertIsInstance( df.dose_matrix.data.base, np.memmap )
+		self.assert_vector_equal( df.dose_matrix.data, self.mat )
+		self.assert_vector_equal( df.voxel_weights.data, self.vw )
+
+		for root, _, files in os.walk(directory, topdown=False):
+			for f in files:
+				os.remove(os.path.join(root, f))
+			os.rmdir(root)
+
+	def test_dose_frame_accessor_load_lazy_pickle(self):
+		directory = os.path.join(os.getcwd(), 'CONRAD_IO_LAZY_TEST')
+		if not os.path.exists(directory):
+			os.mkdir(directory)
+		dfa = DoseFrameAccessor()
+		ptr = dfa.save_frame(self.frame, directory)
+
+		# unloaded frame pickled without data; loads after unpickling
+		df = dfa.load_frame(ptr, mmap=True, lazy=True)
+		self.assertIsInstance( df, LazyDoseFrame )
+		df_copy = pickle.loads(pickle.dumps(df))
+		self.assertFalse( df.loaded )
+		self.assertFalse( df_copy.loaded )
+		self.assertIsInstance( df_copy.dose_matrix.data.base, np.memmap )
+		self.assertTrue( df_copy.loaded )
+		self.assert_vector_equal( df_copy.dose_matrix.data, self.mat )
+		self.assert_vector_equal( df_copy.voxel_weights.data, self.vw )
+		self.assert_vector_equal( df_copy.beam_weights.data, self.bw )
+
+		for root, _, files in os.walk(directory, topdown=False):
+			for f in files:
+				os.remove(os.path.join(root, f))
+			os.rmdir(root)
+
 	def test_dose_frame_accessor_select(self):
 		dfa = DoseFrameAccessor(filesystem=FilesystemTestCaching())
 
@@ -313,8 +359,24 @@ class PhysicsAccessorTestCase(ConradTestCase):
 		self.assert_vector_equal( p.frame.voxel_weights.data, self.vw )
 		self.assert_vector_equal( p.frame.beam_weights.data, self.bw )
 
-		self.assertEqual( len(p.unique_frames), 1 )
+		# all frames attached, data for inactive frame not yet read
+		self.assertEqual( len(p.unique_frames), 2 )
 		self.assertEqual( len(p.available_frame_mappings), 0 )
+		next_name = '1' if p.frame.name == '0' else '0'
+		p.change_dose_frame(next_name)
+		self.assertIsInstance( p.frame, LazyDoseFrame )
+		self.assertFalse( p.frame.loaded )
+		self.assertEqual( p.frame.shape, self.mat.shape )
+		self.assertFalse( p.frame.loaded )
+		self.assert_vector_equal( p.frame.dose_matrix.data, self.mat )
+		self.assertTrue( p.frame.loaded )
+		self.assert_vector_equal( p.frame.voxel_weights.data, self.vw )
+
+		# eager loading of requested frame only
+		p = pa.load_physics(ptr, lazy=False)
+		self.assertNotIsInstance( p.frame, LazyDoseFrame )
+		self.assertEqual( len(p.unique_frames), 1 )
+		self.assert_vector_equal( p.frame.dose_matrix.data, self.mat )
 
 		# load frame
 		next_name = '1' if p.frame.name == '0' else '0'
@@ -401,19 +463,7 @@ class SolverCacheAccessorTestCase(ConradTestCase):
 			Structure(0, 'avoid', False, A=np.random.rand(100, 20)),
 		]
 
-	def test_solver_cache_accessor_save_load_pogs(self):
-		if SKIP_POGS_CACHING_TESTS:
-			return
-
-		sca = SolverCacheAccessor(filesystem=FilesystemTestCaching())
-
-		solver = SolverOptkit()
-		solver.build(self.structures)
-		ptr = sca._SolverCacheAccessor__save_pogs_solver_cache(
-				solver, 'cache0', 'frame0', 'dir')
-		self.assertTrue( sca.DB.has_key(ptr) )
-		cache = sca._SolverCacheAccessor__load_pogs_solver_cache(ptr)
-
+	def assert_pogs_cache(self, cache):
 		self.assertIsInstance( cache, dict )
 		for key in ['matrix', 'left_preconditioner', 'right_preconditioner']:
 			self.assertIn( key, cache )
@@ -426,8 +476,8 @@ class SolverCacheAccessorTestCase(ConradTestCase):
 			self.assertIsInstance( projector_matrix, np.ndarray )
 			self.assertTupleEqual( projector_matrix.shape, (20, 20) )
 
-	def test_solver_cache_accessor_save_load(self):
-		if SKIP_POGS_CACHING_TESTS:
+	def test_solver_cache_accessor_save_load_pogs(self):
+		if SKIP_POGS_CACHING_TESTS or not module_installed('optkit'):
 			return
 
 		sca = SolverCacheAccessor(filesystem=FilesystemTestCaching())
@@ -437,27 +487,84 @@ class SolverCacheAccessorTestCase(ConradTestCase):
 		ptr = sca.save_solver_cache(solver, 'cache0', 'frame0', 'dir')
 		self.assertTrue( sca.DB.has_key(ptr) )
 		cache = sca.load_solver_cache(ptr)
+		self.assertEqual( cache['solver'], 'POGS' )
+		self.assertEqual( cache['fingerprint'], solver.fingerprint )
+		self.assert_pogs_cache(cache)
 
-		self.assertIsInstance( cache, dict )
-		for key in ['matrix', 'left_preconditioner', 'right_preconditioner']:
-			self.assertTrue( key in cache )
-			self.assertIsInstance( cache[key], np.ndarray )
-		self.assertTupleEqual( cache['matrix'].shape, (31, 20) )
-		self.assertEqual( cache['left_preconditioner'].size, 31 )
-		self.assertEqual( cache['right_preconditioner'].size, 20 )
-		projector_matrix = cache.pop('projector_matrix', None)
-		if projector_matrix is not None:
-			self.assertIsInstance( projector_matrix, np.ndarray )
-			self.assertTupleEqual( projector_matrix.shape, (20, 20) )
+	def test_solver_cache_accessor_save_load(self):
+		sca = SolverCacheAccessor(filesystem=FilesystemTestCaching())
+
+		solver = SolverNumpy()
+		solver.build(self.structures)
+		ptr = sca.save_solver_cache(solver, 'cache0', 'frame0', 'dir')
+		self.assertTrue( sca.DB.has_key(ptr) )
+		cache = sca.load_solver_cache(ptr)
+		self.assertEqual( cache['solver'], 'POGS' )
+		self.assertEqual( cache['fingerprint'], solver.fingerprint )
+		self.assertEqual( cache['projector_type'], PROJECTOR_POGS_DENSE_DIRECT )
+		self.assert_pogs_cache(dict(cache))
+
+		# loaded cache adopted by new solver
+		solver2 = SolverNumpy()
+		solver2.build(self.structures, solver_cache=cache)
+		self.assertIs( solver2.cache['matrix'], cache['matrix'] )
+
+		# stale cache ignored
+		structures = [
+			Structure(0, 'target', True, A=5 * np.random.rand(30, 20)),
+			self.structures[1],
+		]
+		solver3 = SolverNumpy()
+		solver3.build(structures, solver_cache=cache)
+		self.assertIsNot( solver3.cache['matrix'], cache['matrix'] )
 
-		# caching only for SolverOptkit
+		# no cache available
 		with self.assertRaises(TypeError):
 			sca.save_solver_cache(SolverCVXPY(), 'cache0', 'frame0', 'dir')
+		with self.assertRaises(TypeError):
+			sca.save_solver_cache(SolverNumpy(), 'cache0', 'frame0', 'dir')
 
 		# incomplete: cannot load
 		with self.assertRaises(ValueError):
 			sca.load_solver_cache(SolverCacheEntry())
 
+	def test_solver_cache_accessor_save_load_cvxpy(self):
+		sca = SolverCacheAccessor(filesystem=FilesystemTestCaching())
+
+		solver = SolverCVXPY()
+		if solver is None:
+			return
+		structures = [
+			Structure(0, 'target', True, A=self.structures[0].A),
+			Structure(1, 'avoid', False, A=self.structures[1].A),
+		]
+		solver.init_problem(20, parametrize=True)
+		solver.build(structures)
+
+		# cvxpy problems are not persisted
+		with self.assertRaises(TypeError):
+			sca.save_solver_cache(solver, 'cache0', 'frame0', 'dir')
+
+	def test_solver_cache_accessor_load_legacy(self):
+		sca = SolverCacheAccessor(filesystem=FilesystemTestCaching())
+
+		solver = SolverNumpy()
+		solver.build(self.structures)
+		raw = solver.cache
+		sc_entry = SolverCacheEntry(
+				name='cache0', frame='frame0', solver='POGS',
+				projector_type=raw['projector']['type'])
+		for key in ['matrix', 'left_preconditioner', 'right_preconditioner']:
+			setattr(sc_entry, key, sca.record_entry('dir', key, raw[key]))
+		sc_entry.projector_matrix = sca.record_entry(
+				'dir', 'projector_matrix', raw['projector']['matrix'])
+		ptr = sca.DB.set_next(sc_entry)
+		self.assertTrue( sca.DB.get(ptr).complete )
+
+		cache = sca.load_solver_cache(ptr)
+		self.assertNotIn( 'fingerprint', cache )
+		self.assert_pogs_cache(dict(cache))
+
 		sc_entry = sca.DB.get(ptr)
 		sc_entry.solver = 'bad solver'
 		with self.assertRaises(ValueError):
@@ -558,7 +665,7 @@ class CaseAccessorTestCase(ConradTestCase):
 		# save solver cache
 		case.physics.voxel_labels = np.zeros(case.physics.frame.voxels)
 		_, run = case.plan(verbose=0)
-		if not (case.problem.solver_pogs is None or SKIP_POGS_CACHING_TESTS):
+		if case.problem.solver.cache is not None:
 			ptr = ca.save_solver_cache(
 					case_entry, case.problem.solver, 'cache0', 'frame0', 'dir')
 			self.assertTrue( ca.DB.has_key(ptr) )
@@ -570,9 +677,11 @@ class CaseAccessorTestCase(ConradTestCase):
 						'dir')
 
 		# load solver cache
-		if not (case.problem.solver_pogs is None or SKIP_POGS_CACHING_TESTS):
+		if ptr is not None:
 			cache = ca.load_solver_cache(case_entry, 'cache0', 'frame0')
 			self.assertIsInstance( cache, dict )
+			self.assertEqual(
+					cache['fingerprint'], case.problem.solver.fingerprint )
 		else:
 			with self.assertRaises(ValueError):
 				ca.load_solver_cache(case_entry, 'cache0', 'frame0')
@@ -0,0 +1,162 @@
+"""
+Unit tests for :mod:`conrad.io.batch`.
+"""
+"""
+Copyright 2016--2017 Baris Ungun, Anqi Fu
+
+This file is part of CONRAD.
+
+CONRAD is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+CONRAD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from conrad.compat import *
+
+import os
+import shutil
+import tempfile
+import numpy as np
+
+from conrad.physics import Gy
+from conrad.medicine import Structure
+from conrad.medicine.dose import D
+from conrad.case import Case
+from conrad.optimization.objectives import NontargetObjectiveSquare, \
+										   TargetObjectiveSquare
+from conrad.io.io import CaseIO, CaseLoader
+from conrad.io.batch import *
+from conrad.tests.base import *
+
+class PlanCasesTestCase(ConradTestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.caseio = CaseIO()
+		self.caseio.working_directory = self.directory
+		self.case_names = ['case0', 'case1', 'case2']
+		for name in self.case_names:
+			m, n = 200, 30
+			labels = np.random.randint(0, 2, m)
+			A = np.random.rand(m, n)
+			A[labels == 0] *= 3
+
+			case = Case()
+			case.anatomy += Structure(0, 'target', True)
+			case.anatomy += Structure(1, 'oar', False)
+			case.physics.voxel_labels = labels
+			case.physics.dose_matrix = A
+			case.anatomy['target'].objective = TargetObjectiveSquare(
+					target_dose=1 * Gy, weight=1.)
+			case.anatomy['oar'].objective = NontargetObjectiveSquare(
+					weight=1.)
+			self.caseio.accessor.save_case(case, name, self.directory)
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def assert_solutions_saved(self, records, solution_name):
+		for record in records:
+			self.assertTrue( record.succeeded )
+			self.assertTrue( record.feasible )
+			self.assertIsNotNone( record.solution_ID )
+			for phase in ('load', 'plan', 'save', 'total'):
+				self.assertIn( phase, record.timing )
+				self.assertGreaterEqual( record.timing[phase]['wall'], 0 )
+
+			case = self.caseio.load_case(record.case_name)
+			x = self.caseio.load_solution(solution_name)['x']
+			self.assertEqual( x.size, case.physics.beams )
+			self.assertTrue( np.all(x >= -1e-6) )
+
+	def test_plan_cases(self):
+		with self.assertRaises(TypeError):
+			plan_cases(self.caseio.DB, self.case_names, self.directory)
+
+		names = self.case_names + ['missing case']
+		records = plan_cases(
+				self.caseio, names, self.directory, solution_name='serial',
+				solver='ECOS', verbose=0)
+		self.assertEqual( [r.case_name for r in records], names )
+
+		# failure isolated to one case
+		self.assertFalse( records[-1].succeeded )
+		self.assertIsNone( records[-1].solution_ID )
+		self.assertIn( 'ValueError', records[-1].error )
+		self.assert_solutions_saved(records[:-1], 'serial')
+
+		# each case's solution saved to a distinct location
+		self.caseio.load_case('case0')
+		x0 = self.caseio.load_solution('serial')['x']
+		self.caseio.load_case('case1')
+		x1 = self.caseio.load_solution('serial')['x']
+		self.assertFalse( np.allclose(x0, x1) )
+
+	def test_plan_cases_parallel(self):
+		records = plan_cases(
+				self.caseio, self.case_names, self.directory,
+				solution_name='parallel', processes=2, solver='ECOS',
+				verbose=0)
+		self.assertEqual(
+				[r.case_name for r in records], self.case_names )
+		self.assert_solutions_saved(records, 'parallel')
+
+	def test_batch_main(self):
+		db_file = self.caseio.DB.dump_to_yaml(
+				os.path.join(self.directory, 'database.yml'))
+		with open(db_file) as f:
+			db_contents = f.read()
+		args = [db_file, self.directory, 'case0', 'case2', '-p', '2',
+				'-n', 'cli', '--solver', 'ECOS']
+
+		# destination of updated database required
+		with self.assertRaises(SystemExit):
+			main(args)
+		with self.assertRaises(SystemExit):
+			main(args + ['-o', db_file + '.out', '--in-place'])
+
+		# input database left unchanged when writing to output file
+		output_file = os.path.join(self.directory, 'output.yml')
+		self.assertEqual( main(args + ['-o', output_file]), 0 )
+		with open(db_file) as f:
+			self.assertEqual( f.read(), db_contents )
+		caseio = CaseIO(DB_yaml=output_file)
+		caseio.load_case('case2')
+		self.assertIsInstance( caseio.load_solution('cli')['x'], np.ndarray )
+
+		# input database overwritten on request
+		self.assertEqual( main(args + ['-n', 'cli2', '--in-place']), 0 )
+		caseio = CaseIO(DB_yaml=db_file)
+		caseio.load_case('case2')
+		self.assertIsInstance(
+				caseio.load_solution('cli2')['x'], np.ndarray )
+
+	def test_plan_sweep_loaded_case(self):
+		grid = {'oar': {'weight': [0.5, 1., 2., 4.]}}
+		case = self.caseio.load_case('case0')
+		case.anatomy['target'].constraints += D(90) > 0.5 * Gy
+		runs = case.plan_sweep(grid, solver='ECOS', verbose=0)
+
+		loader = self.caseio.case_loader()
+		self.assertIsInstance( loader, CaseLoader )
+		self.assertEqual( loader.case_name, 'case0' )
+		with self.assertRaises(ValueError):
+			self.caseio.case_loader('missing case')
+
+		# workers load case from database, or receive a copy of it
+		for options in ({'loader': loader}, {}):
+			runs_parallel = case.plan_sweep(
+					grid, processes=2, solver='ECOS', verbose=0, **options)
+			self.assertEqual( len(runs_parallel), len(runs) )
+			for run, run_parallel in zip(runs, runs_parallel):
+				self.assertEqual( run_parallel.feasible, run.feasible )
+				self.assert_vector_equal(
+						run_parallel.x, run.x, 1e-4, 1e-3 )
+
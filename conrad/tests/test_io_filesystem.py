@@ -190,6 +190,25 @@ class FilesystemBaseTestCase(ConradTestCase):
 			fs.write_sparse_matrix(
 					'dir', 'name', sp.rand(30, 20, 0.2, format='coo'))
 
+	def test_fsbase_write_quantized_matrix(self):
+		fs = FilesystemTestNaming()
+		qme = fs.write_quantized_matrix('dir', 'name', QuantizedMatrix(
+				sp.rand(30, 20, 0.2, format='csc'), bits=8))
+		self.assertIsInstance(qme, QuantizedMatrixEntry )
+		self.assertFalse( qme.layout_CSR )
+		self.assertFalse( qme.layout_fortran_indexing )
+		self.assertEqual( qme.shape, (30, 20) )
+		self.assertEqual( qme.bits, 8 )
+		self.assertEqual( qme.dtype, 'float64' )
+		self.assertEqual(
+				qme.data_values_file, 'writing at file `dir/name_codes`' )
+		self.assertEqual(
+				qme.data_scales_file, 'writing at file `dir/name_scales`' )
+
+		with self.assertRaises(TypeError):
+			fs.write_quantized_matrix(
+					'dir', 'name', sp.rand(30, 20, 0.2, format='csr'))
+
 	def test_fsbase_write_ndarray(self):
 		fs = FilesystemTestNaming()
 		ve = fs.write_ndarray('dir', 'name', np.random.rand(30))
@@ -211,6 +230,9 @@ class FilesystemBaseTestCase(ConradTestCase):
 		sme2 = fs.write_matrix(
 				'dir', 'name', sp.rand(30, 20, 0.2, format='csc'))
 		self.assertIsInstance(sme2, SparseMatrixEntry )
+		qme = fs.write_matrix('dir', 'name', QuantizedMatrix(
+				np.random.rand(30, 20)))
+		self.assertIsInstance(qme, QuantizedMatrixEntry )
 
 		with self.assertRaises(TypeError):
 			fs.write_ndarray(np.random.rand(30))
@@ -374,6 +396,27 @@ class FilesystemBaseTestCase(ConradTestCase):
 		self.assert_vector_equal(mat.indices, mat_back.indices)
 		self.assert_vector_equal(mat.data, mat_back.data)
 
+	def test_fsbase_read_quantized_matrix(self):
+		fs = FilesystemTestCaching()
+		for layout_CSR in (True, False):
+			mat = QuantizedMatrix(
+					np.random.rand(30, 20), layout_CSR=layout_CSR,
+					dtype=np.float32)
+			mat_entry = fs.write_matrix('dir', 'mat' + str(layout_CSR), mat)
+			mat_back = fs.read_data(mat_entry)
+			self.assertIsInstance(mat_back, QuantizedMatrix )
+			self.assertEqual( mat_back.layout_CSR, layout_CSR )
+			self.assertEqual( mat_back.dtype, np.float32 )
+			self.assertEqual( mat_back.bits, 16 )
+			self.assert_vector_equal(mat.codes, mat_back.codes)
+			self.assert_vector_equal(mat.scales, mat_back.scales)
+			self.assert_vector_equal(
+					mat.decompress().toarray(), mat_back.decompress().toarray())
+
+		mat_entry.bits = 8
+		with self.assertRaises(ValueError):
+			fs.read_data(mat_entry)
+
 	def test_fsbase_read_data_dictionary(self):
 		fs = FilesystemTestCaching()
 		data_dict = {
@@ -506,6 +549,30 @@ class LocaFilesystemTestCase(ConradTestCase):
 		v_read = lfs.read(v_written['file'], v_written['key'])
 		self.assert_vector_equal( v, v_read )
 
+	def test_lfs_read_mmap(self):
+		lfs = LocalFilesystem()
+		v = np.random.rand(30)
+		f_ = os.path.join(os.getcwd(), self.file_tag + 'vec')
+		v_written = lfs.write(f_, v)
+		v_read = lfs.read(v_written['file'], v_written['key'], mmap=True)
+		self.assertIsInstance( v_read, np.memmap )
+		self.assertFalse( v_read.flags.writeable )
+		self.assert_vector_equal( v, v_read )
+
+		input_ = {
+				1: np.random.rand(30, 20),
+				2: sp.rand(30, 20, 0.2, format='csr'),
+		}
+		output_ = lfs.read_data(lfs.write_data(
+				os.getcwd(), self.file_tag, input_), mmap=True)
+		self.assertIsInstance( output_[1], np.ndarray )
+		self.assertIsInstance( output_[1].base, np.memmap )
+		self.assert_vector_equal( input_[1], output_[1] )
+		self.assertIsInstance( output_[2], sp.csr_matrix )
+		self.assertFalse( output_[2].data.flags.writeable )
+		self.assert_vector_equal(
+				input_[2].toarray(), output_[2].toarray() )
+
 	def test_lfs_write(self):
 		lfs = LocalFilesystem()
 
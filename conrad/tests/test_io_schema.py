@@ -181,6 +181,39 @@ class SparseMatrixEntryTestCase(ConradTestCase):
 		sme2 = SparseMatrixEntry(**sme.nested_dictionary)
 		sme3 = SparseMatrixEntry(**sme.flat_dictionary)
 
+	def test_quantized_matrix_entry(self):
+		qme = QuantizedMatrixEntry(
+				layout_CSR=True, layout_fortran_indexing=False,
+				shape=(100, 20), data_pointers_file='ptrs.npy',
+				data_indices_file='inds.npy', data_values_file='codes.npy')
+		self.assertIsInstance( qme, SparseMatrixEntry )
+		self.assertIsNone( qme.bits )
+		self.assertIsNone( qme.dtype )
+
+		self.assertFalse( qme.complete )
+		qme.bits = 16
+		self.assertFalse( qme.complete )
+		qme.dtype = np.float32
+		self.assertEqual( qme.dtype, 'float32' )
+		self.assertFalse( qme.complete )
+		qme.data_scales_file = 'scales.npy'
+		self.assertTrue( qme.complete )
+		qme.bits = 12
+		self.assertFalse( qme.complete )
+		qme.bits = 8
+
+		for dictionary in (qme.nested_dictionary, qme.flat_dictionary):
+			self.assertEqual(
+					dictionary[CONRAD_DB_TYPETAG],
+					'data_fragment: quantized matrix' )
+			qme2 = cdb_util.route_data_fragment(dictionary)
+			self.assertIsInstance( qme2, QuantizedMatrixEntry )
+			self.assertTrue( qme2.complete )
+			self.assertEqual( qme2.bits, 8 )
+			self.assertEqual( qme2.dtype, 'float32' )
+			self.assertEqual( qme2.shape, (100, 20) )
+			self.assertEqual( qme2.data_scales_file, 'scales.npy' )
+
 class DoseFrameEntryTestCase(ConradTestCase):
 	def test_dose_frame_entry(self):
 		dfe = DoseFrameEntry()
@@ -41,6 +41,11 @@ class TreatmentObjectiveTestImplementation(TreatmentObjective):
 		raise NotImplementedError
 	def primal_expr_Ax(self, mat, var, weights):
 		raise NotImplementedError
+	def primal_expr_parametrized(self, var, weights):
+		raise NotImplementedError
+	@property
+	def parametrized_values(self):
+		raise NotImplementedError
 	def dual_expr(self, var, weights):
 		raise NotImplementedError
 	def dual_domain_constraints(self, var, weights):
@@ -130,6 +135,17 @@ class ObjectivesTestCase(ConradTestCase):
 		self.assert_scalar_equal( fy.value, f )
 		self.assert_scalar_equal( fAx.value, f )
 
+		# parametrized, unweighted and weighted
+		for wt in (None, weights):
+			f = objective.eval(y.value, wt)
+			expr, params = objective.primal_expr_parametrized(y, wt)
+			values = objective.parametrized_values
+			self.assertEqual( set(params.keys()), set(values.keys()) )
+			for key in params:
+				params[key].value = values[key]
+			self.assertTrue( cvxpy.Minimize(expr).is_dcp(dpp=True) )
+			self.assert_scalar_equal( expr.value, f )
+
 		# dual expression
 		nu = cvxpy.Variable(3)
 		nu.save_value(np.random.rand(3))
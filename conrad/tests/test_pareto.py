@@ -0,0 +1,122 @@
+"""
+Unit tests for :mod:`conrad.optimization.pareto`.
+"""
+"""
+Copyright 2016--2017 Baris Ungun, Anqi Fu
+
+This file is part of CONRAD.
+
+CONRAD is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+CONRAD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from conrad.compat import *
+
+import numpy as np
+
+from conrad.physics import Gy
+from conrad.medicine import Structure
+from conrad.case import Case
+from conrad.optimization.objectives import NontargetObjectiveSquare, \
+										   TargetObjectiveSquare
+from conrad.optimization.history import RunRecord, PlanningHistory
+from conrad.optimization.pareto import *
+from conrad.tests.base import *
+
+class ParetoExplorerTestCase(ConradTestCase):
+	def setUp(self):
+		m, n = 300, 40
+		labels = np.random.randint(0, 3, m)
+		A = np.random.rand(m, n)
+		A[labels == 0] *= 3
+		A[labels == 2, :n // 2] *= 4
+
+		self.case = Case()
+		self.case.anatomy += Structure(0, 'target', True)
+		self.case.anatomy += Structure(1, 'oar1', False)
+		self.case.anatomy += Structure(2, 'oar2', False)
+		self.case.physics.voxel_labels = labels
+		self.case.physics.dose_matrix = A
+		self.case.anatomy['target'].objective = TargetObjectiveSquare(
+				target_dose=1 * Gy, weight=1.)
+		self.case.anatomy['oar1'].objective = NontargetObjectiveSquare(
+				weight=1.)
+		self.case.anatomy['oar2'].objective = NontargetObjectiveSquare(
+				weight=1.)
+
+	def test_pareto_explorer_init(self):
+		pe = ParetoExplorer(self.case, ['target', 'oar1'], verbose=0)
+		self.assertEqual( pe.labels, [0, 1] )
+		self.assertEqual( pe.n_criteria, 2 )
+		self.assertEqual( len(pe.runs), 0 )
+		self.assertTupleEqual( pe.weights.shape, (0, 2) )
+
+		with self.assertRaises(ValueError):
+			ParetoExplorer(self.case, ['target'])
+
+	def test_pareto_explorer_plan(self):
+		pe = ParetoExplorer(self.case, ['target', 'oar1'], verbose=0)
+		index = pe.plan([1, 3])
+		self.assertEqual( index, 0 )
+		self.assertIsInstance( pe.runs[0], RunRecord )
+		self.assert_vector_equal( pe.weights[0], [0.25, 0.75] )
+		self.assertTrue( np.all(np.isfinite(pe.objective_values[0])) )
+
+		# cached
+		self.assertEqual( pe.plan([2, 6]), 0 )
+		self.assertEqual( len(pe.runs), 1 )
+
+		# objective weights restored
+		self.assert_scalar_equal(
+				self.case.anatomy['oar1'].objective.weight_raw, 1. )
+
+		with self.assertRaises(ValueError):
+			pe.plan([1, -1])
+		with self.assertRaises(ValueError):
+			pe.plan([1, 1, 1])
+
+	def test_pareto_explorer_explore(self):
+		history = PlanningHistory()
+		pe = ParetoExplorer(self.case, ['target', 'oar1'], verbose=0)
+		table = pe.explore(max_plans=6, tolerance=1e-3, history=history)
+		self.assertEqual( len(pe.runs), 6 )
+		self.assertEqual( len(history.runs), 6 )
+		self.assertTupleEqual( table['objective_values'].shape, (6, 2) )
+		self.assertTupleEqual( table['weights'].shape, (6, 2) )
+		self.assertEqual( table['facets'].shape[1], 2 )
+		self.assertTrue( all(table['feasible']) )
+
+		# anchors minimize each criterion
+		values = table['objective_values']
+		self.assertEqual( np.argmin(values[:, 0]), 0 )
+		self.assertEqual( np.argmin(values[:, 1]), 1 )
+
+		# plans on trade-off curve: ordered by one criterion, the
+		# other decreases
+		order = np.argsort(values[:, 0])
+		self.assertTrue( np.all(
+				np.diff(values[order, 1]) <= 1e-3 * values[:, 1].max()) )
+
+		# resume with larger budget
+		pe.explore(max_plans=8, tolerance=1e-3, history=history)
+		self.assertEqual( len(pe.runs), 8 )
+		self.assertEqual( len(history.runs), 8 )
+
+		with self.assertRaises(TypeError):
+			pe.explore(history=[])
+
+	def test_pareto_explorer_three_criteria(self):
+		pe = ParetoExplorer(self.case, ['target', 'oar1', 'oar2'], verbose=0)
+		table = pe.explore(max_plans=8)
+		self.assertEqual( len(pe.runs), 8 )
+		self.assertEqual( table['facets'].shape[1], 3 )
+		self.assertTrue( np.all(table['facets'] < 8) )
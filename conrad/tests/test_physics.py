@@ -161,6 +161,22 @@ class DoseFrameTestCase(ConradTestCase):
 		self.assert_vector_equal( vw, d.voxel_weights.data )
 		self.assert_vector_equal( bw, d.beam_weights.data )
 
+	def test_doseframe_dtype(self):
+		m, n = 100, 50
+		A = np.random.rand(m, n)
+		vl = (3 * np.random.rand(m)).astype(int)
+
+		d = DoseFrame(m, n, A, voxel_labels=vl, dtype=np.float32)
+		self.assertEqual( d.dose_matrix.data.dtype, np.float32 )
+		self.assertEqual( d.submatrix(voxel_label=1).dtype, np.float32 )
+
+		p = Physics(dose_matrix=A, voxel_labels=vl, dtype=np.float32)
+		self.assertEqual( p.dose_matrix.data.dtype, np.float32 )
+
+		# type of assigned matrix retained by default
+		d = DoseFrame(m, n, A.astype(np.float32))
+		self.assertEqual( d.dose_matrix.data.dtype, np.float32 )
+
 	def test_indices_by_label(self):
 		maxlabel = 10
 		x = (maxlabel * np.random.rand(100)).astype(int)
@@ -212,12 +228,46 @@ class DoseFrameTestCase(ConradTestCase):
 
 		v_idx.sort()
 		b_idx.sort()
-		v_idx_lookup.sort()
-		b_idx_lookup.sort()
+		v_idx_lookup = np.sort(v_idx_lookup)
+		b_idx_lookup = np.sort(b_idx_lookup)
 
 		self.assert_vector_equal( v_idx, v_idx_lookup )
 		self.assert_vector_equal( b_idx, b_idx_lookup )
 
+	def test_label_index(self):
+		m, n = 100, 50
+		vl = (10 * np.random.rand(m)).astype(int)
+		bl = (3 * np.random.rand(n)).astype(int)
+
+		index = DoseFrame.label_index(vl)
+		self.assertEqual( set(index.keys()), set(vl) )
+		for label in index:
+			self.assert_vector_equal(
+					index[label], np.flatnonzero(vl == label) )
+			self.assertFalse( index[label].flags.writeable )
+		self.assertEqual( DoseFrame.label_index(np.array([], dtype=int)), {} )
+
+		d = DoseFrame(voxel_labels=vl, beam_labels=bl)
+		label = int(vl[0])
+		self.assert_vector_equal(
+				d.voxel_lookup_by_label(label), index[label] )
+
+		# reassigning labels invalidates index
+		vl_new = vl + 20
+		d.voxel_labels = vl_new
+		self.assert_vector_equal(
+				d.voxel_lookup_by_label(label + 20),
+				np.flatnonzero(vl_new == label + 20) )
+		with self.assertRaises(KeyError):
+			d.voxel_lookup_by_label(label)
+
+		d.beam_labels = np.zeros(n, dtype=int)
+		self.assert_vector_equal(
+				d.beam_lookup_by_label(0), np.arange(n) )
+
+		with self.assertRaises(ValueError):
+			DoseFrame(50, 50, None).voxel_lookup_by_label(0)
+
 	def test_submatrix(self):
 		m, n = 100, 50
 		A = np.random.rand(m, n)
@@ -246,6 +296,48 @@ class DoseFrameTestCase(ConradTestCase):
 		self.assert_vector_equal( d.submatrix(beam_label=b_label), A_sub_b )
 		self.assert_vector_equal( d.submatrix(v_label, b_label), A_sub_bv )
 
+class LazyDoseFrameTestCase(ConradTestCase):
+	def test_lazy_frame_load(self):
+		m, n = 100, 50
+		A = np.random.rand(m, n)
+		vl = (10 * np.random.rand(m)).astype(int)
+		vw = np.random.rand(m)
+		calls = []
+
+		def loader(frame):
+			calls.append(frame.name)
+			frame.dose_matrix = A
+			frame.voxel_labels = vl
+			frame.voxel_weights = vw
+
+		f = LazyDoseFrame(loader, m, n, frame_name='lazy')
+		self.assertIsInstance( f, DoseFrame )
+		self.assertFalse( f.loaded )
+		self.assertEqual( f.shape, (m, n) )
+		self.assertEqual( f.name, 'lazy' )
+		self.assertEqual( len(calls), 0 )
+
+		self.assert_vector_equal( f.voxel_labels, vl )
+		self.assertTrue( f.loaded )
+		self.assert_vector_equal( f.dose_matrix.data, A )
+		self.assert_vector_equal( f.voxel_weights.data, vw )
+		self.assertTrue( f.plannable )
+		self.assertEqual( calls, ['lazy'] )
+
+		# assignment loads first, so as not to be overwritten by loader
+		f = LazyDoseFrame(loader, m, n)
+		f.voxel_labels = np.zeros(m, dtype=int)
+		self.assertTrue( f.loaded )
+		self.assert_vector_equal( f.voxel_labels, np.zeros(m) )
+
+		def failing_loader(frame):
+			raise IOError('data unavailable')
+
+		f = LazyDoseFrame(failing_loader, m, n)
+		with self.assertRaises(IOError):
+			f.dose_matrix
+		self.assertFalse( f.loaded )
+
 class DoseFrameMappingTestCase(ConradTestCase):
 	def test_dose_frame_mapping(self):
 		dfm = DoseFrameMapping('source', 'target')
@@ -389,6 +481,13 @@ class PhysicsTestCase(ConradTestCase):
 		with self.assertRaises(KeyError):
 			p.change_dose_frame('bad key')
 
+		# retrieve without activating
+		f = p.retrieve_frame(DEFAULT_FRAME0_NAME)
+		self.assertEqual( f.name, DEFAULT_FRAME0_NAME )
+		self.assertEqual( p.frame.name, 'another frame' )
+		with self.assertRaises(KeyError):
+			p.retrieve_frame('bad key')
+
 	def test_physics_frame_mappings(self):
 		p = Physics()
 		# available frame mappings
@@ -22,6 +22,7 @@ along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
 from conrad.compat import *
 
 import numpy as np
+import scipy.sparse as sp
 
 from conrad.physics.containers import *
 from conrad.tests.base import *
@@ -81,6 +82,47 @@ class DoseMatrixTestCase(ConradTestCase):
 			data['labeled_by'] = 'invalid specification'
 			A = DoseMatrix(data)
 
+	def test_dose_mat_dtype(self):
+		m, n = 20, 10
+		A_ = np.random.rand(m, n)
+		A = DoseMatrix(A_)
+		self.assertEqual( A.dtype, np.float64 )
+		self.assertIs( A.data, A_ )
+
+		# single precision retained, or cast if requested
+		A = DoseMatrix(A_.astype(np.float32))
+		self.assertEqual( A.dtype, np.float32 )
+		A = DoseMatrix(A_, dtype=np.float32)
+		self.assertEqual( A.dtype, np.float32 )
+		self.assertEqual( A.data.dtype, np.float32 )
+		self.assert_vector_equal( A.data, A_, 1e-6, 1e-6 )
+		self.assertEqual(
+				A.voxel_slice(0, np.arange(5)).dtype, np.float32 )
+
+		data = {i: sp.csr_matrix(np.random.rand(m, n)) for i in xrange(2)}
+		A = DoseMatrix(data, dtype=np.float32)
+		self.assertEqual( A.dtype, np.float32 )
+		self.assertTrue( all(A.voxel_slice(i, None).dtype == np.float32
+							 for i in xrange(2)) )
+
+	def test_dose_mat_quantized(self):
+		m, n = 30, 20
+		Q = QuantizedMatrix(np.random.rand(m, n))
+		A = DoseMatrix(Q)
+		self.assertIs( A.data, Q )
+		self.assertEqual( A.shape, (m, n) )
+		self.assertEqual( A.dtype, np.float64 )
+		self.assertIs( A.manifest['contiguous'], Q )
+		self.assert_vector_equal(
+				A.voxel_slice(0, [1, 4, 9]).toarray(),
+				Q.decompress().toarray()[[1, 4, 9], :] )
+
+		# decompressed slices cast to requested precision
+		A = DoseMatrix(Q, dtype=np.float32)
+		self.assertIsInstance( A.data, QuantizedMatrix )
+		self.assertEqual( A.dtype, np.float32 )
+		self.assertEqual( A.beam_slice(0, [0, 3]).dtype, np.float32 )
+
 	def test_dose_mat_voxel_slice(self):
 		m, n = 30, 40
 		indices = [1, 5, 8, 15, 20, 22]
@@ -154,4 +196,20 @@ class DoseMatrixTestCase(ConradTestCase):
 		self.assertEqual( len(D.cached_slices['both']), 0 )
 
 		self.assertIn( 'labeled_by', D.manifest )
-		self.assertEqual( D.manifest['labeled_by'], 'voxels' )
\ No newline at end of file
+		self.assertEqual( D.manifest['labeled_by'], 'voxels' )
+	def test_dose_mat_cache(self):
+		m, n = 30, 40
+		A = np.random.rand(m, n)
+		D = DoseMatrix(A, cache_budget=0)
+		D.voxel_slice(0, [1, 5, 8])
+		self.assertNotIn( ('voxel', 0), D )
+
+		D.cache_budget = None
+		D.voxel_slice(0, [1, 5, 8])
+		D.beam_slice(0, [2, 3])
+		D.pin(0, 'voxel')
+		D.evict()
+		self.assertIn( ('voxel', 0), D )
+		self.assertNotIn( ('beam', 0), D )
+		D.evict(0, 'voxel')
+		self.assertNotIn( ('voxel', 0), D )
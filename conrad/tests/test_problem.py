@@ -27,6 +27,7 @@ from conrad.defs import module_installed
 from conrad.physics.units import Gy
 from conrad.medicine import Structure, Anatomy
 from conrad.medicine.dose import D
+from conrad.optimization.objectives import ObjectiveHinge
 from conrad.optimization.problem import *
 from conrad.optimization.history import *
 from conrad.tests.base import *
@@ -199,12 +200,13 @@ class PlanningProblemTestCase(ConradTestCase):
 	def test_fastest_solver(self):
 		p = PlanningProblem()
 
-		# unconstrained problem: OPTKIT is fastest, if available
+		# unconstrained problem: OPTKIT is fastest, if available,
+		# followed by NUMPY implementation of POGS
 		p._PlanningProblem__set_solver_fastest_available(self.anatomy.list)
 		if p.solver_pogs is not None:
 			self.assertEqual( p.solver, p.solver_pogs )
-		elif p.solver_cvxpy is not None:
-			self.assertEqual( p.solver, p.solver_cvxpy )
+		else:
+			self.assertEqual( p.solver, p.solver_numpy )
 
 		self.anatomy['tumor'].constraints += D('mean') < 15 * Gy
 		p._PlanningProblem__set_solver_fastest_available(self.anatomy.list)
@@ -232,9 +234,52 @@ class PlanningProblemTestCase(ConradTestCase):
 		p._PlanningProblem__set_solver_fastest_available(self.anatomy.list)
 		if p.solver_cvxpy is not None:
 			self.assertEqual( p.solver, p.solver_cvxpy )
+
+		# requested backend must handle constraints
+		with self.assertRaises(ValueError):
+			p._PlanningProblem__set_solver_fastest_available(
+					self.anatomy.list, 'numpy')
 		self.anatomy['tumor'].constraints -= self.anatomy[
 				'tumor'].constraints.last_key
 
+		# requested backend used for unconstrained problem
+		p._PlanningProblem__set_solver_fastest_available(
+				self.anatomy.list, 'numpy')
+		self.assertEqual( p.solver, p.solver_numpy )
+		if p.solver_cvxpy is not None:
+			p._PlanningProblem__set_solver_fastest_available(
+					self.anatomy.list, 'cvxpy')
+			self.assertEqual( p.solver, p.solver_cvxpy )
+		if p.solver_pogs is None:
+			with self.assertRaises(ValueError):
+				p._PlanningProblem__set_solver_fastest_available(
+						self.anatomy.list, 'pogs')
+		with self.assertRaises(ValueError):
+			p._PlanningProblem__set_solver_fastest_available(
+					self.anatomy.list, 'gurobi')
+
+	def test_solve_backend(self):
+		p = PlanningProblem()
+		if p.solver_cvxpy is None or not module_installed('ecos'):
+			return
+
+		# explicit cvxpy solver honored for unconstrained problem
+		ro = RunOutput()
+		self.assertEqual( p.solve(
+				self.anatomy.list, ro, verbose=0, solver='ECOS'), 1 )
+		self.assertIs( p.solver, p.solver_cvxpy )
+		self.assertEqual( ro.solver_info['status'], 'optimal' )
+
+		# requested backend honored
+		self.assertEqual( p.solve(
+				self.anatomy.list, RunOutput(), verbose=0,
+				backend='numpy'), 1 )
+		self.assertIs( p.solver, p.solver_numpy )
+
+		# default: fastest available
+		p.solve(self.anatomy.list, RunOutput(), verbose=0)
+		self.assertIs( p.solver, p.solver_numpy )
+
 	def test_verify_2pass(self):
 		p = PlanningProblem()
 
@@ -342,4 +387,204 @@ class PlanningProblemTestCase(ConradTestCase):
 						   exact_constraints=True)
 		self.assertEqual( feasible, 2 )
 		self.assertGreater( ro.solvetime, 0 )
-		self.assertGreater( ro.solvetime_exact, 0 )
\ No newline at end of file
+		self.assertGreater( ro.solvetime_exact, 0 )
+
+	def test_solve_warm_start(self):
+		p = PlanningProblem()
+		if p.solver_cvxpy is None or not module_installed('ecos'):
+			return
+
+		self.anatomy['tumor'].constraints += D(10) < 20 * Gy
+		run = RunRecord(self.anatomy.list, use_2pass=True)
+		feasible = p.solve(self.anatomy.list, run.output, slack=False,
+						   exact_constraints=True, verbose=0,
+						   solver='ECOS')
+		self.assertEqual( feasible, 2 )
+
+		# initial guesses from history, record or output
+		history = PlanningHistory()
+		guesses = p._PlanningProblem__warm_start_options(history, self.n)
+		self.assertTrue( guesses['warm_start'] )
+		self.assertNotIn( 'x0', guesses )
+
+		# cvxpy: no initial guesses
+		history += run
+		guesses = p._PlanningProblem__warm_start_options(history, self.n)
+		self.assertTrue( guesses['warm_start'] )
+		self.assertNotIn( 'x0', guesses )
+
+		# warm-started solve reproduces both passes
+		ro = RunOutput()
+		feasible = p.solve(self.anatomy.list, ro, slack=False,
+						   exact_constraints=True, verbose=0,
+						   solver='ECOS', warm_start=history)
+		self.assertEqual( feasible, 2 )
+		self.assert_scalar_equal(
+				ro.solver_info['objective'],
+				run.output.solver_info['objective'], rtol=1e-4 )
+		self.assert_scalar_equal(
+				ro.solver_info['objective_exact'],
+				run.output.solver_info['objective_exact'], rtol=1e-4 )
+
+	def test_solve_warm_start_numpy(self):
+		p = PlanningProblem()
+		run = RunRecord(self.anatomy.list)
+		self.assertEqual( p.solve(
+				self.anatomy.list, run.output, verbose=0,
+				backend='numpy'), 1 )
+
+		# initial guesses from history, record or output
+		history = PlanningHistory()
+		history += run
+		for source in (history, run, run.output):
+			guesses = p._PlanningProblem__warm_start_options(source, self.n)
+			self.assertNotIn( 'warm_start', guesses )
+			self.assert_vector_equal( guesses['x0'], run.x )
+			self.assertIn( 'nu0', guesses )
+
+		# mismatched dimensions: no initial guess
+		guesses = p._PlanningProblem__warm_start_options(history, self.n + 1)
+		self.assertNotIn( 'x0', guesses )
+
+		# on new problem instances, warm-started solve of perturbed
+		# problem takes fewer iterations than cold-started solve
+		self.anatomy['tumor'].objective.weight_underdose *= 1.05
+		ro_cold = RunOutput()
+		PlanningProblem().solve(
+				self.anatomy.list, ro_cold, verbose=0, backend='numpy')
+		ro_warm = RunOutput()
+		PlanningProblem().solve(
+				self.anatomy.list, ro_warm, verbose=0, backend='numpy',
+				warm_start=run)
+		self.assertLess(
+				ro_warm.solver_info['iters'], ro_cold.solver_info['iters'] )
+
+	def test_solve_timing(self):
+		p = PlanningProblem()
+		if p.solver_cvxpy is None or not module_installed('ecos'):
+			return
+
+		self.anatomy['tumor'].constraints += D(10) < 20 * Gy
+		ro = RunOutput()
+		feasible = p.solve(self.anatomy.list, ro, slack=False,
+						   exact_constraints=True, verbose=0,
+						   solver='ECOS')
+		self.assertEqual( feasible, 2 )
+		for phase in ('build', 'canonicalization', 'solver', 'dose'):
+			for keymod in ('', '_exact'):
+				self.assertIn( phase + keymod, ro.timing )
+				self.assertGreater( ro.timing[phase + keymod]['wall'], 0 )
+				self.assertGreaterEqual(
+						ro.timing[phase + keymod]['cpu'], 0 )
+
+	def test_solve_progress_callback(self):
+		p = PlanningProblem()
+		reports = []
+
+		# numpy solver reports iterates
+		ro = RunOutput()
+		p.solve(self.anatomy.list, ro, verbose=0, callback=reports.append)
+		self.assertIs( p.solver, p.solver_numpy )
+		self.assertEqual( reports[0], {'phase': 'build'} )
+		self.assertEqual( reports[1], {'phase': 'solve'} )
+		self.assertEqual( len(reports), 2 + ro.solver_info['iters'] )
+		self.assertEqual( reports[-1]['phase'], 'solve' )
+		self.assertEqual( reports[-1]['iteration'], ro.solver_info['iters'] )
+		self.assertIn( 'primal_residual', reports[-1] )
+		self.assertIn( 'dual_residual', reports[-1] )
+
+		# exception raised by callback aborts planning
+		def abort(info):
+			if 'iteration' in info:
+				raise RuntimeError('abort')
+		with self.assertRaises(RuntimeError):
+			p.solve(self.anatomy.list, RunOutput(), verbose=0, callback=abort)
+
+		if p.solver_cvxpy is None or not module_installed('ecos'):
+			return
+
+		# phases reported for each pass when solver has no iterates
+		del reports[:]
+		self.anatomy['tumor'].constraints += D(10) < 20 * Gy
+		feasible = p.solve(
+				self.anatomy.list, RunOutput(), slack=False,
+				exact_constraints=True, verbose=0, solver='ECOS',
+				callback=reports.append)
+		self.assertEqual( feasible, 2 )
+		self.assertEqual(
+				[r['phase'] for r in reports],
+				['build', 'solve', 'build_exact', 'solve_exact'] )
+
+	def test_solve_screen_voxels(self):
+		p = PlanningProblem()
+		if p.solver_cvxpy is None or not module_installed('ecos'):
+			return
+
+		m, n = 2000, 30
+		target = Structure(0, 'tumor', True, A=3 * np.random.rand(100, n))
+		oar = Structure(
+				1, 'oar', False,
+				A=np.random.rand(m, n) * np.random.rand(m, 1))
+		oar.objective = ObjectiveHinge(dose=0.3 * Gy, weight=1.)
+		oar.constraints += D('max') < 0.5 * Gy
+		oar.constraints += D(30) < 0.3 * Gy
+		structures = [target, oar]
+
+		ro = RunOutput()
+		feasible = p.solve(structures, ro, slack=False, verbose=0,
+						   solver='ECOS')
+		self.assertEqual( feasible, 1 )
+		self.assertNotIn( 'screening', ro.solver_info )
+
+		# screened solve reaches same optimum, with all violators added
+		for screen_voxels in (True, 0.01):
+			ro_screened = RunOutput()
+			feasible = p.solve(structures, ro_screened, slack=False,
+							   verbose=0, solver='ECOS',
+							   screen_voxels=screen_voxels)
+			self.assertEqual( feasible, 1 )
+			self.assert_scalar_equal(
+					ro_screened.solver_info['objective'],
+					ro.solver_info['objective'], rtol=1e-4 )
+			self.assertLessEqual(
+					np.max(oar.A.dot(ro_screened.optimal_variables['x'])),
+					0.5 * (1 + 1e-4) )
+			screening = ro_screened.solver_info['screening']
+			self.assertGreaterEqual( screening['rounds'], 1 )
+			self.assertLessEqual( screening['voxels'][1], m )
+			self.assertNotIn( 0, screening['voxels'] )
+
+		# initial voxel subset follows plan supplied as warm start
+		fraction = 0.01
+		count = int(np.ceil(fraction * m))
+		subsets = []
+		def callback(progress):
+			if progress.get('phase') == 'build' and not subsets:
+				subsets.append(dict(p.solver_cvxpy.voxel_subsets))
+		for warm_start, x in ((None, np.ones(n)), (ro, ro.x)):
+			del subsets[:]
+			ro_screened = RunOutput()
+			p.solve(structures, ro_screened, slack=False, verbose=0,
+					solver='ECOS', screen_voxels=fraction,
+					warm_start=warm_start, callback=callback)
+			self.assert_vector_equal( subsets[0][1], np.sort(
+					np.argpartition(-oar.A.dot(x), count - 1)[:count]) )
+
+		# screening with two-pass method
+		ro_screened = RunOutput()
+		feasible = p.solve(structures, ro_screened, slack=False,
+						   exact_constraints=True, verbose=0,
+						   solver='ECOS', screen_voxels=True)
+		self.assertEqual( feasible, 2 )
+		self.assertIn( 'screening_exact', ro_screened.solver_info )
+		self.assertLessEqual(
+				np.max(oar.A.dot(ro_screened.optimal_variables['x_exact'])),
+				0.5 * (1 + 1e-4) )
+
+		# voxel subsets not kept for later solves
+		p.solve(structures, RunOutput(), slack=False, verbose=0,
+				solver='ECOS')
+		self.assertEqual( p.solver_cvxpy.voxel_subsets, {} )
+
+		with self.assertRaises(ValueError):
+			p.solve(structures, RunOutput(), verbose=0, screen_voxels=1.5)
@@ -0,0 +1,94 @@
+"""
+Unit tests for :mod:`conrad.optimization.proximal`.
+"""
+"""
+Copyright 2016--2017 Baris Ungun, Anqi Fu
+
+This file is part of CONRAD.
+
+CONRAD is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+CONRAD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from conrad.compat import *
+
+import numpy as np
+
+from conrad.optimization.proximal import *
+from conrad.tests.base import *
+
+class SeparableObjectiveTestCase(ConradTestCase):
+	def test_separable_objective_init(self):
+		f = SeparableObjective(10, h='Abs', b=2., c=np.arange(10.))
+		self.assertEqual( f.size, 10 )
+		self.assert_vector_equal( f.h, FUNCTION_CODES['Abs'] )
+		self.assert_vector_equal( f.a, 1 )
+		self.assert_vector_equal( f.b, 2 )
+		self.assert_vector_equal( f.c, np.arange(10.) )
+		self.assert_vector_equal( f.d, 0 )
+		self.assert_vector_equal( f.e, 0 )
+
+		with self.assertRaises(KeyError):
+			SeparableObjective(10, h='Huber')
+		with self.assertRaises(ValueError):
+			SeparableObjective(10, a=0)
+		with self.assertRaises(ValueError):
+			SeparableObjective(10, c=-1)
+
+	def test_separable_objective_copy_scale_eval(self):
+		f = SeparableObjective(8)
+		f.copy_from(SeparableObjective(5, h='Abs', b=1., d=0.5), 3)
+		self.assert_vector_equal( f.h[:3], FUNCTION_CODES['Zero'] )
+		self.assert_vector_equal( f.h[3:], FUNCTION_CODES['Abs'] )
+		self.assert_vector_equal( f.b[3:], 1 )
+		with self.assertRaises(ValueError):
+			f.copy_from(SeparableObjective(5), 4)
+
+		x = np.random.rand(8)
+		self.assert_scalar_equal(
+				f.eval(x), np.sum(np.abs(x[3:] - 1)) + 0.5 * np.sum(x[3:]) )
+
+		s = 1 + np.random.rand(8)
+		self.assert_scalar_equal( f.scaled(s).eval(x), f.eval(s * x) )
+
+		g = SeparableObjective(8, h='IndGe0')
+		self.assertEqual( g.eval(x), 0 )
+		self.assertEqual( g.eval(-x), np.inf )
+
+	def test_separable_objective_prox(self):
+		n = 20
+		rho = 0.7
+		v = 3 * np.random.randn(n)
+		grid = np.linspace(-15, 15, 300001)
+		for h in FUNCTION_CODES:
+			f = SeparableObjective(
+					n, h=h, a=0.5 + np.random.rand(n),
+					b=np.random.randn(n), c=np.random.rand(n),
+					d=np.random.randn(n), e=np.random.rand(n))
+			x = f.prox(v, rho)
+
+			# compare to minimization by grid search, entrywise
+			for i in xrange(n):
+				fi = SeparableObjective(
+						1, h=h, a=f.a[i], b=f.b[i], c=f.c[i], d=f.d[i],
+						e=f.e[i])
+				z = fi.a[0] * grid - fi.b[0]
+				vals = fi.d[0] * grid + 0.5 * fi.e[0] * grid**2
+				if h == 'Abs':
+					vals += fi.c[0] * np.abs(z)
+				elif h == 'Square':
+					vals += 0.5 * fi.c[0] * z**2
+				elif h == 'IndGe0':
+					vals[z < 0] = np.inf
+				vals += 0.5 * rho * (grid - v[i])**2
+				self.assert_scalar_equal(
+						x[i], grid[np.argmin(vals)], 1e-3, 1e-3 )
@@ -22,6 +22,7 @@ along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
 from conrad.compat import *
 
 import numpy as np
+import scipy.sparse as sp
 
 from conrad.medicine import Structure, Anatomy
 from conrad.medicine.dose import D, Gy
@@ -73,6 +74,63 @@ class SolverTestCase(ConradTestCase):
 		with self.assertRaises(ValueError):
 			s._Solver__check_dimensions(structures)
 
+	def test_solver_fingerprint(self):
+		A0 = np.random.rand(100, 50)
+		A1 = np.random.rand(150, 50)
+		structures = [
+				Structure(0, 'tumor', True, A=A0),
+				Structure(1, 'OAR', False, A=A1)]
+
+		s = Solver()
+		self.assertIsNone( s.fingerprint )
+		self.assertIsNone( s.cache )
+		fingerprint = s._Solver__record_fingerprint(structures)
+		self.assertEqual( s.fingerprint, fingerprint )
+
+		# same layout and data: same fingerprint
+		self.assertEqual( Solver.layout_fingerprint([
+				Structure(0, 'tumor', True, A=A0.copy()),
+				Structure(1, 'OAR', False, A=A1.copy())]), fingerprint )
+
+		# changed data, order or collapsability: new fingerprint
+		self.assertNotEqual( Solver.layout_fingerprint([
+				Structure(0, 'tumor', True, A=1.1 * A0),
+				Structure(1, 'OAR', False, A=A1)]), fingerprint )
+		self.assertNotEqual(
+				Solver.layout_fingerprint(structures[::-1]), fingerprint )
+
+		# change to matrix that preserves mean dose: new fingerprint
+		A0_swapped = A0.copy()
+		A0_swapped[[0, 1], 0] = A0[[1, 0], 0]
+		self.assertFalse( structures[0].collapsable )
+		self.assertNotEqual( Solver.layout_fingerprint([
+				Structure(0, 'tumor', True, A=A0_swapped),
+				Structure(1, 'OAR', False, A=A1)]), fingerprint )
+
+		# sparse matrices hashed by contents
+		A0_csr = sp.csr_matrix(A0)
+		fingerprint_sparse = Solver.layout_fingerprint([
+				Structure(0, 'tumor', True, A=A0_csr)])
+		self.assertEqual( Solver.layout_fingerprint([
+				Structure(0, 'tumor', True, A=A0_csr.copy())]),
+				fingerprint_sparse )
+		self.assertNotEqual( Solver.layout_fingerprint([
+				Structure(0, 'tumor', True, A=sp.csr_matrix(A0_swapped))]),
+				fingerprint_sparse )
+		structures[1].constraints += D(30) < 20 * Gy
+		self.assertNotEqual(
+				Solver.layout_fingerprint(structures), fingerprint )
+
+		# caches validated by fingerprint, when present
+		self.assertTrue( s._Solver__valid_cache({}) )
+		self.assertTrue( s._Solver__valid_cache(
+				{'fingerprint': fingerprint}) )
+		self.assertFalse( s._Solver__valid_cache(
+				{'fingerprint': 'stale'}) )
+		self.assertFalse( s._Solver__valid_cache(
+				{'solver': 'other solver'}) )
+		self.assertFalse( s._Solver__valid_cache(None) )
+
 class SolverGenericTestCase(ConradTestCase):
 	@classmethod
 	def setUpClass(self):
@@ -251,7 +251,7 @@ class SolverCVXPYTestCase(SolverGenericTestCase):
 		m_exact = int(np.ceil(self.m_target * constr.percentile.fraction))
 		# ensure constraint is met by vector y
 		y[:m_exact] += 10
-		A_exact = A[constr.get_maxmargin_fulfillers(y), :]
+		A_exact = A[constr.get_maxmargin_fulfillers(y, ordered=False), :]
 
 		c = s._SolverCVXPY__percentile_constraint_exact(A, x, y, constr,
 														had_slack=False)
@@ -274,7 +274,7 @@ class SolverCVXPYTestCase(SolverGenericTestCase):
 		m_exact = int(np.ceil(self.m_target * (1 - constr.percentile.fraction)))
 		# ensure constraint is met by vector y
 		y[m_exact:] += 10
-		A_exact = A[constr.get_maxmargin_fulfillers(y), :]
+		A_exact = A[constr.get_maxmargin_fulfillers(y, ordered=False), :]
 
 		c = s._SolverCVXPY__percentile_constraint_exact(A, x, y, constr,
 														had_slack=False)
@@ -526,6 +526,36 @@ class SolverCVXPYTestCase(SolverGenericTestCase):
 		s.dvh_vars[cid2].value = BETA
 		self.assert_scalar_equal( s.get_dvh_slope(cid2), 1. / BETA )
 
+	def test_build_constraint_indices(self):
+		s = SolverCVXPY()
+		if s is None:
+			return
+		s.init_problem(self.n, use_slack=True)
+
+		structure_list = self.anatomy.list
+		structure_list[0].constraints += D('mean') >= 1 * Gy
+		structure_list[0].constraints += D(10) >= 0.5 * Gy
+		structure_list[1].constraints += D('max') <= 0.5 * Gy
+		structure_list[1].constraints += D('mean') <= 0.2 * Gy
+		cids = list(structure_list[0].constraints)
+		cids += list(structure_list[1].constraints)
+		shapes = [(), (), (self.m_oar,), ()]
+
+		s.build(structure_list)
+		indices = s._SolverCVXPY__constraint_indices
+		self.assertEqual( len(indices), 4 )
+		self.assertEqual(
+				max(indices.values()), len(s.problem.constraints) - 1 )
+		self.assertEqual( sorted(indices.values()), [indices[c] for c in cids] )
+		for cid, shape in zip(cids, shapes):
+			self.assertEqual(
+					s.problem.constraints[indices[cid]].shape, shape )
+
+		if module_installed('ecos'):
+			self.assertTrue( s.solve(solver=cvxpy.ECOS, verbose=0) )
+			for cid in cids:
+				self.assertIsNotNone( s.get_dual_value(cid) )
+
 	def test_solve(self):
 		s = SolverCVXPY()
 		if s is None:
@@ -695,4 +725,87 @@ class SolverCVXPYTestCase(SolverGenericTestCase):
 		if module_installed('ecos'):
 			solver_status = s.solve(
 					solver=cvxpy.ECOS, verbose=0, use_indirect=INDIRECT)
-			self.assertTrue( solver_status )
\ No newline at end of file
+			self.assertTrue( solver_status )
+
+	def test_build_parametrized(self):
+		s = SolverCVXPY()
+		if s is None:
+			return
+		s_ref = SolverCVXPY()
+		s.init_problem(self.n, use_slack=True, parametrize=True)
+		s_ref.init_problem(self.n, use_slack=True)
+		self.assertTrue( s.parametrize )
+		self.assertFalse( s_ref.parametrize )
+
+		structure_list = self.anatomy.list
+		structure_list[0].constraints += D('mean') >= 1 * Gy
+		structure_list[0].constraints += D(10) >= 0.5 * Gy
+		structure_list[1].constraints += D(70) <= 0.2 * Gy
+		cid = structure_list[1].constraints.last_key
+
+		s.build(structure_list)
+		problem = s.problem
+		self.assertTrue( problem.is_dpp() )
+		self.assertIn( cid, s.dvh_vars )
+		self.assertIn( cid, s.slack_vars )
+
+		param_prog = None
+		for weight, dose in [(1., 0.2), (4., 0.15), (2., 0.25)]:
+			structure_list[1].objective.weight = weight
+			structure_list[1].constraints[cid].dose = dose * Gy
+			s.build(structure_list)
+			s_ref.build(structure_list)
+
+			# parametrized problem retained for same problem structure
+			self.assertIs( s.problem, problem )
+
+			if module_installed('ecos'):
+				self.assertTrue( s.solve(solver=cvxpy.ECOS, verbose=0) )
+				self.assertTrue( s_ref.solve(solver=cvxpy.ECOS, verbose=0) )
+				self.assert_scalar_equal(
+						s.objective_value, s_ref.objective_value,
+						rtol=1e-4 )
+
+				# canonicalization reused after parameter-only changes
+				if param_prog is not None:
+					self.assertIs( s.problem._cache.param_prog, param_prog )
+				param_prog = s.problem._cache.param_prog
+				self.assertIsNotNone( param_prog )
+
+		# structural change triggers rebuild
+		structure_list[1].constraints += D('max') <= 0.5 * Gy
+		s.build(structure_list)
+		self.assertIsNot( s.problem, problem )
+
+		# re-init with same number of beams retains cached problem
+		problem = s.problem
+		s.init_problem(self.n, use_slack=True, parametrize=True)
+		s.build(structure_list)
+		self.assertIs( s.problem, problem )
+
+	def test_parametrized_cache(self):
+		s = SolverCVXPY()
+		if s is None:
+			return
+		s.init_problem(self.n, use_slack=True)
+		s.build(self.anatomy.list)
+		self.assertIsNone( s.cache )
+		self.assertIsNone( s.fingerprint )
+
+		# parametrized problem is not exported as a solver cache
+		structure_list = self.anatomy.list
+		structure_list[0].constraints += D('mean') >= 1 * Gy
+		s.init_problem(self.n, use_slack=True, parametrize=True)
+		s.build(structure_list)
+		self.assertIsNone( s.cache )
+		problem = s.problem
+
+		# solver caches are ignored; problem is built from structures
+		s2 = SolverCVXPY()
+		s2.init_problem(self.n, use_slack=True, parametrize=True)
+		s2.build(structure_list, solver_cache={
+				'solver': 'CVXPY', 'problem': np.zeros(10, dtype=np.uint8)})
+		self.assertIsNone( s2.fingerprint )
+		self.assertIsNot( s2.problem, problem )
+		self.assertEqual(
+				len(s2.problem.constraints), len(problem.constraints) )
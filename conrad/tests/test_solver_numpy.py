@@ -0,0 +1,222 @@
+"""
+Unit tests for :mod:`conrad.optimization.solver_numpy`.
+"""
+"""
+Copyright 2016--2017 Baris Ungun, Anqi Fu
+
+This file is part of CONRAD.
+
+CONRAD is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+CONRAD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from conrad.compat import *
+
+import numpy as np
+import scipy.sparse as sp
+
+from conrad.medicine import D
+from conrad.physics import Gy
+from conrad.optimization.objectives import NontargetObjectiveSquare
+from conrad.optimization.preprocessing import ObjectiveMethods
+from conrad.optimization.solver_cvxpy import SolverCVXPY
+from conrad.optimization import proximal
+from conrad.optimization.solver_numpy import *
+from conrad.tests.base import *
+from conrad.tests.test_solver import SolverGenericTestCase
+
+class SolverNumpyTestCase(SolverGenericTestCase):
+	def setUp(self):
+		SolverGenericTestCase.setUp(self)
+		self.oar_objective = self.anatomy['oar'].objective
+
+	def tearDown(self):
+		SolverGenericTestCase.tearDown(self)
+		self.anatomy['oar'].objective = self.oar_objective
+
+	def objective_value(self, x):
+		return sum([
+				ObjectiveMethods.eval(s, x=x) for s in self.anatomy.list])
+
+	def assert_solution_matches_cvxpy(self, s):
+		s_cvxpy = SolverCVXPY()
+		if s_cvxpy is None:
+			return
+		s_cvxpy.init_problem(self.n)
+		s_cvxpy.build(self.anatomy.list)
+		s_cvxpy.solve(solver='ECOS', verbose=0)
+		x_cvxpy = np.asarray(s_cvxpy.x).reshape(-1)
+
+		self.assertTrue( all(s.x >= 0) )
+		self.assertTrue( all(s.x_dual >= -1e-2 * np.max(s.x_dual)) )
+
+		# objective agrees to within an order of magnitude of the
+		# solver's default stopping tolerances
+		atol = 10 * ABSTOL_DEFAULT * np.sqrt(self.m + self.n)
+		rtol = 10 * RELTOL_DEFAULT
+		self.assert_scalar_equal(
+				self.objective_value(s.x), self.objective_value(x_cvxpy),
+				atol, rtol )
+
+	def test_solver_numpy_init(self):
+		s = SolverNumpy()
+		self.assertIsNone( s.objective_voxels )
+		self.assertIsNone( s.objective_beams )
+		self.assertIsNone( s.n_beams )
+		self.assertIsNone( s.cache )
+		with self.assertRaises(ValueError):
+			s.x
+		with self.assertRaises(ValueError):
+			s.solve()
+
+		s.init_problem(self.n)
+		self.assertEqual( s.n_beams, self.n )
+
+	def test_solver_build_matrix(self):
+		s = SolverNumpy()
+
+		# -structure 1 not collapsable (reason: target)
+		# -structure 2 collapsable
+		# expected matrix size: {m0 + 1 \times n}
+		A = s._SolverNumpy__build_matrix(self.anatomy.list)
+		self.assertIsInstance( A, np.ndarray )
+		self.assertEqual( A.shape, (self.m_target + 1, self.n) )
+		self.assert_vector_equal( A[:self.m_target, :], self.A_targ )
+		self.assert_vector_equal(
+				A[self.m_target, :], self.A_oar.sum(0) / self.m_oar )
+
+		# sparse structure matrix yields sparse problem matrix
+		self.anatomy['oar'].constraints += D(30) < 10 * Gy
+		self.anatomy['oar'].A_full = sp.csr_matrix(self.A_oar)
+		A = s._SolverNumpy__build_matrix(self.anatomy.list)
+		self.assertTrue( sp.isspmatrix_csr(A) )
+		self.assertEqual( A.shape, (self.m, self.n) )
+		self.assert_vector_equal( A.toarray()[self.m_target:, :], self.A_oar )
+
+	def test_solver_can_solve(self):
+		s = SolverNumpy()
+		self.assertTrue( s.can_solve(self.anatomy.list) )
+		self.anatomy['oar'].objective = NontargetObjectiveSquare()
+		self.assertTrue( s.can_solve(self.anatomy.list) )
+		self.anatomy['tumor'].constraints += D('mean') > 10 * Gy
+		self.assertFalse( s.can_solve(self.anatomy.list) )
+		with self.assertRaises(ValueError):
+			s.build(self.anatomy.list)
+
+	def test_solver_build_objectives(self):
+		s = SolverNumpy()
+		s.build(self.anatomy.list)
+		self.assertEqual( s.objective_voxels.size, self.m_target + 1 )
+		self.assertEqual( s.objective_beams.size, self.n )
+		self.assert_vector_equal(
+				s.objective_beams.h, proximal.FUNCTION_CODES['IndGe0'] )
+
+		expect = ObjectiveMethods.primal_expr_pogs(
+				self.anatomy['tumor'], numpy=True)
+		for attr in ('h', 'a', 'b', 'c', 'd', 'e'):
+			self.assert_vector_equal(
+					getattr(s.objective_voxels, attr)[:self.m_target],
+					getattr(expect, attr) )
+
+	def test_solver_solve(self):
+		s = SolverNumpy()
+		s.build(self.anatomy.list)
+		self.assertTrue( s.solve(verbose=0) )
+		self.assertEqual( s.status, 'optimal' )
+		self.assertGreater( s.solveiters, 0 )
+		self.assertGreater( s.solvetime, 0 )
+		self.assertIn( 'setup', s.timing )
+		self.assertIn( 'solver', s.timing )
+		self.assertEqual( s.y_dual.size, self.m_target + 1 )
+		self.assert_solution_matches_cvxpy(s)
+
+		# nonlinear objective, sparse matrices
+		self.anatomy['oar'].objective = NontargetObjectiveSquare(weight=0.1)
+		self.anatomy['tumor'].A_full = sp.csr_matrix(self.A_targ)
+		self.anatomy['oar'].A_full = sp.csc_matrix(self.A_oar)
+		s.build(self.anatomy.list)
+		self.assertTrue( s.solve(verbose=0) )
+		self.assertEqual( s.y_dual.size, self.m_target + 1 )
+		self.assert_solution_matches_cvxpy(s)
+
+	def test_solver_cache_and_resume(self):
+		s = SolverNumpy()
+		s.build(self.anatomy.list)
+		s.solve(verbose=0)
+		iters = s.solveiters
+		x = s.x
+
+		# unchanged matrix: no setup, solver resumes from last iterates
+		s.build(self.anatomy.list)
+		self.assertNotIn( 'setup', s.timing )
+		s.solve(verbose=0)
+		self.assertLess( s.solveiters, iters )
+		self.assert_vector_equal( s.x, x, 1e-2, 1e-2 )
+
+		cache = s.cache
+		self.assertEqual( cache['solver'], 'POGS' )
+		self.assertEqual( cache['fingerprint'], s.fingerprint )
+		self.assertEqual( cache['projector']['type'],
+						  PROJECTOR_POGS_DENSE_DIRECT )
+		self.assertEqual( cache['matrix'].shape, (self.m_target + 1, self.n) )
+
+		# new solver adopts cached equilibration and factorization
+		s2 = SolverNumpy()
+		s2.build(self.anatomy.list, solver_cache=cache)
+		self.assertIs( s2.cache['matrix'], cache['matrix'] )
+		self.assertIs( s2.cache['projector']['matrix'],
+					   cache['projector']['matrix'] )
+		s2.solve(verbose=0)
+		self.assert_vector_equal( s2.x, x, 1e-2, 1e-2 )
+
+		# malformed cache ignored: equilibration and factorization rebuilt
+		bad_caches = [
+				dict(cache, left_preconditioner=cache[
+						'left_preconditioner'][:-1]),
+				dict(cache, projector={'matrix': np.eye(self.n + 1)}),
+				dict(cache, matrix=cache['matrix'].tolist()),
+		]
+		for bad_cache in bad_caches:
+			s2 = SolverNumpy()
+			s2.build(self.anatomy.list, solver_cache=bad_cache)
+			self.assertIsNot( s2.cache['matrix'], cache['matrix'] )
+			self.assert_vector_equal( s2.cache['left_preconditioner'],
+									  cache['left_preconditioner'] )
+
+		# warm start from optimal beam intensities
+		s3 = SolverNumpy()
+		s3.build(self.anatomy.list)
+		s3.solve(verbose=0, x0=x, nu0=s.y_dual)
+		self.assertLess( s3.solveiters, iters )
+
+		# changed matrix: factorization rebuilt
+		self.anatomy['tumor'].A_full = 1.1 * self.A_targ
+		s.build(self.anatomy.list)
+		self.assertIn( 'setup', s.timing )
+		self.assertIsNot( s.cache['matrix'], cache['matrix'] )
+
+		# matrix change preserving mean dose: stale cache rejected
+		A_swapped = self.A_targ.copy()
+		A_swapped[[0, 1], :] = self.A_targ[[1, 0], :]
+		A_swapped[[0, 1], 0] = self.A_targ[[0, 1], 0]
+		self.anatomy['tumor'].A_full = A_swapped
+		self.assert_vector_equal(
+				self.anatomy['tumor'].A_mean, self.A_targ.mean(0) )
+		s_cold = SolverNumpy()
+		s_cold.build(self.anatomy.list)
+		s_cold.solve(verbose=0)
+		s4 = SolverNumpy()
+		s4.build(self.anatomy.list, solver_cache=cache)
+		self.assertNotEqual( s4.fingerprint, cache['fingerprint'] )
+		self.assertIsNot( s4.cache['matrix'], cache['matrix'] )
+		s4.solve(verbose=0)
+		self.assert_vector_equal( s4.x, s_cold.x )
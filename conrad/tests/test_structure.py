@@ -220,6 +220,20 @@ class StructureTestCase(ConradTestCase):
 		self.assertIsNone( s.A_full )
 		self.assertIsNone( s.A_mean )
 
+	def test_resize(self):
+		s = Structure('LABEL', 'STRUCTURE NAME', False)
+		s.A_full = np.random.rand(50, 300)
+		s.calc_y(np.random.rand(300))
+		s.resize(10)
+		self.assertEqual( s.size, 10 )
+		self.assertIsNone( s.A_full )
+		self.assertIsNone( s.y )
+		self.assert_vector_equal( s.voxel_weights, np.ones(10) )
+
+		s.A_full = np.random.rand(10, 300)
+		s.voxel_weights = 5 * np.ones(10)
+		self.assertEqual( s.weighted_size, 50 )
+
 	def test_create_structure_options(self):
 		# dense
 		s = Structure('LABEL', 'NAME', True, size=400, dose=17 * Gy,
@@ -330,6 +344,34 @@ class StructureTestCase(ConradTestCase):
 		self.assert_scalar_equal(Ax.max(), s.max_dose.value, 1e-7, 1e-7)
 		self.assert_scalar_equal(Ax.min(), s.min_dose.value, 1e-7, 1e-7)
 
+	def test_calculate_dose_single_precision(self):
+		m, n = 2000, 100
+		A = np.random.rand(m, n)
+		x = np.random.rand(n)
+		percentiles = np.linspace(1, 99, 50)
+
+		for fmt in (np.array, sp.csr_matrix, sp.csc_matrix):
+			s64 = Structure('LABEL', 'NAME', True, A=fmt(A))
+			s32 = Structure('LABEL', 'NAME', True, A=fmt(A.astype(np.float32)))
+			self.assertEqual( s32.A_mean.dtype, np.float32 )
+			s64.calc_y(x)
+			s32.calc_y(x)
+			self.assertEqual( s32.y.dtype, np.float32 )
+
+			# doses and DVH in single precision deviate from double
+			# precision by a small multiple of float32 machine epsilon,
+			# relative to the maximum dose
+			scale = s64.y.max()
+			eps32 = np.finfo(np.float32).eps
+			dose_error = np.max(np.abs(s32.y - s64.y)) / scale
+			dvh_error = np.max(np.abs(
+					s32.dvh.doses_at_percentiles(percentiles) -
+					s64.dvh.doses_at_percentiles(percentiles))) / scale
+			self.assertLess( dose_error, 10 * eps32 )
+			self.assertLess( dvh_error, 10 * eps32 )
+			self.assert_scalar_equal(
+					s32.mean_dose.value, s64.mean_dose.value, 1e-6, 1e-6 )
+
 	def test_assign_dose(self):
 		m, n = 400, 50
 		y = np.random.rand(m)
@@ -412,6 +454,12 @@ class StructureTestCase(ConradTestCase):
 		s.constraints += D('min') > below_min * Gy
 		self.assertTrue( s.satisfies_all(s.constraints) )
 
+		# unrecognized threshold
+		c = D('max') < above_max * Gy
+		c.threshold = 'median'
+		with self.assertRaises(ValueError):
+			s.satisfies(c)
+
 	def test_plotting_data(self):
 		m, n = 500, 30
 		x = np.random.rand(n)
@@ -0,0 +1,233 @@
+"""
+Unit tests for :mod:`conrad.optimization.voxel_clustering`.
+"""
+"""
+Copyright 2016 Baris Ungun, Anqi Fu
+
+This file is part of CONRAD.
+
+CONRAD is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+CONRAD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from conrad.compat import *
+
+import numpy as np
+import scipy.sparse as sp
+
+from conrad.physics import Gy
+from conrad.physics.physics import DoseFrame, Physics
+from conrad.medicine import Structure
+from conrad.case import Case
+from conrad.optimization.objectives import NontargetObjectiveSquare, \
+										   TargetObjectiveSquare
+from conrad.optimization.voxel_clustering import *
+from conrad.tests.base import *
+
+class KMeansMinibatchTestCase(ConradTestCase):
+	def assert_contiguous(self, assignments, n_clusters):
+		clusters = np.unique(assignments)
+		self.assertLessEqual( clusters.size, n_clusters )
+		self.assert_vector_equal( clusters, np.arange(clusters.size) )
+
+	def test_kmeans_minibatch(self):
+		rng = np.random.RandomState(0)
+		points = rng.rand(200, 4)
+		assignments = kmeans_minibatch(points, 10, random_state=rng)
+		self.assertEqual( assignments.size, 200 )
+		self.assert_contiguous( assignments, 10 )
+
+		# identical points share a cluster
+		points = np.repeat(rng.rand(8, 4), 25, axis=0)
+		assignments = kmeans_minibatch(points, 8, batch_size=50)
+		for i in xrange(8):
+			self.assertEqual(
+					np.unique(assignments[25 * i:25 * (i + 1)]).size, 1 )
+
+		# at least as many clusters as points
+		self.assert_vector_equal(
+				kmeans_minibatch(points[:5], 5), np.arange(5) )
+
+		with self.assertRaises(ValueError):
+			kmeans_minibatch(points, 0)
+
+	def test_kmeans_minibatch_grouped(self):
+		points = np.random.rand(3 * FLAT_CLUSTERS_MAX, 3)
+		n_clusters = FLAT_CLUSTERS_MAX + 10
+		assignments = kmeans_minibatch(points, n_clusters)
+		self.assertEqual( assignments.size, points.shape[0] )
+		self.assert_contiguous( assignments, n_clusters + 20 )
+		self.assertGreater( assignments.max() + 1, FLAT_CLUSTERS_MAX // 2 )
+
+class VoxelClusteringTestCase(ConradTestCase):
+	def setUp(self):
+		self.m, self.n = 600, 50
+		self.labels = np.random.randint(0, 3, self.m)
+		self.A = np.random.rand(self.m, self.n)
+		self.A[self.labels == 0] *= 3
+		self.frame = DoseFrame(
+				data=self.A, voxel_labels=self.labels, frame_name='full')
+
+	def assert_clustered_frame(self, frame, clustered, voxel_map):
+		self.assertEqual( voxel_map.n_points, frame.voxels )
+		self.assertEqual( voxel_map.n_clusters, clustered.voxels )
+		self.assertEqual( clustered.beams, frame.beams )
+		self.assert_vector_equal(
+				clustered.voxel_labels[voxel_map.vec], frame.voxel_labels )
+		self.assert_vector_equal(
+				clustered.voxel_weights.data, voxel_map.cluster_weights )
+		A = frame.dose_matrix.data
+		A_clustered = clustered.dose_matrix.data
+		if sp.issparse(A):
+			A, A_clustered = A.toarray(), A_clustered.toarray()
+		self.assert_vector_equal( A_clustered, voxel_map.downsample(A) )
+
+	def test_voxel_clustering_init(self):
+		vc = VoxelClustering()
+		self.assertEqual( vc.compression, COMPRESSION_DEFAULT )
+		self.assertEqual( vc.sketch_dimension, SKETCH_DIMENSION_DEFAULT )
+		with self.assertRaises(ValueError):
+			VoxelClustering(compression=0.5)
+
+	def test_sketch(self):
+		vc = VoxelClustering(sketch_dimension=10)
+		S = vc.sketch(self.A)
+		self.assertEqual( S.shape, (self.m, 10) )
+		S = vc.sketch(sp.csr_matrix(self.A))
+		self.assertIsInstance( S, np.ndarray )
+		self.assertEqual( S.shape, (self.m, 10) )
+
+		# narrow matrices not projected
+		self.assert_vector_equal( vc.sketch(self.A[:, :5]), self.A[:, :5] )
+
+	def test_cluster_rows(self):
+		vc = VoxelClustering(seed=0)
+		cmap = vc.cluster_rows(self.A, 30)
+		self.assertEqual( cmap.n_points, self.m )
+		self.assertLessEqual( cmap.n_clusters, 30 )
+
+	def test_cluster_frame(self):
+		vc = VoxelClustering(compression=10, seed=0)
+		clustered, voxel_map = vc.cluster_frame(self.frame)
+		self.assertEqual( clustered.name, 'full_voxel_clusters' )
+		self.assert_clustered_frame(self.frame, clustered, voxel_map)
+		for label in xrange(3):
+			size = np.sum(self.labels == label)
+			self.assertLessEqual(
+					clustered.voxel_lookup_by_label(label).size,
+					np.ceil(size / 10.) )
+
+		# requested number of clusters per structure
+		clustered, voxel_map = vc.cluster_frame(
+				self.frame, frame_name='coarse', clusters={0: 1})
+		self.assertEqual( clustered.name, 'coarse' )
+		self.assertEqual( clustered.voxel_lookup_by_label(0).size, 1 )
+		self.assert_clustered_frame(self.frame, clustered, voxel_map)
+
+		# sparse dose matrix yields sparse clustered dose matrix
+		frame = DoseFrame(
+				data=sp.csr_matrix(self.A), voxel_labels=self.labels)
+		clustered, voxel_map = vc.cluster_frame(frame)
+		self.assertTrue( sp.isspmatrix_csr(clustered.dose_matrix.data) )
+		self.assert_clustered_frame(frame, clustered, voxel_map)
+
+		with self.assertRaises(TypeError):
+			vc.cluster_frame(self.A)
+		with self.assertRaises(ValueError):
+			vc.cluster_frame(DoseFrame(data=self.A))
+		with self.assertRaises(ValueError):
+			vc.cluster_frame(self.frame, clusters={0: 0})
+
+	def test_cluster_physics(self):
+		p = Physics(dose_matrix=self.A, voxel_labels=self.labels)
+		p.add_dose_frame('other', voxels=10, beams=self.n)
+		frame0 = p.frame.name
+		vc = VoxelClustering(seed=0)
+
+		clustered = vc.cluster_physics(p, frame_name='clusters')
+		self.assertEqual( p.frame.name, frame0 )
+		self.assertIn( 'clusters', p.available_frames )
+		self.assertIn( (frame0, 'clusters'), p.available_frame_mappings )
+		voxel_map = p.retrieve_frame_mapping(frame0, 'clusters').voxel_map
+		self.assert_clustered_frame(p.frame, clustered, voxel_map)
+
+		p.change_dose_frame('other')
+		vc.cluster_physics(p, frame_name='clusters2', source_frame=frame0)
+		self.assertEqual( p.frame.name, 'other' )
+		self.assertIn( (frame0, 'clusters2'), p.available_frame_mappings )
+
+		with self.assertRaises(TypeError):
+			vc.cluster_physics(p.frame)
+
+	def test_plan_clustered_frame(self):
+		case = Case()
+		case.anatomy += Structure(0, 'target', True)
+		case.anatomy += Structure(1, 'oar1', False)
+		case.anatomy += Structure(2, 'oar2', False)
+		case.physics.voxel_labels = self.labels
+		case.physics.dose_matrix = self.A
+		case.anatomy['target'].objective = TargetObjectiveSquare(
+				target_dose=1 * Gy, weight=1.)
+		for label in (1, 2):
+			case.anatomy[label].objective = NontargetObjectiveSquare(
+					weight=1.)
+		frame0 = case.physics.frame.name
+		self.assertTrue( case.plan(solver='ECOS', verbose=0)[0] )
+		sizes = [structure.size for structure in case.anatomy]
+
+		clustered = VoxelClustering(seed=0).cluster_physics(case.physics)
+		case.change_dose_frame(clustered.name)
+		for structure, size in zip(case.anatomy, sizes):
+			self.assertEqual(
+					structure.size,
+					clustered.voxel_lookup_by_label(structure.label).size )
+			self.assertEqual( structure.weighted_size, size )
+		feasible, run = case.plan(solver='ECOS', verbose=0)
+		self.assertTrue( feasible )
+		self.assertEqual( run.x.size, self.n )
+
+		case.change_dose_frame(frame0)
+		for structure, size in zip(case.anatomy, sizes):
+			self.assertEqual( structure.size, size )
+			self.assertEqual( structure.weighted_size, size )
+		self.assertTrue( case.plan(solver='ECOS', verbose=0)[0] )
+
+	def test_plan_clustered_small_structure(self):
+		# structure clustered to a single voxel
+		labels = self.labels.copy()
+		labels[:5] = 3
+		case = Case()
+		case.anatomy += Structure(0, 'target', True)
+		case.anatomy += Structure(1, 'oar1', False)
+		case.anatomy += Structure(2, 'oar2', False)
+		case.anatomy += Structure(3, 'oar3', False)
+		case.physics.voxel_labels = labels
+		case.physics.dose_matrix = self.A
+		case.anatomy['target'].objective = TargetObjectiveSquare(
+				target_dose=1 * Gy, weight=1.)
+		frame0 = case.physics.frame.name
+		self.assertTrue( case.plan(solver='ECOS', verbose=0)[0] )
+
+		clustered = VoxelClustering(seed=0).cluster_physics(case.physics)
+		self.assertEqual( clustered.voxel_lookup_by_label(3).size, 1 )
+		case.change_dose_frame(clustered.name)
+		oar3 = case.anatomy['oar3']
+		self.assertEqual( oar3.size, 1 )
+		self.assertEqual( oar3.weighted_size, 5 )
+		self.assertEqual( oar3.A.shape, (1, self.n) )
+		feasible, run = case.plan(solver='ECOS', verbose=0)
+		self.assertTrue( feasible )
+		self.assertEqual( run.x.size, self.n )
+
+		case.change_dose_frame(frame0)
+		self.assertEqual( oar3.size, 5 )
+		self.assertTrue( case.plan(solver='ECOS', verbose=0)[0] )
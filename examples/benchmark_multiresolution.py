@@ -0,0 +1,89 @@
+"""
+Copyright 2016 Baris Ungun, Anqi Fu
+
+This file is part of CONRAD.
+
+CONRAD is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+CONRAD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import sys
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from conrad import Case, Structure, Gy
+from conrad.optimization.objectives import NontargetObjectiveSquare, \
+										   TargetObjectiveSquare
+from conrad.optimization.beam_clustering import BeamClustering
+
+# usage: python benchmark_multiresolution.py [voxels] [beams] [compression]
+voxels = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+beams = int(sys.argv[2]) if len(sys.argv) > 2 else 1500
+compression = float(sys.argv[3]) if len(sys.argv) > 3 else 10.
+REFINE_MAXITER = 100
+OPTIONS = {'verbose': 0, 'reltol': 1e-4, 'abstol': 1e-5, 'maxiter': 5000}
+
+def build_case():
+	# 1-D phantom: beamlet influence decays with distance to voxel
+	rng = np.random.RandomState(0)
+	labels = rng.randint(0, 2, voxels)
+	positions = rng.rand(voxels)
+	centers = np.linspace(0, 1, beams)
+	A = np.exp(-(positions[:, None] - centers[None, :])**2 / 1e-3)
+	A[A < 1e-3] = 0
+	A[labels == 0] *= 3
+
+	case = Case()
+	case.anatomy += Structure(0, 'target', True)
+	case.anatomy += Structure(1, 'oar', False)
+	case.physics.voxel_labels = labels
+	case.physics.dose_matrix = sp.csr_matrix(A)
+	case.anatomy['target'].objective = TargetObjectiveSquare(
+			target_dose=1 * Gy, weight=1.)
+	case.anatomy['oar'].objective = NontargetObjectiveSquare(weight=1.)
+	return case
+
+def direct():
+	case = build_case()
+	return case.plan(**OPTIONS)[1]
+
+def multiresolution(refine_maxiter=None):
+	case = build_case()
+	BeamClustering(compression=compression, seed=0).cluster_physics(
+			case.physics, frame_name='coarse')
+	return case.plan_multiresolution(
+			'coarse', refine_maxiter=refine_maxiter, **OPTIONS)[1]
+
+print('dose matrix: {} x {}, beam compression {}'.format(
+		voxels, beams, compression))
+print('{:<24} {:>10} {:>10} {:>8} {:>14}'.format(
+		'method', 'total (s)', 'solve (s)', 'iters', 'objective'))
+cases = [
+		('direct', direct),
+		('multiresolution', multiresolution),
+		('multires., {} iters'.format(REFINE_MAXITER),
+		 lambda: multiresolution(REFINE_MAXITER)),
+]
+for name, method in cases:
+	start = time.perf_counter()
+	run = method()
+	total = time.perf_counter() - start
+	print('{:<24} {:>10.3f} {:>10.3f} {:>8} {:>14.6g}'.format(
+			name, total, run.solvetime, run.info['iters'],
+			run.info['objective']))
+	for level in run.info.get('levels', [])[:-1]:
+		print('  level {:<16} {:>10.3f} {:>10.3f} {:>8}'.format(
+				level['frame'], sum(
+						t['wall'] for t in level['timing'].values()),
+				level['solvetime'], level['iters']))
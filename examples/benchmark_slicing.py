@@ -0,0 +1,66 @@
+"""
+Copyright 2016 Baris Ungun, Anqi Fu
+
+This file is part of CONRAD.
+
+CONRAD is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+CONRAD is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with CONRAD.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import sys
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from conrad.abstract.matrix import csx_slice_compressed, \
+								   csx_slice_uncompressed
+
+# usage: python benchmark_slicing.py [voxels] [beams] [density]
+voxels = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+beams = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+density = float(sys.argv[3]) if len(sys.argv) > 3 else 0.05
+REPEATS = 3
+
+def best_time(f, *args):
+	best = np.inf
+	for _ in range(REPEATS):
+		start = time.perf_counter()
+		result = f(*args)
+		best = min(best, time.perf_counter() - start)
+	return best, result
+
+A_csr = sp.random(voxels, beams, density, format='csr', dtype=np.float32)
+A_csc = A_csr.tocsc()
+print('dose matrix: {} x {}, {} nonzeros'.format(voxels, beams, A_csr.nnz))
+
+# slice out a structure (~20% of voxels) and a subset of beams (~10%)
+rows = np.sort(np.random.choice(voxels, voxels // 5, replace=False))
+columns = np.sort(np.random.choice(beams, beams // 10, replace=False))
+
+cases = [
+		('CSR rows', csx_slice_compressed, A_csr, rows,
+		 lambda A, idx: A[idx, :]),
+		('CSR columns', csx_slice_uncompressed, A_csr, columns,
+		 lambda A, idx: A[:, idx]),
+		('CSC rows', csx_slice_uncompressed, A_csc, rows,
+		 lambda A, idx: A[idx, :]),
+		('CSC columns', csx_slice_compressed, A_csc, columns,
+		 lambda A, idx: A[:, idx]),
+]
+
+print('{:<12} {:>12} {:>12}'.format('slice', 'conrad (s)', 'scipy (s)'))
+for name, conrad_slice, A, indices, scipy_slice in cases:
+	t_conrad, sub = best_time(conrad_slice, A, indices)
+	t_scipy, sub_check = best_time(scipy_slice, A, indices)
+	assert abs(sub - sub_check).max() == 0
+	print('{:<12} {:>12.4f} {:>12.4f}'.format(name, t_conrad, t_scipy))
@@ -48,6 +48,9 @@ setup(
                       'pyyaml',
                       'nose',
                       'six'],
+    entry_points={
+        'console_scripts': ['conrad-batch = conrad.io.batch:main'],
+    },
     test_suite='nose.collector',
     tests_require=['nose'],
     use_2to3=True,